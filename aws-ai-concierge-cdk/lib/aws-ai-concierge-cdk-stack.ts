@@ -102,6 +102,7 @@ export class AwsAiConciergeCdkStack extends cdk.Stack {
               effect: iam.Effect.ALLOW,
               actions: [
                 'ce:GetCostAndUsage',
+                'ce:GetCostForecast',
                 'ce:GetDimensionValues',
                 'ce:GetReservationCoverage',
                 'ce:GetReservationPurchaseRecommendation',
@@ -177,6 +178,29 @@ export class AwsAiConciergeCdkStack extends cdk.Stack {
               ],
               resources: ['*'],
             }),
+            // Read-only permissions for the ECS, EKS, DynamoDB, ElastiCache and ELB collectors
+            new iam.PolicyStatement({
+              effect: iam.Effect.ALLOW,
+              actions: [
+                'ecs:ListClusters',
+                'ecs:DescribeClusters',
+                'eks:ListClusters',
+                'eks:DescribeCluster',
+                'dynamodb:ListTables',
+                'dynamodb:DescribeTable',
+                'elasticache:DescribeCacheClusters',
+                'elasticloadbalancing:DescribeLoadBalancers',
+              ],
+              resources: ['*'],
+            }),
+            // Resource Groups Tagging API for tag-driven discovery
+            new iam.PolicyStatement({
+              effect: iam.Effect.ALLOW,
+              actions: [
+                'tag:GetResources',
+              ],
+              resources: ['*'],
+            }),
             // Support API permissions for recommendations
             new iam.PolicyStatement({
               effect: iam.Effect.ALLOW,
@@ -1,6 +1,7 @@
 import * as cdk from 'aws-cdk-lib';
 import * as lambda from 'aws-cdk-lib/aws-lambda';
 import * as apigateway from 'aws-cdk-lib/aws-apigateway';
+import * as apigatewayv2 from 'aws-cdk-lib/aws-apigatewayv2';
 import * as dynamodb from 'aws-cdk-lib/aws-dynamodb';
 import * as iam from 'aws-cdk-lib/aws-iam';
 import { Construct } from 'constructs';
@@ -36,6 +37,7 @@ export class DemoBackendStack extends cdk.Stack {
                 'bedrock-runtime:InvokeModel',
                 'bedrock:InvokeAgent',
                 'bedrock:InvokeModel',
+                'bedrock:InvokeModelWithResponseStream',
               ],
               resources: ['*'],
             }),
@@ -181,6 +183,57 @@ export class DemoBackendStack extends cdk.Stack {
     const debugResource = api.root.addResource('debug');
     debugResource.addMethod('POST', new apigateway.LambdaIntegration(chatHandler));
 
+    // Lambda function streaming chat answers over the WebSocket API
+    const chatStreamHandler = new lambda.Function(this, 'ChatStreamFunction', {
+      runtime: lambda.Runtime.PYTHON_3_10,
+      handler: 'bedrock-agent-proxy.lambda_handler',
+      code: lambda.Code.fromAsset('./lambda'),
+      role: lambdaRole,
+      timeout: cdk.Duration.seconds(60),
+      memorySize: 512,
+    });
+
+    // WebSocket API: REST proxy integrations buffer the whole response, so stream
+    // events are posted to the client's connection as each one is produced
+    const streamApi = new apigatewayv2.CfnApi(this, 'ChatStreamApi', {
+      name: 'AWS AI Concierge Chat Stream',
+      protocolType: 'WEBSOCKET',
+      routeSelectionExpression: '$request.body.action',
+    });
+    const streamIntegration = new apigatewayv2.CfnIntegration(this, 'ChatStreamIntegration', {
+      apiId: streamApi.ref,
+      integrationType: 'AWS_PROXY',
+      integrationUri: `arn:${cdk.Aws.PARTITION}:apigateway:${cdk.Aws.REGION}:lambda:path/2015-03-31/functions/${chatStreamHandler.functionArn}/invocations`,
+    });
+    const streamRoutes: Record<string, string> = {
+      ChatStreamConnectRoute: '$connect',
+      ChatStreamDisconnectRoute: '$disconnect',
+      ChatStreamChatRoute: 'chat',
+    };
+    const routes = Object.entries(streamRoutes).map(([id, routeKey]) => new apigatewayv2.CfnRoute(this, id, {
+      apiId: streamApi.ref,
+      routeKey,
+      target: `integrations/${streamIntegration.ref}`,
+    }));
+    const streamStage = new apigatewayv2.CfnStage(this, 'ChatStreamStage', {
+      apiId: streamApi.ref,
+      stageName: 'prod',
+      autoDeploy: true,
+    });
+    routes.forEach((route) => streamStage.addDependency(route));
+
+    chatStreamHandler.addPermission('ChatStreamApiInvoke', {
+      principal: new iam.ServicePrincipal('apigateway.amazonaws.com'),
+      sourceArn: `arn:${cdk.Aws.PARTITION}:execute-api:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:${streamApi.ref}/*`,
+    });
+    chatStreamHandler.addToRolePolicy(new iam.PolicyStatement({
+      effect: iam.Effect.ALLOW,
+      actions: ['execute-api:ManageConnections'],
+      resources: [
+        `arn:${cdk.Aws.PARTITION}:execute-api:${cdk.Aws.REGION}:${cdk.Aws.ACCOUNT_ID}:${streamApi.ref}/${streamStage.stageName}/POST/@connections/*`,
+      ],
+    }));
+
     // Outputs
     new cdk.CfnOutput(this, 'ApiUrl', {
       value: api.url,
@@ -191,5 +244,10 @@ export class DemoBackendStack extends cdk.Stack {
       value: `${api.url}chat`,
       description: 'Chat API Endpoint',
     });
+
+    new cdk.CfnOutput(this, 'ChatStreamEndpoint', {
+      value: `${streamApi.attrApiEndpoint}/${streamStage.stageName}`,
+      description: 'Chat streaming WebSocket endpoint (send {"action": "chat", "message": ...})',
+    });
   }
 }
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Answer cache for the AWS AI Concierge demo chat.
+
+Keys combine the normalized question, detected intent, parsed time period and a
+hash of the AWS data injected into the prompt, so an answer is only reused while
+the underlying data is unchanged.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger()
+
+DEFAULT_TTL_SECONDS = int(os.getenv('ANSWER_CACHE_TTL_SECONDS', '900'))
+DEFAULT_MAX_ENTRIES = int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '256'))
+
+_CONTRACTIONS = {
+    "what's": 'what is', "whats": 'what is', "how's": 'how is', "where's": 'where is',
+    "i'm": 'i am', "don't": 'do not', "isn't": 'is not', "aren't": 'are not'
+}
+# Filler words that do not change what is being asked
+_FILLER_WORDS = {'please', 'hey', 'hi', 'hello', 'can', 'could', 'would', 'you', 'tell', 'me', 'show', 'the', 'a', 'an'}
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, expand common contractions, drop punctuation and filler words."""
+    text = message.lower().strip().replace('\u2019', "'")
+    for contraction, expansion in _CONTRACTIONS.items():
+        text = text.replace(contraction, expansion)
+    words = re.sub(r"[^a-z0-9$.\s-]", ' ', text).replace('.', ' ').split()
+    return ' '.join(word for word in words if word not in _FILLER_WORDS)
+
+
+def make_cache_key(message: str, intent: str, period: str, data_block: Optional[str]) -> str:
+    """Build the cache key for a chat answer."""
+    data_hash = hashlib.sha256((data_block or '').encode('utf-8')).hexdigest()
+    material = json.dumps([normalize_message(message), intent, period, data_hash])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class MemoryAnswerCacheBackend:
+    """In-process LRU store with per-entry expiry; lives as long as the Lambda container."""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Dict[str, Any], expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class DynamoDBAnswerCacheBackend:
+    """DynamoDB store shared by all containers; expiry uses the table's TTL attribute."""
+
+    name = 'dynamodb'
+
+    def __init__(self, table_name: str, dynamodb=None):
+        if dynamodb is None:
+            from client_pool import clients
+            dynamodb = clients.resource('dynamodb', 'us-east-1')
+        self.table = dynamodb.Table(table_name)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        item = self.table.get_item(Key={'cacheKey': key}).get('Item')
+        # DynamoDB TTL deletion is lazy, so check expiry ourselves
+        if not item or float(item.get('ttl', 0)) <= time.time():
+            return None
+        return json.loads(item['value'])
+
+    def put(self, key: str, value: Dict[str, Any], expires_at: float):
+        self.table.put_item(Item={
+            'cacheKey': key,
+            'value': json.dumps(value, default=str),
+            'ttl': Decimal(int(expires_at))
+        })
+
+
+class SqliteAnswerCacheBackend:
+    """Local file-backed stand-in for DynamoDB, useful for tests and local runs."""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = ':memory:', max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS answers '
+                '(cache_key TEXT PRIMARY KEY, value TEXT, expires_at REAL, used_at REAL)'
+            )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM answers WHERE cache_key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE answers SET used_at = ? WHERE cache_key = ?', (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any], expires_at: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value, default=str), expires_at, now)
+            )
+            self._conn.execute('DELETE FROM answers WHERE expires_at <= ?', (now,))
+            self._conn.execute(
+                'DELETE FROM answers WHERE cache_key NOT IN '
+                '(SELECT cache_key FROM answers ORDER BY used_at DESC LIMIT ?)', (self.max_entries,)
+            )
+            self._conn.commit()
+
+
+class AnswerCache:
+    """TTL cache of chat answers in front of a pluggable backend. Backend errors are treated as misses."""
+
+    def __init__(self, backend, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, request_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"[{request_id}] Answer cache read failed: {str(e)}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], request_id: str):
+        try:
+            self.backend.put(key, {**value, 'cached_at': time.time()}, time.time() + self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"[{request_id}] Answer cache write failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {'backend': self.backend.name, 'hits': self.hits, 'misses': self.misses, 'ttl_seconds': self.ttl_seconds}
+
+
+def create_answer_cache() -> Optional[AnswerCache]:
+    """
+    Create the answer cache configured by environment variables.
+
+    ANSWER_CACHE_BACKEND is one of memory (default), dynamodb (ANSWER_CACHE_TABLE),
+    sqlite (ANSWER_CACHE_PATH) or none.
+    """
+    backend_name = os.getenv('ANSWER_CACHE_BACKEND', 'memory').lower()
+
+    if backend_name == 'none':
+        return None
+    if backend_name == 'dynamodb':
+        backend = DynamoDBAnswerCacheBackend(os.getenv('ANSWER_CACHE_TABLE', 'demo-chat-answer-cache'))
+    elif backend_name == 'sqlite':
+        backend = SqliteAnswerCacheBackend(os.getenv('ANSWER_CACHE_PATH', '/tmp/answer-cache.db'))
+    else:
+        backend = MemoryAnswerCacheBackend()
+
+    return AnswerCache(backend)
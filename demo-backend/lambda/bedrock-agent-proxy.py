@@ -1,12 +1,49 @@
 import json
 import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-import boto3
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from client_pool import clients
+from conversation_memory import create_conversation_memory, history_messages
+from model_router import ModelRouter
+from prompt_budget import PromptBudget, PromptSection
+from answer_cache import create_answer_cache, make_cache_key
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+NOVA_MODEL_ID = 'amazon.nova-lite-v1:0'
+CLAUDE_MODEL_ID = 'anthropic.claude-3-haiku-20240307-v1:0'
+
+# 'hedged' starts Claude if Nova has not answered within HEDGE_DELAY_SECONDS; 'serial' waits for Nova to fail
+CHAT_ROUTING_MODE = os.getenv('CHAT_ROUTING_MODE', 'hedged')
+HEDGE_DELAY_SECONDS = float(os.getenv('HEDGE_DELAY_SECONDS', '2.5'))
+
+# Keywords per chat intent; a message can match several intents
+INTENT_KEYWORDS = {
+    'cost': ('cost', 'spending', 'bill', 'how much', 'expensive'),
+    'security': ('security', 'secure', 'vulnerab'),
+    'resource': ('resource', 'instance', 'ec2', 'server')
+}
+# Words that point back at earlier turns; such follow-ups are answered without the answer cache
+FOLLOW_UP_WORDS = frozenset(('it', 'its', 'that', 'those', 'them', 'they', 'above', 'previous', 'earlier', 'same', 'instead'))
+# Real-data fetchers still running after this many seconds are left out of the prompt
+CONTEXT_FETCH_TIMEOUT_SECONDS = float(os.getenv('CONTEXT_FETCH_TIMEOUT_SECONDS', '6'))
+SEVERITY_PRIORITY = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
+
+# Rolling per-model stats live for the lifetime of the container
+model_router = ModelRouter(['nova_lite', 'claude_haiku'])
+# Reuses answers while the question, intent, period and injected AWS data are unchanged
+answer_cache = create_answer_cache()
+# Keeps injected AWS data within PROMPT_DATA_BUDGET_TOKENS
+prompt_budget = PromptBudget()
+# Fixed-size history window (rolling summary + last turns) per sessionId
+conversation_memory = create_conversation_memory()
+
 def lambda_handler(event, context):
     """
     Handler for API Gateway proxy integration.
@@ -26,6 +63,14 @@ def lambda_handler(event, context):
     request_id = context.aws_request_id
     logger.info(f"[{request_id}] Received event: {json.dumps(event)}")
     
+    # Turns buffered by earlier invocations are written while this one runs
+    if conversation_memory is not None:
+        conversation_memory.start_invocation()
+    
+    # Chat streaming arrives through the WebSocket API, which has no path or method
+    if event.get('requestContext', {}).get('connectionId'):
+        return handle_websocket_event(event, request_id)
+    
     try:
         # Extract path and method from API Gateway event
         path = event.get('path', '')
@@ -90,6 +135,46 @@ def create_response(status_code: int, body: Dict[str, Any]) -> Dict[str, Any]:
         'body': json.dumps(body, default=str)  # JSON string, not object!
     }
 
+def handle_websocket_event(event: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+    """
+    Handle a chat WebSocket API event.
+    
+    The 'chat' route (body {"action": "chat", "message": ..., "sessionId": ...}) posts
+    each handle_chat_stream event to the caller's connection as soon as it is produced,
+    so the first token reaches the client while the model is still generating. Tokens
+    already delivered stay with the client if the stream fails; an 'error' event follows.
+    """
+    request_context = event['requestContext']
+    if request_context.get('routeKey') in ('$connect', '$disconnect'):
+        return {'statusCode': 200}
+    
+    connection_id = request_context['connectionId']
+    management_api = clients.client(
+        'apigatewaymanagementapi',
+        endpoint_url=f"https://{request_context['domainName']}/{request_context['stage']}"
+    )
+    
+    def send(stream_event: Dict[str, Any]):
+        management_api.post_to_connection(
+            ConnectionId=connection_id,
+            Data=json.dumps(stream_event, default=str).encode('utf-8')
+        )
+    
+    try:
+        body = json.loads(event.get('body') or '{}')
+        for stream_event in handle_chat_stream(body, request_id):
+            send(stream_event)
+    except management_api.exceptions.GoneException:
+        logger.warning(f"[{request_id}] Client {connection_id} disconnected mid-stream")
+    except Exception as e:
+        logger.error(f"[{request_id}] Stream error: {str(e)}", exc_info=True)
+        try:
+            send({'type': 'error', 'error': str(e), 'error_type': type(e).__name__})
+        except Exception:
+            logger.warning(f"[{request_id}] Could not deliver stream error to {connection_id}")
+    
+    return {'statusCode': 200}
+
 def handle_cost_analysis(params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
     """
     Handle cost analysis request using AWS Cost Explorer.
@@ -125,7 +210,7 @@ def handle_cost_analysis(params: Dict[str, Any], request_id: str) -> Dict[str, A
     logger.info(f"[{request_id}] Analyzing costs from {start_date} to {end_date}")
     
     # Call AWS Cost Explorer
-    ce_client = boto3.client('ce')
+    ce_client = clients.client('ce')
     
     try:
         response = ce_client.get_cost_and_usage(
@@ -192,7 +277,7 @@ def handle_resource_inventory(params: Dict[str, Any], request_id: str) -> Dict[s
     
     # Example: List EC2 instances
     if resource_type == 'EC2':
-        ec2_client = boto3.client('ec2', region_name=region)
+        ec2_client = clients.client('ec2', region)
         response = ec2_client.describe_instances()
         
         resources = []
@@ -216,7 +301,7 @@ def handle_resource_inventory(params: Dict[str, Any], request_id: str) -> Dict[s
     
     # Example: List S3 buckets
     elif resource_type == 'S3':
-        s3_client = boto3.client('s3', region_name=region)
+        s3_client = clients.client('s3', region)
         response = s3_client.list_buckets()
         
         resources = []
@@ -252,7 +337,7 @@ def handle_security_assessment(params: Dict[str, Any], request_id: str) -> Dict[
     region = params.get('region', 'us-east-1')
     
     # Example: Check security groups for open access
-    ec2_client = boto3.client('ec2', region_name=region)
+    ec2_client = clients.client('ec2', region)
     
     try:
         response = ec2_client.describe_security_groups()
@@ -285,7 +370,7 @@ def handle_security_assessment(params: Dict[str, Any], request_id: str) -> Dict[
 
 def handle_chat_request(params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
     """
-    Handle chat request - Hybrid approach: Try Nova Lite direct, fallback to Claude Haiku via Bedrock Agent.
+    Handle chat request - Hybrid approach: Nova Lite direct raced against Claude Haiku via Bedrock Agent.
     """
     logger.info(f"[{request_id}] 🔍 DEBUG: Starting hybrid chat request with params: {params}")
     
@@ -295,26 +380,39 @@ def handle_chat_request(params: Dict[str, Any], request_id: str) -> Dict[str, An
     if not message.strip():
         raise ValueError("Message cannot be empty")
     
-    # Step 1: Try Nova Lite directly via bedrock-runtime
-    logger.info(f"[{request_id}] 🚀 STEP 1: Attempting Nova Lite direct call")
-    nova_result = try_nova_lite_direct(message, session_id, request_id)
+    # Step 1: Fetch real AWS data and build the Nova prompt before any model starts, so the
+    # fetch counts against neither the hedge delay nor the models' latency stats
+    turn = prepare_nova_turn(message, session_id, request_id)
+    cached = cached_answer(turn, message, session_id, request_id)
+    if cached is not None:
+        return cached
     
-    if nova_result['success']:
-        logger.info(f"[{request_id}] ✅ SUCCESS: Nova Lite direct call worked!")
-        return nova_result['response']
+    # Step 2: Race Nova Lite (direct) and Claude Haiku (agent); the first good answer wins
+    hedge_delay = HEDGE_DELAY_SECONDS if CHAT_ROUTING_MODE == 'hedged' else None
+    logger.info(f"[{request_id}] 🚀 STEP 2: Routing chat ({CHAT_ROUTING_MODE}, hedge delay {hedge_delay})")
     
-    # Step 2: Fallback to Claude Haiku via Bedrock Agent
-    logger.info(f"[{request_id}] 🔄 STEP 2: Nova failed, falling back to Claude Haiku via Bedrock Agent")
-    logger.info(f"[{request_id}] 🔍 Nova failure reason: {nova_result['error']}")
-    
-    claude_result = try_claude_haiku_agent(message, session_id, request_id)
+    race = model_router.race(
+        {
+            'nova_lite': lambda cancel_event: try_nova_lite_direct(message, session_id, request_id, turn, cancel_event),
+            'claude_haiku': lambda cancel_event: try_claude_haiku_agent(message, session_id, request_id, cancel_event)
+        },
+        hedge_delay,
+        request_id
+    )
+    routing = race['routing']
+    nova_attempt = routing['attempts'].get('nova_lite', {})
+    claude_attempt = routing['attempts'].get('claude_haiku', {})
     
-    if claude_result['success']:
-        logger.info(f"[{request_id}] ✅ SUCCESS: Claude Haiku agent worked!")
-        # Add fallback info to trace
-        claude_result['response']['trace']['nova_attempted'] = True
-        claude_result['response']['trace']['nova_error'] = nova_result['error']
-        return claude_result['response']
+    if race['success']:
+        logger.info(f"[{request_id}] ✅ SUCCESS: {race['winner']} won ({routing['reason']})")
+        response = race['response']
+        response['trace']['routing'] = routing
+        record_turn(session_id, message, race['text'], request_id)
+        if race['winner'] == 'claude_haiku' and nova_attempt.get('status') == 'failed':
+            # Keep the fallback fields the frontend already reads
+            response['trace']['nova_attempted'] = True
+            response['trace']['nova_error'] = nova_attempt.get('error')
+        return response
     
     # Step 3: Final fallback to simulated response
     logger.warning(f"[{request_id}] ⚠️ STEP 3: Both Nova and Claude failed, using simulated response")
@@ -329,87 +427,246 @@ def handle_chat_request(params: Dict[str, Any], request_id: str) -> Dict[str, An
             'fallback': True,
             'nova_attempted': True,
             'claude_attempted': True,
-            'nova_error': nova_result['error'],
-            'claude_error': claude_result['error'],
-            'reason': 'Both Nova and Claude failed'
+            'nova_error': nova_attempt.get('error'),
+            'claude_error': claude_attempt.get('error'),
+            'reason': 'Both Nova and Claude failed' if routing['reason'] != 'all circuits open' else 'All model circuits open',
+            'routing': routing
         },
         'model': 'simulated (both models failed)',
         'debug_info': {
             'source': 'simulated_fallback',
-            'nova_error': nova_result['error'],
-            'claude_error': claude_result['error']
+            'nova_error': nova_attempt.get('error'),
+            'claude_error': claude_attempt.get('error')
         }
     }
 
-def try_nova_lite_direct(message: str, session_id: str, request_id: str) -> Dict[str, Any]:
+def detect_intents(message: str) -> List[str]:
+    """Detect every kind of AWS data a chat message asks for, in INTENT_KEYWORDS order."""
+    message_lower = message.lower()
+    return [
+        intent for intent, keywords in INTENT_KEYWORDS.items()
+        if any(keyword in message_lower for keyword in keywords)
+    ]
+
+def get_answer_cache_key(message: str, real_aws_data: Optional[str], request_id: str) -> str:
+    """Build the answer cache key from the message, its intents and period, and the injected data."""
+    intents = detect_intents(message)
+    period = parse_cost_time_period(message, request_id)['period_description'] if 'cost' in intents else ''
+    return make_cache_key(message, '+'.join(intents) or 'general', period, real_aws_data or '')
+
+def is_standalone_question(message: str, history: Optional[Dict[str, Any]]) -> bool:
     """
-    Try Nova Lite directly via bedrock-runtime API with real AWS data integration.
+    Whether the answer depends only on the message and the injected data, not on earlier turns.
+    
+    The first turn always is; later turns must name a data intent and not refer back
+    to earlier answers ("why is it so high?", "show those again").
     """
-    try:
-        logger.info(f"[{request_id}] 🔍 Calling Nova Lite with real AWS data integration v2...")
-        
-        # Step 1: Check if user is asking for specific AWS data
-        message_lower = message.lower()
-        real_aws_data = None
-        
-        if 'cost' in message_lower or 'spending' in message_lower or 'bill' in message_lower:
-            logger.info(f"[{request_id}] 💰 Cost query detected, fetching real AWS cost data...")
-            real_aws_data = get_real_cost_data(request_id, message)
-        elif 'security' in message_lower or 'vulnerable' in message_lower:
-            logger.info(f"[{request_id}] 🛡️ Security query detected, fetching real security data...")
-            real_aws_data = get_real_security_data(request_id)
-        elif 'resource' in message_lower or 'instance' in message_lower or 'ec2' in message_lower:
-            logger.info(f"[{request_id}] 🏗️ Resource query detected, fetching real resource data...")
-            real_aws_data = get_real_resource_data(request_id)
-        
-        # Step 2: Enhance message with real AWS data if available
-        if real_aws_data:
-            enhanced_message = f"""You are an AWS AI Concierge powered by Amazon Nova Lite. You have access to real AWS data.
+    if not history or not (history['turns'] or history['summary']):
+        return True
+    words = set(re.findall(r"[a-z']+", message.lower()))
+    return bool(detect_intents(message)) and not words & FOLLOW_UP_WORDS
+
+def load_history(session_id: str, request_id: str) -> Optional[Dict[str, Any]]:
+    """Load the conversation history window for a session, if conversation memory is enabled."""
+    if conversation_memory is None:
+        return None
+    return conversation_memory.load(session_id, request_id)
+
+def record_turn(session_id: str, message: str, response_text: str, request_id: str):
+    """Record a completed turn in conversation memory, if enabled."""
+    if conversation_memory is not None:
+        conversation_memory.record(session_id, message, response_text, request_id)
+
+def history_trace(history: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if history is None:
+        return None
+    return {'turns': len(history['turns']), 'summary_chars': len(history['summary'])}
+
+def prepare_nova_turn(message: str, session_id: str, request_id: str) -> Dict[str, Any]:
+    """
+    Fetch real AWS data, build the Nova Lite prompt and load the history window once per chat turn.
+    
+    Returns:
+        Dictionary with 'prompt', 'real_aws_data', 'history' and 'cache_key' (None when caching is off)
+    """
+    enhanced_message, real_aws_data = build_nova_prompt(message, request_id)
+    history = load_history(session_id, request_id)
+    cache_key = None
+    if answer_cache is not None and is_standalone_question(message, history):
+        cache_key = get_answer_cache_key(message, real_aws_data, request_id)
+    return {'prompt': enhanced_message, 'real_aws_data': real_aws_data, 'history': history, 'cache_key': cache_key}
+
+def cached_answer(turn: Dict[str, Any], message: str, session_id: str, request_id: str) -> Optional[Dict[str, Any]]:
+    """Answer the same question over the same data from the cache without calling a model."""
+    if turn['cache_key'] is None:
+        return None
+    cached = answer_cache.get(turn['cache_key'], request_id)
+    # Entries from before answers were cached unbranded have no 'text'; let them expire
+    if cached is None or 'text' not in cached:
+        return None
+    logger.info(f"[{request_id}] ⚡ Answer cache hit ({answer_cache.backend.name})")
+    record_turn(session_id, message, cached['text'], request_id)
+    return cached_chat_response(cached, session_id, turn['cache_key'])
+
+def fetch_real_aws_data(message: str, intents: List[str], request_id: str) -> Optional[str]:
+    """
+    Run the real-data fetchers for the detected intents concurrently.
+    
+    Fetchers that have not finished within CONTEXT_FETCH_TIMEOUT_SECONDS are dropped
+    so one slow API cannot hold up the chat reply.
+    
+    Returns:
+        Data sections in intent order rendered within the prompt budget, or None if nothing was fetched
+    """
+    if not intents:
+        return None
+    
+    fetchers = {
+        'cost': lambda: get_real_cost_data(request_id, message),
+        'security': lambda: get_real_security_data(request_id),
+        'resource': lambda: get_real_resource_data(request_id)
+    }
+    
+    logger.info(f"[{request_id}] 🔎 Intents detected: {', '.join(intents)}, fetching real AWS data...")
+    executor = ThreadPoolExecutor(max_workers=len(intents))
+    futures = {executor.submit(fetchers[intent]): intent for intent in intents}
+    _, not_done = wait(futures, timeout=CONTEXT_FETCH_TIMEOUT_SECONDS)
+    executor.shutdown(wait=False)
+    
+    sections = []
+    for future, intent in futures.items():
+        if future in not_done:
+            logger.warning(f"[{request_id}] ⏱️ {intent} data not ready after {CONTEXT_FETCH_TIMEOUT_SECONDS}s, leaving it out")
+            continue
+        try:
+            section = future.result()
+        except Exception as e:
+            logger.error(f"[{request_id}] ❌ {intent} data fetch failed: {str(e)}")
+            section = None
+        if section:
+            sections.append(section)
+    
+    return prompt_budget.render(sections, request_id)
+
+def build_nova_prompt(message: str, request_id: str) -> Tuple[str, Optional[str]]:
+    """
+    Build the Nova Lite prompt, injecting real AWS data when the query asks for it.
+    
+    Returns:
+        Tuple of (prompt text, real AWS data block or None)
+    """
+    # Step 1: Fetch real AWS data for every kind of data the user is asking about
+    real_aws_data = fetch_real_aws_data(message, detect_intents(message), request_id)
+    
+    # Step 2: Enhance message with real AWS data if available
+    if real_aws_data:
+        enhanced_message = f"""You are an AWS AI Concierge powered by Amazon Nova Lite. You have access to real AWS data.
 
 User query: {message}
 
-REAL AWS DATA (use this actual data in your response):
+REAL AWS DATA (use this actual data in your response; tables are pipe-separated with a header row):
 {real_aws_data}
 
 IMPORTANT: When presenting the time period to the user, focus on the complete month being analyzed. For example, if the data shows "2024-12-01 to 2024-12-31", present it as "December 2024" or "the month of December 2024". The date range represents the complete month the user requested.
 
 Please provide a helpful response using the REAL AWS DATA above. Be specific and reference the actual numbers and resources shown, and present the time period in a user-friendly way."""
-        else:
-            enhanced_message = f"""You are an AWS AI Concierge powered by Amazon Nova Lite. You help users with AWS infrastructure management.
+    else:
+        enhanced_message = f"""You are an AWS AI Concierge powered by Amazon Nova Lite. You help users with AWS infrastructure management.
 
 User query: {message}
 
 Please provide a helpful response about AWS infrastructure management. If the user needs specific cost, security, or resource data, let them know you can provide real AWS insights."""
-        
-        # Step 3: Call Nova Lite
-        bedrock_runtime = boto3.client('bedrock-runtime', region_name='us-east-1')
-        
-        request_body = {
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "text": enhanced_message
-                        }
-                    ]
-                }
-            ],
-            "inferenceConfig": {
-                "maxTokens": 1000,
-                "temperature": 0.7
+    
+    return enhanced_message, real_aws_data
+
+def build_nova_request_body(prompt: str, history: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build the Nova Lite messages-API request body: the history window followed by this user turn."""
+    body = {
+        "messages": history_messages(history) + [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "text": prompt
+                    }
+                ]
+            }
+        ],
+        "inferenceConfig": {
+            "maxTokens": 1000,
+            "temperature": 0.7
+        }
+    }
+    if history and history['summary']:
+        body["system"] = [{"text": f"Summary of earlier turns in this conversation:\n{history['summary']}"}]
+    return body
+
+def nova_header(real_aws_data_used: bool) -> str:
+    """Nova Lite branding line shown above the answer text."""
+    data_source = "with Real AWS Data" if real_aws_data_used else "with General AWS Guidance"
+    return f"**🚀 Powered by Amazon Nova Lite (Direct Integration {data_source})**\n\n"
+
+def cached_chat_response(cached: Dict[str, Any], session_id: str, cache_key: str) -> Dict[str, Any]:
+    """Build a chat response from a cached answer; the cache holds the unbranded text."""
+    return {
+        'response': nova_header(cached.get('real_aws_data_used', False)) + cached['text'],
+        'sessionId': session_id,
+        'citations': [],
+        'trace': {
+            'fallback': False,
+            'model_used': NOVA_MODEL_ID,
+            'response_time': 0.0,
+            'integration_type': 'answer_cache',
+            'real_aws_data_used': cached.get('real_aws_data_used', False),
+            'cache': {
+                'hit': True,
+                'backend': answer_cache.backend.name,
+                'key': cache_key[:16],
+                'age_seconds': round(datetime.utcnow().timestamp() - cached.get('cached_at', 0), 1)
             }
+        },
+        'model': f"{NOVA_MODEL_ID} (cached answer)",
+        'debug_info': {
+            'source': 'answer_cache',
+            'completion_length': len(cached['text'])
         }
+    }
+
+def try_nova_lite_direct(message: str, session_id: str, request_id: str, turn: Dict[str, Any],
+                         cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Try Nova Lite directly via bedrock-runtime API with real AWS data integration.
+    
+    turn is the prepare_nova_turn result, so only the model call runs inside the race.
+    If cancel_event is set (another model already answered), the result is discarded.
+    The result's 'model_latency' is the invoke_model time the router records.
+    """
+    try:
+        logger.info(f"[{request_id}] 🔍 Calling Nova Lite with real AWS data integration v2...")
+        
+        real_aws_data = turn['real_aws_data']
+        history = turn['history']
+        cache_key = turn['cache_key']
+        
+        bedrock_runtime = clients.client('bedrock-runtime', 'us-east-1')
+        
+        request_body = build_nova_request_body(turn['prompt'], history)
         
         start_time = datetime.utcnow()
         
+        if cancel_event is not None and cancel_event.is_set():
+            return {'success': False, 'error': 'Cancelled', 'error_type': 'Cancelled'}
+        
         response = bedrock_runtime.invoke_model(
-            modelId='amazon.nova-lite-v1:0',
+            modelId=NOVA_MODEL_ID,
             body=json.dumps(request_body),
             contentType='application/json',
             accept='application/json'
         )
         
+        if cancel_event is not None and cancel_event.is_set():
+            return {'success': False, 'error': 'Cancelled', 'error_type': 'Cancelled'}
+        
         end_time = datetime.utcnow()
         response_time = (end_time - start_time).total_seconds()
         
@@ -420,25 +677,31 @@ Please provide a helpful response about AWS infrastructure management. If the us
             response_text = response_body['output']['message']['content'][0]['text']
             
             # Add Nova Lite branding with real data indicator
-            data_source = "with Real AWS Data" if real_aws_data else "with General AWS Guidance"
-            branded_response = f"**🚀 Powered by Amazon Nova Lite (Direct Integration {data_source})**\n\n{response_text}"
+            branded_response = nova_header(bool(real_aws_data)) + response_text
             
             logger.info(f"[{request_id}] ✅ Nova Lite success! Response time: {response_time:.2f}s, Real data: {bool(real_aws_data)}")
             
+            if cache_key is not None:
+                answer_cache.put(cache_key, {'text': response_text, 'real_aws_data_used': bool(real_aws_data)}, request_id)
+            
             return {
                 'success': True,
+                'model_latency': response_time,
+                'text': response_text,
                 'response': {
                     'response': branded_response,
                     'sessionId': session_id,
                     'citations': [],
                     'trace': {
                         'fallback': False,
-                        'model_used': 'amazon.nova-lite-v1:0',
+                        'model_used': NOVA_MODEL_ID,
                         'response_time': response_time,
                         'integration_type': 'direct_bedrock_runtime',
-                        'real_aws_data_used': bool(real_aws_data)
+                        'real_aws_data_used': bool(real_aws_data),
+                        'cache': {'hit': False, 'backend': answer_cache.backend.name} if answer_cache else None,
+                        'history': history_trace(history)
                     },
-                    'model': 'amazon.nova-lite-v1:0 (direct + real data)',
+                    'model': f"{NOVA_MODEL_ID} (direct + real data)",
                     'debug_info': {
                         'source': 'nova_lite_direct_with_real_data',
                         'response_time': response_time,
@@ -459,8 +722,228 @@ Please provide a helpful response about AWS infrastructure management. If the us
             'error_type': type(e).__name__
         }
 
-def get_real_cost_data(request_id: str, user_message: str = "") -> str:
-    """Get real AWS cost data using Cost Explorer API with intelligent date parsing."""
+def handle_chat_stream(params: Dict[str, Any], request_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming chat: yields token events as the model produces them, then one 'done' event.
+    
+    The 'done' event carries the same response/sessionId/trace/model fields as the
+    non-streaming /chat response. Nova Lite is streamed first; if it fails before the
+    first token, Claude Haiku agent chunks are streamed instead, then the simulated answer.
+    The turn is recorded once, for whichever model completed the stream.
+    """
+    message = params.get('message', '')
+    session_id = params.get('sessionId', f"session-{request_id}")
+    
+    if not message.strip():
+        raise ValueError("Message cannot be empty")
+    
+    # Fetch the data before timing any model, so the fetch stays out of the models' latency stats
+    turn = prepare_nova_turn(message, session_id, request_id)
+    cached = cached_answer(turn, message, session_id, request_id)
+    if cached is not None:
+        yield {'type': 'token', 'text': cached['response']}
+        yield {'type': 'done', 'response': cached}
+        return
+    
+    errors = {}
+    streams = (
+        ('nova_lite', lambda: stream_nova_lite_direct(message, session_id, request_id, turn)),
+        ('claude_haiku', lambda: stream_claude_haiku_agent(message, session_id, request_id))
+    )
+    for model, stream_fn in streams:
+        if not model_router.allow(model):
+            logger.warning(f"[{request_id}] Circuit open, skipping {model} stream")
+            errors[model] = 'circuit open'
+            continue
+        started = datetime.utcnow()
+        tokens_sent = 0
+        try:
+            for event in stream_fn():
+                if event['type'] == 'token':
+                    tokens_sent += 1
+                elif event['type'] == 'done':
+                    record_turn(session_id, message, event.pop('text'), request_id)
+                    event['response']['trace']['streamed'] = True
+                    if errors:
+                        event['response']['trace']['fallback_errors'] = errors
+                    elapsed = (datetime.utcnow() - started).total_seconds()
+                    model_router.record(model, event['response']['trace'].get('response_time', elapsed), True)
+                    event['response']['trace']['circuit_breakers'] = model_router.breaker_snapshot()
+                yield event
+            return
+        except Exception as e:
+            logger.error(f"[{request_id}] ❌ {model} stream failed after {tokens_sent} tokens: {str(e)}")
+            model_router.record(model, (datetime.utcnow() - started).total_seconds(), False)
+            if tokens_sent:
+                # Part of the answer is already on the wire; finish with what the client has
+                yield {'type': 'error', 'error': str(e), 'model': model}
+                yield {'type': 'done', 'response': {
+                    'response': None,
+                    'sessionId': session_id,
+                    'citations': [],
+                    'trace': {'fallback': False, 'streamed': True, 'truncated': True, 'model_used': model, 'error': str(e)},
+                    'model': model
+                }}
+                return
+            errors[model] = str(e)
+    
+    logger.warning(f"[{request_id}] ⚠️ Both streaming models failed, using simulated response")
+    simulated_response = get_simulated_chat_response(message)
+    yield {'type': 'token', 'text': simulated_response}
+    yield {'type': 'done', 'response': {
+        'response': simulated_response,
+        'sessionId': session_id,
+        'citations': [],
+        'trace': {
+            'fallback': True,
+            'streamed': True,
+            'reason': 'Both Nova and Claude failed',
+            'fallback_errors': errors,
+            'circuit_breakers': model_router.breaker_snapshot()
+        },
+        'model': 'simulated (both models failed)'
+    }}
+
+def stream_nova_lite_direct(message: str, session_id: str, request_id: str,
+                            turn: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Nova Lite tokens via invoke_model_with_response_stream.
+    
+    turn is the prepare_nova_turn result. Yields {'type': 'token', 'text': ...} events
+    and a final {'type': 'done', 'text': ..., 'response': ...}, 'text' being the unbranded answer.
+    """
+    real_aws_data = turn['real_aws_data']
+    history = turn['history']
+    cache_key = turn['cache_key']
+    
+    bedrock_runtime = clients.client('bedrock-runtime', 'us-east-1')
+    
+    header = nova_header(bool(real_aws_data))
+    
+    start_time = datetime.utcnow()
+    response = bedrock_runtime.invoke_model_with_response_stream(
+        modelId=NOVA_MODEL_ID,
+        body=json.dumps(build_nova_request_body(turn['prompt'], history)),
+        contentType='application/json',
+        accept='application/json'
+    )
+    
+    parts = []
+    usage = {}
+    first_token_time = None
+    
+    for event in response['body']:
+        if 'chunk' not in event:
+            # Modeled stream errors (throttling, validation) arrive as their own event types
+            error_type = next(iter(event), 'UnknownStreamError')
+            raise RuntimeError(f"{error_type}: {event[error_type].get('message', '') if isinstance(event[error_type], dict) else ''}")
+        
+        payload = json.loads(event['chunk']['bytes'])
+        text = payload.get('contentBlockDelta', {}).get('delta', {}).get('text')
+        if text:
+            if first_token_time is None:
+                first_token_time = (datetime.utcnow() - start_time).total_seconds()
+                logger.info(f"[{request_id}] ⚡ Nova Lite first token after {first_token_time:.2f}s")
+                yield {'type': 'token', 'text': header}
+            parts.append(text)
+            yield {'type': 'token', 'text': text}
+        if 'metadata' in payload:
+            usage = payload['metadata'].get('usage', {})
+    
+    if first_token_time is None:
+        raise ValueError("Empty response stream from Nova Lite")
+    
+    response_text = ''.join(parts)
+    response_time = (datetime.utcnow() - start_time).total_seconds()
+    logger.info(f"[{request_id}] ✅ Nova Lite stream complete in {response_time:.2f}s")
+    
+    if cache_key is not None:
+        answer_cache.put(cache_key, {'text': response_text, 'real_aws_data_used': bool(real_aws_data)}, request_id)
+    
+    yield {'type': 'done', 'text': response_text, 'response': {
+        'response': header + response_text,
+        'sessionId': session_id,
+        'citations': [],
+        'trace': {
+            'fallback': False,
+            'model_used': NOVA_MODEL_ID,
+            'response_time': response_time,
+            'time_to_first_token': first_token_time,
+            'integration_type': 'direct_bedrock_runtime_stream',
+            'real_aws_data_used': bool(real_aws_data),
+            'cache': {'hit': False, 'backend': answer_cache.backend.name} if answer_cache else None,
+            'history': history_trace(history)
+        },
+        'model': f"{NOVA_MODEL_ID} (direct stream + real data)",
+        'debug_info': {
+            'source': 'nova_lite_direct_stream',
+            'completion_length': len(response_text),
+            'usage': usage,
+            'real_data_integrated': bool(real_aws_data)
+        }
+    }}
+
+def stream_claude_haiku_agent(message: str, session_id: str, request_id: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Claude Haiku agent chunks as they arrive instead of concatenating them first.
+    
+    Yields {'type': 'token', 'text': ...} events and a final {'type': 'done', 'text': ..., 'response': ...},
+    'text' being the unbranded answer.
+    """
+    bedrock_runtime = clients.client('bedrock-agent-runtime', 'us-east-1')
+    header = "**🤖 Powered by Claude 3 Haiku (Bedrock Agent)**\n\n"
+    
+    start_time = datetime.utcnow()
+    response = bedrock_runtime.invoke_agent(
+        agentId='WWYOPOAATI',
+        agentAliasId='TSTALIASID',
+        sessionId=session_id,
+        inputText=message
+    )
+    
+    parts = []
+    citations = []
+    trace = {}
+    first_token_time = None
+    
+    for event in response.get('completion', []):
+        if 'chunk' in event and 'bytes' in event['chunk']:
+            text = event['chunk']['bytes'].decode('utf-8')
+            if first_token_time is None:
+                first_token_time = (datetime.utcnow() - start_time).total_seconds()
+                yield {'type': 'token', 'text': header}
+            parts.append(text)
+            yield {'type': 'token', 'text': text}
+        elif 'trace' in event:
+            trace = event['trace']
+        elif 'citation' in event:
+            citations.append(event['citation'])
+    
+    if first_token_time is None:
+        raise ValueError("Empty response from Claude Haiku agent")
+    
+    completion = ''.join(parts)
+    yield {'type': 'done', 'text': completion, 'response': {
+        'response': header + completion,
+        'sessionId': session_id,
+        'citations': citations,
+        'trace': {
+            'fallback': False,
+            'model_used': CLAUDE_MODEL_ID,
+            'time_to_first_token': first_token_time,
+            'integration_type': 'bedrock_agent_stream',
+            **trace
+        },
+        'model': f"{CLAUDE_MODEL_ID} (agent)",
+        'debug_info': {
+            'source': 'claude_haiku_agent_stream',
+            'agent_id': 'WWYOPOAATI',
+            'completion_length': len(completion)
+        }
+    }}
+
+def get_real_cost_data(request_id: str, user_message: str = "") -> Optional[PromptSection]:
+    """Get real AWS cost data using Cost Explorer API with intelligent date parsing, services ranked by cost."""
     try:
         logger.info(f"[{request_id}] 💰 Fetching real cost data for message: {user_message}")
         
@@ -486,13 +969,15 @@ def get_real_cost_data(request_id: str, user_message: str = "") -> str:
             except Exception as e:
                 logger.warning(f"[{request_id}] Could not adjust display date: {str(e)}")
         
-        return f"""REAL AWS COST DATA:
-- Total Cost: ${cost_data['total_cost']} USD
-- Time Period: {display_start_date} to {display_end_date}
-- Period Description: {cost_params.get('period_description', 'Current period')}
-- Top Services: {', '.join([f"{item['service_name']}: ${item['cost']}" for item in cost_data['breakdown'][:5]])}
-- Total Services: {cost_data['total_services']}
-- Note: This covers the complete month of {cost_params.get('period_description', 'the requested period')}"""
+        section = PromptSection('REAL AWS COST DATA', [
+            f"Total Cost: ${cost_data['total_cost']} USD",
+            f"Time Period: {display_start_date} to {display_end_date}",
+            f"Period: {cost_params.get('period_description', 'Current period')} (complete month)",
+            f"Total Services: {cost_data['total_services']}"
+        ], ['service', 'cost_usd', 'pct'])
+        for item in cost_data['breakdown']:
+            section.add_row([item['service_name'], item['cost'], item['percentage']], item['cost'])
+        return section
         
     except Exception as e:
         logger.error(f"[{request_id}] ❌ Failed to get real cost data: {str(e)}")
@@ -596,51 +1081,68 @@ def parse_cost_time_period(message: str, request_id: str) -> Dict[str, Any]:
     logger.info(f"[{request_id}] 📅 Final params: {params}")
     return params
 
-def get_real_security_data(request_id: str) -> str:
-    """Get real AWS security data."""
+def get_real_security_data(request_id: str) -> Optional[PromptSection]:
+    """Get real AWS security data, issues ranked by severity."""
     try:
         logger.info(f"[{request_id}] 🛡️ Fetching real security data...")
         
         # Use the existing security assessment function
         security_data = handle_security_assessment({'region': 'us-east-1'}, request_id)
         
-        return f"""REAL AWS SECURITY DATA:
-- Total Issues: {security_data['total_issues']}
-- High Priority Issues: {security_data['high_priority']}
-- Assessment Time: {security_data['assessment_time']}
-- Region: {security_data['region']}
-- Issues Found: {', '.join([f"{issue['type']}: {issue['description']}" for issue in security_data['security_issues'][:3]])}"""
+        section = PromptSection('REAL AWS SECURITY DATA', [
+            f"Total Issues: {security_data['total_issues']}",
+            f"High Priority Issues: {security_data['high_priority']}",
+            f"Region: {security_data['region']}",
+            f"Assessment Time: {security_data['assessment_time']}"
+        ], ['severity', 'type', 'resource', 'port', 'protocol'])
+        for issue in security_data['security_issues']:
+            section.add_row(
+                [issue['severity'], issue['type'], issue['resource_id'], issue['port'], issue['protocol']],
+                SEVERITY_PRIORITY.get(issue['severity'], 0)
+            )
+        return section
         
     except Exception as e:
         logger.error(f"[{request_id}] ❌ Failed to get real security data: {str(e)}")
         return None
 
-def get_real_resource_data(request_id: str) -> str:
-    """Get real AWS resource data."""
+def get_real_resource_data(request_id: str) -> Optional[PromptSection]:
+    """Get real AWS resource data, running resources first."""
     try:
         logger.info(f"[{request_id}] 🏗️ Fetching real resource data...")
         
         # Use the existing resource inventory function
         resource_data = handle_resource_inventory({'resource_type': 'EC2', 'region': 'us-east-1'}, request_id)
         
-        return f"""REAL AWS RESOURCE DATA:
-- Resource Type: {resource_data['resource_type']}
-- Total Count: {resource_data['total_count']}
-- Region: {resource_data['region']}
-- Resources: {', '.join([f"{res['name']} ({res['state']})" for res in resource_data['resources'][:5]])}"""
+        resources = resource_data['resources']
+        section = PromptSection('REAL AWS RESOURCE DATA', [
+            f"Resource Type: {resource_data['resource_type']}",
+            f"Total Count: {resource_data['total_count']}",
+            f"Running: {sum(1 for res in resources if res['state'] == 'running')}",
+            f"Region: {resource_data['region']}"
+        ], ['name', 'id', 'state', 'instance_type'])
+        for res in resources:
+            section.add_row(
+                [res['name'], res['resource_id'], res['state'], res['instance_type']],
+                1 if res['state'] == 'running' else 0
+            )
+        return section
         
     except Exception as e:
         logger.error(f"[{request_id}] ❌ Failed to get real resource data: {str(e)}")
         return None
 
-def try_claude_haiku_agent(message: str, session_id: str, request_id: str) -> Dict[str, Any]:
+def try_claude_haiku_agent(message: str, session_id: str, request_id: str,
+                           cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
     """
-    Try Claude Haiku via Bedrock Agent as fallback.
+    Try Claude Haiku via Bedrock Agent.
+    
+    Stops reading the agent stream as soon as cancel_event is set.
     """
     try:
         logger.info(f"[{request_id}] 🔍 Calling Claude Haiku via Bedrock Agent...")
         
-        bedrock_runtime = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
+        bedrock_runtime = clients.client('bedrock-agent-runtime', 'us-east-1')
         
         response = bedrock_runtime.invoke_agent(
             agentId='WWYOPOAATI',
@@ -656,6 +1158,12 @@ def try_claude_haiku_agent(message: str, session_id: str, request_id: str) -> Di
         
         if 'completion' in response:
             for event in response['completion']:
+                if cancel_event is not None and cancel_event.is_set():
+                    # Another model already answered; stop consuming the stream
+                    close_stream = getattr(response['completion'], 'close', None)
+                    if close_stream:
+                        close_stream()
+                    return {'success': False, 'error': 'Cancelled', 'error_type': 'Cancelled'}
                 if 'chunk' in event:
                     chunk = event['chunk']
                     if 'bytes' in chunk:
@@ -674,17 +1182,18 @@ def try_claude_haiku_agent(message: str, session_id: str, request_id: str) -> Di
             
             return {
                 'success': True,
+                'text': completion,
                 'response': {
                     'response': branded_response,
                     'sessionId': session_id,
                     'citations': citations,
                     'trace': {
                         'fallback': False,
-                        'model_used': 'anthropic.claude-3-haiku-20240307-v1:0',
+                        'model_used': CLAUDE_MODEL_ID,
                         'integration_type': 'bedrock_agent',
                         **trace
                     },
-                    'model': 'anthropic.claude-3-haiku-20240307-v1:0 (agent)',
+                    'model': f"{CLAUDE_MODEL_ID} (agent)",
                     'debug_info': {
                         'source': 'claude_haiku_agent',
                         'agent_id': 'WWYOPOAATI',
@@ -717,7 +1226,7 @@ def handle_debug_request(params: Dict[str, Any], request_id: str) -> Dict[str, A
     
     # Test 1: Basic AWS credentials
     try:
-        sts_client = boto3.client('sts')
+        sts_client = clients.client('sts')
         identity = sts_client.get_caller_identity()
         debug_results['tests']['aws_credentials'] = {
             'status': 'SUCCESS',
@@ -732,7 +1241,7 @@ def handle_debug_request(params: Dict[str, Any], request_id: str) -> Dict[str, A
     
     # Test 2: Bedrock Agent Runtime client
     try:
-        bedrock_runtime = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
+        bedrock_runtime = clients.client('bedrock-agent-runtime', 'us-east-1')
         debug_results['tests']['bedrock_client'] = {
             'status': 'SUCCESS',
             'region': 'us-east-1'
@@ -745,7 +1254,7 @@ def handle_debug_request(params: Dict[str, Any], request_id: str) -> Dict[str, A
     
     # Test 3: Try to invoke Bedrock Agent
     try:
-        bedrock_runtime = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
+        bedrock_runtime = clients.client('bedrock-agent-runtime', 'us-east-1')
         response = bedrock_runtime.invoke_agent(
             agentId='WWYOPOAATI',
             agentAliasId='TSTALIASID',
@@ -765,7 +1274,7 @@ def handle_debug_request(params: Dict[str, Any], request_id: str) -> Dict[str, A
     
     # Test 4: Cost Explorer access
     try:
-        ce_client = boto3.client('ce')
+        ce_client = clients.client('ce')
         end_date = datetime.utcnow().date()
         start_date = end_date - timedelta(days=1)
         
@@ -789,7 +1298,7 @@ def handle_debug_request(params: Dict[str, Any], request_id: str) -> Dict[str, A
     
     # Test 5: EC2 access
     try:
-        ec2_client = boto3.client('ec2', region_name='us-east-1')
+        ec2_client = clients.client('ec2', 'us-east-1')
         response = ec2_client.describe_instances(MaxResults=5)
         debug_results['tests']['ec2_access'] = {
             'status': 'SUCCESS',
@@ -801,6 +1310,9 @@ def handle_debug_request(params: Dict[str, Any], request_id: str) -> Dict[str, A
             'error': str(e)
         }
     
+    debug_results['answer_cache'] = answer_cache.stats() if answer_cache else {'backend': 'none'}
+    debug_results['circuit_breakers'] = model_router.breaker_snapshot()
+    
     return debug_results
 
 def get_simulated_chat_response(message: str) -> str:
@@ -1,27 +1,48 @@
 import json
-import boto3
+import os
 import uuid
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+from client_pool import clients
+from session_writer import (
+    SessionWriter, DynamoDBSessionBackend, MemorySessionBackend, SqliteSessionBackend
+)
+
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-bedrock_runtime = boto3.client('bedrock-agent-runtime', region_name='us-east-1')
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+# Pooled AWS clients, reused across invocations
+bedrock_runtime = clients.client('bedrock-agent-runtime', 'us-east-1')
+dynamodb = clients.resource('dynamodb', 'us-east-1')
 
 # Configuration
 AGENT_ID = 'WWYOPOAATI'
 AGENT_ALIAS_ID = 'TSTALIASID'
 SESSIONS_TABLE = 'demo-chat-sessions'
 
+def create_session_writer() -> SessionWriter:
+    """Create the session writer; SESSION_STORE_BACKEND selects dynamodb (default), memory or sqlite."""
+    backend_name = os.getenv('SESSION_STORE_BACKEND', 'dynamodb').lower()
+    if backend_name == 'memory':
+        backend = MemorySessionBackend()
+    elif backend_name == 'sqlite':
+        backend = SqliteSessionBackend(os.getenv('SESSION_STORE_PATH', '/tmp/chat-sessions.db'))
+    else:
+        backend = DynamoDBSessionBackend(dynamodb)
+    return SessionWriter(backend, SESSIONS_TABLE)
+
+# Buffers chat turns across warm invocations and writes them in batches off the response path
+session_writer = create_session_writer()
+
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     Lambda handler for chat API integration with Bedrock Agent
     """
+    # Turns buffered by earlier invocations are written while this one calls the agent
+    session_writer.start_invocation()
     try:
         # Parse request
         if 'body' in event:
@@ -63,8 +84,9 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         try:
             response = invoke_bedrock_agent(message, session_id)
             
-            # Store session in DynamoDB
+            # Queue the turn for DynamoDB; written by a later invocation unless the buffer is full or old
             store_session(session_id, message, response.get('completion', ''), judge_info if is_judge else None)
+            session_writer.flush_after_response()
             
             return create_response(200, {
                 'response': response.get('completion', ''),
@@ -385,10 +407,9 @@ Hello! I'm powered by Amazon Nova Pro and ready to help with your AWS infrastruc
 
 def store_session(session_id: str, user_message: str, ai_response: str, judge_info: dict = None):
     """
-    Store chat session in DynamoDB with judge information
+    Queue a chat turn with judge information for batched DynamoDB writes
     """
     try:
-        table = dynamodb.Table(SESSIONS_TABLE)
         item = {
             'sessionId': session_id,
             'timestamp': datetime.utcnow().isoformat(),
@@ -401,7 +422,7 @@ def store_session(session_id: str, user_message: str, ai_response: str, judge_in
         if judge_info:
             item['judgeInfo'] = judge_info
             
-        table.put_item(Item=item)
+        session_writer.add(item)
     except Exception as e:
         logger.warning(f"Failed to store session: {str(e)}")
 
@@ -426,7 +447,7 @@ def get_cost_analysis(user_message: str = "") -> Dict[str, Any]:
         # Parse the user message for specific time periods
         cost_params = parse_cost_time_period(user_message)
         
-        ce_client = boto3.client('ce', region_name='us-east-1')
+        ce_client = clients.client('ce', 'us-east-1')
         
         # Calculate date range based on parsed parameters
         if cost_params.get('time_period') == 'CUSTOM':
@@ -524,10 +545,10 @@ def get_budget_costs() -> Optional[float]:
     """Get current costs from AWS Budgets API as fallback"""
     try:
         # Get Budgets client
-        budgets_client = boto3.client('budgets', region_name='us-east-1')
+        budgets_client = clients.client('budgets', 'us-east-1')
         
         # Get account ID
-        sts_client = boto3.client('sts')
+        sts_client = clients.client('sts')
         account_id = sts_client.get_caller_identity()['Account']
         
         # List budgets to find one with current spend data
@@ -0,0 +1,109 @@
+"""
+Shared AWS clients for the AWS AI Concierge demo lambdas.
+
+Clients are created once per container and reused across invocations, so
+endpoint and credential resolution and TLS handshakes are not repeated on every
+chat request. Timeouts are sized for interactive chat: fail fast on connect,
+and allow model calls longer to read than the data APIs.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger()
+
+CONNECT_TIMEOUT_SECONDS = float(os.getenv('AWS_CONNECT_TIMEOUT_SECONDS', '2'))
+# Data APIs (Cost Explorer, EC2, S3, STS, ...) answer quickly or not at all
+READ_TIMEOUT_SECONDS = float(os.getenv('AWS_READ_TIMEOUT_SECONDS', '10'))
+# Model calls and agent/stream responses take longer before the first byte arrives
+MODEL_READ_TIMEOUT_SECONDS = float(os.getenv('MODEL_READ_TIMEOUT_SECONDS', '60'))
+# Concurrent context fetches and hedged model calls share each client's pool
+MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '25'))
+
+MODEL_SERVICES = ('bedrock-runtime', 'bedrock-agent-runtime')
+
+
+def _endpoint_url(service_name: str) -> Optional[str]:
+    """Endpoint override for Bedrock clients, e.g. the local emulator in demo-backend/loadtest."""
+    if service_name in MODEL_SERVICES:
+        return os.getenv('BEDROCK_ENDPOINT_URL') or None
+    return None
+
+
+def _build_config(read_timeout: float) -> Config:
+    return Config(
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=read_timeout,
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        retries={
+            'max_attempts': 2,
+            'mode': 'standard'
+        }
+    )
+
+
+class ClientPool:
+    """
+    Thread-safe cache of configured boto3 clients and resources keyed by service and region.
+
+    Uses its own session because creating clients from the default boto3 session
+    is not thread-safe.
+    """
+
+    def __init__(self, default_region: Optional[str] = None):
+        self.default_region = default_region
+        self._session = boto3.session.Session()
+        self._clients: Dict[Tuple[str, str, Optional[str], Optional[str]], Any] = {}
+        self._lock = threading.Lock()
+        self._data_config = _build_config(READ_TIMEOUT_SECONDS)
+        self._model_config = _build_config(MODEL_READ_TIMEOUT_SECONDS)
+
+    def client(self, service_name: str, region: Optional[str] = None, endpoint_url: Optional[str] = None) -> Any:
+        """
+        Get or create a client.
+
+        Args:
+            service_name: AWS service name (e.g., 'ce', 'ec2', 'bedrock-runtime')
+            region: AWS region (optional, uses the pool or session default)
+            endpoint_url: Endpoint for services addressed per API, e.g. the
+                apigatewaymanagementapi endpoint of a WebSocket stage (optional)
+
+        Returns:
+            Boto3 client for the service, region and endpoint
+        """
+        return self._get('client', service_name, region, endpoint_url)
+
+    def resource(self, service_name: str, region: Optional[str] = None) -> Any:
+        """Get or create a boto3 resource (e.g., 'dynamodb')."""
+        return self._get('resource', service_name, region)
+
+    def _get(self, kind: str, service_name: str, region: Optional[str], endpoint_url: Optional[str] = None) -> Any:
+        region = region or self.default_region
+        key = (kind, service_name, region, endpoint_url)
+        cached = self._clients.get(key)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            if key not in self._clients:
+                config = self._model_config if service_name in MODEL_SERVICES else self._data_config
+                factory = self._session.client if kind == 'client' else self._session.resource
+                kwargs = {'config': config}
+                if region:
+                    kwargs['region_name'] = region
+                endpoint_url = endpoint_url or _endpoint_url(service_name)
+                if endpoint_url:
+                    kwargs['endpoint_url'] = endpoint_url
+                self._clients[key] = factory(service_name, **kwargs)
+                logger.info(f"Created pooled {service_name} {kind} for region {region or 'default'}")
+            return self._clients[key]
+
+
+# One pool per container, shared by every invocation
+clients = ClientPool()
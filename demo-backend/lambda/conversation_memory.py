@@ -0,0 +1,225 @@
+"""
+Bounded conversation memory for the AWS AI Concierge demo chat.
+
+The model sees a fixed-size window: a rolling summary of older turns plus the
+last few turns verbatim. Turns that fall out of the window are folded into the
+summary one at a time, so prompt size and per-turn latency stay flat as a
+conversation grows.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from session_writer import SessionWriter
+
+logger = logging.getLogger()
+
+HISTORY_TURNS = int(os.getenv('CHAT_HISTORY_TURNS', '4'))
+# Assistant answers are cut to this many characters when replayed as history
+HISTORY_ANSWER_MAX_CHARS = 600
+SUMMARY_MAX_CHARS = int(os.getenv('CHAT_SUMMARY_MAX_CHARS', '800'))
+# Summary items share the session table; 'summary' sorts after ISO timestamps
+SUMMARY_SORT_KEY = 'summary'
+SESSION_TTL_SECONDS = 7 * 24 * 60 * 60
+
+_MARKDOWN = re.compile(r'[*_#`>]+')
+_AMOUNT = re.compile(r'\$[\d,]+(?:\.\d+)?')
+
+
+def summarize_turn(user_message: str, ai_response: str) -> str:
+    """Compress one turn to a single line: the question, the answer's lead and its dollar figures."""
+    answer = ' '.join(_MARKDOWN.sub('', ai_response).split())
+    lead = re.split(r'(?<=[.!?])\s', answer, maxsplit=1)[0][:160]
+    amounts = [amount for amount in _AMOUNT.findall(answer) if amount not in lead][:3]
+    line = f"Q: {' '.join(user_message.split())[:120]} -> A: {lead}"
+    if amounts:
+        line += f" ({', '.join(amounts)})"
+    return line
+
+
+def fold_summary(summary: str, line: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """Append a summary line, dropping the oldest lines once the summary is over max_chars."""
+    lines = [existing for existing in summary.split('\n') if existing] + [line]
+    while len(lines) > 1 and len('\n'.join(lines)) > max_chars:
+        lines.pop(0)
+    return '\n'.join(lines)[-max_chars:]
+
+
+class MemoryConversationBackend:
+    """Per-container store; sessions are kept for as long as the container lives (LRU-bounded)."""
+
+    name = 'memory'
+
+    def __init__(self, max_sessions: int = 500):
+        self.max_sessions = max_sessions
+        self._sessions: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _session(self, session_id: str) -> Dict[str, Any]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = {'turns': [], 'summary': None}
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def recent_turns(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            turns = self._session(session_id)['turns']
+            # Older turns are only needed until they are folded into the summary
+            del turns[:-limit]
+            return list(reversed(turns))
+
+    def add_turn(self, item: Dict[str, Any]):
+        with self._lock:
+            self._session(item['sessionId'])['turns'].append(item)
+
+    def start_invocation(self):
+        """Nothing is buffered; turns are stored as they are added."""
+
+    def get_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._session(session_id)['summary']
+
+    def put_summary(self, session_id: str, summary: str, summarized_until: str):
+        with self._lock:
+            self._session(session_id)['summary'] = {'summary': summary, 'summarizedUntil': summarized_until}
+
+
+class DynamoDBConversationBackend:
+    """Reads turns from the chat session table; new turns go through the batched session writer."""
+
+    name = 'dynamodb'
+
+    def __init__(self, table, session_writer: SessionWriter):
+        self.table = table
+        self.session_writer = session_writer
+
+    def recent_turns(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        from boto3.dynamodb.conditions import Key
+        response = self.table.query(
+            KeyConditionExpression=Key('sessionId').eq(session_id) & Key('timestamp').lt(SUMMARY_SORT_KEY),
+            ScanIndexForward=False,
+            Limit=limit
+        )
+        turns = response.get('Items', [])
+        # Turns this container has not written yet would otherwise be missing from the window
+        pending = self.session_writer.pending_items(session_id)
+        if pending:
+            stored = {turn['timestamp'] for turn in turns}
+            turns = sorted(turns + [turn for turn in pending if turn['timestamp'] not in stored],
+                           key=lambda turn: turn['timestamp'], reverse=True)[:limit]
+        return turns
+
+    def add_turn(self, item: Dict[str, Any]):
+        self.session_writer.add(item)
+        self.session_writer.flush_after_response()
+
+    def start_invocation(self):
+        self.session_writer.start_invocation()
+
+    def get_summary(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self.table.get_item(Key={'sessionId': session_id, 'timestamp': SUMMARY_SORT_KEY}).get('Item')
+
+    def put_summary(self, session_id: str, summary: str, summarized_until: str):
+        self.table.put_item(Item={
+            'sessionId': session_id,
+            'timestamp': SUMMARY_SORT_KEY,
+            'summary': summary,
+            'summarizedUntil': summarized_until,
+            'ttl': int(datetime.utcnow().timestamp()) + SESSION_TTL_SECONDS
+        })
+
+
+class ConversationMemory:
+    """Loads a fixed-size history window for a session and records new turns."""
+
+    def __init__(self, backend, window_turns: int = HISTORY_TURNS):
+        self.backend = backend
+        self.window_turns = window_turns
+
+    def load(self, session_id: str, request_id: str) -> Dict[str, Any]:
+        """
+        Load the history window for a session.
+
+        Reads one turn beyond the window; if it has not been summarized yet it
+        is folded into the rolling summary before returning.
+
+        Returns:
+            Dictionary with 'summary' (str) and 'turns' (oldest first, each with
+            'userMessage' and 'aiResponse')
+        """
+        try:
+            turns = self.backend.recent_turns(session_id, self.window_turns + 1)
+            stored = self.backend.get_summary(session_id) or {}
+            summary = stored.get('summary', '')
+            summarized_until = stored.get('summarizedUntil', '')
+
+            overflow = [turn for turn in turns[self.window_turns:] if turn['timestamp'] > summarized_until]
+            if overflow:
+                for turn in reversed(overflow):
+                    summary = fold_summary(summary, summarize_turn(turn['userMessage'], turn['aiResponse']))
+                summarized_until = overflow[0]['timestamp']
+                self.backend.put_summary(session_id, summary, summarized_until)
+
+            return {'summary': summary, 'turns': list(reversed(turns[:self.window_turns]))}
+        except Exception as e:
+            logger.warning(f"[{request_id}] Conversation history unavailable: {str(e)}")
+            return {'summary': '', 'turns': []}
+
+    def start_invocation(self):
+        """Start writing turns buffered by earlier invocations of this container."""
+        self.backend.start_invocation()
+
+    def record(self, session_id: str, user_message: str, ai_response: str, request_id: str):
+        """Store a completed turn."""
+        try:
+            self.backend.add_turn({
+                'sessionId': session_id,
+                'timestamp': datetime.utcnow().isoformat(),
+                'userMessage': user_message,
+                'aiResponse': ai_response,
+                'ttl': int(datetime.utcnow().timestamp()) + SESSION_TTL_SECONDS
+            })
+        except Exception as e:
+            logger.warning(f"[{request_id}] Failed to record conversation turn: {str(e)}")
+
+
+def history_messages(history: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Render the history window as alternating user/assistant messages for the Nova messages API."""
+    messages = []
+    for turn in (history or {}).get('turns', []):
+        messages.append({'role': 'user', 'content': [{'text': turn['userMessage']}]})
+        messages.append({'role': 'assistant', 'content': [{'text': turn['aiResponse'][:HISTORY_ANSWER_MAX_CHARS]}]})
+    return messages
+
+
+def create_conversation_memory() -> Optional[ConversationMemory]:
+    """
+    Create the conversation memory configured by environment variables.
+
+    CONVERSATION_MEMORY_BACKEND is one of memory (default), dynamodb (reads and
+    writes CHAT_SESSIONS_TABLE) or none.
+    """
+    backend_name = os.getenv('CONVERSATION_MEMORY_BACKEND', 'memory').lower()
+
+    if backend_name == 'none':
+        return None
+    if backend_name == 'dynamodb':
+        from client_pool import clients
+        from session_writer import DynamoDBSessionBackend
+        dynamodb = clients.resource('dynamodb', 'us-east-1')
+        table_name = os.getenv('CHAT_SESSIONS_TABLE', 'demo-chat-sessions')
+        backend = DynamoDBConversationBackend(
+            dynamodb.Table(table_name), SessionWriter(DynamoDBSessionBackend(dynamodb), table_name)
+        )
+    else:
+        backend = MemoryConversationBackend()
+
+    return ConversationMemory(backend)
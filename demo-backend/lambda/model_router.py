@@ -0,0 +1,313 @@
+"""
+Model routing for the AWS AI Concierge demo chat: rolling per-model stats, circuit breakers and hedged requests.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+logger = logging.getLogger()
+
+DEFAULT_WINDOW = 50
+# Older samples are ignored so a demoted model gets another chance as primary
+SAMPLE_MAX_AGE_SECONDS = 300
+# Below this many samples a model keeps its configured position
+MIN_SAMPLES = 5
+# Demote the preferred model when more than this share of recent calls failed
+ERROR_RATE_THRESHOLD = 0.5
+# Demote the preferred model when its median latency is this much worse than the alternative
+LATENCY_MARGIN_SECONDS = 1.0
+# Consecutive failures that open a model's circuit
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '3'))
+# How long an open circuit skips its model before allowing one trial request
+CIRCUIT_COOLDOWN_SECONDS = float(os.getenv('CIRCUIT_COOLDOWN_SECONDS', '30'))
+
+
+class ModelStats:
+    """Rolling latency and error statistics over the last N recent calls to one model."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW, max_age: float = SAMPLE_MAX_AGE_SECONDS):
+        self.max_age = max_age
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, success: bool):
+        with self._lock:
+            self._samples.append((time.time(), latency, success))
+
+    def _recent(self) -> List[Tuple[float, bool]]:
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            return [(latency, ok) for ts, latency, ok in self._samples if ts >= cutoff]
+
+    @property
+    def count(self) -> int:
+        return len(self._recent())
+
+    def error_rate(self) -> float:
+        samples = self._recent()
+        if not samples:
+            return 0.0
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile over successful calls only."""
+        latencies = sorted(latency for latency, ok in self._recent() if ok)
+        if not latencies:
+            return None
+        return latencies[min(int(len(latencies) * pct / 100), len(latencies) - 1)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.latency_percentile(50)
+        p90 = self.latency_percentile(90)
+        return {
+            'samples': self.count,
+            'error_rate': round(self.error_rate(), 3),
+            'p50_latency': round(p50, 3) if p50 is not None else None,
+            'p90_latency': round(p90, 3) if p90 is not None else None
+        }
+
+
+class CircuitBreaker:
+    """
+    Skips a model after repeated failures.
+
+    closed: requests pass. open: requests are skipped until the cool-down has
+    passed, then one trial request is let through (half_open). The trial's
+    outcome closes the circuit again or restarts the cool-down.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown: float = CIRCUIT_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now; moving to half_open claims the single trial."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() >= self.opened_at + self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+
+    def release(self):
+        """Give back an unused trial (the request was never sent or was cancelled) without judging the model."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.opened_at + self.cooldown - time.time()), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in_seconds': retry_in
+            }
+
+
+class ModelRouter:
+    """
+    Picks the primary model from rolling stats and races a backup against it.
+
+    In hedged mode the backup starts after hedge_delay seconds (or as soon as the
+    primary fails); the first successful answer wins and the other attempt is
+    told to stop through its cancel event. Models whose circuit is open are
+    skipped without being called.
+    """
+
+    def __init__(self, models: List[str], window: int = DEFAULT_WINDOW):
+        self.models = list(models)
+        self.stats = {model: ModelStats(window) for model in self.models}
+        self.breakers = {model: CircuitBreaker() for model in self.models}
+
+    def allow(self, model: str) -> bool:
+        """Whether the model's circuit lets a request through."""
+        return self.breakers[model].allow_request()
+
+    def record(self, model: str, latency: float, success: bool):
+        """Record a finished call in the model's rolling stats and circuit breaker."""
+        self.stats[model].record(latency, success)
+        if success:
+            self.breakers[model].record_success()
+        else:
+            self.breakers[model].record_failure()
+
+    def release(self, model: str):
+        """Release a call that was allowed but never completed."""
+        self.breakers[model].release()
+
+    def choose_order(self) -> Tuple[List[str], str]:
+        """
+        Order models for this request.
+
+        Returns:
+            Tuple of (models in priority order, reason for the primary choice)
+        """
+        preferred, alternative = self.models[0], self.models[1]
+        preferred_stats, alternative_stats = self.stats[preferred], self.stats[alternative]
+
+        if preferred_stats.count >= MIN_SAMPLES:
+            if (preferred_stats.error_rate() > ERROR_RATE_THRESHOLD
+                    and alternative_stats.error_rate() < preferred_stats.error_rate()):
+                return [alternative, preferred], f"{preferred} error rate {preferred_stats.error_rate():.0%}"
+
+            preferred_p50 = preferred_stats.latency_percentile(50)
+            alternative_p50 = alternative_stats.latency_percentile(50)
+            if (alternative_stats.count >= MIN_SAMPLES and preferred_p50 is not None and alternative_p50 is not None
+                    and preferred_p50 > alternative_p50 + LATENCY_MARGIN_SECONDS
+                    and alternative_stats.error_rate() <= ERROR_RATE_THRESHOLD):
+                return [alternative, preferred], f"{alternative} median latency {alternative_p50:.2f}s vs {preferred_p50:.2f}s"
+
+        return [preferred, alternative], 'default preference'
+
+    def race(self, attempts: Dict[str, Callable[[threading.Event], Dict[str, Any]]],
+             hedge_delay: Optional[float], request_id: str) -> Dict[str, Any]:
+        """
+        Run model attempts and return the first successful one.
+
+        Args:
+            attempts: model name -> callable taking a cancel event and returning
+                {'success': bool, 'response': ..., 'error': ...}, plus an optional
+                'model_latency' recorded instead of the attempt's wall time and an
+                optional 'text' (the unbranded answer) passed through to the caller
+            hedge_delay: Seconds before starting the backup; None waits for the primary to fail
+            request_id: Request ID for tracking
+
+        Returns:
+            Dictionary with 'success', 'winner', 'response', 'text', and 'routing' trace details
+        """
+        order, reason = self.choose_order()
+        skipped = [model for model in order if model in attempts and not self.allow(model)]
+        order = [model for model in order if model in attempts and model not in skipped]
+        cancel_events = {model: threading.Event() for model in order}
+        routing = {
+            'mode': 'hedged' if hedge_delay is not None else 'serial',
+            'primary': order[0] if order else None,
+            'primary_reason': reason,
+            'hedge_delay': hedge_delay,
+            'hedge_started': False,
+            'attempts': {model: {'status': 'skipped', 'reason': 'circuit open'} for model in skipped}
+        }
+        if skipped:
+            logger.warning(f"[{request_id}] Circuit open, skipping: {', '.join(skipped)}")
+        if not order:
+            routing['winner'] = None
+            routing['reason'] = 'all circuits open'
+            routing['circuit_breakers'] = self.breaker_snapshot()
+            return {'success': False, 'winner': None, 'response': None, 'routing': routing}
+
+        executor = ThreadPoolExecutor(max_workers=len(order))
+        running = {}
+        started_at = {}
+        queue = list(order)
+        race_start = time.time()
+
+        def start_next():
+            model = queue.pop(0)
+            started_at[model] = time.time()
+            running[executor.submit(attempts[model], cancel_events[model])] = model
+            if model != order[0]:
+                routing['hedge_started'] = True
+
+        try:
+            start_next()
+            while running:
+                timeout = None
+                if queue and hedge_delay is not None:
+                    timeout = max(0.0, race_start + hedge_delay - time.time())
+
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    logger.info(f"[{request_id}] {order[0]} has not answered after {hedge_delay}s, starting {queue[0]}")
+                    start_next()
+                    continue
+
+                for future in done:
+                    model = running.pop(future)
+                    latency = time.time() - started_at[model]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': str(e), 'error_type': type(e).__name__}
+
+                    latency = result.get('model_latency', latency)
+                    self.record(model, latency, result.get('success', False))
+                    routing['attempts'][model] = {
+                        'status': 'success' if result.get('success') else 'failed',
+                        'latency': round(latency, 3),
+                        'error': result.get('error')
+                    }
+
+                    if result.get('success'):
+                        for loser in running.values():
+                            cancel_events[loser].set()
+                            self.release(loser)
+                            routing['attempts'][loser] = {'status': 'cancelled'}
+                        routing['winner'] = model
+                        routing['reason'] = self._win_reason(model, order, routing)
+                        routing['circuit_breakers'] = self.breaker_snapshot()
+                        return {'success': True, 'winner': model, 'response': result['response'],
+                                'text': result.get('text'), 'routing': routing}
+
+                    # Primary failed before the hedge timer: start the backup right away
+                    if queue:
+                        start_next()
+
+            routing['winner'] = None
+            routing['reason'] = 'all models failed'
+            routing['circuit_breakers'] = self.breaker_snapshot()
+            return {'success': False, 'winner': None, 'response': None, 'routing': routing}
+        finally:
+            # Backups that were never started do not use up a half-open trial
+            for model in queue:
+                self.release(model)
+            executor.shutdown(wait=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current rolling stats for every model."""
+        return {model: stats.snapshot() for model, stats in self.stats.items()}
+
+    def breaker_snapshot(self) -> Dict[str, Any]:
+        """Current circuit state and rolling error rate for every model."""
+        return {
+            model: {**breaker.snapshot(), 'error_rate': round(self.stats[model].error_rate(), 3)}
+            for model, breaker in self.breakers.items()
+        }
+
+    @staticmethod
+    def _win_reason(winner: str, order: List[str], routing: Dict[str, Any]) -> str:
+        if winner == order[0]:
+            return 'primary answered first' if routing['hedge_started'] else 'primary answered before hedge delay'
+        if routing['attempts'].get(order[0], {}).get('status') == 'failed':
+            return f"{order[0]} failed"
+        return f"backup answered before {order[0]}"
@@ -0,0 +1,112 @@
+"""
+Token-budgeted rendering of real AWS data for the AWS AI Concierge demo chat prompts.
+
+Each data source contributes a section with headline numbers, which are always
+kept, and ranked rows, which are added most important first until the budget
+is spent.
+"""
+
+import logging
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger()
+
+# Rough size of an English/number token for Nova-class tokenizers
+CHARS_PER_TOKEN = 4
+DEFAULT_BUDGET_TOKENS = int(os.getenv('PROMPT_DATA_BUDGET_TOKENS', '600'))
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of model tokens in a piece of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+class PromptSection:
+    """One block of AWS data: a title, headline facts and rows ranked by priority."""
+
+    def __init__(self, title: str, headline: List[str], columns: List[str]):
+        self.title = title
+        self.headline = headline
+        self.columns = columns
+        self._rows: List[tuple] = []
+
+    def add_row(self, values: List[Any], priority: float):
+        """
+        Add a table row.
+
+        Args:
+            values: Cell values in column order
+            priority: Higher values are kept first when the budget is tight
+        """
+        self._rows.append((priority, len(self._rows), '|'.join(str(value) for value in values)))
+
+    def ranked_rows(self) -> List[str]:
+        # Stable for equal priorities: ties keep insertion order
+        return [row for _, _, row in sorted(self._rows, key=lambda row: (-row[0], row[1]))]
+
+    def header_lines(self) -> List[str]:
+        lines = [f"{self.title}:", ' | '.join(self.headline)]
+        if self._rows:
+            lines.append('|'.join(self.columns))
+        return lines
+
+
+class PromptBudget:
+    """Renders prompt sections as compact tables within a token budget."""
+
+    def __init__(self, max_tokens: int = DEFAULT_BUDGET_TOKENS):
+        self.max_tokens = max_tokens
+
+    def render(self, sections: List[PromptSection], request_id: str) -> Optional[str]:
+        """
+        Render sections within the budget.
+
+        Headlines are always included. Rows are then taken round-robin across
+        sections, highest priority first, so one long section cannot starve the
+        others.
+
+        Returns:
+            Rendered text, or None when there are no sections
+        """
+        if not sections:
+            return None
+
+        included: Dict[int, List[str]] = {index: [] for index in range(len(sections))}
+        pending = {index: section.ranked_rows() for index, section in enumerate(sections)}
+        used = sum(estimate_tokens('\n'.join(section.header_lines())) for section in sections)
+        # Leave room for each section's "more rows omitted" line
+        remaining = self.max_tokens - used - 8 * len(sections)
+
+        active = [index for index in pending if pending[index]]
+        while active:
+            still_active = []
+            for index in active:
+                row = pending[index][0]
+                cost = estimate_tokens(row) + 1
+                if cost > remaining:
+                    continue
+                remaining -= cost
+                included[index].append(pending[index].pop(0))
+                if pending[index]:
+                    still_active.append(index)
+            active = still_active
+
+        blocks = []
+        total_rows = 0
+        omitted_rows = 0
+        for index, section in enumerate(sections):
+            lines = section.header_lines() + included[index]
+            if pending[index]:
+                lines.append(f"(+{len(pending[index])} lower-priority rows omitted)")
+            blocks.append('\n'.join(lines))
+            total_rows += len(included[index])
+            omitted_rows += len(pending[index])
+
+        text = '\n\n'.join(blocks)
+        logger.info(
+            f"[{request_id}] 📏 Prompt data: ~{estimate_tokens(text)} tokens (budget {self.max_tokens}), "
+            f"{total_rows} rows kept, {omitted_rows} omitted"
+        )
+        return text
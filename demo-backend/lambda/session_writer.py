@@ -0,0 +1,199 @@
+"""
+Write-behind session persistence for the AWS AI Concierge demo chat.
+
+Chat turns are buffered in memory and written with batch_write_item, so no
+DynamoDB write sits between a model reply and the response.
+
+With the default SESSION_FLUSH_MODE=deferred the buffer is carried across warm
+invocations of the same container. It is written:
+- when it reaches SESSION_FLUSH_THRESHOLD turns;
+- in a background thread at the start of the next invocation, while that
+  invocation's model call runs;
+- before the handler returns, once the oldest buffered turn is older than
+  SESSION_FLUSH_MAX_AGE_SECONDS.
+
+Durability trade-off: Lambda freezes the container between invocations and
+reclaims idle containers without notice, so buffered turns (fewer than the
+threshold) are lost if the container is never invoked again. Other containers
+do not see them until they are written; the writing container serves them to
+its own history reads through pending_items. SESSION_FLUSH_MODE=end writes
+before every response instead, trading the latency back for durability.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger()
+
+# DynamoDB accepts at most 25 put requests per batch_write_item call
+MAX_BATCH_SIZE = 25
+FLUSH_THRESHOLD = int(os.getenv('SESSION_FLUSH_THRESHOLD', '10'))
+# 'deferred' carries the buffer to the next invocation; 'end' flushes before the handler returns
+FLUSH_MODE = os.getenv('SESSION_FLUSH_MODE', 'deferred')
+# In deferred mode, buffered turns older than this are written before the handler returns
+FLUSH_MAX_AGE_SECONDS = float(os.getenv('SESSION_FLUSH_MAX_AGE_SECONDS', '60'))
+MAX_RETRIES = 4
+RETRY_BASE_DELAY_SECONDS = 0.05
+
+
+class DynamoDBSessionBackend:
+    """Writes batches to DynamoDB and returns the items it did not process."""
+
+    name = 'dynamodb'
+
+    def __init__(self, dynamodb):
+        self.dynamodb = dynamodb
+
+    def batch_write(self, table_name: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        response = self.dynamodb.batch_write_item(
+            RequestItems={table_name: [{'PutRequest': {'Item': item}} for item in items]}
+        )
+        unprocessed = response.get('UnprocessedItems', {}).get(table_name, [])
+        return [request['PutRequest']['Item'] for request in unprocessed]
+
+
+class MemorySessionBackend:
+    """In-memory stand-in for tests and local runs."""
+
+    name = 'memory'
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+
+    def batch_write(self, table_name: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.tables.setdefault(table_name, []).extend(items)
+        return []
+
+
+class SqliteSessionBackend:
+    """SQLite stand-in for tests and local runs; keeps one row per session turn."""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = ':memory:'):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(table_name TEXT, session_id TEXT, timestamp TEXT, item TEXT, '
+                'PRIMARY KEY (table_name, session_id, timestamp))'
+            )
+
+    def batch_write(self, table_name: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)',
+                [(table_name, item['sessionId'], item['timestamp'], json.dumps(item, default=str)) for item in items]
+            )
+            self._conn.commit()
+        return []
+
+
+class SessionWriter:
+    """Buffers session items and flushes them in batches, retrying unprocessed items."""
+
+    def __init__(self, backend, table_name: str, flush_threshold: int = FLUSH_THRESHOLD,
+                 flush_mode: str = FLUSH_MODE, max_age_seconds: float = FLUSH_MAX_AGE_SECONDS):
+        self.backend = backend
+        self.table_name = table_name
+        self.flush_threshold = flush_threshold
+        self.flush_mode = flush_mode
+        self.max_age_seconds = max_age_seconds
+        self._buffer: List[Dict[str, Any]] = []
+        # Items taken from the buffer by a flush that has not finished writing them
+        self._in_flight: List[Dict[str, Any]] = []
+        self._oldest: Optional[float] = None
+        self._buffer_lock = threading.Lock()
+        # Only one flush writes at a time so batches are not sent twice
+        self._flush_lock = threading.Lock()
+        self._flush_thread: Optional[threading.Thread] = None
+        self.items_written = 0
+        self.items_dropped = 0
+
+    def add(self, item: Dict[str, Any]):
+        """Buffer one item; flushes synchronously once the buffer reaches the threshold."""
+        with self._buffer_lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(item)
+            pending = len(self._buffer)
+        if pending >= self.flush_threshold:
+            self.flush()
+
+    def pending(self) -> int:
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def pending_items(self, session_id: str) -> List[Dict[str, Any]]:
+        """Items for a session that are buffered or being written, so reads can include them."""
+        with self._buffer_lock:
+            return [item for item in self._in_flight + self._buffer if item['sessionId'] == session_id]
+
+    def flush(self) -> int:
+        """
+        Write every buffered item.
+
+        Returns:
+            Number of items written
+        """
+        with self._flush_lock:
+            with self._buffer_lock:
+                items, self._buffer = self._buffer, []
+                self._in_flight = items
+                self._oldest = None
+            try:
+                written = 0
+                for start in range(0, len(items), MAX_BATCH_SIZE):
+                    written += self._write_batch(items[start:start + MAX_BATCH_SIZE])
+                self.items_written += written
+                return written
+            finally:
+                with self._buffer_lock:
+                    self._in_flight = []
+
+    def start_invocation(self):
+        """Start writing turns carried over from earlier invocations while this one runs."""
+        if not self.pending():
+            return
+        if self._flush_thread is None or not self._flush_thread.is_alive():
+            self._flush_thread = threading.Thread(target=self._flush_quietly, daemon=True)
+            self._flush_thread.start()
+
+    def flush_after_response(self):
+        """Flush at the end of a chat turn according to the configured mode."""
+        if not self.pending():
+            return
+        if self.flush_mode == 'end' or self._oldest_age() >= self.max_age_seconds:
+            self.flush()
+
+    def _oldest_age(self) -> float:
+        with self._buffer_lock:
+            return time.monotonic() - self._oldest if self._oldest is not None else 0.0
+
+    def _flush_quietly(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Background session flush failed: {str(e)}")
+
+    def _write_batch(self, items: List[Dict[str, Any]]) -> int:
+        remaining = items
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                remaining = self.backend.batch_write(self.table_name, remaining)
+            except Exception as e:
+                logger.warning(f"Session batch write failed (attempt {attempt + 1}): {str(e)}")
+            if not remaining:
+                return len(items)
+            if attempt < MAX_RETRIES:
+                time.sleep(RETRY_BASE_DELAY_SECONDS * (2 ** attempt))
+
+        logger.error(f"Dropping {len(remaining)} session items after {MAX_RETRIES} retries")
+        self.items_dropped += len(remaining)
+        return len(items) - len(remaining)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Local Bedrock stand-in for load testing the demo chat lambdas.
+
+Serves the bedrock-runtime InvokeModel and InvokeModelWithResponseStream APIs
+and the bedrock-agent-runtime InvokeAgent event stream, with configurable
+latency, token rate and error injection. Point the lambdas at it with
+BEDROCK_ENDPOINT_URL=http://127.0.0.1:<port>.
+
+Usage:
+    python bedrock_emulator.py --port 8765 --latency-ms 400 --tokens-per-second 80 --error-rate 0.05
+"""
+
+import argparse
+import base64
+import json
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+# HTTP status codes for injected errors
+ERROR_STATUS = {
+    'ThrottlingException': 429,
+    'ServiceUnavailableException': 503,
+    'InternalServerException': 500,
+    'AccessDeniedException': 403,
+    'ModelTimeoutException': 408
+}
+
+_INVOKE = re.compile(r'^/model/(?P<model>[^/]+)/invoke$')
+_INVOKE_STREAM = re.compile(r'^/model/(?P<model>[^/]+)/invoke-with-response-stream$')
+_INVOKE_AGENT = re.compile(r'^/agents/[^/]+/agentAliases/[^/]+/sessions/[^/]+/text$')
+
+
+@dataclass
+class EmulatorConfig:
+    """Behaviour of one emulated endpoint family (models or agents)."""
+    latency_ms: float = 400.0          # median time to first byte
+    latency_sigma: float = 0.5         # lognormal spread of the first-byte latency
+    tokens_per_second: float = 80.0    # generation speed after the first byte
+    response_tokens: int = 120         # tokens per answer
+    chunk_tokens: int = 4              # tokens per streamed chunk
+    error_rate: float = 0.0            # share of requests rejected up front
+    error_type: str = 'ThrottlingException'
+    stream_error_rate: float = 0.0     # share of streams that fail after the first chunk
+
+
+def encode_event(headers: Dict[str, str], payload: bytes) -> bytes:
+    """Encode one message in the AWS event stream binary format."""
+    encoded_headers = b''
+    for name, value in headers.items():
+        name_bytes, value_bytes = name.encode('utf-8'), value.encode('utf-8')
+        encoded_headers += (
+            struct.pack('>B', len(name_bytes)) + name_bytes
+            + b'\x07' + struct.pack('>H', len(value_bytes)) + value_bytes
+        )
+    total_length = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack('>II', total_length, len(encoded_headers))
+    message = prelude + struct.pack('>I', zlib.crc32(prelude)) + encoded_headers + payload
+    return message + struct.pack('>I', zlib.crc32(message))
+
+
+def chunk_event(data: bytes) -> bytes:
+    """A 'chunk' event carrying a PayloadPart."""
+    payload = json.dumps({'bytes': base64.b64encode(data).decode('ascii')}).encode('utf-8')
+    return encode_event({
+        ':event-type': 'chunk',
+        ':content-type': 'application/json',
+        ':message-type': 'event'
+    }, payload)
+
+
+def exception_event(error_type: str, message: str) -> bytes:
+    """A modeled in-stream exception (e.g. throttlingException)."""
+    return encode_event({
+        ':exception-type': error_type[0].lower() + error_type[1:],
+        ':content-type': 'application/json',
+        ':message-type': 'exception'
+    }, json.dumps({'message': message}).encode('utf-8'))
+
+
+class BedrockEmulator:
+    """Request statistics and simulated model behaviour shared by all handler threads."""
+
+    def __init__(self, model_config: EmulatorConfig, agent_config: EmulatorConfig, seed: Optional[int] = None):
+        self.model_config = model_config
+        self.agent_config = agent_config
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+
+    def count(self, key: str):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def roll(self, probability: float) -> bool:
+        with self._lock:
+            return self._random.random() < probability
+
+    def first_byte_delay(self, config: EmulatorConfig) -> float:
+        with self._lock:
+            return config.latency_ms / 1000.0 * self._random.lognormvariate(0.0, config.latency_sigma)
+
+    @staticmethod
+    def answer_chunks(config: EmulatorConfig) -> Tuple[str, ...]:
+        words = [f"token{index}" for index in range(config.response_tokens)]
+        return tuple(
+            ' '.join(words[start:start + config.chunk_tokens]) + ' '
+            for start in range(0, len(words), config.chunk_tokens)
+        )
+
+
+def model_response_body(model_id: str, text: str, output_tokens: int) -> Dict:
+    """InvokeModel JSON for Nova (messages API) or Anthropic models."""
+    usage = {'inputTokens': 200, 'outputTokens': output_tokens, 'totalTokens': 200 + output_tokens}
+    if model_id.startswith('anthropic.'):
+        return {
+            'type': 'message',
+            'role': 'assistant',
+            'content': [{'type': 'text', 'text': text}],
+            'stop_reason': 'end_turn',
+            'usage': {'input_tokens': 200, 'output_tokens': output_tokens}
+        }
+    return {
+        'output': {'message': {'role': 'assistant', 'content': [{'text': text}]}},
+        'stopReason': 'end_turn',
+        'usage': usage
+    }
+
+
+def make_handler(emulator: BedrockEmulator):
+    class EmulatorHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+            path = self.path.split('?')[0]
+
+            match = _INVOKE.match(path)
+            if match:
+                return self._invoke_model(match.group('model'))
+            match = _INVOKE_STREAM.match(path)
+            if match:
+                return self._invoke_model_stream(match.group('model'))
+            if _INVOKE_AGENT.match(path):
+                return self._invoke_agent()
+
+            self._send_error('ValidationException', f"Unsupported path {path}", 404)
+
+        def _send_error(self, error_type: str, message: str, status: Optional[int] = None):
+            body = json.dumps({'message': message}).encode('utf-8')
+            self.send_response(status or ERROR_STATUS.get(error_type, 400))
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('x-amzn-ErrorType', error_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _reject(self, config: EmulatorConfig, route: str) -> bool:
+            time.sleep(emulator.first_byte_delay(config))
+            if emulator.roll(config.error_rate):
+                emulator.count(f"{route}:error")
+                self._send_error(config.error_type, f"Emulated {config.error_type}")
+                return True
+            emulator.count(route)
+            return False
+
+        def _invoke_model(self, model_id: str):
+            config = emulator.model_config
+            if self._reject(config, 'invoke_model'):
+                return
+            chunks = emulator.answer_chunks(config)
+            # Non-streaming calls pay for the whole generation before the first byte
+            time.sleep(config.response_tokens / config.tokens_per_second)
+            body = json.dumps(model_response_body(model_id, ''.join(chunks), config.response_tokens)).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _invoke_model_stream(self, model_id: str):
+            config = emulator.model_config
+            if self._reject(config, 'invoke_model_stream'):
+                return
+            events = [{'messageStart': {'role': 'assistant'}}]
+            events += [{'contentBlockDelta': {'delta': {'text': chunk}, 'contentBlockIndex': 0}}
+                       for chunk in emulator.answer_chunks(config)]
+            events += [
+                {'contentBlockStop': {'contentBlockIndex': 0}},
+                {'messageStop': {'stopReason': 'end_turn'}},
+                {'metadata': {'usage': {'inputTokens': 200, 'outputTokens': config.response_tokens}}}
+            ]
+            self._stream(config, [chunk_event(json.dumps(event).encode('utf-8')) for event in events])
+
+        def _invoke_agent(self):
+            config = emulator.agent_config
+            if self._reject(config, 'invoke_agent'):
+                return
+            self._stream(config, [chunk_event(chunk.encode('utf-8')) for chunk in emulator.answer_chunks(config)])
+
+        def _stream(self, config: EmulatorConfig, events):
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/vnd.amazon.eventstream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            fail_after_first = emulator.roll(config.stream_error_rate)
+            delay = config.chunk_tokens / config.tokens_per_second
+            for index, event in enumerate(events):
+                if index and fail_after_first:
+                    event = exception_event(config.error_type, f"Emulated mid-stream {config.error_type}")
+                    self._write_chunk(event)
+                    break
+                if index:
+                    time.sleep(delay)
+                self._write_chunk(event)
+            self.wfile.write(b'0\r\n\r\n')
+
+        def _write_chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+            self.wfile.flush()
+
+    return EmulatorHandler
+
+
+def start_emulator(model_config: EmulatorConfig = None, agent_config: EmulatorConfig = None,
+                   host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+    """
+    Start the emulator in a background thread.
+
+    Returns:
+        Tuple of (server, emulator, endpoint URL)
+    """
+    emulator = BedrockEmulator(model_config or EmulatorConfig(), agent_config or EmulatorConfig(), seed)
+    server = ThreadingHTTPServer((host, port), make_handler(emulator))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, emulator, f"http://{host}:{server.server_address[1]}"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Emulator behaviour flags shared with the load driver."""
+    defaults = EmulatorConfig()
+    parser.add_argument('--latency-ms', type=float, default=defaults.latency_ms, help='Median time to first byte')
+    parser.add_argument('--latency-sigma', type=float, default=defaults.latency_sigma, help='Lognormal latency spread')
+    parser.add_argument('--tokens-per-second', type=float, default=defaults.tokens_per_second)
+    parser.add_argument('--response-tokens', type=int, default=defaults.response_tokens)
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help='Share of model requests rejected')
+    parser.add_argument('--error-type', default=defaults.error_type, choices=sorted(ERROR_STATUS))
+    parser.add_argument('--stream-error-rate', type=float, default=defaults.stream_error_rate)
+    parser.add_argument('--agent-latency-ms', type=float, help='Agent first-byte latency (defaults to --latency-ms)')
+    parser.add_argument('--agent-error-rate', type=float, help='Agent error rate (defaults to --error-rate)')
+    parser.add_argument('--seed', type=int)
+
+
+def configs_from_args(args) -> Tuple[EmulatorConfig, EmulatorConfig]:
+    model_config = EmulatorConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        error_rate=args.error_rate,
+        error_type=args.error_type,
+        stream_error_rate=args.stream_error_rate
+    )
+    agent_config = EmulatorConfig(**{
+        **model_config.__dict__,
+        'latency_ms': args.agent_latency_ms if args.agent_latency_ms is not None else args.latency_ms,
+        'error_rate': args.agent_error_rate if args.agent_error_rate is not None else args.error_rate
+    })
+    return model_config, agent_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Bedrock emulator for chat load testing')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    model_config, agent_config = configs_from_args(args)
+    server, emulator, url = start_emulator(model_config, agent_config, args.host, args.port, args.seed)
+    print(f"🧪 Bedrock emulator listening on {url}")
+    print(f"   export BEDROCK_ENDPOINT_URL={url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"   requests: {emulator.counts}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
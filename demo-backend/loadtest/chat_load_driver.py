@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Chat load driver for the demo lambdas against the local Bedrock emulator.
+
+Runs bedrock-agent-proxy (or chat-handler) in-process with its Bedrock clients
+pointed at the emulator, fires chat requests from a thread pool and reports
+latency percentiles, throughput and which model answered.
+
+Usage:
+    python chat_load_driver.py --requests 200 --concurrency 16
+    python chat_load_driver.py --target chat-handler --error-rate 0.1
+    python chat_load_driver.py --stream --latency-ms 800 --tokens-per-second 40
+    python chat_load_driver.py --endpoint-url http://127.0.0.1:8765   # use a running emulator
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from bedrock_emulator import add_config_arguments, configs_from_args, start_emulator
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda')
+
+# Questions without cost/security/resource keywords, so no real AWS data APIs are called
+MESSAGES = [
+    "What can you help me with?",
+    "Explain the difference between Nova Lite and Claude Haiku",
+    "Give me tips for a tagging strategy",
+    "How should I organize accounts for a small startup?",
+    "What is a good way to review IAM policies?"
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))]
+
+
+def load_lambda(file_name: str):
+    sys.path.insert(0, LAMBDA_DIR)
+    spec = importlib.util.spec_from_file_location(file_name.replace('-', '_')[:-3], os.path.join(LAMBDA_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_request_fn(args):
+    """Build a callable that sends one chat request and returns its measurements."""
+    if args.target == 'chat-handler':
+        handler = load_lambda('chat-handler.py')
+
+        def send(index: int) -> Dict[str, Any]:
+            response = handler.lambda_handler(
+                {'message': MESSAGES[index % len(MESSAGES)], 'sessionId': f"load-{uuid.uuid4()}"}, None
+            )
+            body = json.loads(response['body'])
+            fallback = body.get('trace', {}).get('fallback', False)
+            return {'ok': response['statusCode'] == 200, 'model': body.get('model'), 'fallback': fallback}
+        return send
+
+    proxy = load_lambda('bedrock-agent-proxy.py')
+
+    if args.stream:
+        def send(index: int) -> Dict[str, Any]:
+            start = time.time()
+            first_token = None
+            done = {}
+            params = {'message': MESSAGES[index % len(MESSAGES)], 'sessionId': f"load-{uuid.uuid4()}"}
+            for event in proxy.handle_chat_stream(params, f"load-{index}"):
+                if event['type'] == 'token' and first_token is None:
+                    first_token = time.time() - start
+                elif event['type'] == 'done':
+                    done = event['response']
+            trace = done.get('trace', {})
+            return {'ok': bool(done.get('response')), 'model': done.get('model'),
+                    'fallback': trace.get('fallback', False), 'ttft': first_token}
+        return send
+
+    def send(index: int) -> Dict[str, Any]:
+        event = {
+            'httpMethod': 'POST',
+            'path': '/chat',
+            'body': json.dumps({'message': MESSAGES[index % len(MESSAGES)], 'sessionId': f"load-{uuid.uuid4()}"})
+        }
+        response = proxy.lambda_handler(event, SimpleNamespace(aws_request_id=f"load-{index}"))
+        body = json.loads(response['body'])
+        data = body.get('data', {})
+        trace = data.get('trace', {})
+        return {'ok': response['statusCode'] == 200, 'model': data.get('model'),
+                'fallback': trace.get('fallback', False), 'winner': trace.get('routing', {}).get('winner')}
+    return send
+
+
+def run_load(send, total: int, concurrency: int) -> Dict[str, Any]:
+    def timed(index: int) -> Dict[str, Any]:
+        start = time.time()
+        try:
+            result = send(index)
+        except Exception as e:
+            result = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        result['latency'] = time.time() - start
+        return result
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    wall = time.time() - started
+
+    latencies = [r['latency'] for r in results if r['ok']]
+    ttfts = [r['ttft'] for r in results if r.get('ttft') is not None]
+    report = {
+        'requests': total,
+        'concurrency': concurrency,
+        'succeeded': len(latencies),
+        'failed': total - len(latencies),
+        'fallbacks': sum(1 for r in results if r.get('fallback')),
+        'wall_seconds': round(wall, 2),
+        'throughput_rps': round(total / wall, 2) if wall else 0.0,
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'latency_p90_ms': round(percentile(latencies, 90) * 1000, 1),
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'models': dict(Counter(r.get('model') for r in results if r['ok'])),
+        'errors': dict(Counter(r['error'] for r in results if r.get('error')))
+    }
+    if ttfts:
+        report['ttft_p50_ms'] = round(percentile(ttfts, 50) * 1000, 1)
+        report['ttft_p99_ms'] = round(percentile(ttfts, 99) * 1000, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the demo chat lambdas against a Bedrock emulator')
+    parser.add_argument('--target', choices=['proxy', 'chat-handler'], default='proxy')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--stream', action='store_true', help='Drive the proxy streaming path and report TTFT')
+    parser.add_argument('--routing-mode', choices=['hedged', 'serial'], help='Override CHAT_ROUTING_MODE')
+    parser.add_argument('--endpoint-url', help='Use an already running emulator instead of starting one')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.endpoint_url:
+        endpoint_url = args.endpoint_url
+    else:
+        model_config, agent_config = configs_from_args(args)
+        _, emulator, endpoint_url = start_emulator(model_config, agent_config, seed=args.seed)
+
+    # Environment is read when the lambda modules are imported, so set it first
+    os.environ['BEDROCK_ENDPOINT_URL'] = endpoint_url
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    os.environ.setdefault('AWS_ACCESS_KEY_ID', 'emulator')
+    os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'emulator')
+    # Measure the model path, not repeat answers or history growth
+    os.environ.setdefault('ANSWER_CACHE_BACKEND', 'none')
+    os.environ.setdefault('CONVERSATION_MEMORY_BACKEND', 'none')
+    os.environ.setdefault('SESSION_STORE_BACKEND', 'memory')
+    if args.routing_mode:
+        os.environ['CHAT_ROUTING_MODE'] = args.routing_mode
+
+    import logging
+    logging.disable(logging.WARNING)
+
+    report = run_load(make_request_fn(args), args.requests, args.concurrency)
+    report['target'] = args.target + (' (stream)' if args.stream else '')
+    if not args.endpoint_url:
+        report['emulator_requests'] = dict(emulator.counts)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n📊 Chat load test: {report['target']} via {endpoint_url}")
+    print("=" * 50)
+    print(f"Requests: {report['requests']} (concurrency {report['concurrency']}), "
+          f"succeeded {report['succeeded']}, failed {report['failed']}, fallbacks {report['fallbacks']}")
+    print(f"Throughput: {report['throughput_rps']} req/s over {report['wall_seconds']}s")
+    print(f"Latency: p50 {report['latency_p50_ms']}ms, p90 {report['latency_p90_ms']}ms, p99 {report['latency_p99_ms']}ms")
+    if 'ttft_p50_ms' in report:
+        print(f"Time to first token: p50 {report['ttft_p50_ms']}ms, p99 {report['ttft_p99_ms']}ms")
+    print(f"Models: {report['models']}")
+    if report['errors']:
+        print(f"Errors: {report['errors']}")
+    if 'emulator_requests' in report:
+        print(f"Emulator requests: {report['emulator_requests']}")
+
+
+if __name__ == '__main__':
+    main()
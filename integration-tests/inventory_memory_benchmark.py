@@ -0,0 +1,186 @@
+"""
+AWS AI Concierge Inventory Memory Benchmark
+Compares the inventory records collectors build with the nested dicts they used to
+build: full inventories, and collections built for a projection (fields=...), which
+keep only the requested fields
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda-src'))
+
+from tools.resource_discovery import ResourceDiscoveryHandler  # noqa: E402
+from utils.inventory_filters import project, wants  # noqa: E402
+
+REGIONS = ['us-east-1', 'us-east-2', 'us-west-2', 'eu-west-1', 'eu-central-1', 'ap-southeast-2']
+INSTANCE_TYPES = ['t3.micro', 't3.small', 't3.large', 'm5.large', 'm5.xlarge', 'c5.2xlarge', 'r5.large']
+STATES = ['running', 'running', 'running', 'stopped']
+
+
+def synthetic_instances(count: int, region_index: int) -> List[Dict[str, Any]]:
+    """describe_instances-shaped instances with realistic tag and network fields."""
+    launched = datetime(2024, 1, 1)
+    instances = []
+    for index in range(count):
+        instances.append({
+            'InstanceId': f"i-{region_index:02x}{index:015x}",
+            'InstanceType': INSTANCE_TYPES[index % len(INSTANCE_TYPES)],
+            'State': {'Name': STATES[index % len(STATES)]},
+            'LaunchTime': launched + timedelta(minutes=index),
+            'Placement': {'AvailabilityZone': f"{REGIONS[region_index]}{'abc'[index % 3]}"},
+            'VpcId': f"vpc-{index % 8:08x}",
+            'SubnetId': f"subnet-{index % 32:08x}",
+            'SecurityGroups': [{'GroupName': 'default'}, {'GroupName': f"app-{index % 10}"}],
+            'PrivateIpAddress': f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}",
+            'PublicIpAddress': None if index % 3 else f"54.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}",
+            'Tags': [
+                {'Key': 'Name', 'Value': f"app-{index}"},
+                {'Key': 'team', 'Value': f"team-{index % 12}"},
+                {'Key': 'env', 'Value': ['prod', 'staging', 'dev'][index % 3]},
+                {'Key': 'cost-center', 'Value': f"cc-{index % 40}"}
+            ]
+        })
+    return instances
+
+
+def legacy_ec2_dict(handler, instance: Dict[str, Any], region: str,
+                    fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+    """The nested dict _get_ec2_resources built before projected collections were trimmed."""
+    resource = {
+        'resource_id': instance['InstanceId'],
+        'resource_type': 'EC2',
+        'name': handler._get_resource_name(instance.get('Tags', [])),
+        'status': instance['State']['Name'],
+        'instance_type': instance['InstanceType'],
+        'launch_time': instance.get('LaunchTime', '').isoformat() if instance.get('LaunchTime') else None,
+        'region': region,
+        'availability_zone': instance.get('Placement', {}).get('AvailabilityZone')
+    }
+    if wants(fields, 'tags'):
+        resource['tags'] = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+    if wants(fields, 'metadata'):
+        resource['metadata'] = {
+            'vpc_id': instance.get('VpcId'),
+            'subnet_id': instance.get('SubnetId'),
+            'security_groups': [sg['GroupName'] for sg in instance.get('SecurityGroups', [])],
+            'public_ip': instance.get('PublicIpAddress'),
+            'private_ip': instance.get('PrivateIpAddress')
+        }
+    return resource
+
+
+def collect(total: int, build) -> Dict[str, Any]:
+    """
+    Build an inventory region by region the way collectors do, dropping each API payload afterwards.
+
+    Returns:
+        The built inventory, bytes it retains and build time
+    """
+    per_region = total // len(REGIONS)
+
+    # Timed without tracemalloc, which slows allocation-heavy code unevenly
+    payloads = [(synthetic_instances(per_region, region_index), region) for region_index, region in enumerate(REGIONS)]
+    elapsed = best_of(lambda: [[build(instance, region) for instance in instances] for instances, region in payloads])
+    del payloads
+
+    gc.collect()
+    tracemalloc.start()
+    inventory = []
+    for region_index, region in enumerate(REGIONS):
+        instances = synthetic_instances(per_region, region_index)
+        inventory.extend(build(instance, region) for instance in instances)
+        del instances
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'inventory': inventory, 'bytes': retained, 'build_s': elapsed}
+
+
+def best_of(func, repeat: int = 5) -> float:
+    """
+    Fastest of several timed runs.
+
+    Like timeit, the collector is paused while timing: with a large inventory alive, a
+    full collection landing in one run dominates whatever is being measured.
+    """
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def measure(total: int) -> Dict[str, Any]:
+    """Memory, build and serialization cost of collector records vs the legacy nested dicts."""
+    handler = ResourceDiscoveryHandler(aws_clients=None)
+    fields = {'resource_id', 'resource_type', 'name', 'status', 'instance_type'}
+    builds = {
+        # Full inventories are serialized whole
+        'full': lambda instance, region: handler._ec2_inventory_record(instance, region),
+        'legacy': lambda instance, region: legacy_ec2_dict(handler, instance, region),
+        # Collections built for a projection hold only the requested fields
+        'trimmed': lambda instance, region: handler._ec2_inventory_record(instance, region, fields),
+        'projected_dict': lambda instance, region: legacy_ec2_dict(handler, instance, region, fields)
+    }
+
+    result = {}
+    for name, build in builds.items():
+        # Each inventory is measured and dropped before the next is built, so none runs on a heap
+        # fragmented by another one
+        built = collect(total, build)
+        inventory = built['inventory']
+        if name in ('full', 'legacy'):
+            serialize = best_of(lambda: json.dumps(inventory))
+        else:
+            serialize = best_of(lambda: json.dumps([project(resource, fields) for resource in inventory]))
+        result['resources'] = len(inventory)
+        result[f"{name}_mb"] = round(built['bytes'] / 1e6, 1)
+        result[f"{name}_build_s"] = round(built['build_s'], 3)
+        result[f"{name}_serialize_s"] = round(serialize, 3)
+        if name == 'trimmed':
+            result['projected_payload_mb'] = round(len(json.dumps([project(r, fields) for r in inventory])) / 1e6, 1)
+            trimmed_bytes = built['bytes']
+        elif name == 'projected_dict':
+            result['memory_ratio'] = round(built['bytes'] / max(trimmed_bytes, 1), 2)
+        del built, inventory
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inventory record memory benchmark')
+    parser.add_argument('--resources', type=int, nargs='+', default=[5000, 50000])
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = [measure(total) for total in args.resources]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print("\n📊 INVENTORY MEMORY BENCHMARK (EC2 records, 4 tags each)")
+    print("=" * 60)
+    for result in results:
+        print(f"{result['resources']:>7} resources, full: {result['full_mb']} MB vs legacy dicts "
+              f"{result['legacy_mb']} MB, build {result['full_build_s']}s / {result['legacy_build_s']}s, "
+              f"serialize {result['full_serialize_s']}s / {result['legacy_serialize_s']}s")
+        print(f"         5-field projection: trimmed {result['trimmed_mb']} MB vs dicts "
+              f"{result['projected_dict_mb']} MB ({result['memory_ratio']}x), build {result['trimmed_build_s']}s "
+              f"/ {result['projected_dict_build_s']}s, project+serialize {result['trimmed_serialize_s']}s "
+              f"/ {result['projected_dict_serialize_s']}s ({result['projected_payload_mb']} MB)")
+
+if __name__ == '__main__':
+    main()
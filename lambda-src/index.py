@@ -14,7 +14,11 @@ from utils.error_handler import ErrorHandler
 from utils.response_formatter import ResponseFormatter
 from utils.aws_clients import AWSClientManager
 from utils.audit_logger import AuditLogger
+from utils.cost_history import DailyCostHistory, HourlyCostStore
+from utils.metric_cache import MetricSeriesCache
+from utils.inventory_index import InventoryIndex
 from tools.cost_analysis import CostAnalysisHandler
+from tools.cost_forecast import CostForecastHandler
 from tools.resource_discovery import ResourceDiscoveryHandler
 from tools.security_assessment import SecurityAssessmentHandler
 
@@ -27,18 +31,27 @@ error_handler = ErrorHandler()
 response_formatter = ResponseFormatter()
 aws_clients = AWSClientManager()
 audit_logger = AuditLogger()
+cost_history = DailyCostHistory()
+hourly_cost_store = HourlyCostStore()
+metric_cache = MetricSeriesCache(spill_dir=os.getenv('METRIC_CACHE_DIR'))
+inventory_index = InventoryIndex()
 
 # Initialize tool handlers
-cost_handler = CostAnalysisHandler(aws_clients)
-resource_handler = ResourceDiscoveryHandler(aws_clients)
+cost_handler = CostAnalysisHandler(aws_clients, cost_history, metric_cache, hourly_cost_store)
+forecast_handler = CostForecastHandler(aws_clients, cost_history)
+resource_handler = ResourceDiscoveryHandler(aws_clients, metric_cache, inventory_index)
 security_handler = SecurityAssessmentHandler(aws_clients)
 
 # Route mapping for different actions
 TOOL_ROUTES = {
     'getCostAnalysis': cost_handler.get_cost_analysis,
     'getIdleResources': cost_handler.get_idle_resources,
+    'getCostForecast': forecast_handler.get_cost_forecast,
     'getResourceInventory': resource_handler.get_resource_inventory,
     'getResourceDetails': resource_handler.get_resource_details,
+    'getInventoryChanges': resource_handler.get_inventory_changes,
+    'getResourceRelationships': resource_handler.get_resource_relationships,
+    'searchResources': resource_handler.search_resources,
     'getResourceHealth': resource_handler.get_resource_health_status,
     'getSecurityAssessment': security_handler.get_security_assessment,
     'checkEncryptionStatus': security_handler.check_encryption_status,
@@ -170,8 +183,12 @@ def _extract_operation_from_path(api_path: str) -> str:
     path_mapping = {
         '/getCostAnalysis': 'getCostAnalysis',
         '/getIdleResources': 'getIdleResources',
+        '/getCostForecast': 'getCostForecast',
         '/getResourceInventory': 'getResourceInventory',
         '/getResourceDetails': 'getResourceDetails',
+        '/getInventoryChanges': 'getInventoryChanges',
+        '/getResourceRelationships': 'getResourceRelationships',
+        '/searchResources': 'searchResources',
         '/getResourceHealth': 'getResourceHealth',
         '/getSecurityAssessment': 'getSecurityAssessment',
         '/checkEncryptionStatus': 'checkEncryptionStatus',
@@ -0,0 +1,101 @@
+"""
+Unit tests for the collector registry and scheduler
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from utils.collector_registry import CollectorRegistry, CollectorScheduler, Paginator, paginate
+
+
+class TestCollectorRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.registry.register('EC2', Mock(), cost_weight=3, health={'dimension': 'InstanceId', 'metrics': {}})
+        self.registry.register('S3', Mock(), scope='global')
+
+    def test_select(self):
+        self.assertEqual([c['resource_type'] for c in self.registry.select('ALL')], ['EC2', 'S3'])
+        self.assertEqual(self.registry.select('S3')[0]['scope'], 'global')
+        self.assertEqual(self.registry.health_metrics('EC2')['dimension'], 'InstanceId')
+        self.assertIsNone(self.registry.health_metrics('S3'))
+        with self.assertRaises(ValueError):
+            self.registry.select('REDSHIFT')
+
+    def test_rejects_duplicates_and_bad_scope(self):
+        with self.assertRaises(ValueError):
+            self.registry.register('EC2', Mock())
+        with self.assertRaises(ValueError):
+            self.registry.register('EBS', Mock(), scope='zonal')
+
+    def test_paginate(self):
+        call = Mock(side_effect=[{'Items': [1, 2], 'NextMarker': 'm'}, {'Items': [3]}])
+
+        self.assertEqual(paginate(call, 'Items', 'Marker', 'NextMarker', PageSize=2), [1, 2, 3])
+        self.assertEqual(call.call_args_list[1].kwargs, {'PageSize': 2, 'Marker': 'm'})
+
+    def test_registered_paginator_pages_through_operation(self):
+        volumes = Paginator('describe_volumes', 'Volumes')
+        self.registry.register('EBS', Mock(), paginator=volumes)
+        client = Mock()
+        client.describe_volumes.side_effect = [{'Volumes': ['vol-1'], 'NextToken': 't'}, {'Volumes': ['vol-2']}]
+
+        paginator = self.registry.get('EBS')['paginator']
+
+        self.assertEqual(paginator.paginate(client, MaxResults=500), ['vol-1', 'vol-2'])
+        self.assertEqual(client.describe_volumes.call_args_list[1].kwargs, {'MaxResults': 500, 'NextToken': 't'})
+        self.assertIsNone(self.registry.get('S3')['paginator'])
+
+
+class TestCollectorScheduler(unittest.TestCase):
+
+    def test_respects_per_collector_concurrency(self):
+        registry = CollectorRegistry()
+        registry.register('EKS', Mock(), max_concurrency=2)
+        registry.register('EC2', Mock(), max_concurrency=8)
+        lock = threading.Lock()
+        running = {'EKS': 0, 'EC2': 0}
+        peak = {'EKS': 0, 'EC2': 0}
+
+        def task(resource_type):
+            def run():
+                with lock:
+                    running[resource_type] += 1
+                    peak[resource_type] = max(peak[resource_type], running[resource_type])
+                time.sleep(0.02)
+                with lock:
+                    running[resource_type] -= 1
+                return resource_type
+            return run
+
+        tasks = {f"{t}:{region}": (registry.get(t), task(t)) for t in ('EKS', 'EC2') for region in range(6)}
+        outcome = CollectorScheduler(max_workers=8).run(tasks, 'test-request')
+
+        self.assertEqual(len(outcome['results']), 12)
+        self.assertLessEqual(peak['EKS'], 2)
+        self.assertGreater(peak['EC2'], 2)
+
+    def test_heaviest_first_and_errors_collected(self):
+        registry = CollectorRegistry()
+        registry.register('LIGHT', Mock(), cost_weight=1)
+        registry.register('HEAVY', Mock(), cost_weight=5)
+        order = []
+
+        def failing():
+            order.append('HEAVY')
+            raise RuntimeError('throttled')
+
+        outcome = CollectorScheduler(max_workers=1).run({
+            'LIGHT': (registry.get('LIGHT'), lambda: order.append('LIGHT')),
+            'HEAVY': (registry.get('HEAVY'), failing)
+        }, 'test-request')
+
+        self.assertEqual(order, ['HEAVY', 'LIGHT'])
+        self.assertIsInstance(outcome['errors']['HEAVY'], RuntimeError)
+        self.assertIn('LIGHT', outcome['results'])
+
+
+if __name__ == '__main__':
+    unittest.main()
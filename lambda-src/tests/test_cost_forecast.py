@@ -0,0 +1,191 @@
+"""
+Unit tests for cost forecasting functionality
+"""
+
+import unittest
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+from botocore.exceptions import ClientError
+from tools.cost_forecast import CostForecastHandler
+from utils.cost_history import DailyCostHistory
+
+
+class TestCostForecastHandler(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_aws_clients = Mock()
+        self.mock_ce_client = Mock()
+        self.mock_aws_clients.get_cost_explorer_client.return_value = self.mock_ce_client
+        self.mock_aws_clients.make_api_call.side_effect = (
+            lambda client, operation, request_id, **kwargs: getattr(client, operation)(**kwargs)
+        )
+        self.cost_history = DailyCostHistory(path=None)
+        self.handler = CostForecastHandler(self.mock_aws_clients, self.cost_history)
+        self.request_id = "test-request-123"
+
+    def _record_linear_history(self, days, base=10.0, step=1.0):
+        today = datetime.utcnow().date()
+        self.cost_history.record([
+            {'date': (today - timedelta(days=days - i)).isoformat(), 'cost': base + step * i}
+            for i in range(days)
+        ])
+
+    def test_get_cost_forecast_from_cost_explorer(self):
+        """Test forecast served by Cost Explorer."""
+        self.mock_ce_client.get_cost_forecast.return_value = {
+            'Total': {'Amount': '250.50', 'Unit': 'USD'},
+            'ForecastResultsByTime': [
+                {
+                    'TimePeriod': {'Start': '2025-01-15', 'End': '2025-02-01'},
+                    'MeanValue': '250.50',
+                    'PredictionIntervalLowerBound': '200.00',
+                    'PredictionIntervalUpperBound': '300.00'
+                }
+            ]
+        }
+
+        result = self.handler.get_cost_forecast({}, self.request_id)
+
+        self.assertEqual(result['forecast_total'], 250.50)
+        self.assertEqual(result['lower_bound'], 200.00)
+        self.assertEqual(result['upper_bound'], 300.00)
+        self.assertEqual(result['data_source'], 'AWS Cost Explorer Forecast')
+        self.assertEqual(result['horizon'], 'END_OF_MONTH')
+        self.assertFalse(result['cached'])
+
+        call_kwargs = self.mock_ce_client.get_cost_forecast.call_args[1]
+        self.assertEqual(call_kwargs['Metric'], 'BLENDED_COST')
+        self.assertEqual(call_kwargs['Granularity'], 'MONTHLY')
+
+    def test_repeated_forecast_is_cached(self):
+        """Test repeated forecasts with the same key skip Cost Explorer."""
+        self.mock_ce_client.get_cost_forecast.return_value = {
+            'Total': {'Amount': '100.00', 'Unit': 'USD'},
+            'ForecastResultsByTime': []
+        }
+
+        self.handler.get_cost_forecast({'horizon': '30', 'granularity': 'DAILY'}, self.request_id)
+        result = self.handler.get_cost_forecast({'horizon': 30, 'granularity': 'daily'}, self.request_id)
+
+        self.assertTrue(result['cached'])
+        self.assertEqual(result['forecast_total'], 100.00)
+        self.assertEqual(self.mock_ce_client.get_cost_forecast.call_count, 1)
+
+        # A different metric is a different cache entry
+        self.handler.get_cost_forecast({'horizon': '30', 'granularity': 'DAILY', 'metric': 'UNBLENDED_COST'}, self.request_id)
+        self.assertEqual(self.mock_ce_client.get_cost_forecast.call_count, 2)
+
+    def test_local_fallback_when_data_unavailable(self):
+        """Test local regression is used when Cost Explorer cannot forecast."""
+        self.mock_ce_client.get_cost_forecast.side_effect = ClientError(
+            error_response={'Error': {'Code': 'DataUnavailableException', 'Message': 'Not enough data'}},
+            operation_name='GetCostForecast'
+        )
+        self._record_linear_history(30, base=10.0, step=1.0)
+
+        result = self.handler.get_cost_forecast({'horizon': '3', 'granularity': 'DAILY'}, self.request_id)
+
+        self.assertEqual(result['data_source'], 'Local regression model')
+        self.assertEqual(result['fallback_reason'], 'DataUnavailableException')
+        self.assertEqual(len(result['forecast_by_period']), 3)
+        # Perfect linear history: the next three days continue the trend (40, 41, 42)
+        self.assertAlmostEqual(result['forecast_total'], 123.0, places=1)
+        self.assertAlmostEqual(result['model']['daily_trend'], 1.0, places=3)
+        self.mock_ce_client.get_cost_and_usage.assert_not_called()
+
+    def test_local_fallback_only_forecasts_blended_cost(self):
+        """Test the local model does not answer for metrics its history does not track."""
+        self.mock_ce_client.get_cost_forecast.side_effect = ClientError(
+            error_response={'Error': {'Code': 'DataUnavailableException', 'Message': 'Not enough data'}},
+            operation_name='GetCostForecast'
+        )
+        self._record_linear_history(30)
+
+        result = self.handler.get_cost_forecast({'horizon': '3', 'metric': 'AMORTIZED_COST'}, self.request_id)
+
+        self.assertIsNone(result['forecast_total'])
+        self.assertEqual(result['metric'], 'AMORTIZED_COST')
+        self.assertIn('BLENDED_COST', result['message'])
+
+    def test_local_fallback_backfills_short_history(self):
+        """Test the local model backfills history from Cost Explorer actuals."""
+        self.mock_ce_client.get_cost_forecast.side_effect = ClientError(
+            error_response={'Error': {'Code': 'DataUnavailableException', 'Message': 'Not enough data'}},
+            operation_name='GetCostForecast'
+        )
+        today = datetime.utcnow().date()
+        self.mock_ce_client.get_cost_and_usage.return_value = {
+            'ResultsByTime': [
+                {
+                    'TimePeriod': {'Start': (today - timedelta(days=10 - i)).isoformat()},
+                    'Total': {'BlendedCost': {'Amount': '5.0', 'Unit': 'USD'}}
+                }
+                for i in range(10)
+            ]
+        }
+
+        result = self.handler.get_cost_forecast({'horizon': '10', 'granularity': 'DAILY'}, self.request_id)
+
+        self.assertEqual(len(self.cost_history), 10)
+        self.assertAlmostEqual(result['forecast_total'], 50.0, places=1)
+
+    def test_local_fallback_without_history(self):
+        """Test a helpful message is returned when no history exists."""
+        self.mock_ce_client.get_cost_forecast.side_effect = ClientError(
+            error_response={'Error': {'Code': 'AccessDenied', 'Message': 'Access denied'}},
+            operation_name='GetCostForecast'
+        )
+        self.mock_ce_client.get_cost_and_usage.side_effect = ClientError(
+            error_response={'Error': {'Code': 'AccessDenied', 'Message': 'Access denied'}},
+            operation_name='GetCostAndUsage'
+        )
+
+        result = self.handler.get_cost_forecast({}, self.request_id)
+
+        self.assertIsNone(result['forecast_total'])
+        self.assertIn('message', result)
+
+        # Empty results are not cached
+        self.handler.get_cost_forecast({}, self.request_id)
+        self.assertEqual(self.mock_ce_client.get_cost_forecast.call_count, 2)
+
+    def test_invalid_parameters(self):
+        """Test parameter validation."""
+        with self.assertRaises(ValueError):
+            self.handler.get_cost_forecast({'granularity': 'HOURLY'}, self.request_id)
+
+        with self.assertRaises(ValueError):
+            self.handler.get_cost_forecast({'metric': 'USAGE'}, self.request_id)
+
+        with self.assertRaises(ValueError):
+            self.handler.get_cost_forecast({'horizon': 'someday'}, self.request_id)
+
+        with self.assertRaises(ValueError):
+            self.handler.get_cost_forecast({'horizon': '200', 'granularity': 'DAILY'}, self.request_id)
+
+
+class TestDailyCostHistory(unittest.TestCase):
+
+    def test_record_skips_today_and_persists(self):
+        """Test today's partial bucket is ignored and history survives a reload."""
+        import os
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'history.json')
+            history = DailyCostHistory(path=path)
+            today = datetime.utcnow().date()
+
+            changed = history.record([
+                {'date': (today - timedelta(days=1)).isoformat(), 'cost': 12.5},
+                {'date': today.isoformat(), 'cost': 3.0}
+            ])
+
+            self.assertEqual(changed, 1)
+
+            reloaded = DailyCostHistory(path=path)
+            self.assertEqual(reloaded.get_series(), [(today - timedelta(days=1), 12.5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
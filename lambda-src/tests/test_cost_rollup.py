@@ -0,0 +1,189 @@
+"""
+Unit tests for hourly cost rollups and the hourly cost store
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+from utils.cost_rollup import HourlyCostAggregator
+from utils.cost_history import HourlyCostStore
+from tools.cost_analysis import CostAnalysisHandler
+
+
+def _hour(dt):
+    return dt.strftime('%Y-%m-%dT%H:00:00Z')
+
+
+class TestHourlyCostAggregator(unittest.TestCase):
+
+    def test_totals_and_bounded_top_hours(self):
+        """Test running totals and that only the top-K hours per group are kept."""
+        aggregator = HourlyCostAggregator(top_k=2)
+        for index, cost in enumerate([1.0, 5.0, 3.0, 9.0]):
+            aggregator.add(f"2025-01-01T0{index}:00:00Z", 'Amazon EC2', cost)
+        aggregator.add('2025-01-01T00:00:00Z', 'Amazon S3', 4.0)
+
+        self.assertEqual(aggregator.total_cost, 22.0)
+        self.assertEqual(aggregator.hourly_totals['2025-01-01T00:00:00Z'], 5.0)
+        self.assertEqual(
+            aggregator.top_hours_by_group()['Amazon EC2'],
+            [{'hour': '2025-01-01T03:00:00Z', 'cost': 9.0}, {'hour': '2025-01-01T01:00:00Z', 'cost': 5.0}]
+        )
+        self.assertEqual(aggregator.peak_hours(1), [{'hour': '2025-01-01T03:00:00Z', 'cost': 9.0}])
+        self.assertAlmostEqual(aggregator.average_hourly_cost(), 5.5)
+
+    def test_add_results_page(self):
+        """Test Cost Explorer pages are folded in, including empty hours."""
+        aggregator = HourlyCostAggregator()
+
+        count = aggregator.add_results([
+            {
+                'TimePeriod': {'Start': '2025-01-01T00:00:00Z'},
+                'Groups': [{
+                    'Keys': ['AWS Lambda'],
+                    'Metrics': {
+                        'BlendedCost': {'Amount': '0.25'},
+                        'UsageQuantity': {'Amount': '100', 'Unit': 'Requests'}
+                    }
+                }]
+            },
+            {'TimePeriod': {'Start': '2025-01-01T01:00:00Z'}, 'Groups': []}
+        ])
+
+        self.assertEqual(count, 2)
+        self.assertEqual(len(aggregator.hourly_totals), 2)
+        self.assertEqual(aggregator.group_totals['AWS Lambda']['usage'], 100.0)
+
+
+class TestHourlyCostStore(unittest.TestCase):
+
+    def test_window_resumes_after_settled_hours(self):
+        """Test stored hours are returned and fetching resumes after them."""
+        store = HourlyCostStore(path=None)
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        start = _hour(now - timedelta(days=3))
+        settled = _hour(now - timedelta(days=1))
+        store.save_window('SERVICE', start, settled, {start: {'Amazon EC2': [1.0, 1.0, 'Hrs']}})
+
+        hours, fetch_start = store.load_window('SERVICE', start, _hour(now))
+        self.assertEqual(fetch_start, settled)
+        self.assertEqual(hours[start]['Amazon EC2'][0], 1.0)
+
+        # A window starting before the stored range is fetched in full
+        earlier = _hour(now - timedelta(days=5))
+        hours, fetch_start = store.load_window('SERVICE', earlier, _hour(now))
+        self.assertEqual((hours, fetch_start), ({}, earlier))
+
+    def test_pages_count_once_the_window_is_saved(self):
+        """Test rows added page by page are merged per hour and only loaded after save_window."""
+        store = HourlyCostStore(path=None)
+        now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        start = _hour(now - timedelta(days=2))
+        settled = _hour(now - timedelta(days=1))
+        store.add_hours('SERVICE', start, {start: {'Amazon EC2': [1.0, 1.0, 'Hrs']}})
+        store.add_hours('SERVICE', start, {start: {'Amazon S3': [2.0, 0.0, '']}})
+
+        # An interrupted fetch leaves nothing settled, so the hours are fetched again
+        self.assertEqual(store.load_window('SERVICE', start, _hour(now)), ({}, start))
+
+        store.save_window('SERVICE', start, settled)
+        hours, fetch_start = store.load_window('SERVICE', start, _hour(now))
+        self.assertEqual(fetch_start, settled)
+        self.assertEqual(set(hours[start]), {'Amazon EC2', 'Amazon S3'})
+
+    def test_persists_across_instances(self):
+        """Test stored hours survive a reload from the spill file."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'hourly.json')
+            now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+            start = _hour(now - timedelta(days=2))
+            HourlyCostStore(path=path).save_window(
+                'SERVICE', start, _hour(now - timedelta(days=1)), {start: {'Amazon S3': [2.0, 0.0, '']}}
+            )
+
+            hours, _ = HourlyCostStore(path=path).load_window('SERVICE', start, _hour(now))
+            self.assertIn(start, hours)
+
+
+class TestHourlyCostAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_aws_clients = Mock()
+        self.mock_ce_client = Mock()
+        self.mock_aws_clients.get_cost_explorer_client.return_value = self.mock_ce_client
+        self.mock_aws_clients.make_api_call.side_effect = (
+            lambda client, operation, request_id, **kwargs: getattr(client, operation)(**kwargs)
+        )
+        self.mock_ce_client.get_cost_and_usage.side_effect = self._fake_hourly_costs
+        self.handler = CostAnalysisHandler(self.mock_aws_clients)
+        self.request_id = "test-request-123"
+
+    def _fake_hourly_costs(self, TimePeriod, Granularity, Metrics, GroupBy, NextPageToken=None):
+        """Two pages of hourly rows; hour 02:00 of each day is a batch spike."""
+        start = datetime.strptime(TimePeriod['Start'], '%Y-%m-%dT%H:00:00Z')
+        end = datetime.strptime(TimePeriod['End'], '%Y-%m-%dT%H:00:00Z')
+        hours = []
+        hour = start
+        while hour < end:
+            hours.append(hour)
+            hour += timedelta(hours=1)
+
+        middle = len(hours) // 2
+        page = hours[middle:] if NextPageToken else hours[:middle]
+        response = {
+            'ResultsByTime': [
+                {
+                    'TimePeriod': {'Start': _hour(h)},
+                    'Groups': [{
+                        'Keys': ['Amazon EC2'],
+                        'Metrics': {
+                            'BlendedCost': {'Amount': '10.0' if h.hour == 2 else '1.0'},
+                            'UsageQuantity': {'Amount': '1', 'Unit': 'Hrs'}
+                        }
+                    }]
+                }
+                for h in page
+            ]
+        }
+        if not NextPageToken:
+            response['NextPageToken'] = 'page-2'
+        return response
+
+    def test_hourly_analysis_streams_pages_and_reuses_settled_hours(self):
+        """Test paginated hourly data is aggregated and settled hours are not re-downloaded."""
+        params = {'time_period': 'MONTHLY', 'granularity': 'HOURLY', 'group_by': 'SERVICE'}
+
+        result = self.handler.get_cost_analysis(params, self.request_id)
+
+        self.assertEqual(result['granularity'], 'HOURLY')
+        self.assertEqual(self.mock_ce_client.get_cost_and_usage.call_count, 2)
+        first_request = self.mock_ce_client.get_cost_and_usage.call_args_list[0][1]
+        self.assertEqual(first_request['Granularity'], 'HOURLY')
+        self.assertEqual(result['peak_hours'][0]['cost'], 10.0)
+        self.assertTrue(result['peak_hours'][0]['hour'].endswith('T02:00:00Z'))
+        self.assertLessEqual(len(result['top_hours_by_service']['Amazon EC2']), 5)
+        self.assertGreater(result['spike_hours'], 0)
+
+        repeat = self.handler.get_cost_analysis(params, self.request_id)
+
+        repeat_request = self.mock_ce_client.get_cost_and_usage.call_args_list[2][1]
+        now_hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        self.assertGreaterEqual(repeat_request['TimePeriod']['Start'], _hour(now_hour - timedelta(hours=24)))
+        self.assertEqual(repeat['total_cost'], result['total_cost'])
+        self.assertEqual(repeat['hours_analyzed'], result['hours_analyzed'])
+
+    def test_hourly_analysis_rejects_period_outside_retention(self):
+        """Test a period older than the hourly retention raises instead of reporting $0."""
+        params = {'time_period': 'January 2020', 'granularity': 'HOURLY', 'group_by': 'SERVICE'}
+
+        with self.assertRaises(ValueError) as context:
+            self.handler.get_cost_analysis(params, self.request_id)
+
+        self.assertIn('Hourly cost data is unavailable', str(context.exception))
+        self.mock_ce_client.get_cost_and_usage.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
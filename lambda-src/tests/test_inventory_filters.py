@@ -0,0 +1,115 @@
+"""
+Unit tests for inventory filters and field projection
+"""
+
+import unittest
+from unittest.mock import Mock
+from utils.inventory_filters import (
+    parse_inventory_filters, parse_fields, ec2_api_filters, matches_filters, project
+)
+from utils.inventory_index import InventoryIndex
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+class TestInventoryFilters(unittest.TestCase):
+
+    def test_parse_filters(self):
+        filters = parse_inventory_filters({
+            'resource_type': 'EC2', 'state': 'running', 'tag': 'env=prod,owner', 'name_prefix': ''
+        })
+        self.assertEqual(filters, {'state': 'running', 'tags': {'env': 'prod', 'owner': None}})
+
+    def test_parse_invalid_tag(self):
+        with self.assertRaises(ValueError):
+            parse_inventory_filters({'tag': '=prod'})
+
+    def test_parse_fields_keeps_key_fields(self):
+        self.assertIsNone(parse_fields({}))
+        self.assertEqual(parse_fields({'fields': 'name, status'}), {'name', 'status', 'resource_id', 'resource_type'})
+
+    def test_ec2_api_filters(self):
+        api_filters = ec2_api_filters({
+            'state': 'running', 'instance_type': 't3.large', 'vpc_id': 'vpc-1',
+            'name_prefix': 'web', 'tags': {'env': 'prod', 'owner': None}
+        })
+        self.assertEqual(api_filters, [
+            {'Name': 'instance-state-name', 'Values': ['running']},
+            {'Name': 'instance-type', 'Values': ['t3.large']},
+            {'Name': 'vpc-id', 'Values': ['vpc-1']},
+            {'Name': 'tag:Name', 'Values': ['web*']},
+            {'Name': 'tag:env', 'Values': ['prod']},
+            {'Name': 'tag-key', 'Values': ['owner']}
+        ])
+
+    def test_matches_filters(self):
+        rds = {'resource_id': 'db-1', 'name': 'orders-db', 'status': 'available', 'instance_class': 'db.t3.large',
+               'tags': {}, 'metadata': {'vpc_id': 'vpc-1'}}
+        self.assertTrue(matches_filters(rds, {'instance_type': 'db.t3.large', 'vpc_id': 'vpc-1', 'name_prefix': 'orders'}))
+        self.assertFalse(matches_filters(rds, {'state': 'stopped'}))
+        self.assertFalse(matches_filters(rds, {'tags': {'env': None}}))
+
+        function = {'resource_id': 'fn', 'metadata': {'vpc_config': {'VpcId': 'vpc-2'}}}
+        self.assertTrue(matches_filters(function, {'vpc_id': 'vpc-2'}))
+
+    def test_project(self):
+        record = {'resource_id': 'i-1', 'resource_type': 'EC2', 'name': 'web', 'metadata': {}}
+        self.assertEqual(project(record, {'resource_id', 'resource_type', 'name'}),
+                         {'resource_id': 'i-1', 'resource_type': 'EC2', 'name': 'web'})
+        self.assertIs(project(record, None), record)
+
+
+class TestFilteredInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.ec2_client = Mock()
+        self.aws_clients.get_ec2_client.return_value = self.ec2_client
+        self.ec2_client.describe_instances.return_value = {
+            'Reservations': [{
+                'Instances': [{
+                    'InstanceId': 'i-1234567890abcdef0',
+                    'InstanceType': 't3.large',
+                    'State': {'Name': 'running'},
+                    'VpcId': 'vpc-1',
+                    'Tags': [{'Key': 'Name', 'Value': 'web'}, {'Key': 'env', 'Value': 'prod'}]
+                }]
+            }]
+        }
+        self.index = InventoryIndex(path=None)
+        self.handler = ResourceDiscoveryHandler(self.aws_clients, inventory_index=self.index)
+
+    def test_filters_pushed_down_and_not_indexed(self):
+        params = {'resource_type': 'EC2', 'region': 'us-east-1', 'state': 'running', 'vpc_id': 'vpc-1',
+                  'fields': 'name,instance_type'}
+
+        result = self.handler.get_resource_inventory(params, 'test-request-1')
+
+        self.ec2_client.describe_instances.assert_called_once_with(Filters=[
+            {'Name': 'instance-state-name', 'Values': ['running']},
+            {'Name': 'vpc-id', 'Values': ['vpc-1']}
+        ])
+        self.assertEqual(result['resources'], [{
+            'resource_id': 'i-1234567890abcdef0', 'resource_type': 'EC2', 'name': 'web', 'instance_type': 't3.large'
+        }])
+        self.assertEqual(result['filters_applied'], {'state': 'running', 'vpc_id': 'vpc-1'})
+        # A filtered collection is partial, so it must not replace the indexed one
+        self.assertIsNone(self.index.refreshed_at('EC2', 'us-east-1'))
+
+    def test_filters_served_from_fresh_index(self):
+        self.handler.get_resource_inventory({'resource_type': 'EC2', 'region': 'us-east-1'}, 'test-request-1')
+
+        match = self.handler.get_resource_inventory(
+            {'resource_type': 'EC2', 'region': 'us-east-1', 'state': 'running', 'name_prefix': 'we'}, 'test-request-2'
+        )
+        no_match = self.handler.get_resource_inventory(
+            {'resource_type': 'EC2', 'region': 'us-east-1', 'instance_type': 't3.micro'}, 'test-request-3'
+        )
+
+        self.assertEqual(self.ec2_client.describe_instances.call_count, 1)
+        self.assertEqual(match['inventory_source'], {'EC2': 'index'})
+        self.assertEqual(match['total_count'], 1)
+        self.assertEqual(no_match['total_count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+"""
+Unit tests for the persistent resource inventory index
+"""
+
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+from botocore.exceptions import ClientError
+from utils.inventory_index import InventoryIndex, SNAPSHOT_RETENTION_SECONDS, diff_snapshots
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+def _resource(resource_id, status='running', tags=None, region='us-east-1'):
+    return {
+        'resource_id': resource_id,
+        'resource_type': 'EC2',
+        'name': resource_id,
+        'status': status,
+        'region': region,
+        'tags': tags or {},
+        'metadata': {}
+    }
+
+
+class TestInventoryIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = InventoryIndex(path=None)
+
+    def test_sync_writes_only_changes(self):
+        counts = self.index.sync('EC2', 'us-east-1', [_resource('i-1'), _resource('i-2')])
+        self.assertEqual(counts, {'added': 2, 'modified': 0, 'removed': 0, 'unchanged': 0})
+
+        counts = self.index.sync('EC2', 'us-east-1', [_resource('i-1', status='stopped'), _resource('i-3')])
+        self.assertEqual(counts, {'added': 1, 'modified': 1, 'removed': 1, 'unchanged': 0})
+
+        counts = self.index.sync('EC2', 'us-east-1', [_resource('i-1', status='stopped'), _resource('i-3')])
+        self.assertEqual(counts, {'added': 0, 'modified': 0, 'removed': 0, 'unchanged': 2})
+        self.assertIsNone(self.index.get('EC2', 'us-east-1', 'i-2'))
+        self.assertEqual(self.index.get('EC2', 'us-east-1', 'i-1')['status'], 'stopped')
+
+    def test_collections_are_scoped(self):
+        self.index.sync('EC2', 'us-east-1', [_resource('i-1')])
+        self.index.sync('EC2', 'us-west-2', [_resource('i-2', region='us-west-2')])
+
+        # Refreshing one region leaves the other untouched
+        counts = self.index.sync('EC2', 'us-east-1', [])
+        self.assertEqual(counts['removed'], 1)
+        self.assertEqual([r['resource_id'] for r in self.index.query(resource_type='EC2')], ['i-2'])
+
+    def test_query_by_state_and_tags(self):
+        self.index.sync('EC2', 'us-east-1', [
+            _resource('i-1', tags={'env': 'prod', 'team': 'a'}),
+            _resource('i-2', status='stopped', tags={'env': 'dev'}),
+            _resource('i-3', tags={'env': 'prod'})
+        ])
+
+        self.assertEqual([r['resource_id'] for r in self.index.query(state='stopped')], ['i-2'])
+        self.assertEqual([r['resource_id'] for r in self.index.query(tags={'env': 'prod'})], ['i-1', 'i-3'])
+        self.assertEqual([r['resource_id'] for r in self.index.query(tags={'team': None})], ['i-1'])
+        self.assertEqual(self.index.query(tags={'env': 'prod'}, state='stopped'), [])
+
+    def test_freshness(self):
+        self.assertFalse(self.index.is_fresh('EC2', 'us-east-1'))
+        self.index.sync('EC2', 'us-east-1', [])
+        self.assertTrue(self.index.is_fresh('EC2', 'us-east-1'))
+        self.assertFalse(self.index.is_fresh('EC2', 'us-east-1', max_age_seconds=-1))
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'inventory.db')
+            InventoryIndex(path=path).sync('EC2', 'us-east-1', [_resource('i-1', tags={'env': 'prod'})])
+
+            reopened = InventoryIndex(path=path)
+            self.assertTrue(reopened.is_fresh('EC2', 'us-east-1'))
+            self.assertEqual(reopened.query(tags={'env': 'prod'})[0]['resource_id'], 'i-1')
+
+
+class TestSnapshotDiff(unittest.TestCase):
+
+    def test_diff_snapshots(self):
+        diff = diff_snapshots({'a': '1', 'b': '2', 'c': '3'}, {'b': '2', 'c': '4', 'd': '5'})
+        self.assertEqual(diff, {'added': ['d'], 'removed': ['a'], 'modified': ['c']})
+
+    def test_snapshot_recorded_only_on_change(self):
+        index = InventoryIndex(path=None)
+        index.sync('EC2', 'us-east-1', [_resource('i-1')])
+        first = index.snapshot_before('EC2', 'us-east-1', time.time())
+
+        index.sync('EC2', 'us-east-1', [_resource('i-1')])
+        self.assertEqual(index.snapshot_before('EC2', 'us-east-1', time.time())['taken_at'], first['taken_at'])
+
+        index.sync('EC2', 'us-east-1', [_resource('i-1', status='stopped')])
+        latest = index.snapshot_before('EC2', 'us-east-1', time.time())
+        self.assertEqual(latest['summaries']['i-1']['status'], 'stopped')
+        # A point in time before the change still resolves to the first snapshot
+        self.assertEqual(index.snapshot_before('EC2', 'us-east-1', first['taken_at'])['summaries']['i-1']['status'], 'running')
+
+    def test_snapshots_store_only_changes(self):
+        index = InventoryIndex(path=None)
+        index.sync('EC2', 'us-east-1', [_resource(f"i-{n}") for n in range(10)])
+        first = index.snapshot_before('EC2', 'us-east-1', time.time())
+
+        index.sync('EC2', 'us-east-1',
+                   [_resource('i-0', status='stopped')] + [_resource(f"i-{n}") for n in range(2, 10)] + [_resource('i-new')])
+        rows = index._conn.execute('SELECT COUNT(*) FROM snapshot_changes').fetchone()[0]
+        latest = index.snapshot_before('EC2', 'us-east-1', time.time())
+
+        # Ten base rows plus one modified, one removed and one added
+        self.assertEqual(rows, 13)
+        self.assertEqual(diff_snapshots(first['fingerprints'], latest['fingerprints']),
+                         {'added': ['i-new'], 'removed': ['i-1'], 'modified': ['i-0']})
+        self.assertEqual(latest['summaries']['i-0']['status'], 'stopped')
+
+    def test_pruning_folds_expired_snapshots_into_baseline(self):
+        index = InventoryIndex(path=None)
+        start = time.time() - SNAPSHOT_RETENTION_SECONDS - 3600
+        with patch('utils.inventory_index.time.time', return_value=start):
+            index.sync('EC2', 'us-east-1', [_resource('i-1'), _resource('i-2')])
+        with patch('utils.inventory_index.time.time', return_value=start + 60):
+            index.sync('EC2', 'us-east-1', [_resource('i-1', status='stopped')])
+
+        index.sync('EC2', 'us-east-1', [_resource('i-1', status='stopped'), _resource('i-3')])
+
+        snapshots = index._conn.execute('SELECT COUNT(*) FROM snapshots').fetchone()[0]
+        baseline = index.snapshot_before('EC2', 'us-east-1', start + 120)
+        self.assertEqual(snapshots, 2)
+        self.assertEqual(baseline['summaries'], {'i-1': {'name': 'i-1', 'status': 'stopped', 'region': 'us-east-1'}})
+        self.assertEqual(set(index.snapshot_before('EC2', 'us-east-1', time.time())['fingerprints']), {'i-1', 'i-3'})
+
+
+class TestInventoryServedFromIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.ec2_client = Mock()
+        self.aws_clients.get_ec2_client.return_value = self.ec2_client
+        self.ec2_client.describe_instances.return_value = {
+            'Reservations': [{
+                'Instances': [{
+                    'InstanceId': 'i-1234567890abcdef0',
+                    'InstanceType': 't3.micro',
+                    'State': {'Name': 'running'},
+                    'Tags': [{'Key': 'Name', 'Value': 'web'}]
+                }]
+            }]
+        }
+        self.index = InventoryIndex(path=None)
+        self.handler = ResourceDiscoveryHandler(self.aws_clients, inventory_index=self.index)
+        self.params = {'resource_type': 'EC2', 'region': 'us-east-1'}
+
+    def test_second_request_is_served_from_index(self):
+        first = self.handler.get_resource_inventory(self.params, 'test-request-1')
+        second = self.handler.get_resource_inventory(self.params, 'test-request-2')
+
+        self.assertEqual(self.ec2_client.describe_instances.call_count, 1)
+        self.assertEqual(first['inventory_source'], {'EC2': 'live'})
+        self.assertEqual(first['refresh_summary']['EC2']['added'], 1)
+        self.assertEqual(second['inventory_source'], {'EC2': 'index'})
+        self.assertEqual(second['resources'], first['resources'])
+
+    def test_refresh_param_forces_collection(self):
+        self.handler.get_resource_inventory(self.params, 'test-request-1')
+        result = self.handler.get_resource_inventory({**self.params, 'refresh': True}, 'test-request-2')
+
+        self.assertEqual(self.ec2_client.describe_instances.call_count, 2)
+        self.assertEqual(result['refresh_summary']['EC2']['unchanged'], 1)
+
+    def test_stale_index_served_when_collection_fails(self):
+        self.handler.get_resource_inventory(self.params, 'test-request-1')
+        self.index.max_age_seconds = -1
+        self.ec2_client.describe_instances.side_effect = ClientError(
+            {'Error': {'Code': 'Throttling', 'Message': 'Rate exceeded'}}, 'DescribeInstances'
+        )
+
+        result = self.handler.get_resource_inventory(self.params, 'test-request-2')
+
+        self.assertEqual(result['inventory_source'], {'EC2': 'stale'})
+        self.assertEqual(result['total_count'], 1)
+
+    def test_error_raised_when_nothing_to_serve(self):
+        self.ec2_client.describe_instances.side_effect = ClientError(
+            {'Error': {'Code': 'UnauthorizedOperation', 'Message': 'Denied'}}, 'DescribeInstances'
+        )
+
+        with self.assertRaises(ClientError):
+            self.handler.get_resource_inventory(self.params, 'test-request-1')
+
+    def test_inventory_changes(self):
+        self.handler.get_resource_inventory(self.params, 'test-request-1')
+        self.index.max_age_seconds = -1
+        self.ec2_client.describe_instances.return_value = {
+            'Reservations': [{
+                'Instances': [
+                    {'InstanceId': 'i-1234567890abcdef0', 'InstanceType': 't3.micro', 'State': {'Name': 'stopped'},
+                     'Tags': [{'Key': 'Name', 'Value': 'web'}]},
+                    {'InstanceId': 'i-0fedcba0987654321', 'InstanceType': 't3.large', 'State': {'Name': 'running'}}
+                ]
+            }]
+        }
+
+        result = self.handler.get_inventory_changes(self.params, 'test-request-2')
+
+        changes = result['changes']['EC2']
+        self.assertEqual(result['summary'], {'added': 1, 'removed': 0, 'modified': 1})
+        self.assertEqual(changes['added'][0]['resource_id'], 'i-0fedcba0987654321')
+        self.assertEqual(changes['modified'][0]['changed_fields'], {'status': {'before': 'running', 'after': 'stopped'}})
+        self.assertFalse(changes['baseline_covers_window'])
+
+    def test_inventory_changes_served_from_fresh_index(self):
+        self.handler.get_resource_inventory(self.params, 'test-request-1')
+
+        result = self.handler.get_inventory_changes(self.params, 'test-request-2')
+
+        self.assertEqual(self.ec2_client.describe_instances.call_count, 1)
+        self.assertEqual(result['total_changes'], 0)
+        self.assertEqual(result['changes']['EC2']['unchanged_count'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
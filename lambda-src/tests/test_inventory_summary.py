@@ -0,0 +1,107 @@
+"""
+Unit tests for count-only inventory summaries
+"""
+
+import unittest
+from unittest.mock import Mock
+from utils.inventory_index import InventoryIndex
+from utils.inventory_summary import InventorySummary, count_resources
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+def _instance(instance_id, state, instance_type):
+    return {'InstanceId': instance_id, 'State': {'Name': state}, 'InstanceType': instance_type}
+
+
+class TestInventorySummary(unittest.TestCase):
+
+    def test_count_resources_applies_filters(self):
+        pairs = [('running', 't3.large'), ('Running', 't3.micro'), ('stopped', 't3.large')]
+
+        self.assertEqual(count_resources(iter(pairs), {'state': 'running'}),
+                         {('running', 't3.large'): 1, ('Running', 't3.micro'): 1})
+        self.assertEqual(sum(count_resources(pairs, {'instance_type': 't3.large'}).values()), 2)
+
+    def test_tables(self):
+        summary = InventorySummary()
+        summary.add('EC2', 'us-east-1', count_resources([('running', 't3.large')] * 3 + [('stopped', 't3.large')]))
+        summary.add('S3', 'global', count_resources([('active', None)]))
+        summary.add('EKS', 'us-east-1', count_resources([(None, None)]))
+
+        tables = summary.tables()
+        self.assertEqual(summary.total, 6)
+        self.assertEqual(tables['by_type'], {'EC2': 4, 'S3': 1, 'EKS': 1})
+        self.assertEqual(tables['by_region'], {'us-east-1': 5, 'global': 1})
+        self.assertEqual(tables['by_state']['unknown'], 1)
+        self.assertEqual(tables['by_instance_type'], {'t3.large': 4})
+        self.assertEqual(tables['groups'][0], {'resource_type': 'EC2', 'region': 'us-east-1', 'state': 'running',
+                                               'instance_type': 't3.large', 'count': 3})
+
+
+class TestCountOnlyInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.ec2_clients = {}
+        self.aws_clients.get_ec2_client.side_effect = lambda region: self.ec2_clients.setdefault(region, Mock())
+        self.handler = ResourceDiscoveryHandler(self.aws_clients, inventory_index=InventoryIndex(path=None))
+
+    def test_counts_streamed_pages_per_region(self):
+        self.aws_clients.get_ec2_client('us-east-1').describe_instances.side_effect = [
+            {'Reservations': [{'Instances': [_instance('i-1', 'running', 't3.large')]}], 'NextToken': 'page-2'},
+            {'Reservations': [{'Instances': [_instance('i-2', 'running', 't3.large')]}]}
+        ]
+        self.aws_clients.get_ec2_client('eu-west-1').describe_instances.return_value = {
+            'Reservations': [{'Instances': [_instance('i-3', 'running', 'm5.xlarge')]}]
+        }
+
+        result = self.handler.get_resource_inventory({
+            'resource_type': 'EC2', 'regions': 'us-east-1,eu-west-1', 'state': 'running', 'count_only': 'true'
+        }, 'test-request')
+
+        self.assertNotIn('resources', result)
+        self.assertEqual(result['total_count'], 3)
+        self.assertEqual(result['counts']['by_region'], {'us-east-1': 2, 'eu-west-1': 1})
+        self.assertEqual(result['counts']['by_instance_type'], {'t3.large': 2, 'm5.xlarge': 1})
+        self.assertEqual(result['inventory_source'], {'EC2:us-east-1': 'live', 'EC2:eu-west-1': 'live'})
+        second_call = self.aws_clients.get_ec2_client('us-east-1').describe_instances.call_args_list[1].kwargs
+        self.assertEqual(second_call['NextToken'], 'page-2')
+        self.assertEqual(second_call['Filters'], [{'Name': 'instance-state-name', 'Values': ['running']}])
+
+    def test_counts_fresh_collections_from_index(self):
+        ec2_client = self.aws_clients.get_ec2_client('us-east-1')
+        ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [_instance('i-1', 'running', 't3.large'),
+                                            _instance('i-2', 'stopped', 't3.large')]}]
+        }
+        self.handler.get_resource_inventory({'resource_type': 'EC2', 'region': 'us-east-1'}, 'test-1')
+
+        result = self.handler.get_resource_inventory(
+            {'resource_type': 'EC2', 'region': 'us-east-1', 'count_only': True}, 'test-2'
+        )
+
+        ec2_client.describe_instances.assert_called_once()
+        self.assertEqual(result['inventory_source'], {'EC2': 'index'})
+        self.assertEqual(result['counts']['by_state'], {'running': 1, 'stopped': 1})
+
+    def test_additional_collector_counted_with_server_side_state(self):
+        ec2_client = self.aws_clients.get_ec2_client('us-east-1')
+        ec2_client.describe_volumes.return_value = {'Volumes': [{'VolumeId': 'vol-1', 'State': 'available'}]}
+
+        result = self.handler.get_resource_inventory(
+            {'resource_type': 'EBS', 'region': 'us-east-1', 'state': 'available', 'count_only': 'true'}, 'test-request'
+        )
+
+        self.assertEqual(ec2_client.describe_volumes.call_args.kwargs['Filters'],
+                         [{'Name': 'status', 'Values': ['available']}])
+        self.assertEqual(result['counts']['by_type'], {'EBS': 1})
+
+    def test_rejects_filters_that_need_records(self):
+        with self.assertRaises(ValueError):
+            self.handler.get_resource_inventory(
+                {'resource_type': 'EC2', 'tag': 'team=payments', 'count_only': 'true'}, 'test-request'
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Unit tests for the CloudWatch metric series cache
+"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+from utils.metric_cache import MetricSeriesCache, summarize
+
+
+class TestMetricSeriesCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cw_client = Mock()
+        self.cw_client.meta.region_name = 'us-east-1'
+        self.cw_client.get_metric_statistics.side_effect = self._fake_statistics
+        self.dimensions = [{'Name': 'InstanceId', 'Value': 'i-123'}]
+
+    def _fake_statistics(self, Namespace, MetricName, Dimensions, StartTime, EndTime, Period, Statistics):
+        """Return one datapoint per period whose value is the hour of day."""
+        datapoints = []
+        timestamp = StartTime
+        while timestamp < EndTime:
+            datapoint = {'Timestamp': timestamp, 'Unit': 'Percent'}
+            for stat in Statistics:
+                datapoint[stat] = float(timestamp.hour)
+            datapoints.append(datapoint)
+            timestamp += timedelta(seconds=Period)
+        return {'Datapoints': list(reversed(datapoints))}
+
+    def _get(self, cache, days=7, period=3600, stats=None):
+        end_time = datetime.utcnow()
+        return cache.get_values(
+            self.cw_client, 'AWS/EC2', 'CPUUtilization', self.dimensions, period,
+            stats or ['Average', 'Maximum'], end_time - timedelta(days=days), end_time, 'test-request-123'
+        )
+
+    def test_first_call_fetches_full_window_in_order(self):
+        """Test the first call downloads the window once and returns time-ordered values."""
+        cache = MetricSeriesCache()
+
+        result = self._get(cache)
+
+        self.assertEqual(self.cw_client.get_metric_statistics.call_count, 1)
+        self.assertEqual(result['unit'], 'Percent')
+        self.assertIn(len(result['values']['Average']), (168, 169))
+        self.assertEqual(result['values']['Average'][-1], float(datetime.utcnow().hour))
+
+    def test_repeat_call_fetches_only_unsettled_tail(self):
+        """Test later calls only re-fetch the tail of the window."""
+        cache = MetricSeriesCache()
+        first = self._get(cache)
+
+        second = self._get(cache)
+
+        self.assertEqual(self.cw_client.get_metric_statistics.call_count, 2)
+        tail_call = self.cw_client.get_metric_statistics.call_args[1]
+        self.assertGreaterEqual(tail_call['StartTime'], datetime.utcnow() - timedelta(hours=2))
+        self.assertEqual(tail_call['Statistics'], ['Average', 'Maximum'])
+        self.assertEqual(first['values'], second['values'])
+
+    def test_shorter_window_served_from_cache(self):
+        """Test a sub-window of a cached series only needs the tail."""
+        cache = MetricSeriesCache()
+        self._get(cache, days=7)
+
+        result = self._get(cache, days=1)
+
+        self.assertIn(len(result['values']['Average']), (24, 25))
+        tail_call = self.cw_client.get_metric_statistics.call_args[1]
+        self.assertGreaterEqual(tail_call['StartTime'], datetime.utcnow() - timedelta(hours=2))
+
+    def test_large_windows_are_chunked(self):
+        """Test windows above the datapoint limit are split into several calls."""
+        cache = MetricSeriesCache()
+
+        result = self._get(cache, days=7, period=300, stats=['Average'])
+
+        self.assertEqual(self.cw_client.get_metric_statistics.call_count, 2)
+        self.assertIn(len(result['values']['Average']), (2016, 2017))
+
+    def test_spilled_series_survive_new_cache(self):
+        """Test series spilled to disk are reused by a fresh cache instance."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self._get(MetricSeriesCache(spill_dir=tmp_dir))
+            self.assertTrue(os.listdir(tmp_dir))
+
+            fresh_cache = MetricSeriesCache(spill_dir=tmp_dir)
+            result = self._get(fresh_cache)
+
+            self.assertEqual(fresh_cache.api_calls, 1)
+            tail_call = self.cw_client.get_metric_statistics.call_args[1]
+            self.assertGreaterEqual(tail_call['StartTime'], datetime.utcnow() - timedelta(hours=2))
+            self.assertIn(len(result['values']['Average']), (168, 169))
+
+    def test_concurrent_calls_for_one_metric_fetch_full_window_once(self):
+        """Test a concurrent request for the same metric waits and reuses the merged series."""
+        cache = MetricSeriesCache()
+        fake_statistics = self.cw_client.get_metric_statistics.side_effect
+
+        def slow_statistics(**kwargs):
+            time.sleep(0.05)
+            return fake_statistics(**kwargs)
+
+        self.cw_client.get_metric_statistics.side_effect = slow_statistics
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self._get(cache))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results[0]['values'], results[1]['values'])
+        self.assertIn(len(results[1]['values']['Average']), (168, 169))
+        start_times = sorted(call[1]['StartTime'] for call in self.cw_client.get_metric_statistics.call_args_list)
+        self.assertEqual(len(start_times), 2)
+        self.assertGreaterEqual(start_times[1], datetime.utcnow() - timedelta(hours=2))
+
+    def test_summarize(self):
+        """Test summary statistics over a value list."""
+        summary = summarize([10.0, 20.0, 30.0])
+
+        self.assertEqual(summary['average'], 20.0)
+        self.assertEqual(summary['maximum'], 30.0)
+        self.assertEqual(summary['latest'], 30.0)
+        self.assertEqual(summary['total'], 60.0)
+        self.assertIsNone(summarize([])['average'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the additional resource collectors
+"""
+
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+from utils.inventory_index import InventoryIndex
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+class TestResourceCollectors(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.service_clients = {}
+        self.aws_clients.get_client.side_effect = lambda service, region=None: self.service_clients.setdefault(
+            (service, region), Mock()
+        )
+        self.ec2_clients = {}
+        self.aws_clients.get_ec2_client.side_effect = lambda region: self.ec2_clients.setdefault(region, Mock())
+        self.handler = ResourceDiscoveryHandler(self.aws_clients, inventory_index=InventoryIndex(path=None))
+
+    def test_ebs_across_regions(self):
+        for region in ('us-east-1', 'eu-west-1'):
+            self.aws_clients.get_ec2_client(region).describe_volumes.return_value = {'Volumes': [{
+                'VolumeId': f"vol-{region}", 'State': 'available', 'VolumeType': 'gp3', 'Size': 100,
+                'CreateTime': datetime(2024, 1, 1), 'AvailabilityZone': f"{region}a", 'Attachments': [],
+                'Tags': [{'Key': 'Name', 'Value': 'scratch'}]
+            }]}
+
+        result = self.handler.get_resource_inventory(
+            {'resource_type': 'EBS', 'regions': 'us-east-1,eu-west-1'}, 'test-request'
+        )
+
+        self.assertEqual(result['regions'], ['us-east-1', 'eu-west-1'])
+        self.assertEqual(result['inventory_source'], {'EBS:us-east-1': 'live', 'EBS:eu-west-1': 'live'})
+        volume = result['resources'][0]
+        self.assertEqual(volume['resource_id'], 'vol-us-east-1')
+        self.assertEqual(volume['name'], 'scratch')
+        self.assertEqual(volume['size_gb'], 100)
+        self.assertIsNone(volume['metadata']['attached_instance'])
+
+    def test_ecs_clusters_described_in_batches(self):
+        ecs_client = self.aws_clients.get_client('ecs', 'us-east-1')
+        ecs_client.list_clusters.return_value = {'clusterArns': ['arn:aws:ecs:us-east-1:1:cluster/web']}
+        ecs_client.describe_clusters.return_value = {'clusters': [{
+            'clusterName': 'web', 'status': 'ACTIVE', 'runningTasksCount': 4, 'activeServicesCount': 2,
+            'tags': [{'key': 'team', 'value': 'payments'}]
+        }]}
+
+        result = self.handler.get_resource_inventory({'resource_type': 'ECS', 'region': 'us-east-1'}, 'test-request')
+
+        ecs_client.describe_clusters.assert_called_once_with(
+            clusters=['arn:aws:ecs:us-east-1:1:cluster/web'], include=['TAGS']
+        )
+        self.assertEqual(result['resources'][0]['running_tasks'], 4)
+        self.assertEqual(result['resources'][0]['tags'], {'team': 'payments'})
+
+    def test_dynamodb_skips_tables_deleted_after_listing(self):
+        dynamodb_client = self.aws_clients.get_client('dynamodb', 'us-east-1')
+        dynamodb_client.list_tables.side_effect = [
+            {'TableNames': ['orders'], 'LastEvaluatedTableName': 'orders'},
+            {'TableNames': ['sessions']}
+        ]
+
+        def describe_table(TableName):
+            if TableName != 'orders':
+                raise ClientError({'Error': {'Code': 'ResourceNotFoundException', 'Message': 'Gone'}}, 'DescribeTable')
+            return {'Table': {'TableName': 'orders', 'TableStatus': 'ACTIVE', 'ItemCount': 10,
+                              'BillingModeSummary': {'BillingMode': 'PAY_PER_REQUEST'}}}
+        dynamodb_client.describe_table.side_effect = describe_table
+
+        result = self.handler.get_resource_inventory(
+            {'resource_type': 'DYNAMODB', 'region': 'us-east-1'}, 'test-request'
+        )
+
+        self.assertEqual(dynamodb_client.list_tables.call_args_list[1].kwargs['ExclusiveStartTableName'], 'orders')
+        self.assertEqual([r['resource_id'] for r in result['resources']], ['orders'])
+        self.assertEqual(result['resources'][0]['billing_mode'], 'PAY_PER_REQUEST')
+
+    def test_details_and_health_from_registry(self):
+        ec2_client = self.aws_clients.get_ec2_client('us-east-1')
+        ec2_client.describe_nat_gateways.return_value = {'NatGateways': [{'NatGatewayId': 'nat-1', 'State': 'available'}]}
+        self.handler._get_resource_health_metrics = Mock(return_value={'metrics': {}})
+
+        result = self.handler.get_resource_details(
+            {'resource_id': 'nat-1', 'resource_type': 'NAT_GATEWAY', 'region': 'us-east-1'}, 'test-request'
+        )
+
+        ec2_client.describe_nat_gateways.assert_called_once_with(NatGatewayIds=['nat-1'])
+        self.assertEqual(result['details']['health_metrics'], {'metrics': {}})
+        self.handler._get_resource_health_metrics.assert_called_once_with(
+            'nat-1', 'NAT_GATEWAY', 'us-east-1', 'test-request'
+        )
+
+    def test_unsupported_inventory_type(self):
+        with self.assertRaises(ValueError):
+            self.handler.get_resource_inventory({'resource_type': 'REDSHIFT'}, 'test-request')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -373,6 +373,7 @@ class TestResourceDiscoveryHandler(unittest.TestCase):
         self.assertEqual(resource['instance_class'], 'db.t3.micro')
         self.assertEqual(resource['metadata']['allocated_storage'], 20)
         self.assertEqual(resource['metadata']['multi_az'], False)
+        self.assertIsNone(resource['tags'])  # Not collected, as opposed to an untagged instance
     
     def test_get_lambda_resources_success(self):
         """Test successful Lambda resource discovery."""
@@ -412,6 +413,7 @@ class TestResourceDiscoveryHandler(unittest.TestCase):
         self.assertEqual(resource['handler'], 'index.handler')
         self.assertEqual(resource['metadata']['memory_size'], 128)
         self.assertEqual(resource['metadata']['timeout'], 30)
+        self.assertIsNone(resource['tags'])
     
     def test_resource_inventory_client_error(self):
         """Test resource inventory with AWS client error."""
@@ -433,6 +435,101 @@ class TestResourceDiscoveryHandler(unittest.TestCase):
         with self.assertRaises(ClientError):
             self.handler.get_resource_inventory(params, self.request_id)
 
+    def test_get_resource_details_batch_ec2(self):
+        """Test batched EC2 details with an invalid ID dropped and retried."""
+        mock_ec2_client = Mock()
+        self.mock_aws_clients.get_ec2_client.return_value = mock_ec2_client
+
+        def describe_instances(InstanceIds):
+            if 'i-00000000000000bad' in InstanceIds:
+                raise ClientError(
+                    error_response={'Error': {'Code': 'InvalidInstanceID.NotFound',
+                                              'Message': "The instance ID 'i-00000000000000bad' does not exist"}},
+                    operation_name='DescribeInstances'
+                )
+            return {'Reservations': [{'Instances': [
+                {'InstanceId': instance_id, 'InstanceType': 't3.micro', 'State': {'Name': 'running'}}
+                for instance_id in InstanceIds
+            ]}]}
+        mock_ec2_client.describe_instances.side_effect = describe_instances
+
+        params = {
+            'resource_ids': 'i-0000000000000001a,i-00000000000000bad,i-0000000000000002b',
+            'resource_type': 'EC2',
+            'include_health': False
+        }
+
+        result = self.handler.get_resource_details(params, self.request_id)
+
+        self.assertEqual(mock_ec2_client.describe_instances.call_count, 2)
+        self.assertEqual(list(result['details']), ['i-0000000000000001a', 'i-0000000000000002b'])
+        self.assertEqual(result['details']['i-0000000000000001a']['instance_type'], 't3.micro')
+        self.assertEqual(result['errors']['i-00000000000000bad']['error_code'], 'InvalidInstanceID.NotFound')
+        self.assertEqual(result['found_count'], 2)
+
+    def test_get_resource_details_batch_ec2_malformed_id(self):
+        """Test malformed EC2 IDs are reported without being sent to describe_instances."""
+        mock_ec2_client = Mock()
+        self.mock_aws_clients.get_ec2_client.return_value = mock_ec2_client
+        mock_ec2_client.describe_instances.return_value = {'Reservations': [{'Instances': [
+            {'InstanceId': 'i-0000000000000001a', 'InstanceType': 't3.micro', 'State': {'Name': 'running'}},
+            {'InstanceId': 'i-0000000000000002b', 'InstanceType': 't3.micro', 'State': {'Name': 'running'}}
+        ]}]}
+
+        params = {
+            'resource_ids': 'i-0000000000000001a,web-server-1,i-0000000000000002b',
+            'resource_type': 'EC2',
+            'include_health': False
+        }
+
+        result = self.handler.get_resource_details(params, self.request_id)
+
+        mock_ec2_client.describe_instances.assert_called_once_with(
+            InstanceIds=['i-0000000000000001a', 'i-0000000000000002b']
+        )
+        self.assertEqual(result['errors']['web-server-1']['error_code'], 'InvalidInstanceID.Malformed')
+        self.assertEqual(result['found_count'], 2)
+
+    def test_get_resource_details_batch_rds_filters(self):
+        """Test batched RDS details use db-instance-id filters and report missing IDs."""
+        mock_rds_client = Mock()
+        self.mock_aws_clients.get_rds_client.return_value = mock_rds_client
+        mock_rds_client.describe_db_instances.return_value = {
+            'DBInstances': [{'DBInstanceIdentifier': 'orders-db', 'DBInstanceClass': 'db.t3.medium'}]
+        }
+
+        params = {'resource_ids': ['orders-db', 'missing-db'], 'resource_type': 'RDS', 'include_health': False}
+
+        result = self.handler.get_resource_details(params, self.request_id)
+
+        mock_rds_client.describe_db_instances.assert_called_once_with(
+            Filters=[{'Name': 'db-instance-id', 'Values': ['orders-db', 'missing-db']}]
+        )
+        self.assertEqual(result['details']['orders-db']['DBInstanceClass'], 'db.t3.medium')
+        self.assertEqual(result['errors']['missing-db']['error_code'], 'DBInstanceNotFound')
+
+    def test_get_resource_details_batch_lambda_errors(self):
+        """Test batched Lambda details keep per-function errors."""
+        mock_lambda_client = Mock()
+        self.mock_aws_clients.get_lambda_client.return_value = mock_lambda_client
+
+        def get_function(FunctionName):
+            if FunctionName == 'missing':
+                raise ClientError(
+                    error_response={'Error': {'Code': 'ResourceNotFoundException', 'Message': 'Function not found'}},
+                    operation_name='GetFunction'
+                )
+            return {'Configuration': {'FunctionName': FunctionName}}
+        mock_lambda_client.get_function.side_effect = get_function
+
+        params = {'resource_ids': ['fn-a', 'missing', 'fn-b'], 'resource_type': 'LAMBDA', 'include_health': False}
+
+        result = self.handler.get_resource_details(params, self.request_id)
+
+        self.assertEqual(sorted(result['details']), ['fn-a', 'fn-b'])
+        self.assertEqual(result['errors']['missing']['error_code'], 'ResourceNotFoundException')
+        self.assertEqual(result['error_count'], 1)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Unit tests for the resource relationship graph
+"""
+
+import unittest
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+from utils.resource_graph import RelationshipGraphBuilder, ResourceGraph
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+def _related(result):
+    return {(r['resource_type'], r['resource_id']): r['distance'] for r in result['resources']}
+
+
+class TestResourceGraphBuilder(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.ec2_client = Mock()
+        self.rds_client = Mock()
+        self.lambda_client = Mock()
+        self.aws_clients.get_ec2_client.return_value = self.ec2_client
+        self.aws_clients.get_rds_client.return_value = self.rds_client
+        self.aws_clients.get_lambda_client.return_value = self.lambda_client
+
+        self.ec2_client.describe_vpcs.return_value = {'Vpcs': [{'VpcId': 'vpc-1', 'State': 'available'}]}
+        self.ec2_client.describe_subnets.return_value = {'Subnets': [{'SubnetId': 'subnet-1', 'VpcId': 'vpc-1'}]}
+        self.ec2_client.describe_security_groups.return_value = {'SecurityGroups': [
+            {'GroupId': 'sg-web', 'GroupName': 'web', 'VpcId': 'vpc-1'},
+            {'GroupId': 'sg-db', 'GroupName': 'db', 'VpcId': 'vpc-1', 'IpPermissions': [
+                {'UserIdGroupPairs': [{'GroupId': 'sg-web'}]}
+            ]}
+        ]}
+        self.ec2_client.describe_instances.side_effect = [
+            {'Reservations': [{'Instances': [
+                {'InstanceId': 'i-1', 'State': {'Name': 'running'}, 'SubnetId': 'subnet-1',
+                 'SecurityGroups': [{'GroupId': 'sg-web'}], 'Tags': [{'Key': 'Name', 'Value': 'web-1'}]}
+            ]}], 'NextToken': 'page-2'},
+            {'Reservations': [{'Instances': [
+                {'InstanceId': 'i-2', 'State': {'Name': 'stopped'}, 'SubnetId': 'subnet-1', 'SecurityGroups': []}
+            ]}]}
+        ]
+        self.ec2_client.describe_network_interfaces.return_value = {'NetworkInterfaces': [
+            {'NetworkInterfaceId': 'eni-1', 'SubnetId': 'subnet-1', 'Groups': [{'GroupId': 'sg-web'}],
+             'Attachment': {'InstanceId': 'i-1'}, 'Status': 'in-use'}
+        ]}
+        self.ec2_client.describe_volumes.return_value = {'Volumes': [
+            {'VolumeId': 'vol-1', 'State': 'in-use', 'Attachments': [{'InstanceId': 'i-1'}]}
+        ]}
+        self.rds_client.describe_db_instances.return_value = {'DBInstances': [
+            {'DBInstanceIdentifier': 'orders', 'DBInstanceStatus': 'available',
+             'DBSubnetGroup': {'VpcId': 'vpc-1', 'Subnets': [{'SubnetIdentifier': 'subnet-1'}]},
+             'VpcSecurityGroups': [{'VpcSecurityGroupId': 'sg-db'}]}
+        ]}
+        self.lambda_client.list_functions.return_value = {'Functions': [
+            {'FunctionName': 'worker', 'VpcConfig': {'SubnetIds': ['subnet-1'], 'SecurityGroupIds': ['sg-web']}},
+            {'FunctionName': 'cron'}
+        ]}
+
+        self.builder = RelationshipGraphBuilder(self.aws_clients)
+
+    def test_builds_graph_in_one_pass(self):
+        graph = self.builder.build('us-east-1', 'test-request')
+
+        self.assertEqual(graph.node_count, 11)
+        self.assertEqual(self.ec2_client.describe_instances.call_args_list[1].kwargs['NextToken'], 'page-2')
+        self.assertEqual(graph.failed_collectors, {})
+
+    def test_security_group_users(self):
+        graph = self.builder.build('us-east-1', 'test-request')
+
+        users = graph.blast_radius(graph.find('sg-web')[0], 1)
+
+        self.assertEqual(_related(users), {
+            ('EC2', 'i-1'): 1, ('ENI', 'eni-1'): 1, ('LAMBDA', 'worker'): 1, ('SECURITY_GROUP', 'sg-db'): 1
+        })
+        self.assertIn({'source': 'i-1', 'relation': 'uses_security_group', 'target': 'sg-web'}, users['edges'])
+
+    def test_vpc_blast_radius_is_transitive(self):
+        graph = self.builder.build('us-east-1', 'test-request')
+
+        affected = _related(graph.blast_radius(graph.find('vpc-1')[0]))
+
+        self.assertEqual(affected[('SUBNET', 'subnet-1')], 1)
+        self.assertEqual(affected[('EC2', 'i-2')], 2)
+        self.assertEqual(affected[('EBS_VOLUME', 'vol-1')], 3)
+        self.assertNotIn(('LAMBDA', 'cron'), affected)
+
+    def test_neighborhood_follows_both_directions(self):
+        graph = self.builder.build('us-east-1', 'test-request')
+
+        neighbors = _related(graph.neighborhood(graph.find('i-1')[0]))
+
+        self.assertEqual(neighbors, {
+            ('SUBNET', 'subnet-1'): 1, ('SECURITY_GROUP', 'sg-web'): 1, ('ENI', 'eni-1'): 1, ('EBS_VOLUME', 'vol-1'): 1
+        })
+
+    def test_failed_collector_reported(self):
+        self.rds_client.describe_db_instances.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied', 'Message': 'Denied'}}, 'DescribeDBInstances'
+        )
+
+        graph = self.builder.build('us-east-1', 'test-request')
+
+        self.assertEqual(list(graph.failed_collectors), ['db_instances'])
+        self.assertEqual(graph.find('orders'), [])
+
+    def test_duplicate_edges_stored_once(self):
+        graph = ResourceGraph('us-east-1')
+        node = graph.add_node('EC2', 'i-1')
+
+        graph.add_edge(node, 'in_subnet', 'SUBNET', 'subnet-1')
+        graph.add_edge(node, 'in_subnet', 'SUBNET', 'subnet-1')
+        graph.add_edge(node, 'in_subnet', 'SUBNET', None)
+
+        self.assertEqual(graph.edge_count, 1)
+
+
+class TestResourceRelationshipsTool(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = ResourceDiscoveryHandler(Mock())
+        self.graph = ResourceGraph('us-east-1')
+        instance = self.graph.add_node('EC2', 'i-1', 'web-1', 'running')
+        self.graph.add_edge(instance, 'uses_security_group', 'SECURITY_GROUP', 'sg-web')
+        self.handler.graph_builder = Mock()
+        self.handler.graph_builder.build.return_value = self.graph
+
+    def test_graph_reused_across_queries(self):
+        first = self.handler.get_resource_relationships({'resource_id': 'sg-web', 'query': 'blast_radius'}, 'test-1')
+        second = self.handler.get_resource_relationships({'resource_id': 'i-1'}, 'test-2')
+
+        self.handler.graph_builder.build.assert_called_once_with('us-east-1', 'test-1')
+        self.assertEqual(first['related_by_type'], {'EC2': 1})
+        self.assertEqual(second['related_resources'][0]['resource_id'], 'sg-web')
+        self.assertEqual(second['graph']['resource_count'], 2)
+
+    def test_unknown_resource(self):
+        with self.assertRaises(ValueError):
+            self.handler.get_resource_relationships({'resource_id': 'sg-missing'}, 'test-request')
+
+
+if __name__ == '__main__':
+    unittest.main()
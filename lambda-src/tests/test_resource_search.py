@@ -0,0 +1,110 @@
+"""
+Unit tests for the resource search index
+"""
+
+import time
+import unittest
+from unittest.mock import Mock
+from utils.inventory_index import InventoryIndex
+from utils.resource_search import ResourceSearchIndex, tokenize
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+def _resource(resource_id, resource_type, name, region='us-east-1', tags=None):
+    return {'resource_id': resource_id, 'resource_type': resource_type, 'name': name, 'region': region,
+            'status': 'available', 'tags': tags or {}}
+
+
+class TestResourceSearchIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ResourceSearchIndex()
+        self.index.replace_collection('RDS', 'us-east-1', [
+            _resource('payments-db', 'RDS', 'payments-db', tags={'team': 'payments'}),
+            _resource('orders-db', 'RDS', 'orders-db')
+        ], version=1)
+        self.index.replace_collection('EC2', 'us-east-1', [
+            _resource('i-0abc1234', 'EC2', 'payments-api', tags={'team': 'payments'}),
+            _resource('i-0abd5678', 'EC2', 'batch-worker')
+        ], version=1)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('Payments-API v2'), ['payments', 'api', 'v2'])
+        self.assertEqual(tokenize(None), [])
+
+    def test_loose_reference_ranks_best_match_first(self):
+        found = self.index.search('the payments db')
+
+        self.assertEqual(found['matches'][0]['resource_id'], 'payments-db')
+        self.assertEqual(found['matches'][0]['matched_terms'], 2)
+        self.assertEqual(found['total_matches'], 3)
+
+    def test_partial_id_completion(self):
+        found = self.index.search('i-0abc')
+
+        self.assertEqual([m['resource_id'] for m in found['matches']], ['i-0abc1234'])
+        self.assertIn('id', found['matches'][0]['matched_fields'])
+
+    def test_last_word_matches_as_prefix(self):
+        found = self.index.search('batch wor')
+
+        self.assertEqual(found['matches'][0]['resource_id'], 'i-0abd5678')
+
+    def test_type_and_region_filters(self):
+        self.assertEqual([m['resource_id'] for m in self.index.search('payments', resource_type='EC2')['matches']],
+                         ['i-0abc1234'])
+        self.assertEqual(self.index.search('payments', region='eu-west-1')['matches'], [])
+
+    def test_replacing_a_collection_drops_old_records(self):
+        self.index.replace_collection('RDS', 'us-east-1', [_resource('ledger-db', 'RDS', 'ledger-db')], version=2)
+
+        self.assertEqual(self.index.search('orders')['matches'], [])
+        self.assertEqual(self.index.version('RDS', 'us-east-1'), 2)
+        self.assertEqual(self.index.document_count, 3)
+
+    def test_warm_search_is_fast(self):
+        index = ResourceSearchIndex()
+        index.replace_collection('EC2', 'us-east-1', [
+            _resource(f"i-{n:017x}", 'EC2', f"service-{n % 500}-{['web', 'api', 'worker'][n % 3]}",
+                      tags={'team': f"team-{n % 40}"})
+            for n in range(20000)
+        ], version=1)
+        index.search('warmup')
+
+        start = time.perf_counter()
+        for _ in range(20):
+            index.search('service 42 api')
+        average_ms = (time.perf_counter() - start) * 1000 / 20
+
+        self.assertLess(average_ms, 20)
+
+
+class TestSearchResourcesTool(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.rds_client = Mock()
+        self.aws_clients.get_rds_client.return_value = self.rds_client
+        self.rds_client.describe_db_instances.return_value = {'DBInstances': [{
+            'DBInstanceIdentifier': 'payments-db', 'DBInstanceStatus': 'available', 'Engine': 'postgres',
+            'EngineVersion': '15.4', 'DBInstanceClass': 'db.t3.large'
+        }]}
+        self.handler = ResourceDiscoveryHandler(self.aws_clients, inventory_index=InventoryIndex(path=None))
+
+    def test_second_search_is_served_warm(self):
+        first = self.handler.search_resources({'query': 'payments db', 'resource_type': 'RDS'}, 'test-1')
+        second = self.handler.search_resources({'query': 'paym', 'resource_type': 'RDS'}, 'test-2')
+
+        self.rds_client.describe_db_instances.assert_called_once()
+        self.assertEqual(first['index_source'], {'RDS': 'live'})
+        self.assertEqual(second['index_source'], {'RDS': 'warm'})
+        self.assertEqual(second['matches'][0]['resource_id'], 'payments-db')
+        self.assertEqual(second['matches'][0]['region'], 'us-east-1')
+
+    def test_query_required(self):
+        with self.assertRaises(ValueError):
+            self.handler.search_resources({'query': '  '}, 'test-request')
+
+
+if __name__ == '__main__':
+    unittest.main()
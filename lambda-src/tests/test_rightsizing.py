@@ -0,0 +1,145 @@
+"""
+Unit tests for percentile-based rightsizing
+"""
+
+import unittest
+from unittest.mock import Mock
+from tools.rightsizing import RightsizingEngine, percentile, fraction_above, RIGHTSIZING_METRICS
+
+
+class TestPercentileHelpers(unittest.TestCase):
+
+    def test_percentile(self):
+        """Test linear-interpolated percentiles over a sorted list."""
+        values = [float(v) for v in range(1, 101)]
+
+        self.assertEqual(percentile(values, 0), 1.0)
+        self.assertEqual(percentile(values, 100), 100.0)
+        self.assertAlmostEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 95), 95.05)
+        self.assertIsNone(percentile([], 95))
+
+    def test_fraction_above(self):
+        """Test the fraction of samples strictly above a threshold."""
+        values = [1.0, 2.0, 3.0, 4.0]
+
+        self.assertEqual(fraction_above(values, 2.0), 0.5)
+        self.assertEqual(fraction_above(values, 10.0), 0.0)
+        self.assertEqual(fraction_above([], 1.0), 0.0)
+
+
+class TestRightsizingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = RightsizingEngine(max_workers=2, time_budget_seconds=60)
+        self.request_id = "test-request-123"
+
+    def _series(self, cpu, memory=None, network=100000.0, points=2016):
+        series = {
+            'cpu': [cpu] * points,
+            'network_in': [network] * points,
+            'network_out': [network] * points
+        }
+        if memory is not None:
+            series['memory'] = [memory] * points
+        return series
+
+    def test_batches_respect_datapoint_limit(self):
+        """Test batches stay under the get_metric_data query and datapoint limits."""
+        instances = [{'instance_id': f'i-{i}', 'instance_type': 'm5.large'} for i in range(30)]
+
+        batches = self.engine._make_batches(instances, days=14)
+
+        # 14 days of 5-minute data is 4032 points per series, four series per instance
+        self.assertEqual(len(batches[0]), 100800 // (4 * 4032))
+        self.assertEqual(sum(len(b) for b in batches), 30)
+
+    def test_idle_instance_without_traffic_is_terminate_candidate(self):
+        """Test near-zero CPU and network leads to a terminate recommendation."""
+        analysis = self.engine.analyze_series('m5.large', self._series(1.0, network=10.0), 10.0)
+
+        self.assertEqual(analysis['recommendation']['recommendation'], 'terminate')
+        self.assertEqual(analysis['recommendation']['potential_savings'], 70.0)
+        self.assertEqual(analysis['metrics']['p95_cpu'], 1.0)
+        self.assertEqual(analysis['metrics']['hours_covered'], 168.0)
+
+    def test_oversized_instance_downsizes_within_family(self):
+        """Test a lightly loaded instance maps to a smaller type of the same family."""
+        analysis = self.engine.analyze_series('m5.4xlarge', self._series(25.0, memory=30.0), 10.0)
+        recommendation = analysis['recommendation']
+
+        self.assertEqual(recommendation['target_instance_type'], 'm5.2xlarge')
+        self.assertEqual(recommendation['recommendation'], 'downsize_significantly')
+        self.assertEqual(recommendation['potential_savings'], 280.0)
+        self.assertEqual(recommendation['confidence'], 'high')
+
+    def test_spiky_workload_is_not_moved_to_burstable(self):
+        """Test workloads that often exceed the credit baseline avoid burstable targets."""
+        series = self._series(5.0, memory=20.0)
+        series['cpu'] = [5.0] * 1800 + [60.0] * 216
+
+        analysis = self.engine.analyze_series('m5.xlarge', series, 10.0)
+        target = analysis['recommendation']['target_instance_type']
+
+        self.assertFalse(target and target.startswith('t'))
+        self.assertGreater(analysis['metrics']['cpu_time_above_threshold_percent'], 10.0)
+
+    def test_busy_instance_is_kept(self):
+        """Test a busy instance gets no downsizing target."""
+        analysis = self.engine.analyze_series('m5.large', self._series(70.0, memory=70.0), 10.0)
+
+        self.assertEqual(analysis['recommendation']['recommendation'], 'monitor')
+        self.assertEqual(analysis['recommendation']['potential_savings'], 0.0)
+
+    def test_missing_memory_lowers_confidence(self):
+        """Test recommendations without agent memory data are not reported as high confidence."""
+        analysis = self.engine.analyze_series('m5.4xlarge', self._series(20.0), 10.0)
+
+        self.assertEqual(analysis['recommendation']['confidence'], 'medium')
+        self.assertIsNone(analysis['metrics']['p95_memory'])
+
+    def test_analyze_instances_with_paginated_metric_data(self):
+        """Test batched get_metric_data results are mapped back to instances across pages."""
+        cw_client = Mock()
+
+        def fake_metric_data(**kwargs):
+            results = [
+                {'Id': q['Id'], 'Values': [2.0] * 1008}
+                for q in kwargs['MetricDataQueries']
+            ]
+            if 'NextToken' in kwargs:
+                return {'MetricDataResults': results}
+            return {'MetricDataResults': results, 'NextToken': 'page-2'}
+
+        cw_client.get_metric_data.side_effect = fake_metric_data
+        instances = [
+            {'instance_id': 'i-1', 'instance_type': 'm5.large'},
+            {'instance_id': 'i-2', 'instance_type': 't3.micro'}
+        ]
+
+        result = self.engine.analyze_instances(cw_client, instances, 7, 10.0, self.request_id)
+
+        self.assertEqual(cw_client.get_metric_data.call_count, 2)
+        first_call = cw_client.get_metric_data.call_args_list[0][1]
+        self.assertEqual(len(first_call['MetricDataQueries']), 2 * len(RIGHTSIZING_METRICS))
+        self.assertEqual(first_call['ScanBy'], 'TimestampAscending')
+        self.assertEqual(result['analyses']['i-1']['metrics']['data_points'], 2016)
+        self.assertEqual(result['skipped'], [])
+        self.assertEqual(result['failed'], [])
+
+    def test_failed_and_skipped_batches(self):
+        """Test failed batches and batches past the time budget are reported."""
+        cw_client = Mock()
+        cw_client.get_metric_data.side_effect = Exception('Throttling')
+        instances = [{'instance_id': 'i-1', 'instance_type': 'm5.large'}]
+
+        result = self.engine.analyze_instances(cw_client, instances, 7, 10.0, self.request_id)
+        self.assertEqual(result['failed'], ['i-1'])
+
+        expired = RightsizingEngine(time_budget_seconds=0)
+        result = expired.analyze_instances(cw_client, instances, 7, 10.0, self.request_id)
+        self.assertEqual(result['skipped'], ['i-1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Unit tests for tag-driven resource discovery
+"""
+
+import unittest
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+from utils.tag_query import TagQueryEngine, parse_arn, tag_filters_for
+from utils.inventory_index import InventoryIndex
+from tools.resource_discovery import ResourceDiscoveryHandler
+
+
+def _mapping(arn, **tags):
+    return {'ResourceARN': arn, 'Tags': [{'Key': key, 'Value': value} for key, value in tags.items()]}
+
+
+class TestTagQueryEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.tagging_clients = {}
+        self.aws_clients.get_tagging_client.side_effect = self._tagging_client
+        self.engine = TagQueryEngine(self.aws_clients)
+
+    def _tagging_client(self, region):
+        return self.tagging_clients.setdefault(region, Mock())
+
+    def test_parse_arn(self):
+        self.assertEqual(parse_arn('arn:aws:ec2:us-east-1:123456789012:instance/i-0abc'), ('EC2', 'i-0abc'))
+        self.assertEqual(parse_arn('arn:aws:s3:::my-bucket'), ('S3', 'my-bucket'))
+        self.assertEqual(parse_arn('arn:aws:rds:us-east-1:123456789012:db:orders-db'), ('RDS', 'orders-db'))
+        self.assertEqual(parse_arn('arn:aws:lambda:us-east-1:123456789012:function:api:prod'), ('LAMBDA', 'api'))
+        self.assertEqual(parse_arn('arn:aws:ec2:us-east-1:123456789012:volume/vol-1'), ('EBS', 'vol-1'))
+        self.assertEqual(parse_arn('arn:aws:elasticloadbalancing:us-east-1:123456789012:loadbalancer/app/web/50dc6c'),
+                         ('ELB', 'web'))
+        self.assertIsNone(parse_arn('arn:aws:ec2:us-east-1:123456789012:snapshot/snap-1'))
+
+    def test_tag_filters(self):
+        self.assertEqual(tag_filters_for({'team': 'payments', 'owner': None}),
+                         [{'Key': 'team', 'Values': ['payments']}, {'Key': 'owner'}])
+
+    def test_paginates_and_fans_out_across_regions(self):
+        self._tagging_client('us-east-1').get_resources.side_effect = [
+            {'ResourceTagMappingList': [_mapping('arn:aws:ec2:us-east-1:1:instance/i-1', team='payments')],
+             'PaginationToken': 'next'},
+            {'ResourceTagMappingList': [_mapping('arn:aws:s3:::payments-data', team='payments')],
+             'PaginationToken': ''}
+        ]
+        self._tagging_client('eu-west-1').get_resources.return_value = {
+            'ResourceTagMappingList': [_mapping('arn:aws:rds:eu-west-1:1:db:ledger', team='payments')]
+        }
+
+        found = self.engine.find({'team': 'payments'}, ['EC2', 'S3', 'RDS'], ['us-east-1', 'eu-west-1'], 'test-request')
+
+        self.assertEqual(sorted((m['resource_type'], m['resource_id'], m['region']) for m in found['matches']), [
+            ('EC2', 'i-1', 'us-east-1'), ('RDS', 'ledger', 'eu-west-1'), ('S3', 'payments-data', 'us-east-1')
+        ])
+        calls = self._tagging_client('us-east-1').get_resources.call_args_list
+        self.assertEqual(calls[0].kwargs['ResourceTypeFilters'], ['ec2:instance', 's3', 'rds:db'])
+        self.assertEqual(calls[1].kwargs['PaginationToken'], 'next')
+
+    def test_failed_region_reported(self):
+        self._tagging_client('us-east-1').get_resources.return_value = {'ResourceTagMappingList': []}
+        self._tagging_client('us-west-2').get_resources.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDeniedException', 'Message': 'Denied'}}, 'GetResources'
+        )
+
+        found = self.engine.find({'team': 'payments'}, ['EC2'], ['us-east-1', 'us-west-2'], 'test-request')
+
+        self.assertEqual(list(found['failed_regions']), ['us-west-2'])
+
+    def test_all_regions_failing_raises(self):
+        self._tagging_client('us-east-1').get_resources.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDeniedException', 'Message': 'Denied'}}, 'GetResources'
+        )
+
+        with self.assertRaises(ClientError):
+            self.engine.find({'team': 'payments'}, ['EC2'], ['us-east-1'], 'test-request')
+
+
+class TestTaggedInventory(unittest.TestCase):
+
+    def setUp(self):
+        self.aws_clients = Mock()
+        self.tagging_client = Mock()
+        self.ec2_client = Mock()
+        self.lambda_client = Mock()
+        self.aws_clients.get_tagging_client.return_value = self.tagging_client
+        self.aws_clients.get_ec2_client.return_value = self.ec2_client
+        self.aws_clients.get_lambda_client.return_value = self.lambda_client
+        self.handler = ResourceDiscoveryHandler(self.aws_clients, inventory_index=InventoryIndex(path=None))
+
+    def test_tag_filter_hydrates_only_matches(self):
+        self.tagging_client.get_resources.return_value = {'ResourceTagMappingList': [
+            _mapping('arn:aws:ec2:us-east-1:1:instance/i-1', team='payments'),
+            _mapping('arn:aws:s3:::payments-data', team='payments'),
+            _mapping('arn:aws:lambda:us-east-1:1:function:charge', team='payments')
+        ]}
+        self.ec2_client.describe_instances.return_value = {'Reservations': [{'Instances': [
+            {'InstanceId': 'i-1', 'InstanceType': 't3.micro', 'State': {'Name': 'running'},
+             'Tags': [{'Key': 'team', 'Value': 'payments'}]}
+        ]}]}
+        self.lambda_client.get_function.return_value = {'Configuration': {
+            'FunctionName': 'charge', 'Runtime': 'python3.11', 'Handler': 'app.handler'
+        }}
+
+        result = self.handler.get_resource_inventory(
+            {'resource_type': 'ALL', 'region': 'us-east-1', 'tag': 'team=payments'}, 'test-request'
+        )
+
+        self.ec2_client.describe_instances.assert_called_once_with(Filters=[{'Name': 'instance-id', 'Values': ['i-1']}])
+        self.lambda_client.list_functions.assert_not_called()
+        self.assertEqual(sorted(r['resource_id'] for r in result['resources']), ['charge', 'i-1', 'payments-data'])
+        self.assertTrue(all(r['tags'] == {'team': 'payments'} for r in result['resources']))
+        self.assertEqual(result['inventory_source']['S3'], 'tagging_api')
+
+    def test_tag_filter_combines_with_state(self):
+        self.tagging_client.get_resources.return_value = {'ResourceTagMappingList': [
+            _mapping('arn:aws:ec2:us-east-1:1:instance/i-1', team='payments')
+        ]}
+        self.ec2_client.describe_instances.return_value = {'Reservations': [{'Instances': [
+            {'InstanceId': 'i-1', 'InstanceType': 't3.micro', 'State': {'Name': 'stopped'}}
+        ]}]}
+
+        result = self.handler.get_resource_inventory(
+            {'resource_type': 'EC2', 'region': 'us-east-1', 'tag': 'team=payments', 'state': 'running'}, 'test-request'
+        )
+
+        self.assertEqual(result['total_count'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+"""
+Unit tests for concurrent task graphs and the invocation-scoped response cache
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from utils.task_graph import TaskGraph
+from utils.response_cache import ResponseCache, CachingClientManager
+from tools.cost_analysis import CostAnalysisHandler
+
+
+class TestTaskGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.request_id = "test-request-123"
+
+    def test_independent_tasks_run_concurrently(self):
+        """Test wall time is the slowest branch, not the sum of branches."""
+        graph = TaskGraph()
+        for name in ('a', 'b', 'c'):
+            graph.add(name, lambda deps, n=name: time.sleep(0.2) or n)
+
+        start = time.time()
+        run = graph.run(self.request_id)
+
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(run['results'], {'a': 'a', 'b': 'b', 'c': 'c'})
+        self.assertEqual(run['errors'], {})
+
+    def test_dependencies_receive_results(self):
+        """Test dependent tasks run after and receive their dependencies' results."""
+        graph = TaskGraph()
+        graph.add('base', lambda deps: 2)
+        graph.add('double', lambda deps: deps['base'] * 2, depends_on=['base'])
+
+        run = graph.run(self.request_id)
+
+        self.assertEqual(run['results']['double'], 4)
+
+    def test_failures_skip_dependents_only(self):
+        """Test a failed branch does not stop independent branches."""
+        def fail(deps):
+            raise RuntimeError('boom')
+
+        graph = TaskGraph()
+        graph.add('broken', fail)
+        graph.add('after_broken', lambda deps: 'never', depends_on=['broken'])
+        graph.add('independent', lambda deps: 'ok')
+
+        run = graph.run(self.request_id)
+
+        self.assertEqual(run['results'], {'independent': 'ok'})
+        self.assertEqual(run['errors']['broken'], 'boom')
+        self.assertIn('Dependency failed', run['errors']['after_broken'])
+
+    def test_timeout_reports_unfinished_tasks(self):
+        """Test tasks still running at the deadline are reported as timed out."""
+        graph = TaskGraph()
+        graph.add('fast', lambda deps: 'ok')
+        graph.add('slow', lambda deps: time.sleep(1) or 'late')
+
+        run = graph.run(self.request_id, timeout=0.2)
+
+        self.assertEqual(run['results'], {'fast': 'ok'})
+        self.assertEqual(run['errors']['slow'], 'Timed out')
+
+    def test_unknown_dependency(self):
+        """Test graphs with unknown dependencies are rejected."""
+        graph = TaskGraph()
+        graph.add('task', lambda deps: None, depends_on=['missing'])
+
+        with self.assertRaises(ValueError):
+            graph.run(self.request_id)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_identical_calls_are_fetched_once(self):
+        """Test concurrent identical calls share one API request."""
+        client = Mock()
+        client.describe_instances.side_effect = lambda **kwargs: time.sleep(0.1) or {'Reservations': []}
+        cache = ResponseCache()
+
+        threads = [
+            threading.Thread(target=cache.call, args=(client, 'describe_instances'), kwargs={'MaxResults': 5})
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(client.describe_instances.call_count, 1)
+        self.assertEqual(cache.stats()['hits'], 3)
+
+        cache.call(client, 'describe_instances', MaxResults=10)
+        self.assertEqual(client.describe_instances.call_count, 2)
+
+    def test_errors_are_not_cached(self):
+        """Test failed calls are retried on the next request."""
+        client = Mock()
+        client.list_buckets.side_effect = [Exception('Throttling'), {'Buckets': []}]
+        cache = ResponseCache()
+
+        with self.assertRaises(Exception):
+            cache.call(client, 'list_buckets')
+
+        self.assertEqual(cache.call(client, 'list_buckets'), {'Buckets': []})
+
+    def test_caching_client_manager_wraps_clients(self):
+        """Test read-only operations go through the cache and others do not."""
+        aws_clients = Mock()
+        ec2_client = Mock()
+        ec2_client.describe_instances.return_value = {'Reservations': []}
+        aws_clients.get_ec2_client.return_value = ec2_client
+        manager = CachingClientManager(aws_clients)
+
+        manager.get_ec2_client('us-east-1').describe_instances()
+        manager.get_ec2_client('us-east-1').describe_instances()
+        manager.get_ec2_client('us-east-1').stop_instances(InstanceIds=['i-1'])
+        manager.get_ec2_client('us-east-1').stop_instances(InstanceIds=['i-1'])
+
+        self.assertEqual(ec2_client.describe_instances.call_count, 1)
+        self.assertEqual(ec2_client.stop_instances.call_count, 2)
+
+
+class TestCostOptimizationRecommendations(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = CostAnalysisHandler(Mock())
+        self.request_id = "test-request-123"
+
+    def _idle_result(self, region):
+        time.sleep(0.2)
+        return {
+            'region': region,
+            'total_idle_instances': 1,
+            'potential_monthly_savings': 70.0,
+            'rightsizing_recommendations': [],
+            'rightsizing_monthly_savings': 0.0
+        }
+
+    def test_branches_run_concurrently_across_regions(self):
+        """Test cost analysis and per-region idle scans run in parallel and merge."""
+        def cost_analysis(params, request_id):
+            time.sleep(0.2)
+            return {'total_cost': 1000.0, 'breakdown': [{'service_name': 'Amazon S3', 'cost': 100.0}]}
+
+        self.handler.get_cost_analysis = cost_analysis
+        self.handler.get_idle_resources = lambda params, request_id: self._idle_result(params['region'])
+
+        start = time.time()
+        result = self.handler.get_cost_optimization_recommendations(
+            {'regions': 'us-east-1, eu-west-1'}, self.request_id
+        )
+
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(result['regions_analyzed'], ['us-east-1', 'eu-west-1'])
+        categories = [r['category'] for r in result['recommendations']]
+        self.assertEqual(categories.count('EC2 Optimization'), 2)
+        self.assertIn('S3 Storage Optimization', categories)
+        self.assertIn('General Cost Management', categories)
+        self.assertNotIn('failed_analyses', result)
+
+    def test_failed_region_is_reported(self):
+        """Test a failing region does not discard the other results."""
+        def idle(params, request_id):
+            if params['region'] == 'eu-west-1':
+                raise RuntimeError('UnauthorizedOperation')
+            return self._idle_result(params['region'])
+
+        self.handler.get_cost_analysis = lambda params, request_id: {'total_cost': 10.0, 'breakdown': []}
+        self.handler.get_idle_resources = idle
+
+        result = self.handler.get_cost_optimization_recommendations(
+            {'regions': ['us-east-1', 'eu-west-1']}, self.request_id
+        )
+
+        self.assertEqual(result['regions_analyzed'], ['us-east-1'])
+        self.assertIn('idle_resources:eu-west-1', result['failed_analyses'])
+        self.assertEqual(result['total_potential_savings'], 70.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,14 +2,29 @@
 Cost analysis tools for AWS AI Concierge
 """
 
+import copy
 import logging
+import os
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta, date
 from botocore.exceptions import ClientError
 from utils.audit_logger import AuditLogger
+from utils.cost_history import HourlyCostStore, HOURLY_RETENTION_DAYS
+from utils.cost_rollup import HourlyCostAggregator
+from utils.metric_cache import MetricSeriesCache, summarize
+from utils.instance_catalog import get_monthly_cost
+from utils.response_cache import CachingClientManager
+from utils.task_graph import TaskGraph
+from tools.rightsizing import RightsizingEngine
 
 logger = logging.getLogger(__name__)
 
+# Leave headroom under the Lambda timeout for formatting the response
+OPTIMIZATION_TIMEOUT_SECONDS = float(os.getenv('OPTIMIZATION_TIMEOUT_SECONDS', '150'))
+# Hourly Cost Explorer rows can still be revised for about a day
+HOURLY_SETTLE_HOURS = 24
+HOUR_FORMAT = '%Y-%m-%dT%H:00:00Z'
+
 
 class CostAnalysisHandler:
     """Handles cost analysis and optimization recommendations."""
@@ -48,8 +63,12 @@ class CostAnalysisHandler:
         # Default to original if no match (will be validated later)
         return time_period.upper()
     
-    def __init__(self, aws_clients):
+    def __init__(self, aws_clients, cost_history=None, metric_cache=None, hourly_store=None):
         self.aws_clients = aws_clients
+        self.cost_history = cost_history
+        self.metric_cache = metric_cache if metric_cache is not None else MetricSeriesCache()
+        self.hourly_store = hourly_store if hourly_store is not None else HourlyCostStore(path=None)
+        self.rightsizing = RightsizingEngine()
         self.audit_logger = AuditLogger()
     
     def get_cost_analysis(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
@@ -102,7 +121,7 @@ class CostAnalysisHandler:
                 start_date, end_date = self._calculate_date_range(time_period)
             
             # Validate parameters
-            valid_granularities = ['DAILY', 'MONTHLY']
+            valid_granularities = ['HOURLY', 'DAILY', 'MONTHLY']
             valid_group_by = ['SERVICE', 'REGION', 'USAGE_TYPE', 'INSTANCE_TYPE']
             
             # Validate parameters
@@ -123,8 +142,9 @@ class CostAnalysisHandler:
                 end_date = datetime.now().date()
                 if time_period == 'DAILY':
                     start_date = end_date - timedelta(days=1)
-                    # For daily analysis, use DAILY granularity
-                    granularity = 'DAILY'
+                    # For daily analysis, use DAILY granularity unless hours were requested
+                    if granularity != 'HOURLY':
+                        granularity = 'DAILY'
                 elif time_period == 'MONTHLY':
                     # Get current month data from 1st of month to today
                     start_date = end_date.replace(day=1)
@@ -162,6 +182,9 @@ class CostAnalysisHandler:
             
             logger.info(f"[{request_id}] Analyzing costs from {start_date} to {end_date}")
             
+            if granularity == 'HOURLY':
+                return self._get_hourly_cost_analysis(time_period, group_by, start_date, end_date, request_id)
+            
             # Get Cost Explorer client
             ce_client = self.aws_clients.get_cost_explorer_client()
             
@@ -193,6 +216,10 @@ class CostAnalysisHandler:
             # Process the response
             result = self._process_cost_response(response, time_period, group_by, start_date, end_date)
             
+            # Retain daily totals locally so forecasts still work when Cost Explorer does not
+            if granularity == 'DAILY' and self.cost_history is not None:
+                self.cost_history.record(result.get('daily_costs', []))
+            
             # If Cost Explorer returns zero, try AWS Budgets API as fallback
             if result.get('total_cost', 0) == 0:
                 logger.info(f"[{request_id}] Cost Explorer returned $0, trying AWS Budgets API fallback")
@@ -312,66 +339,102 @@ class CostAnalysisHandler:
             cw_client = self.aws_clients.get_cloudwatch_client(region)
             
             # Get all running EC2 instances
-            instances_response = ec2_client.describe_instances(
-                Filters=[
+            instances = []
+            analyzed_instances = 0
+            describe_params = {
+                'Filters': [
                     {'Name': 'instance-state-name', 'Values': ['running']}
                 ]
+            }
+            
+            while True:
+                instances_response = ec2_client.describe_instances(**describe_params)
+                
+                for reservation in instances_response['Reservations']:
+                    for instance in reservation['Instances']:
+                        analyzed_instances += 1
+                        launch_time = instance.get('LaunchTime')
+                        
+                        # Skip instances launched less than the analysis period
+                        if launch_time:
+                            instance_age = datetime.now(launch_time.tzinfo) - launch_time
+                            if instance_age.days < days:
+                                logger.debug(f"[{request_id}] Skipping {instance['InstanceId']} - too new ({instance_age.days} days)")
+                                continue
+                        
+                        instances.append(instance)
+                
+                next_token = instances_response.get('NextToken')
+                if not next_token:
+                    break
+                describe_params['NextToken'] = next_token
+            
+            # Pull 5-minute CPU, network and memory series for all instances in batches
+            rightsizing = self.rightsizing.analyze_instances(
+                cw_client,
+                [{'instance_id': i['InstanceId'], 'instance_type': i['InstanceType']} for i in instances],
+                days, cpu_threshold, request_id
             )
             
             idle_instances = []
-            analyzed_instances = 0
+            rightsizing_recommendations = []
             total_potential_savings = 0.0
             
             # Analyze each instance
-            for reservation in instances_response['Reservations']:
-                for instance in reservation['Instances']:
-                    analyzed_instances += 1
-                    instance_id = instance['InstanceId']
-                    instance_type = instance['InstanceType']
-                    launch_time = instance.get('LaunchTime')
-                    
-                    # Skip instances launched less than the analysis period
-                    if launch_time:
-                        instance_age = datetime.now(launch_time.tzinfo) - launch_time
-                        if instance_age.days < days:
-                            logger.debug(f"[{request_id}] Skipping {instance_id} - too new ({instance_age.days} days)")
-                            continue
-                    
-                    # Get comprehensive metrics
+            for instance in instances:
+                instance_id = instance['InstanceId']
+                instance_type = instance['InstanceType']
+                launch_time = instance.get('LaunchTime')
+                estimated_monthly_cost = self._estimate_instance_cost(instance_type)
+                analysis = rightsizing['analyses'].get(instance_id)
+                
+                if analysis:
+                    metrics = analysis['metrics']
+                    recommendation = analysis['recommendation']
+                elif instance_id in rightsizing['failed']:
+                    # get_metric_data failed for this batch, fall back to cached hourly metrics
                     metrics = self._get_instance_metrics(cw_client, instance_id, days, request_id)
+                    recommendation = self._get_optimization_recommendation(
+                        metrics, instance_type, estimated_monthly_cost
+                    )
+                else:
+                    continue
+                
+                if metrics['avg_cpu'] is not None and metrics['avg_cpu'] < cpu_threshold:
+                    idle_instance = {
+                        'instance_id': instance_id,
+                        'instance_type': instance_type,
+                        'metrics': self._format_instance_metrics(metrics),
+                        'launch_time': launch_time.isoformat() if launch_time else None,
+                        'estimated_monthly_cost': estimated_monthly_cost,
+                        'potential_monthly_savings': recommendation['potential_savings'],
+                        'optimization_recommendation': recommendation['recommendation'],
+                        'target_instance_type': recommendation.get('target_instance_type'),
+                        'recommendation_reason': recommendation.get('reason'),
+                        'confidence_level': recommendation['confidence'],
+                        'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
+                        'vpc_id': instance.get('VpcId'),
+                        'subnet_id': instance.get('SubnetId'),
+                        'availability_zone': instance.get('Placement', {}).get('AvailabilityZone')
+                    }
                     
-                    if metrics['avg_cpu'] is not None and metrics['avg_cpu'] < cpu_threshold:
-                        # Estimate potential savings
-                        estimated_monthly_cost = self._estimate_instance_cost(instance_type)
-                        
-                        # Determine optimization recommendation
-                        recommendation = self._get_optimization_recommendation(
-                            metrics, instance_type, estimated_monthly_cost
-                        )
-                        
-                        idle_instance = {
-                            'instance_id': instance_id,
-                            'instance_type': instance_type,
-                            'metrics': {
-                                'average_cpu_utilization': round(metrics['avg_cpu'], 2),
-                                'max_cpu_utilization': round(metrics['max_cpu'], 2) if metrics['max_cpu'] else None,
-                                'average_network_in': round(metrics['avg_network_in'], 2) if metrics['avg_network_in'] else None,
-                                'average_network_out': round(metrics['avg_network_out'], 2) if metrics['avg_network_out'] else None,
-                                'data_points': metrics['data_points']
-                            },
-                            'launch_time': launch_time.isoformat() if launch_time else None,
-                            'estimated_monthly_cost': estimated_monthly_cost,
-                            'potential_monthly_savings': recommendation['potential_savings'],
-                            'optimization_recommendation': recommendation['recommendation'],
-                            'confidence_level': recommendation['confidence'],
-                            'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
-                            'vpc_id': instance.get('VpcId'),
-                            'subnet_id': instance.get('SubnetId'),
-                            'availability_zone': instance.get('Placement', {}).get('AvailabilityZone')
-                        }
-                        
-                        idle_instances.append(idle_instance)
-                        total_potential_savings += recommendation['potential_savings']
+                    idle_instances.append(idle_instance)
+                    total_potential_savings += recommendation['potential_savings']
+                
+                elif recommendation['potential_savings'] > 0:
+                    # Busy enough not to be idle, but still oversized for its observed peaks
+                    rightsizing_recommendations.append({
+                        'instance_id': instance_id,
+                        'instance_type': instance_type,
+                        'target_instance_type': recommendation.get('target_instance_type'),
+                        'optimization_recommendation': recommendation['recommendation'],
+                        'potential_monthly_savings': recommendation['potential_savings'],
+                        'recommendation_reason': recommendation.get('reason'),
+                        'confidence_level': recommendation['confidence'],
+                        'metrics': self._format_instance_metrics(metrics)
+                    })
+            
+            rightsizing_recommendations.sort(key=lambda r: r['potential_monthly_savings'], reverse=True)
             
             # Generate optimization insights
             optimization_insights = self._generate_idle_resource_insights(idle_instances, analyzed_instances)
@@ -384,6 +447,9 @@ class CostAnalysisHandler:
                 'idle_instances': idle_instances,
                 'total_idle_instances': len(idle_instances),
                 'potential_monthly_savings': round(total_potential_savings, 2),
+                'rightsizing_recommendations': rightsizing_recommendations,
+                'rightsizing_monthly_savings': round(sum(r['potential_monthly_savings'] for r in rightsizing_recommendations), 2),
+                'instances_skipped_time_budget': len(rightsizing['skipped']),
                 'optimization_insights': optimization_insights,
                 'currency': 'USD',
                 'analysis_date': datetime.utcnow().isoformat()
@@ -399,6 +465,147 @@ class CostAnalysisHandler:
             logger.error(f"[{request_id}] Error in idle resource analysis: {str(e)}")
             raise
     
+    def _get_hourly_cost_analysis(self, time_period: str, group_by: str, start_date: date,
+                                  end_date: date, request_id: str) -> Dict[str, Any]:
+        """
+        Analyze hourly costs, streaming Cost Explorer pages through a bounded aggregator.
+        
+        Settled hours are kept in the hourly store, so only hours after the last
+        settled hour are downloaded again on repeated queries.
+        
+        Args:
+            time_period: Requested time period
+            group_by: Cost Explorer group_by dimension
+            start_date: Window start date
+            end_date: Window end date (exclusive)
+            request_id: Request ID for tracking
+            
+        Returns:
+            Hourly cost analysis with per-hour peaks and top hours per group
+        """
+        now_hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        earliest = now_hour - timedelta(days=HOURLY_RETENTION_DAYS)
+        window_start = max(datetime.combine(start_date, datetime.min.time()), earliest)
+        window_end = min(datetime.combine(end_date, datetime.min.time()), now_hour)
+        clamped = window_start > datetime.combine(start_date, datetime.min.time())
+        if window_start >= window_end:
+            raise ValueError(f"Hourly cost data is unavailable for {start_date} to {end_date}; "
+                             f"it is only kept for the last {HOURLY_RETENTION_DAYS} days")
+        
+        start = window_start.strftime(HOUR_FORMAT)
+        end = window_end.strftime(HOUR_FORMAT)
+        settle_boundary = min(now_hour - timedelta(hours=HOURLY_SETTLE_HOURS), window_end).strftime(HOUR_FORMAT)
+        
+        aggregator = HourlyCostAggregator()
+        cached_hours, fetch_start = self.hourly_store.load_window(group_by, start, end)
+        for hour, groups in cached_hours.items():
+            aggregator.hourly_totals.setdefault(hour, 0.0)
+            for group, (cost, usage, unit) in groups.items():
+                aggregator.add(hour, group, cost, usage, unit)
+        
+        fetched_hours = 0
+        
+        if fetch_start < end:
+            ce_client = self.aws_clients.get_cost_explorer_client()
+            cost_request = {
+                'TimePeriod': {'Start': fetch_start, 'End': end},
+                'Granularity': 'HOURLY',
+                'Metrics': ['BlendedCost', 'UsageQuantity'],
+                'GroupBy': [{'Type': 'DIMENSION', 'Key': group_by}]
+            }
+            
+            while True:
+                response = self.aws_clients.make_api_call(
+                    client=ce_client,
+                    operation='get_cost_and_usage',
+                    request_id=request_id,
+                    **cost_request
+                )
+                results_by_time = response.get('ResultsByTime', [])
+                fetched_hours += aggregator.add_results(results_by_time)
+                
+                # Hand settled rows to the store page by page; everything else is dropped with the page
+                settled_rows: Dict[str, Dict[str, list]] = {}
+                for time_result in results_by_time:
+                    hour = time_result.get('TimePeriod', {}).get('Start')
+                    if not hour or hour >= settle_boundary:
+                        continue
+                    rows = settled_rows.setdefault(hour, {})
+                    for group in time_result.get('Groups', []):
+                        metrics = group.get('Metrics', {})
+                        rows[group.get('Keys', ['Unknown'])[0]] = [
+                            float(metrics.get('BlendedCost', {}).get('Amount', 0)),
+                            float(metrics.get('UsageQuantity', {}).get('Amount', 0)),
+                            metrics.get('UsageQuantity', {}).get('Unit', '')
+                        ]
+                self.hourly_store.add_hours(group_by, fetch_start, settled_rows)
+                
+                next_token = response.get('NextPageToken')
+                if not next_token:
+                    break
+                cost_request['NextPageToken'] = next_token
+            
+            self.hourly_store.save_window(group_by, fetch_start, settle_boundary)
+        
+        logger.info(f"[{request_id}] Hourly cost analysis: {len(cached_hours)} hours from local store, "
+                    f"{fetched_hours} hours fetched")
+        
+        total_cost = aggregator.total_cost
+        breakdown = []
+        for group_name, totals in aggregator.group_totals.items():
+            percentage = (totals['cost'] / total_cost * 100) if total_cost > 0 else 0
+            breakdown.append({
+                'service_name': group_name,
+                'cost': round(totals['cost'], 2),
+                'usage_quantity': round(totals['usage'], 2),
+                'usage_unit': totals['unit'],
+                'percentage': round(percentage, 2)
+            })
+        breakdown.sort(key=lambda x: x['cost'], reverse=True)
+        
+        average_hourly_cost = aggregator.average_hourly_cost()
+        peak_hours = aggregator.peak_hours()
+        spike_hours = sum(1 for cost in aggregator.hourly_totals.values()
+                          if average_hourly_cost > 0 and cost > average_hourly_cost * 2)
+        
+        optimization_insights = self._generate_cost_insights(breakdown, total_cost)
+        if spike_hours:
+            optimization_insights.append(
+                f"{spike_hours} hours cost more than twice the hourly average of ${average_hourly_cost:.2f}. "
+                f"Check scheduled batch jobs around {peak_hours[0]['hour']}."
+            )
+        
+        result = {
+            'total_cost': round(total_cost, 2),
+            'currency': 'USD',
+            'time_period': time_period,
+            'granularity': 'HOURLY',
+            'group_by': group_by,
+            'start_date': start,
+            'end_date': end,
+            'breakdown': breakdown,
+            'hours_analyzed': len(aggregator.hourly_totals),
+            'average_hourly_cost': round(average_hourly_cost, 4),
+            'peak_hours': peak_hours,
+            'top_hours_by_service': aggregator.top_hours_by_group(),
+            'spike_hours': spike_hours,
+            'optimization_insights': optimization_insights,
+            'analysis_date': datetime.utcnow().isoformat()
+        }
+        
+        if clamped:
+            result['message'] = f'Hourly cost data is only available for the last {HOURLY_RETENTION_DAYS} days, so the analysis starts at {start}.'
+        
+        self.audit_logger.log_cost_analysis(
+            request_id=request_id,
+            time_period=f"{start} to {end}",
+            total_cost=result['total_cost'],
+            currency='USD',
+            optimization_opportunities=spike_hours
+        )
+        
+        return result
+    
     def _process_cost_response(self, response: Dict[str, Any], time_period: str, group_by: str, start_date, end_date) -> Dict[str, Any]:
         """Process Cost Explorer response into structured format."""
         results_by_time = response.get('ResultsByTime', [])
@@ -556,63 +763,36 @@ class CostAnalysisHandler:
                 'data_points': 0
             }
             
-            # Get CPU utilization
+            dimensions = [{'Name': 'InstanceId', 'Value': instance_id}]
+            
+            # Get CPU utilization (hourly datapoints are served from the metric cache)
             try:
-                cpu_response = cw_client.get_metric_statistics(
-                    Namespace='AWS/EC2',
-                    MetricName='CPUUtilization',
-                    Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
-                    StartTime=start_time,
-                    EndTime=end_time,
-                    Period=3600,  # 1 hour periods
-                    Statistics=['Average', 'Maximum']
-                )
+                cpu_values = self.metric_cache.get_values(
+                    cw_client, 'AWS/EC2', 'CPUUtilization', dimensions, 3600,
+                    ['Average', 'Maximum'], start_time, end_time, request_id
+                )['values']
                 
-                cpu_datapoints = cpu_response.get('Datapoints', [])
-                if cpu_datapoints:
-                    metrics['avg_cpu'] = sum(dp['Average'] for dp in cpu_datapoints) / len(cpu_datapoints)
-                    metrics['max_cpu'] = max(dp['Maximum'] for dp in cpu_datapoints)
-                    metrics['data_points'] = len(cpu_datapoints)
+                if cpu_values['Average']:
+                    metrics['avg_cpu'] = summarize(cpu_values['Average'])['average']
+                    metrics['max_cpu'] = summarize(cpu_values['Maximum'])['maximum']
+                    metrics['data_points'] = len(cpu_values['Average'])
                     
             except Exception as e:
                 logger.warning(f"[{request_id}] Could not get CPU metrics for {instance_id}: {str(e)}")
             
             # Get network metrics
-            try:
-                network_in_response = cw_client.get_metric_statistics(
-                    Namespace='AWS/EC2',
-                    MetricName='NetworkIn',
-                    Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
-                    StartTime=start_time,
-                    EndTime=end_time,
-                    Period=3600,
-                    Statistics=['Average']
-                )
-                
-                network_in_datapoints = network_in_response.get('Datapoints', [])
-                if network_in_datapoints:
-                    metrics['avg_network_in'] = sum(dp['Average'] for dp in network_in_datapoints) / len(network_in_datapoints)
-                    
-            except Exception as e:
-                logger.debug(f"[{request_id}] Could not get NetworkIn metrics for {instance_id}: {str(e)}")
-            
-            try:
-                network_out_response = cw_client.get_metric_statistics(
-                    Namespace='AWS/EC2',
-                    MetricName='NetworkOut',
-                    Dimensions=[{'Name': 'InstanceId', 'Value': instance_id}],
-                    StartTime=start_time,
-                    EndTime=end_time,
-                    Period=3600,
-                    Statistics=['Average']
-                )
-                
-                network_out_datapoints = network_out_response.get('Datapoints', [])
-                if network_out_datapoints:
-                    metrics['avg_network_out'] = sum(dp['Average'] for dp in network_out_datapoints) / len(network_out_datapoints)
+            for metric_name, metric_key in [('NetworkIn', 'avg_network_in'), ('NetworkOut', 'avg_network_out')]:
+                try:
+                    network_values = self.metric_cache.get_values(
+                        cw_client, 'AWS/EC2', metric_name, dimensions, 3600,
+                        ['Average'], start_time, end_time, request_id
+                    )['values']['Average']
                     
-            except Exception as e:
-                logger.debug(f"[{request_id}] Could not get NetworkOut metrics for {instance_id}: {str(e)}")
+                    if network_values:
+                        metrics[metric_key] = summarize(network_values)['average']
+                        
+                except Exception as e:
+                    logger.debug(f"[{request_id}] Could not get {metric_name} metrics for {instance_id}: {str(e)}")
             
             return metrics
             
@@ -712,41 +892,44 @@ class CostAnalysisHandler:
         Estimate monthly cost for an instance type.
         This is a simplified estimation - in production, you'd use AWS Pricing API.
         """
-        # Simplified cost estimates (USD per month for common instance types)
-        cost_estimates = {
-            't2.micro': 8.50,
-            't2.small': 17.00,
-            't2.medium': 34.00,
-            't2.large': 68.00,
-            't2.xlarge': 136.00,
-            't3.micro': 7.60,
-            't3.small': 15.20,
-            't3.medium': 30.40,
-            't3.large': 60.80,
-            't3.xlarge': 121.60,
-            't3.2xlarge': 243.20,
-            'm5.large': 70.00,
-            'm5.xlarge': 140.00,
-            'm5.2xlarge': 280.00,
-            'm5.4xlarge': 560.00,
-            'c5.large': 62.00,
-            'c5.xlarge': 124.00,
-            'c5.2xlarge': 248.00,
-            'c5.4xlarge': 496.00,
-            'r5.large': 91.00,
-            'r5.xlarge': 182.00,
-            'r5.2xlarge': 364.00,
-            'r5.4xlarge': 728.00,
+        return get_monthly_cost(instance_type)
+    
+    def _format_instance_metrics(self, metrics: Dict[str, Any]) -> Dict[str, Any]:
+        """Round instance metrics for the response, including percentiles when available."""
+        def rounded(key):
+            value = metrics.get(key)
+            return round(value, 2) if value is not None else None
+        
+        formatted = {
+            'average_cpu_utilization': rounded('avg_cpu'),
+            'max_cpu_utilization': rounded('max_cpu'),
+            'average_network_in': rounded('avg_network_in'),
+            'average_network_out': rounded('avg_network_out'),
+            'data_points': metrics.get('data_points', 0)
         }
         
-        return cost_estimates.get(instance_type, 50.0)  # Default estimate
+        if 'p95_cpu' in metrics:
+            formatted.update({
+                'p50_cpu_utilization': rounded('p50_cpu'),
+                'p95_cpu_utilization': rounded('p95_cpu'),
+                'p99_cpu_utilization': rounded('p99_cpu'),
+                'cpu_time_above_threshold_percent': metrics.get('cpu_time_above_threshold_percent'),
+                'cpu_time_above_80_percent': metrics.get('cpu_time_above_high_percent'),
+                'p95_memory_utilization': rounded('p95_memory'),
+                'p95_network_bytes_per_second': rounded('p95_network_bytes_per_second')
+            })
+        
+        return formatted
     
     def get_cost_optimization_recommendations(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
         """
         Get comprehensive cost optimization recommendations.
         
+        Cost analysis and the idle resource scans for each region run concurrently
+        and share one cache of AWS responses for the request.
+        
         Args:
-            params: Parameters including region
+            params: Parameters including region or regions
             request_id: Request ID for tracking
             
         Returns:
@@ -756,78 +939,68 @@ class CostAnalysisHandler:
         
         try:
             region = params.get('region', 'us-east-1')
+            regions = self._get_optimization_regions(params, region)
             
-            recommendations = []
+            # One response cache per request, shared by all branches
+            scoped = copy.copy(self)
+            scoped.aws_clients = CachingClientManager(self.aws_clients)
             
-            # Get cost analysis for context
-            cost_params = {'time_period': 'MONTHLY', 'group_by': 'SERVICE'}
-            cost_analysis = self.get_cost_analysis(cost_params, request_id)
+            graph = TaskGraph()
+            graph.add('cost_analysis', lambda deps: scoped.get_cost_analysis(
+                {'time_period': 'MONTHLY', 'group_by': 'SERVICE'}, request_id
+            ))
+            for idle_region in regions:
+                graph.add(f"idle_resources:{idle_region}", lambda deps, r=idle_region: scoped.get_idle_resources(
+                    {'region': r, 'cpu_threshold': 5.0, 'days': 7}, request_id
+                ))
+            graph.add('service_checks', lambda deps: self._get_service_recommendations(deps['cost_analysis']),
+                      depends_on=['cost_analysis'])
             
-            # Get idle resources
-            idle_params = {'region': region, 'cpu_threshold': 5.0, 'days': 7}
-            idle_analysis = self.get_idle_resources(idle_params, request_id)
+            run = graph.run(request_id, timeout=OPTIMIZATION_TIMEOUT_SECONDS)
+            results, errors = run['results'], run['errors']
             
-            # Generate EC2 recommendations
-            if idle_analysis['total_idle_instances'] > 0:
-                recommendations.append({
-                    'category': 'EC2 Optimization',
-                    'priority': 'high',
-                    'potential_savings': idle_analysis['potential_monthly_savings'],
-                    'description': f"Found {idle_analysis['total_idle_instances']} idle EC2 instances",
-                    'actions': [
-                        'Review idle instances for termination or downsizing',
-                        'Consider Reserved Instances for consistent workloads',
-                        'Implement auto-scaling for variable workloads'
-                    ]
-                })
+            if 'cost_analysis' not in results:
+                raise RuntimeError(f"Cost analysis failed: {errors.get('cost_analysis', 'unknown error')}")
             
-            # Generate service-specific recommendations based on cost analysis
-            if cost_analysis.get('breakdown'):
-                for service in cost_analysis['breakdown'][:5]:  # Top 5 services
-                    service_name = service['service_name']
-                    service_cost = service['cost']
-                    
-                    if 'S3' in service_name and service_cost > 50:
-                        recommendations.append({
-                            'category': 'S3 Storage Optimization',
-                            'priority': 'medium',
-                            'potential_savings': service_cost * 0.3,  # Estimate 30% savings
-                            'description': f"S3 costs are ${service_cost:.2f}/month",
-                            'actions': [
-                                'Implement S3 Intelligent Tiering',
-                                'Review and optimize lifecycle policies',
-                                'Delete incomplete multipart uploads',
-                                'Consider S3 Glacier for archival data'
-                            ]
-                        })
-                    
-                    elif 'RDS' in service_name and service_cost > 100:
-                        recommendations.append({
-                            'category': 'RDS Optimization',
-                            'priority': 'medium',
-                            'potential_savings': service_cost * 0.25,  # Estimate 25% savings
-                            'description': f"RDS costs are ${service_cost:.2f}/month",
-                            'actions': [
-                                'Consider Reserved Instances for RDS',
-                                'Right-size RDS instances based on utilization',
-                                'Optimize backup retention periods',
-                                'Consider Aurora Serverless for variable workloads'
-                            ]
-                        })
-                    
-                    elif 'Lambda' in service_name and service_cost > 20:
-                        recommendations.append({
-                            'category': 'Lambda Optimization',
-                            'priority': 'low',
-                            'potential_savings': service_cost * 0.2,  # Estimate 20% savings
-                            'description': f"Lambda costs are ${service_cost:.2f}/month",
-                            'actions': [
-                                'Optimize Lambda memory allocation',
-                                'Review function timeout settings',
-                                'Consider Provisioned Concurrency usage',
-                                'Optimize cold start performance'
-                            ]
-                        })
+            cost_analysis = results['cost_analysis']
+            recommendations = []
+            
+            # Generate EC2 recommendations per region
+            for idle_region in regions:
+                idle_analysis = results.get(f"idle_resources:{idle_region}")
+                if not idle_analysis:
+                    continue
+                
+                if idle_analysis['total_idle_instances'] > 0:
+                    recommendations.append({
+                        'category': 'EC2 Optimization',
+                        'region': idle_region,
+                        'priority': 'high',
+                        'potential_savings': idle_analysis['potential_monthly_savings'],
+                        'description': f"Found {idle_analysis['total_idle_instances']} idle EC2 instances in {idle_region}",
+                        'actions': [
+                            'Review idle instances for termination or downsizing',
+                            'Consider Reserved Instances for consistent workloads',
+                            'Implement auto-scaling for variable workloads'
+                        ]
+                    })
+                
+                rightsizing = idle_analysis.get('rightsizing_recommendations', [])
+                if rightsizing:
+                    recommendations.append({
+                        'category': 'EC2 Rightsizing',
+                        'region': idle_region,
+                        'priority': 'medium',
+                        'potential_savings': idle_analysis.get('rightsizing_monthly_savings', 0),
+                        'description': f"{len(rightsizing)} EC2 instances in {idle_region} fit a cheaper instance type",
+                        'actions': [
+                            f"Move {r['instance_id']} from {r['instance_type']} to {r['target_instance_type']}"
+                            for r in rightsizing[:5]
+                        ]
+                    })
+            
+            # Service-specific recommendations based on cost analysis
+            recommendations.extend(results.get('service_checks', []))
             
             # General recommendations
             total_cost = cost_analysis.get('total_cost', 0)
@@ -853,20 +1026,92 @@ class CostAnalysisHandler:
             
             result = {
                 'region': region,
+                'regions_analyzed': [r for r in regions if f"idle_resources:{r}" in results],
                 'total_monthly_cost': total_cost,
                 'total_potential_savings': round(total_potential_savings, 2),
                 'savings_percentage': round((total_potential_savings / total_cost * 100), 2) if total_cost > 0 else 0,
                 'recommendations': recommendations,
+                'analysis_timings': run['timings'],
                 'analysis_date': datetime.utcnow().isoformat()
             }
             
-            logger.info(f"[{request_id}] Generated {len(recommendations)} cost optimization recommendations")
+            if errors:
+                result['failed_analyses'] = errors
+            
+            logger.info(f"[{request_id}] Generated {len(recommendations)} cost optimization recommendations "
+                        f"(response cache: {scoped.aws_clients.cache.stats()})")
             return result
             
         except Exception as e:
             logger.error(f"[{request_id}] Error generating cost optimization recommendations: {str(e)}")
             raise
     
+    def _get_optimization_regions(self, params: Dict[str, Any], default_region: str) -> List[str]:
+        """
+        Get the regions to scan for idle resources.
+        
+        Uses the 'regions' parameter, then the CONCIERGE_REGIONS environment variable,
+        then the single 'region' parameter.
+        """
+        regions = params.get('regions') or os.getenv('CONCIERGE_REGIONS', '')
+        if isinstance(regions, str):
+            regions = [r.strip() for r in regions.split(',')]
+        regions = [r for r in regions if r]
+        # Keep order but drop duplicates
+        return list(dict.fromkeys(regions)) or [default_region]
+    
+    def _get_service_recommendations(self, cost_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Generate service-specific recommendations from the top services in a cost analysis."""
+        recommendations = []
+        
+        for service in cost_analysis.get('breakdown', [])[:5]:  # Top 5 services
+            service_name = service['service_name']
+            service_cost = service['cost']
+            
+            if 'S3' in service_name and service_cost > 50:
+                recommendations.append({
+                    'category': 'S3 Storage Optimization',
+                    'priority': 'medium',
+                    'potential_savings': service_cost * 0.3,  # Estimate 30% savings
+                    'description': f"S3 costs are ${service_cost:.2f}/month",
+                    'actions': [
+                        'Implement S3 Intelligent Tiering',
+                        'Review and optimize lifecycle policies',
+                        'Delete incomplete multipart uploads',
+                        'Consider S3 Glacier for archival data'
+                    ]
+                })
+            
+            elif 'RDS' in service_name and service_cost > 100:
+                recommendations.append({
+                    'category': 'RDS Optimization',
+                    'priority': 'medium',
+                    'potential_savings': service_cost * 0.25,  # Estimate 25% savings
+                    'description': f"RDS costs are ${service_cost:.2f}/month",
+                    'actions': [
+                        'Consider Reserved Instances for RDS',
+                        'Right-size RDS instances based on utilization',
+                        'Optimize backup retention periods',
+                        'Consider Aurora Serverless for variable workloads'
+                    ]
+                })
+            
+            elif 'Lambda' in service_name and service_cost > 20:
+                recommendations.append({
+                    'category': 'Lambda Optimization',
+                    'priority': 'low',
+                    'potential_savings': service_cost * 0.2,  # Estimate 20% savings
+                    'description': f"Lambda costs are ${service_cost:.2f}/month",
+                    'actions': [
+                        'Optimize Lambda memory allocation',
+                        'Review function timeout settings',
+                        'Consider Provisioned Concurrency usage',
+                        'Optimize cold start performance'
+                    ]
+                })
+        
+        return recommendations
+    
     def _get_budget_costs(self, request_id: str) -> Optional[Dict[str, Any]]:
         """
         Get current costs from AWS Budgets API as fallback when Cost Explorer is delayed.
@@ -0,0 +1,375 @@
+"""
+Cost forecasting tools for AWS AI Concierge
+"""
+
+import logging
+import math
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta, date
+from botocore.exceptions import ClientError, BotoCoreError
+from utils.audit_logger import AuditLogger
+from utils.cost_history import DailyCostHistory
+
+logger = logging.getLogger(__name__)
+
+VALID_GRANULARITIES = ['DAILY', 'MONTHLY']
+VALID_METRICS = ['BLENDED_COST', 'UNBLENDED_COST', 'AMORTIZED_COST', 'NET_UNBLENDED_COST', 'NET_AMORTIZED_COST']
+PREDICTION_INTERVAL_LEVEL = 80
+# z-score for a two-sided 80% interval, used by the local model
+PREDICTION_INTERVAL_Z = 1.2816
+
+# The retained daily history is BlendedCost, so the local model only stands in for that metric
+LOCAL_FORECAST_METRIC = 'BLENDED_COST'
+LOCAL_LOOKBACK_DAYS = 90
+MIN_LOCAL_HISTORY_DAYS = 7
+# Local answers are only a stand-in for CE, so re-check CE sooner than the daily refresh
+LOCAL_FORECAST_TTL_SECONDS = 900
+
+
+class CostForecastHandler:
+    """Handles cost forecasts with a per-container cache and a local fallback model."""
+
+    def __init__(self, aws_clients, cost_history: Optional[DailyCostHistory] = None):
+        self.aws_clients = aws_clients
+        self.cost_history = cost_history if cost_history is not None else DailyCostHistory()
+        self.audit_logger = AuditLogger()
+
+        # (granularity, metric, horizon) -> (expires_at, result)
+        self._cache: Dict[Tuple[str, str, str], Tuple[datetime, Dict[str, Any]]] = {}
+
+    def get_cost_forecast(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        """
+        Forecast AWS spend using Cost Explorer, falling back to a local regression model.
+
+        Args:
+            params: Parameters including granularity, metric, horizon
+            request_id: Request ID for tracking
+
+        Returns:
+            Cost forecast results
+        """
+        logger.info(f"[{request_id}] Starting cost forecast with params: {params}")
+
+        try:
+            granularity = str(params.get('granularity', 'MONTHLY')).upper()
+            metric = str(params.get('metric', 'BLENDED_COST')).upper()
+            horizon = self._normalize_horizon(params.get('horizon', 'END_OF_MONTH'))
+
+            if granularity not in VALID_GRANULARITIES:
+                raise ValueError(f"Invalid granularity '{granularity}'. Must be one of: {VALID_GRANULARITIES}")
+
+            if metric not in VALID_METRICS:
+                raise ValueError(f"Invalid metric '{metric}'. Must be one of: {VALID_METRICS}")
+
+            start_date, end_date = self._calculate_forecast_range(horizon, granularity)
+
+            cache_key = (granularity, metric, horizon)
+            cached = self._get_cached(cache_key)
+            if cached:
+                logger.info(f"[{request_id}] Serving cost forecast from cache for {cache_key}")
+                return cached
+
+            try:
+                result = self._get_ce_forecast(granularity, metric, start_date, end_date, request_id)
+                expires_at = self._next_ce_refresh()
+            except (ClientError, BotoCoreError) as e:
+                if isinstance(e, ClientError):
+                    reason = e.response.get('Error', {}).get('Code', 'Unknown')
+                else:
+                    reason = type(e).__name__
+                logger.warning(f"[{request_id}] Cost Explorer forecast unavailable ({reason}), using local model")
+
+                result = self._get_local_forecast(granularity, metric, start_date, end_date, request_id)
+                result['fallback_reason'] = reason
+                expires_at = datetime.utcnow() + timedelta(seconds=LOCAL_FORECAST_TTL_SECONDS)
+
+            result.update({
+                'granularity': granularity,
+                'metric': metric,
+                'horizon': horizon,
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+                'currency': result.get('currency', 'USD'),
+                'prediction_interval_level': PREDICTION_INTERVAL_LEVEL,
+                'forecast_date': datetime.utcnow().isoformat(),
+                'cache_expires_at': expires_at.isoformat()
+            })
+
+            if result.get('forecast_total') is not None:
+                self._cache[cache_key] = (expires_at, result)
+
+            logger.info(f"[{request_id}] Cost forecast completed from {result.get('data_source')} - Forecast: ${result.get('forecast_total') or 0:.2f}")
+            return dict(result, cached=False)
+
+        except Exception as e:
+            logger.error(f"[{request_id}] Error in cost forecast: {str(e)}")
+            raise
+
+    def clear_cache(self):
+        """Clear cached forecasts (useful for testing)."""
+        self._cache.clear()
+
+    def _get_cached(self, cache_key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Return a cached forecast if it has not passed its refresh time."""
+        entry = self._cache.get(cache_key)
+        if not entry:
+            return None
+
+        expires_at, result = entry
+        if datetime.utcnow() >= expires_at:
+            del self._cache[cache_key]
+            return None
+
+        return dict(result, cached=True)
+
+    def _get_ce_forecast(self, granularity: str, metric: str, start_date: date, end_date: date,
+                         request_id: str) -> Dict[str, Any]:
+        """Call Cost Explorer get_cost_forecast and shape the response."""
+        ce_client = self.aws_clients.get_cost_explorer_client()
+
+        response = self.aws_clients.make_api_call(
+            client=ce_client,
+            operation='get_cost_forecast',
+            request_id=request_id,
+            TimePeriod={
+                'Start': start_date.strftime('%Y-%m-%d'),
+                'End': end_date.strftime('%Y-%m-%d')
+            },
+            Metric=metric,
+            Granularity=granularity,
+            PredictionIntervalLevel=PREDICTION_INTERVAL_LEVEL
+        )
+
+        forecast_by_period = []
+        lower_total = 0.0
+        upper_total = 0.0
+
+        for period in response.get('ForecastResultsByTime', []):
+            mean = float(period.get('MeanValue', 0))
+            lower = float(period.get('PredictionIntervalLowerBound', mean))
+            upper = float(period.get('PredictionIntervalUpperBound', mean))
+            lower_total += lower
+            upper_total += upper
+            forecast_by_period.append({
+                'start': period.get('TimePeriod', {}).get('Start'),
+                'end': period.get('TimePeriod', {}).get('End'),
+                'mean': round(mean, 2),
+                'lower_bound': round(lower, 2),
+                'upper_bound': round(upper, 2)
+            })
+
+        total = response.get('Total', {})
+        forecast_total = float(total.get('Amount', sum(p['mean'] for p in forecast_by_period)))
+
+        return {
+            'forecast_total': round(forecast_total, 2),
+            'lower_bound': round(lower_total, 2),
+            'upper_bound': round(upper_total, 2),
+            'currency': total.get('Unit', 'USD'),
+            'forecast_by_period': forecast_by_period,
+            'data_source': 'AWS Cost Explorer Forecast'
+        }
+
+    def _get_local_forecast(self, granularity: str, metric: str, start_date: date, end_date: date,
+                            request_id: str) -> Dict[str, Any]:
+        """Forecast from the retained daily series with an ordinary least squares trend."""
+        if metric != LOCAL_FORECAST_METRIC:
+            logger.info(f"[{request_id}] Local model cannot forecast {metric}, only {LOCAL_FORECAST_METRIC}")
+            return {
+                'forecast_total': None,
+                'lower_bound': None,
+                'upper_bound': None,
+                'forecast_by_period': [],
+                'data_source': 'Local regression model',
+                'message': f"Cost Explorer is unavailable and the local model can only forecast {LOCAL_FORECAST_METRIC}.",
+                'suggestion': f"Request the {LOCAL_FORECAST_METRIC} metric, or try again once Cost Explorer forecasts are available."
+            }
+
+        if len(self.cost_history) < MIN_LOCAL_HISTORY_DAYS:
+            self._backfill_history(request_id)
+
+        series = self.cost_history.get_series(days=LOCAL_LOOKBACK_DAYS)
+
+        if len(series) < 2:
+            return {
+                'forecast_total': None,
+                'lower_bound': None,
+                'upper_bound': None,
+                'forecast_by_period': [],
+                'data_source': 'Local regression model',
+                'message': 'Not enough cost history is available to forecast spend yet.',
+                'suggestion': 'Cost Explorer needs some billing history before forecasts are available. Try again in a few days.'
+            }
+
+        intercept, slope, residual_std = self._fit_linear_trend(series)
+        origin = series[0][0]
+
+        daily_forecast = []
+        day = start_date
+        while day < end_date:
+            x = (day - origin).days
+            daily_forecast.append((day, max(0.0, intercept + slope * x)))
+            day += timedelta(days=1)
+
+        forecast_by_period = self._bucket_forecast(daily_forecast, granularity, residual_std)
+        forecast_total = sum(cost for _, cost in daily_forecast)
+        margin = PREDICTION_INTERVAL_Z * residual_std * math.sqrt(len(daily_forecast))
+
+        return {
+            'forecast_total': round(forecast_total, 2),
+            'lower_bound': round(max(0.0, forecast_total - margin), 2),
+            'upper_bound': round(forecast_total + margin, 2),
+            'forecast_by_period': forecast_by_period,
+            'data_source': 'Local regression model',
+            'model': {
+                'type': 'linear_trend',
+                'history_days': len(series),
+                'history_start': series[0][0].isoformat(),
+                'history_end': series[-1][0].isoformat(),
+                'daily_trend': round(slope, 4),
+                'confidence': 'low' if len(series) < 30 else 'medium'
+            }
+        }
+
+    def _fit_linear_trend(self, series: List[Tuple[date, float]]) -> Tuple[float, float, float]:
+        """
+        Fit cost = intercept + slope * day_index in a single pass over the series.
+
+        Returns:
+            Tuple of (intercept, slope, residual standard deviation)
+        """
+        origin = series[0][0]
+        n = len(series)
+        sum_x = sum_y = sum_xx = sum_xy = 0.0
+
+        for day, cost in series:
+            x = (day - origin).days
+            sum_x += x
+            sum_y += cost
+            sum_xx += x * x
+            sum_xy += x * cost
+
+        denominator = n * sum_xx - sum_x * sum_x
+        slope = (n * sum_xy - sum_x * sum_y) / denominator if denominator else 0.0
+        intercept = (sum_y - slope * sum_x) / n
+
+        residual_ss = sum((cost - (intercept + slope * (day - origin).days)) ** 2 for day, cost in series)
+        residual_std = math.sqrt(residual_ss / (n - 2)) if n > 2 else 0.0
+
+        return intercept, slope, residual_std
+
+    def _bucket_forecast(self, daily_forecast: List[Tuple[date, float]], granularity: str,
+                         residual_std: float) -> List[Dict[str, Any]]:
+        """Group daily predictions into the requested granularity."""
+        buckets: Dict[date, List[float]] = {}
+        for day, cost in daily_forecast:
+            bucket_start = day if granularity == 'DAILY' else day.replace(day=1)
+            buckets.setdefault(bucket_start, []).append(cost)
+
+        periods = []
+        for bucket_start in sorted(buckets):
+            costs = buckets[bucket_start]
+            first_day = max(bucket_start, daily_forecast[0][0])
+            mean = sum(costs)
+            margin = PREDICTION_INTERVAL_Z * residual_std * math.sqrt(len(costs))
+            periods.append({
+                'start': first_day.isoformat(),
+                'end': (first_day + timedelta(days=len(costs))).isoformat(),
+                'mean': round(mean, 2),
+                'lower_bound': round(max(0.0, mean - margin), 2),
+                'upper_bound': round(mean + margin, 2)
+            })
+
+        return periods
+
+    def _backfill_history(self, request_id: str):
+        """Seed the retained series from Cost Explorer actuals when it is too short."""
+        try:
+            end_date = datetime.utcnow().date()
+            start_date = end_date - timedelta(days=LOCAL_LOOKBACK_DAYS)
+            ce_client = self.aws_clients.get_cost_explorer_client()
+
+            response = self.aws_clients.make_api_call(
+                client=ce_client,
+                operation='get_cost_and_usage',
+                request_id=request_id,
+                TimePeriod={
+                    'Start': start_date.strftime('%Y-%m-%d'),
+                    'End': end_date.strftime('%Y-%m-%d')
+                },
+                Granularity='DAILY',
+                Metrics=['BlendedCost']
+            )
+
+            daily_costs = [
+                {
+                    'date': result.get('TimePeriod', {}).get('Start'),
+                    'cost': float(result.get('Total', {}).get('BlendedCost', {}).get('Amount', 0))
+                }
+                for result in response.get('ResultsByTime', [])
+            ]
+            added = self.cost_history.record(daily_costs)
+            logger.info(f"[{request_id}] Backfilled {added} days of cost history")
+
+        except Exception as e:
+            logger.warning(f"[{request_id}] Could not backfill cost history: {str(e)}")
+
+    @staticmethod
+    def _normalize_horizon(horizon: Any) -> str:
+        """
+        Normalize the forecast horizon to END_OF_MONTH, END_OF_YEAR or a day count.
+
+        Args:
+            horizon: Horizon keyword or number of days
+
+        Returns:
+            Normalized horizon string used in cache keys
+        """
+        horizon_str = str(horizon).strip().upper().replace(' ', '_')
+
+        if horizon_str in ['END_OF_MONTH', 'MONTH', 'THIS_MONTH', 'MONTH_END']:
+            return 'END_OF_MONTH'
+        if horizon_str in ['END_OF_YEAR', 'YEAR', 'THIS_YEAR', 'YEAR_END']:
+            return 'END_OF_YEAR'
+
+        try:
+            days = int(float(horizon_str))
+        except ValueError:
+            raise ValueError(f"Invalid horizon '{horizon}'. Use END_OF_MONTH, END_OF_YEAR or a number of days")
+
+        if days < 1 or days > 365:
+            raise ValueError("Forecast horizon must be between 1 and 365 days")
+
+        return str(days)
+
+    @staticmethod
+    def _calculate_forecast_range(horizon: str, granularity: str) -> Tuple[date, date]:
+        """
+        Calculate the forecast window. Cost Explorer treats the end date as exclusive.
+
+        Returns:
+            Tuple of (start_date, end_date)
+        """
+        start_date = datetime.utcnow().date()
+
+        if horizon == 'END_OF_MONTH':
+            if start_date.month == 12:
+                end_date = date(start_date.year + 1, 1, 1)
+            else:
+                end_date = date(start_date.year, start_date.month + 1, 1)
+        elif horizon == 'END_OF_YEAR':
+            end_date = date(start_date.year + 1, 1, 1)
+        else:
+            end_date = start_date + timedelta(days=int(horizon))
+
+        # Cost Explorer limits DAILY forecasts to three months
+        if granularity == 'DAILY' and (end_date - start_date).days > 93:
+            raise ValueError("DAILY forecasts are limited to 93 days. Use MONTHLY granularity for longer horizons")
+
+        return start_date, end_date
+
+    @staticmethod
+    def _next_ce_refresh() -> datetime:
+        """Cost Explorer refreshes its data daily, so cached forecasts expire at the next UTC midnight."""
+        now = datetime.utcnow()
+        return datetime(now.year, now.month, now.day) + timedelta(days=1)
@@ -0,0 +1,451 @@
+"""
+Inventory collectors for ECS, EKS, DynamoDB, ElastiCache, EBS, ELB and NAT gateways
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+
+from utils.collector_registry import CollectorRegistry, Paginator
+from utils.inventory_filters import wants, project
+
+logger = logging.getLogger(__name__)
+
+# Clusters accepted by one ecs describe_clusters call
+ECS_DESCRIBE_BATCH_SIZE = 100
+# Concurrent describe calls for APIs that only describe one resource at a time (EKS, DynamoDB)
+DESCRIBE_MAX_WORKERS = 8
+
+# List APIs each collector pages through
+ECS_CLUSTERS = Paginator('list_clusters', 'clusterArns', 'nextToken', 'nextToken')
+EKS_CLUSTERS = Paginator('list_clusters', 'clusters', 'nextToken', 'nextToken')
+DYNAMODB_TABLES = Paginator('list_tables', 'TableNames', 'ExclusiveStartTableName', 'LastEvaluatedTableName')
+ELASTICACHE_CLUSTERS = Paginator('describe_cache_clusters', 'CacheClusters', 'Marker', 'Marker')
+EBS_VOLUMES = Paginator('describe_volumes', 'Volumes')
+ELB_LOAD_BALANCERS = Paginator('describe_load_balancers', 'LoadBalancers', 'Marker', 'NextMarker')
+NAT_GATEWAYS = Paginator('describe_nat_gateways', 'NatGateways')
+
+# CloudWatch health metrics, in the same format as HEALTH_METRICS
+ECS_HEALTH = {
+    'dimension': 'ClusterName',
+    'metrics': {
+        'CPUUtilization': {'namespace': 'AWS/ECS', 'stat': 'Average'},
+        'MemoryUtilization': {'namespace': 'AWS/ECS', 'stat': 'Average'}
+    }
+}
+DYNAMODB_HEALTH = {
+    'dimension': 'TableName',
+    'metrics': {
+        'ConsumedReadCapacityUnits': {'namespace': 'AWS/DynamoDB', 'stat': 'Sum'},
+        'ConsumedWriteCapacityUnits': {'namespace': 'AWS/DynamoDB', 'stat': 'Sum'},
+        'ThrottledRequests': {'namespace': 'AWS/DynamoDB', 'stat': 'Sum'}
+    }
+}
+ELASTICACHE_HEALTH = {
+    'dimension': 'CacheClusterId',
+    'metrics': {
+        'CPUUtilization': {'namespace': 'AWS/ElastiCache', 'stat': 'Average'},
+        'CurrConnections': {'namespace': 'AWS/ElastiCache', 'stat': 'Average'},
+        'Evictions': {'namespace': 'AWS/ElastiCache', 'stat': 'Sum'}
+    }
+}
+EBS_HEALTH = {
+    'dimension': 'VolumeId',
+    'metrics': {
+        'VolumeReadOps': {'namespace': 'AWS/EBS', 'stat': 'Sum'},
+        'VolumeWriteOps': {'namespace': 'AWS/EBS', 'stat': 'Sum'},
+        'VolumeIdleTime': {'namespace': 'AWS/EBS', 'stat': 'Sum'}
+    }
+}
+NAT_GATEWAY_HEALTH = {
+    'dimension': 'NatGatewayId',
+    'metrics': {
+        'BytesOutToDestination': {'namespace': 'AWS/NATGateway', 'stat': 'Sum'},
+        'ActiveConnectionCount': {'namespace': 'AWS/NATGateway', 'stat': 'Maximum'},
+        'ErrorPortAllocation': {'namespace': 'AWS/NATGateway', 'stat': 'Sum'}
+    }
+}
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _tag_list(tags: Optional[List[Dict[str, str]]]) -> Dict[str, str]:
+    return {tag.get('Key', tag.get('key')): tag.get('Value', tag.get('value')) for tag in tags or []}
+
+
+def _name_tag(tags: Optional[List[Dict[str, str]]]) -> Optional[str]:
+    for tag in tags or []:
+        if tag.get('Key') == 'Name':
+            return tag.get('Value')
+    return None
+
+
+def _describe_each(names: List[str], describe, request_id: str) -> List[Dict[str, Any]]:
+    """Describe resources one call each, concurrently, skipping any deleted since they were listed."""
+    def attempt(name):
+        try:
+            return describe(name)
+        except Exception as e:
+            logger.warning(f"[{request_id}] Could not describe {name}: {str(e)}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(DESCRIBE_MAX_WORKERS, len(names)))) as executor:
+        return [item for item in executor.map(attempt, names) if item is not None]
+
+
+class ResourceCollectors:
+    """Collectors, record builders and details fetchers for the additional resource types."""
+
+    def __init__(self, aws_clients):
+        self.aws_clients = aws_clients
+
+    def register(self, registry: CollectorRegistry):
+        """Register every collector with its scope, paginator, cost weight and health metrics."""
+        registry.register('ECS', self.collect_ecs, paginator=ECS_CLUSTERS, cost_weight=2, health=ECS_HEALTH,
+                          details=self.ecs_details, count=self.count_ecs)
+        registry.register('EKS', self.collect_eks, paginator=EKS_CLUSTERS, cost_weight=3, max_concurrency=2,
+                          details=self.eks_details, count=self.count_eks)
+        registry.register('DYNAMODB', self.collect_dynamodb, paginator=DYNAMODB_TABLES, cost_weight=3,
+                          health=DYNAMODB_HEALTH, details=self.dynamodb_details, count=self.count_dynamodb)
+        registry.register('ELASTICACHE', self.collect_elasticache, paginator=ELASTICACHE_CLUSTERS, cost_weight=1,
+                          health=ELASTICACHE_HEALTH, details=self.elasticache_details, count=self.count_elasticache)
+        registry.register('EBS', self.collect_ebs, paginator=EBS_VOLUMES, cost_weight=2, health=EBS_HEALTH,
+                          details=self.ebs_details, count=self.count_ebs)
+        registry.register('ELB', self.collect_elb, paginator=ELB_LOAD_BALANCERS, cost_weight=1,
+                          details=self.elb_details, count=self.count_elb)
+        registry.register('NAT_GATEWAY', self.collect_nat_gateways, paginator=NAT_GATEWAYS, cost_weight=1,
+                          health=NAT_GATEWAY_HEALTH, details=self.nat_gateway_details, count=self.count_nat_gateways)
+
+    # ECS
+
+    def collect_ecs(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                    fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get ECS clusters, described in batches of 100."""
+        ecs_client = self.aws_clients.get_client('ecs', region)
+        arns = ECS_CLUSTERS.paginate(ecs_client, maxResults=100)
+        clusters = []
+        for start in range(0, len(arns), ECS_DESCRIBE_BATCH_SIZE):
+            response = ecs_client.describe_clusters(clusters=arns[start:start + ECS_DESCRIBE_BATCH_SIZE], include=['TAGS'])
+            clusters.extend(response.get('clusters', []))
+        return [self.ecs_record(cluster, region, fields) for cluster in clusters]
+
+    def count_ecs(self, region: str, request_id: str,
+                  filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], None]]:
+        """ECS cluster states; clusters are described without tags to keep responses small."""
+        ecs_client = self.aws_clients.get_client('ecs', region)
+        arns = ECS_CLUSTERS.paginate(ecs_client, maxResults=100)
+        for start in range(0, len(arns), ECS_DESCRIBE_BATCH_SIZE):
+            response = ecs_client.describe_clusters(clusters=arns[start:start + ECS_DESCRIBE_BATCH_SIZE])
+            for cluster in response.get('clusters', []):
+                yield cluster.get('status'), None
+
+    def ecs_record(self, cluster: Dict[str, Any], region: str, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        resource = {
+            'resource_id': cluster['clusterName'],
+            'resource_type': 'ECS',
+            'name': cluster['clusterName'],
+            'status': cluster.get('status'),
+            'running_tasks': cluster.get('runningTasksCount'),
+            'active_services': cluster.get('activeServicesCount'),
+            'region': region
+        }
+        if wants(fields, 'tags'):
+            resource['tags'] = _tag_list(cluster.get('tags'))
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'registered_container_instances': cluster.get('registeredContainerInstancesCount'),
+                'pending_tasks': cluster.get('pendingTasksCount'),
+                'capacity_providers': cluster.get('capacityProviders', [])
+            }
+        return project(resource, fields)
+
+    def ecs_details(self, cluster_name: str, region: str, request_id: str) -> Dict[str, Any]:
+        response = self.aws_clients.get_client('ecs', region).describe_clusters(
+            clusters=[cluster_name], include=['TAGS', 'SETTINGS', 'STATISTICS']
+        )
+        if not response.get('clusters'):
+            raise ValueError(f"ECS cluster {cluster_name} not found")
+        return response['clusters'][0]
+
+    # EKS
+
+    def collect_eks(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                    fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get EKS clusters; describe_cluster takes one name, so clusters are described concurrently."""
+        eks_client = self.aws_clients.get_client('eks', region)
+        names = EKS_CLUSTERS.paginate(eks_client, maxResults=100)
+        names = [name for name in names if name.startswith((filters or {}).get('name_prefix', ''))]
+        clusters = _describe_each(names, lambda name: eks_client.describe_cluster(name=name)['cluster'], request_id)
+        return [self.eks_record(cluster, region, fields) for cluster in clusters]
+
+    def count_eks(self, region: str, request_id: str,
+                  filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], None]]:
+        """EKS cluster statuses; list_clusters returns names only, so each cluster is described."""
+        eks_client = self.aws_clients.get_client('eks', region)
+        names = EKS_CLUSTERS.paginate(eks_client, maxResults=100)
+        statuses = _describe_each(names, lambda name: eks_client.describe_cluster(name=name)['cluster'].get('status'),
+                                  request_id)
+        return ((status, None) for status in statuses)
+
+    def eks_record(self, cluster: Dict[str, Any], region: str, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        vpc_config = cluster.get('resourcesVpcConfig', {})
+        resource = {
+            'resource_id': cluster['name'],
+            'resource_type': 'EKS',
+            'name': cluster['name'],
+            'status': cluster.get('status'),
+            'version': cluster.get('version'),
+            'created_date': _isoformat(cluster.get('createdAt')),
+            'region': region
+        }
+        if wants(fields, 'tags'):
+            resource['tags'] = dict(cluster.get('tags', {}))
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'vpc_id': vpc_config.get('vpcId'),
+                'platform_version': cluster.get('platformVersion'),
+                'endpoint_public_access': vpc_config.get('endpointPublicAccess')
+            }
+        return project(resource, fields)
+
+    def eks_details(self, cluster_name: str, region: str, request_id: str) -> Dict[str, Any]:
+        return self.aws_clients.get_client('eks', region).describe_cluster(name=cluster_name)['cluster']
+
+    # DynamoDB
+
+    def collect_dynamodb(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                         fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get DynamoDB tables; describe_table takes one name, so tables are described concurrently."""
+        dynamodb_client = self.aws_clients.get_client('dynamodb', region)
+        names = DYNAMODB_TABLES.paginate(dynamodb_client, Limit=100)
+        names = [name for name in names if name.startswith((filters or {}).get('name_prefix', ''))]
+        tables = _describe_each(names, lambda name: dynamodb_client.describe_table(TableName=name)['Table'],
+                                request_id)
+        return [self.dynamodb_record(table, region, fields) for table in tables]
+
+    def count_dynamodb(self, region: str, request_id: str,
+                       filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], None]]:
+        """DynamoDB table statuses; list_tables returns names only, so each table is described."""
+        dynamodb_client = self.aws_clients.get_client('dynamodb', region)
+        names = DYNAMODB_TABLES.paginate(dynamodb_client, Limit=100)
+        statuses = _describe_each(
+            names, lambda name: dynamodb_client.describe_table(TableName=name)['Table'].get('TableStatus'), request_id
+        )
+        return ((status, None) for status in statuses)
+
+    def dynamodb_record(self, table: Dict[str, Any], region: str, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        throughput = table.get('ProvisionedThroughput', {})
+        resource = {
+            'resource_id': table['TableName'],
+            'resource_type': 'DYNAMODB',
+            'name': table['TableName'],
+            'status': table.get('TableStatus'),
+            'billing_mode': table.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED'),
+            'item_count': table.get('ItemCount'),
+            'created_date': _isoformat(table.get('CreationDateTime')),
+            'region': region,
+            'tags': None
+        }
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'table_size_bytes': table.get('TableSizeBytes'),
+                'read_capacity': throughput.get('ReadCapacityUnits'),
+                'write_capacity': throughput.get('WriteCapacityUnits')
+            }
+        return project(resource, fields)
+
+    def dynamodb_details(self, table_name: str, region: str, request_id: str) -> Dict[str, Any]:
+        return self.aws_clients.get_client('dynamodb', region).describe_table(TableName=table_name)['Table']
+
+    # ElastiCache
+
+    def collect_elasticache(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                            fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get ElastiCache clusters."""
+        elasticache_client = self.aws_clients.get_client('elasticache', region)
+        clusters = ELASTICACHE_CLUSTERS.paginate(elasticache_client, MaxRecords=100)
+        return [self.elasticache_record(cluster, region, fields) for cluster in clusters]
+
+    def count_elasticache(self, region: str, request_id: str,
+                          filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], Optional[str]]]:
+        """ElastiCache cluster statuses and node types."""
+        elasticache_client = self.aws_clients.get_client('elasticache', region)
+        for cluster in ELASTICACHE_CLUSTERS.pages(elasticache_client, MaxRecords=100):
+            yield cluster.get('CacheClusterStatus'), cluster.get('CacheNodeType')
+
+    def elasticache_record(self, cluster: Dict[str, Any], region: str,
+                           fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        resource = {
+            'resource_id': cluster['CacheClusterId'],
+            'resource_type': 'ELASTICACHE',
+            'name': cluster['CacheClusterId'],
+            'status': cluster.get('CacheClusterStatus'),
+            'engine': cluster.get('Engine'),
+            'engine_version': cluster.get('EngineVersion'),
+            'instance_class': cluster.get('CacheNodeType'),
+            'created_date': _isoformat(cluster.get('CacheClusterCreateTime')),
+            'availability_zone': cluster.get('PreferredAvailabilityZone'),
+            'region': region,
+            'tags': None
+        }
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'num_cache_nodes': cluster.get('NumCacheNodes'),
+                'replication_group_id': cluster.get('ReplicationGroupId')
+            }
+        return project(resource, fields)
+
+    def elasticache_details(self, cluster_id: str, region: str, request_id: str) -> Dict[str, Any]:
+        response = self.aws_clients.get_client('elasticache', region).describe_cache_clusters(
+            CacheClusterId=cluster_id, ShowCacheNodeInfo=True
+        )
+        return response['CacheClusters'][0]
+
+    # EBS
+
+    def collect_ebs(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                    fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get EBS volumes, with state and tag filters applied server-side."""
+        filters = filters or {}
+        api_filters = [{'Name': 'status', 'Values': [filters['state']]}] if 'state' in filters else []
+        for key, value in filters.get('tags', {}).items():
+            api_filters.append({'Name': 'tag-key', 'Values': [key]} if value is None
+                               else {'Name': f"tag:{key}", 'Values': [value]})
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        volumes = EBS_VOLUMES.paginate(ec2_client, MaxResults=500,
+                                       **({'Filters': api_filters} if api_filters else {}))
+        return [self.ebs_record(volume, region, fields) for volume in volumes]
+
+    def count_ebs(self, region: str, request_id: str,
+                  filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], None]]:
+        """EBS volume states, with a state filter applied server-side."""
+        api_filters = [{'Name': 'status', 'Values': [filters['state']]}] if 'state' in (filters or {}) else []
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        for volume in EBS_VOLUMES.pages(ec2_client, MaxResults=500,
+                                        **({'Filters': api_filters} if api_filters else {})):
+            yield volume.get('State'), None
+
+    def ebs_record(self, volume: Dict[str, Any], region: str, fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        attachments = volume.get('Attachments', [])
+        resource = {
+            'resource_id': volume['VolumeId'],
+            'resource_type': 'EBS',
+            'name': _name_tag(volume.get('Tags')),
+            'status': volume.get('State'),
+            'volume_type': volume.get('VolumeType'),
+            'size_gb': volume.get('Size'),
+            'created_date': _isoformat(volume.get('CreateTime')),
+            'availability_zone': volume.get('AvailabilityZone'),
+            'region': region
+        }
+        if wants(fields, 'tags'):
+            resource['tags'] = _tag_list(volume.get('Tags'))
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'iops': volume.get('Iops'),
+                'encrypted': volume.get('Encrypted'),
+                'attached_instance': attachments[0].get('InstanceId') if attachments else None
+            }
+        return project(resource, fields)
+
+    def ebs_details(self, volume_id: str, region: str, request_id: str) -> Dict[str, Any]:
+        response = self.aws_clients.get_ec2_client(region).describe_volumes(VolumeIds=[volume_id])
+        if not response.get('Volumes'):
+            raise ValueError(f"EBS volume {volume_id} not found")
+        return response['Volumes'][0]
+
+    # ELB
+
+    def collect_elb(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                    fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get Application, Network and Gateway Load Balancers."""
+        elb_client = self.aws_clients.get_client('elbv2', region)
+        load_balancers = ELB_LOAD_BALANCERS.paginate(elb_client, PageSize=400)
+        return [self.elb_record(load_balancer, region, fields) for load_balancer in load_balancers]
+
+    def count_elb(self, region: str, request_id: str,
+                  filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], None]]:
+        """Load balancer states."""
+        elb_client = self.aws_clients.get_client('elbv2', region)
+        for load_balancer in ELB_LOAD_BALANCERS.pages(elb_client, PageSize=400):
+            yield load_balancer.get('State', {}).get('Code'), None
+
+    def elb_record(self, load_balancer: Dict[str, Any], region: str,
+                   fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        resource = {
+            'resource_id': load_balancer['LoadBalancerName'],
+            'resource_type': 'ELB',
+            'name': load_balancer['LoadBalancerName'],
+            'status': load_balancer.get('State', {}).get('Code'),
+            'load_balancer_type': load_balancer.get('Type'),
+            'scheme': load_balancer.get('Scheme'),
+            'created_date': _isoformat(load_balancer.get('CreatedTime')),
+            'region': region,
+            'tags': None
+        }
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'vpc_id': load_balancer.get('VpcId'),
+                'dns_name': load_balancer.get('DNSName'),
+                'arn': load_balancer.get('LoadBalancerArn')
+            }
+        return project(resource, fields)
+
+    def elb_details(self, name: str, region: str, request_id: str) -> Dict[str, Any]:
+        response = self.aws_clients.get_client('elbv2', region).describe_load_balancers(Names=[name])
+        return response['LoadBalancers'][0]
+
+    # NAT gateways
+
+    def collect_nat_gateways(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                             fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get NAT gateways, with state and VPC filters applied server-side."""
+        filters = filters or {}
+        api_filters = []
+        if 'state' in filters:
+            api_filters.append({'Name': 'state', 'Values': [filters['state']]})
+        if 'vpc_id' in filters:
+            api_filters.append({'Name': 'vpc-id', 'Values': [filters['vpc_id']]})
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        gateways = NAT_GATEWAYS.paginate(ec2_client, MaxResults=1000,
+                                        **({'Filter': api_filters} if api_filters else {}))
+        return [self.nat_gateway_record(gateway, region, fields) for gateway in gateways]
+
+    def count_nat_gateways(self, region: str, request_id: str,
+                           filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Optional[str], None]]:
+        """NAT gateway states, with a state filter applied server-side."""
+        api_filters = [{'Name': 'state', 'Values': [filters['state']]}] if 'state' in (filters or {}) else []
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        for gateway in NAT_GATEWAYS.pages(ec2_client, MaxResults=1000,
+                                         **({'Filter': api_filters} if api_filters else {})):
+            yield gateway.get('State'), None
+
+    def nat_gateway_record(self, gateway: Dict[str, Any], region: str,
+                           fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        addresses = gateway.get('NatGatewayAddresses', [])
+        resource = {
+            'resource_id': gateway['NatGatewayId'],
+            'resource_type': 'NAT_GATEWAY',
+            'name': _name_tag(gateway.get('Tags')),
+            'status': gateway.get('State'),
+            'connectivity_type': gateway.get('ConnectivityType'),
+            'created_date': _isoformat(gateway.get('CreateTime')),
+            'region': region
+        }
+        if wants(fields, 'tags'):
+            resource['tags'] = _tag_list(gateway.get('Tags'))
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'vpc_id': gateway.get('VpcId'),
+                'subnet_id': gateway.get('SubnetId'),
+                'public_ip': addresses[0].get('PublicIp') if addresses else None
+            }
+        return project(resource, fields)
+
+    def nat_gateway_details(self, gateway_id: str, region: str, request_id: str) -> Dict[str, Any]:
+        response = self.aws_clients.get_ec2_client(region).describe_nat_gateways(NatGatewayIds=[gateway_id])
+        if not response.get('NatGateways'):
+            raise ValueError(f"NAT gateway {gateway_id} not found")
+        return response['NatGateways'][0]
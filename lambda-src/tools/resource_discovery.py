@@ -3,27 +3,143 @@ Resource discovery tools for AWS AI Concierge
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from botocore.exceptions import ClientError
 from utils.audit_logger import AuditLogger
+from utils.metric_cache import MetricSeriesCache, summarize
+from utils.inventory_index import InventoryIndex, diff_snapshots, snapshot_summary
+from utils.tag_query import TagQueryEngine
+from utils.resource_graph import RelationshipGraphBuilder
+from utils.collector_registry import CollectorRegistry, CollectorScheduler, Paginator
+from utils.resource_search import ResourceSearchIndex
+from utils.inventory_summary import InventorySummary, SUMMARY_FILTERS, count_resources
+from utils.inventory_filters import (
+    parse_inventory_filters, parse_fields, fields_to_build, wants, ec2_api_filters, matches_filters, project
+)
+from tools.resource_collectors import ResourceCollectors
 
 logger = logging.getLogger(__name__)
 
+# List APIs each collector pages through
+EC2_INSTANCES = Paginator('describe_instances', 'Reservations')
+S3_BUCKETS = Paginator('list_buckets', 'Buckets', 'ContinuationToken', 'ContinuationToken')
+RDS_INSTANCES = Paginator('describe_db_instances', 'DBInstances', 'Marker', 'Marker')
+LAMBDA_FUNCTIONS = Paginator('list_functions', 'Functions', 'Marker', 'NextMarker')
+
+# CloudWatch health metrics per resource type
+HEALTH_METRICS = {
+    'EC2': {
+        'dimension': 'InstanceId',
+        'metrics': {
+            'CPUUtilization': {'namespace': 'AWS/EC2', 'stat': 'Average'},
+            'NetworkIn': {'namespace': 'AWS/EC2', 'stat': 'Sum'},
+            'NetworkOut': {'namespace': 'AWS/EC2', 'stat': 'Sum'},
+            'DiskReadOps': {'namespace': 'AWS/EC2', 'stat': 'Sum'},
+            'DiskWriteOps': {'namespace': 'AWS/EC2', 'stat': 'Sum'}
+        }
+    },
+    'RDS': {
+        'dimension': 'DBInstanceIdentifier',
+        'metrics': {
+            'CPUUtilization': {'namespace': 'AWS/RDS', 'stat': 'Average'},
+            'DatabaseConnections': {'namespace': 'AWS/RDS', 'stat': 'Average'},
+            'FreeableMemory': {'namespace': 'AWS/RDS', 'stat': 'Average'},
+            'FreeStorageSpace': {'namespace': 'AWS/RDS', 'stat': 'Average'},
+            'ReadLatency': {'namespace': 'AWS/RDS', 'stat': 'Average'},
+            'WriteLatency': {'namespace': 'AWS/RDS', 'stat': 'Average'}
+        }
+    },
+    'LAMBDA': {
+        'dimension': 'FunctionName',
+        'metrics': {
+            'Invocations': {'namespace': 'AWS/Lambda', 'stat': 'Sum'},
+            'Errors': {'namespace': 'AWS/Lambda', 'stat': 'Sum'},
+            'Duration': {'namespace': 'AWS/Lambda', 'stat': 'Average'},
+            'Throttles': {'namespace': 'AWS/Lambda', 'stat': 'Sum'},
+            'ConcurrentExecutions': {'namespace': 'AWS/Lambda', 'stat': 'Maximum'}
+        }
+    }
+}
+
+# Largest ID lists accepted by one describe call
+EC2_DESCRIBE_BATCH_SIZE = 1000
+RDS_FILTER_BATCH_SIZE = 100
+# Concurrent per-resource calls (get_function, S3 bucket details, health metrics)
+DETAIL_MAX_WORKERS = 8
+# Values per EC2 filter when hydrating tag query matches
+EC2_FILTER_BATCH_SIZE = 200
+
+# How long a region's relationship graph is reused before it is rebuilt
+GRAPH_MAX_AGE_SECONDS = 300
+RELATIONSHIP_QUERIES = ('neighborhood', 'blast_radius')
+# Largest number of matches searchResources returns
+MAX_SEARCH_RESULTS = 50
+
+_EC2_INSTANCE_ID = re.compile(r'i-[0-9a-f]+')
+# IDs EC2 would reject as InvalidInstanceID.Malformed, failing the whole describe call
+_EC2_INSTANCE_ID_FORMAT = re.compile(r'^i-[0-9a-f]{8,17}$')
+
 
 class ResourceDiscoveryHandler:
     """Handles AWS resource discovery and inventory."""
     
-    def __init__(self, aws_clients):
+    def __init__(self, aws_clients, metric_cache=None, inventory_index=None, search_index=None):
         self.aws_clients = aws_clients
+        self.metric_cache = metric_cache if metric_cache is not None else MetricSeriesCache()
+        self.inventory_index = inventory_index if inventory_index is not None else InventoryIndex(path=None)
+        self.search_index = search_index if search_index is not None else ResourceSearchIndex()
+        self.tag_query = TagQueryEngine(aws_clients)
+        self.graph_builder = RelationshipGraphBuilder(aws_clients)
+        self.relationship_graphs = {}
+        self.collectors = CollectorRegistry()
+        self.scheduler = CollectorScheduler()
+        self._register_collectors()
         self.audit_logger = AuditLogger()
     
+    def _register_collectors(self):
+        """Register the inventory collectors; the order here is the order resources are returned in."""
+        self.collectors.register(
+            'EC2', self._get_ec2_resources, paginator=EC2_INSTANCES,
+            cost_weight=3, health=HEALTH_METRICS['EC2'], details=self._get_ec2_instance_details,
+            batch_details=self._batch_ec2_instance_details, count=self._count_ec2_resources
+        )
+        # One get_bucket_location call per bucket makes S3 the slowest collector
+        self.collectors.register(
+            'S3', lambda scope, request_id, filters=None, fields=None: self._get_s3_resources(request_id, filters, fields),
+            scope='global', paginator=S3_BUCKETS, cost_weight=4,
+            details=lambda bucket, region, request_id: self._get_s3_bucket_details(bucket, request_id),
+            count=lambda scope, request_id, filters=None: self._count_s3_resources(request_id)
+        )
+        self.collectors.register(
+            'RDS', self._get_rds_resources, paginator=RDS_INSTANCES,
+            cost_weight=2, health=HEALTH_METRICS['RDS'], details=self._get_rds_instance_details,
+            batch_details=self._batch_rds_instance_details, count=self._count_rds_resources
+        )
+        self.collectors.register(
+            'LAMBDA', self._get_lambda_resources, paginator=LAMBDA_FUNCTIONS,
+            cost_weight=2, health=HEALTH_METRICS['LAMBDA'], details=self._get_lambda_function_details,
+            count=self._count_lambda_resources
+        )
+        ResourceCollectors(self.aws_clients).register(self.collectors)
+    
     def get_resource_inventory(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
         """
         Get inventory of AWS resources.
         
+        Collectors for the selected types run concurrently across the
+        requested regions.
+        
         Args:
-            params: Parameters including resource_type, region
+            params: Parameters including resource_type, region, regions
+                (comma-separated, defaults to region), optional filters
+                (state, instance_type, tag, vpc_id, name_prefix) and fields.
+                Tag filters are answered through the Resource Groups Tagging API.
+                With count_only, only aggregate counts are returned.
             request_id: Request ID for tracking
             
         Returns:
@@ -34,39 +150,79 @@ class ResourceDiscoveryHandler:
         try:
             resource_type = params.get('resource_type', 'ALL')
             region = params.get('region', 'us-east-1')
+            regions = [r.strip() for r in str(params.get('regions') or region).split(',') if r.strip()]
             
-            resources = []
+            force_refresh = str(params.get('refresh', 'false')).lower() == 'true'
+            filters = parse_inventory_filters(params)
+            if str(params.get('count_only', 'false')).lower() == 'true':
+                return self._get_inventory_summary(resource_type, region, regions, filters, force_refresh, request_id)
             
-            if resource_type in ['EC2', 'ALL']:
-                ec2_resources = self._get_ec2_resources(region, request_id)
-                resources.extend(ec2_resources)
+            fields = parse_fields(params)
+            # Unfiltered collections refresh the index, so they are always built in full
+            collections = self._inventory_collectors(
+                resource_type, regions, request_id, filters, fields_to_build(fields, filters) if filters else None
+            )
+            
+            resources = []
+            sources = {}
+            refresh_summary = {}
+            failures = {}
+            failed_regions = {}
             
-            if resource_type in ['S3', 'ALL']:
-                s3_resources = self._get_s3_resources(request_id)
-                resources.extend(s3_resources)
+            if 'tags' in filters:
+                resource_types = [collector['resource_type'] for collector in self.collectors.select(resource_type)]
+                tagged = self._get_tagged_resources(
+                    resource_types, regions, filters, fields_to_build(fields, filters), request_id
+                )
+                resources = tagged['resources'] if fields is None else [
+                    project(resource, fields) for resource in tagged['resources']
+                ]
+                sources = {collection_type: 'tagging_api' for collection_type in resource_types}
+                failed_regions = tagged['failed_regions']
+                collections = {}
             
-            if resource_type in ['RDS', 'ALL']:
-                rds_resources = self._get_rds_resources(region, request_id)
-                resources.extend(rds_resources)
+            loaded = self._load_collections(collections, force_refresh, request_id, filters)
+            for key in collections:
+                if key in loaded['errors']:
+                    failures[key] = loaded['errors'][key]
+                    continue
+                
+                source, collected, summary = loaded['results'][key]
+                sources[key] = source
+                resources.extend(collected if fields is None else (project(resource, fields) for resource in collected))
+                if summary is not None:
+                    refresh_summary[key] = summary
             
-            if resource_type in ['LAMBDA', 'ALL']:
-                lambda_resources = self._get_lambda_resources(region, request_id)
-                resources.extend(lambda_resources)
+            # Nothing to serve at all: surface the underlying AWS error
+            if collections and len(failures) == len(collections):
+                raise next(iter(failures.values()))
             
             result = {
                 'resource_type': resource_type,
                 'region': region,
                 'resources': resources,
                 'total_count': len(resources),
-                'inventory_date': datetime.utcnow().isoformat()
+                'inventory_date': datetime.utcnow().isoformat(),
+                'inventory_source': sources,
+                'refresh_summary': refresh_summary
             }
+            if len(regions) > 1:
+                result['regions'] = regions
+            if filters:
+                result['filters_applied'] = filters
+            if fields is not None:
+                result['fields'] = sorted(fields)
+            if failures:
+                result['failed_collectors'] = {t: str(e) for t, e in failures.items()}
+            if failed_regions:
+                result['failed_regions'] = failed_regions
             
             # Log resource access activity
             self.audit_logger.log_resource_access(
                 request_id=request_id,
                 resource_type=resource_type,
                 resource_count=len(resources),
-                regions=[region] if region else [],
+                regions=regions,
                 sensitive_data_accessed=False
             )
             
@@ -80,12 +236,535 @@ class ResourceDiscoveryHandler:
             logger.error(f"[{request_id}] Error in resource inventory: {str(e)}")
             raise
     
+    def _get_inventory_summary(self, resource_type: str, region: str, regions: List[str],
+                               filters: Dict[str, Any], force_refresh: bool, request_id: str) -> Dict[str, Any]:
+        """
+        Count resources by type, region, state and instance type.
+        
+        No inventory records are built or returned: fresh indexed collections
+        are counted from the index, and the rest are counted as their describe
+        pages stream in.
+        
+        Returns:
+            Aggregate count tables
+        """
+        unsupported = sorted(set(filters) - set(SUMMARY_FILTERS))
+        if unsupported:
+            raise ValueError(
+                f"count_only supports only the state and instance_type filters, not: {', '.join(unsupported)}"
+            )
+        
+        collections = self._inventory_collectors(resource_type, regions, request_id)
+        tasks = {
+            key: (collector, partial(self._count_collection, collector, collection_type, scope, filters,
+                                     force_refresh, request_id))
+            for key, (collector, collection_type, scope, _) in collections.items()
+        }
+        outcome = self.scheduler.run(tasks, request_id)
+        failures = outcome['errors']
+        
+        # Nothing to count at all: surface the underlying AWS error
+        if collections and len(failures) == len(collections):
+            raise next(iter(failures.values()))
+        
+        summary = InventorySummary()
+        sources = {}
+        for key, (_, collection_type, scope, _) in collections.items():
+            if key in outcome['results']:
+                sources[key], counts = outcome['results'][key]
+                summary.add(collection_type, scope, counts)
+        
+        result = {
+            'resource_type': resource_type,
+            'region': region,
+            'count_only': True,
+            'total_count': summary.total,
+            'counts': summary.tables(),
+            'inventory_date': datetime.utcnow().isoformat(),
+            'inventory_source': sources
+        }
+        if len(regions) > 1:
+            result['regions'] = regions
+        if filters:
+            result['filters_applied'] = filters
+        if failures:
+            result['failed_collectors'] = {t: str(e) for t, e in failures.items()}
+        
+        self.audit_logger.log_resource_access(
+            request_id=request_id,
+            resource_type=resource_type,
+            resource_count=summary.total,
+            regions=regions,
+            sensitive_data_accessed=False
+        )
+        
+        logger.info(f"[{request_id}] Counted {summary.total} resources")
+        return result
+    
+    def _count_collection(self, collector: Dict[str, Any], collection_type: str, scope: str,
+                          filters: Dict[str, Any], force_refresh: bool, request_id: str):
+        """
+        Count one collection, from the index when fresh and otherwise live.
+        
+        Returns:
+            Tuple of (source, Counter keyed by (state, instance_type)); source is
+            'index', 'live' or 'stale'
+        """
+        def indexed():
+            stored = self.inventory_index.query(resource_type=collection_type, scope=scope)
+            return count_resources(
+                ((resource.get('status'), resource.get('instance_type') or resource.get('instance_class'))
+                 for resource in stored),
+                filters
+            )
+        
+        if not force_refresh and self.inventory_index.is_fresh(collection_type, scope):
+            return 'index', indexed()
+        
+        try:
+            return 'live', count_resources(collector['count'](scope, request_id, filters), filters)
+        except Exception as e:
+            logger.warning(f"[{request_id}] Could not count {collection_type} resources in {scope}: {str(e)}")
+            if self.inventory_index.refreshed_at(collection_type, scope) is None:
+                raise
+            return 'stale', indexed()
+    
+    def get_inventory_changes(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        """
+        Get resources added, removed and modified since an earlier point in time.
+        
+        Compares the current inventory against the stored hash snapshot that was
+        current at that time. Details come from the inventory index, so
+        unchanged resources are not re-fetched.
+        
+        Args:
+            params: Parameters including resource_type, region, since_hours
+            request_id: Request ID for tracking
+            
+        Returns:
+            Inventory changes per resource type
+        """
+        logger.info(f"[{request_id}] Starting inventory change detection with params: {params}")
+        
+        try:
+            resource_type = params.get('resource_type', 'ALL')
+            region = params.get('region', 'us-east-1')
+            since_hours = float(params.get('since_hours', 24))
+            if since_hours <= 0:
+                raise ValueError("since_hours must be positive")
+            since = time.time() - since_hours * 3600
+            
+            collections = self._inventory_collectors(resource_type, [region], request_id)
+            loaded = self._load_collections(collections, False, request_id)
+            changes = {}
+            failures = {}
+            totals = {'added': 0, 'removed': 0, 'modified': 0}
+            
+            for collection_type, (_, _, scope, _) in collections.items():
+                if collection_type in loaded['errors']:
+                    failures[collection_type] = loaded['errors'][collection_type]
+                    continue
+                
+                source = loaded['results'][collection_type][0]
+                baseline = self.inventory_index.snapshot_before(collection_type, scope, since)
+                current = self.inventory_index.fingerprints(collection_type, scope)
+                diff = diff_snapshots(baseline['fingerprints'] if baseline else {}, current)
+                
+                modified = []
+                for resource_id in diff['modified']:
+                    record = self.inventory_index.get(collection_type, scope, resource_id)
+                    previous = baseline['summaries'].get(resource_id, {})
+                    current_summary = snapshot_summary(record)
+                    modified.append({
+                        'resource': record,
+                        'changed_fields': {
+                            field: {'before': previous.get(field), 'after': current_summary.get(field)}
+                            for field in sorted(set(previous) | set(current_summary))
+                            if previous.get(field) != current_summary.get(field)
+                        }
+                    })
+                
+                changes[collection_type] = {
+                    'source': source,
+                    'baseline_time': datetime.utcfromtimestamp(baseline['taken_at']).isoformat() if baseline else None,
+                    # Baseline is newer than requested when the collection was first indexed after 'since'
+                    'baseline_covers_window': bool(baseline) and baseline['taken_at'] <= since,
+                    'added': [self.inventory_index.get(collection_type, scope, resource_id) for resource_id in diff['added']],
+                    'removed': [
+                        {'resource_id': resource_id, **baseline['summaries'].get(resource_id, {})}
+                        for resource_id in diff['removed']
+                    ],
+                    'modified': modified,
+                    'unchanged_count': len(current) - len(diff['added']) - len(diff['modified'])
+                }
+                for change_type in totals:
+                    totals[change_type] += len(diff[change_type])
+            
+            if collections and len(failures) == len(collections):
+                raise next(iter(failures.values()))
+            
+            result = {
+                'resource_type': resource_type,
+                'region': region,
+                'since': datetime.utcfromtimestamp(since).isoformat(),
+                'changes': changes,
+                'summary': totals,
+                'total_changes': sum(totals.values()),
+                'analysis_date': datetime.utcnow().isoformat()
+            }
+            if failures:
+                result['failed_collectors'] = {t: str(e) for t, e in failures.items()}
+            
+            self.audit_logger.log_resource_access(
+                request_id=request_id,
+                resource_type=resource_type,
+                resource_count=result['total_changes'],
+                regions=[region] if region else [],
+                sensitive_data_accessed=False
+            )
+            
+            logger.info(f"[{request_id}] Found {result['total_changes']} inventory changes since {result['since']}")
+            return result
+            
+        except ClientError as e:
+            logger.error(f"[{request_id}] AWS error in inventory change detection: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"[{request_id}] Error in inventory change detection: {str(e)}")
+            raise
+    
+    def get_resource_relationships(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        """
+        Get the resources related to one resource from the region's relationship graph.
+        
+        The graph links EC2 instances, network interfaces, EBS volumes, security
+        groups, subnets, VPCs, RDS instances and Lambda VPC configs. It is built
+        in one pass of batched describe calls and reused for GRAPH_MAX_AGE_SECONDS,
+        so follow-up questions are answered in memory.
+        
+        Args:
+            params: Parameters including resource_id, resource_type (to disambiguate
+                RDS and Lambda names), region, query ('neighborhood' or
+                'blast_radius'), depth, refresh
+            request_id: Request ID for tracking
+            
+        Returns:
+            The resource, its related resources with their distance, and the
+            relationships traversed
+        """
+        logger.info(f"[{request_id}] Starting resource relationship query with params: {params}")
+        
+        try:
+            resource_id = params.get('resource_id')
+            if not resource_id:
+                raise ValueError("resource_id is required")
+            resource_type = params.get('resource_type')
+            region = params.get('region', 'us-east-1')
+            query = params.get('query', 'neighborhood')
+            if query not in RELATIONSHIP_QUERIES:
+                raise ValueError(f"query must be one of {', '.join(RELATIONSHIP_QUERIES)}")
+            # Blast radius follows dependents all the way out unless limited
+            default_depth = 1 if query == 'neighborhood' else None
+            depth = int(params['depth']) if params.get('depth') not in (None, '') else default_depth
+            if depth is not None and depth < 1:
+                raise ValueError("depth must be at least 1")
+            refresh = str(params.get('refresh', False)).lower() == 'true'
+            
+            graph = self.relationship_graphs.get(region)
+            if refresh or graph is None or time.time() - graph.built_at > GRAPH_MAX_AGE_SECONDS:
+                graph = self.graph_builder.build(region, request_id)
+                self.relationship_graphs[region] = graph
+            
+            nodes = graph.find(resource_id, resource_type)
+            if not nodes:
+                raise ValueError(f"Resource {resource_id} not found in the {region} relationship graph")
+            if len(nodes) > 1:
+                raise ValueError(f"Several resources are named {resource_id}; specify resource_type")
+            
+            if query == 'neighborhood':
+                related = graph.neighborhood(nodes[0], depth)
+            else:
+                related = graph.blast_radius(nodes[0], depth)
+            
+            by_type = {}
+            for resource in related['resources']:
+                by_type[resource['resource_type']] = by_type.get(resource['resource_type'], 0) + 1
+            
+            result = {
+                'resource': graph.describe(nodes[0]),
+                'region': region,
+                'query': query,
+                'depth': depth,
+                'related_resources': related['resources'],
+                'relationships': related['edges'],
+                'total_related': len(related['resources']),
+                'related_by_type': by_type,
+                'graph': {
+                    'built_at': datetime.utcfromtimestamp(graph.built_at).isoformat(),
+                    'resource_count': graph.node_count,
+                    'relationship_count': graph.edge_count
+                },
+                'analysis_date': datetime.utcnow().isoformat()
+            }
+            if graph.failed_collectors:
+                result['failed_collectors'] = graph.failed_collectors
+            
+            self.audit_logger.log_resource_access(
+                request_id=request_id,
+                resource_type=graph.describe(nodes[0])['resource_type'],
+                resource_count=result['total_related'],
+                regions=[region],
+                sensitive_data_accessed=False
+            )
+            
+            logger.info(f"[{request_id}] Found {result['total_related']} resources related to {resource_id}")
+            return result
+            
+        except ClientError as e:
+            logger.error(f"[{request_id}] AWS error in resource relationship query: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"[{request_id}] Error in resource relationship query: {str(e)}")
+            raise
+    
+    def search_resources(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        """
+        Find resources by loose references: names, tag values and partial IDs.
+        
+        Inventory collections are indexed for search when they are loaded and
+        re-indexed only after the inventory refreshes them, so a warm search
+        makes no AWS calls.
+        
+        Args:
+            params: Parameters including query, resource_type, region, regions
+                (comma-separated), limit, refresh
+            request_id: Request ID for tracking
+            
+        Returns:
+            Best matches with the resource_id, resource_type and region that
+            getResourceDetails takes
+        """
+        logger.info(f"[{request_id}] Starting resource search with params: {params}")
+        
+        try:
+            query = str(params.get('query') or '').strip()
+            if not query:
+                raise ValueError("query is required")
+            resource_type = params.get('resource_type', 'ALL')
+            region = params.get('region', 'us-east-1')
+            regions = [r.strip() for r in str(params.get('regions') or region).split(',') if r.strip()]
+            limit = min(max(int(params.get('limit', 10)), 1), MAX_SEARCH_RESULTS)
+            force_refresh = str(params.get('refresh', 'false')).lower() == 'true'
+            
+            collections = self._inventory_collectors(resource_type, regions, request_id)
+            sources = {}
+            stale = {}
+            for key, (collector, collection_type, scope, collect) in collections.items():
+                refreshed_at = self.inventory_index.refreshed_at(collection_type, scope)
+                if (not force_refresh and refreshed_at is not None
+                        and self.inventory_index.is_fresh(collection_type, scope)
+                        and self.search_index.version(collection_type, scope) == refreshed_at):
+                    sources[key] = 'warm'
+                else:
+                    stale[key] = (collector, collection_type, scope, collect)
+            
+            failures = {}
+            loaded = self._load_collections(stale, force_refresh, request_id)
+            for key, (_, collection_type, scope, _) in stale.items():
+                if key in loaded['errors']:
+                    failures[key] = loaded['errors'][key]
+                    continue
+                source, resources, _ = loaded['results'][key]
+                sources[key] = source
+                self.search_index.replace_collection(
+                    collection_type, scope, resources, self.inventory_index.refreshed_at(collection_type, scope)
+                )
+            
+            if collections and len(failures) == len(collections):
+                raise next(iter(failures.values()))
+            
+            start = time.perf_counter()
+            found = self.search_index.search(
+                query, limit,
+                resource_type=None if resource_type == 'ALL' else resource_type,
+                region=regions[0] if len(regions) == 1 else None
+            )
+            search_ms = (time.perf_counter() - start) * 1000
+            
+            result = {
+                'query': query,
+                'resource_type': resource_type,
+                'region': region,
+                'matches': found['matches'],
+                'total_matches': found['total_matches'],
+                'search_time_ms': round(search_ms, 3),
+                'indexed_resources': self.search_index.document_count,
+                'index_source': sources
+            }
+            if failures:
+                result['failed_collectors'] = {key: str(e) for key, e in failures.items()}
+            
+            self.audit_logger.log_resource_access(
+                request_id=request_id,
+                resource_type=resource_type,
+                resource_count=len(found['matches']),
+                regions=regions,
+                sensitive_data_accessed=False
+            )
+            
+            logger.info(f"[{request_id}] Search for '{query}' found {found['total_matches']} resources "
+                        f"in {search_ms:.3f}ms")
+            return result
+            
+        except ClientError as e:
+            logger.error(f"[{request_id}] AWS error in resource search: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"[{request_id}] Error in resource search: {str(e)}")
+            raise
+    
+    def _get_tagged_resources(self, resource_types: List[str], regions: List[str], filters: Dict[str, Any],
+                              fields: Optional[Set[str]], request_id: str) -> Dict[str, Any]:
+        """
+        Find resources by tag, then describe only the matches.
+        
+        Returns:
+            Dictionary with 'resources' (inventory records carrying the tags
+            reported by the tagging API) and 'failed_regions'
+        """
+        found = self.tag_query.find(filters['tags'], resource_types, regions, request_id)
+        
+        grouped = {}
+        for match in found['matches']:
+            grouped.setdefault((match['resource_type'], match['region']), {})[match['resource_id']] = match
+        
+        resources = []
+        for (collection_type, region), matched in grouped.items():
+            resource_ids = list(matched)
+            if collection_type == 'EC2':
+                ec2_client = self.aws_clients.get_ec2_client(region)
+                records = []
+                for start in range(0, len(resource_ids), EC2_FILTER_BATCH_SIZE):
+                    # An instance-id filter skips instances terminated since tagging instead of failing
+                    response = ec2_client.describe_instances(Filters=[
+                        {'Name': 'instance-id', 'Values': resource_ids[start:start + EC2_FILTER_BATCH_SIZE]}
+                    ])
+                    records.extend(
+                        self._ec2_inventory_record(instance, region, fields)
+                        for reservation in response['Reservations'] for instance in reservation['Instances']
+                    )
+            elif collection_type == 'RDS':
+                details, _ = self._batch_rds_instance_details(resource_ids, region, request_id)
+                records = [self._rds_inventory_record(db_instance, region, fields) for db_instance in details.values()]
+            elif collection_type == 'LAMBDA':
+                lambda_client = self.aws_clients.get_lambda_client(region)
+                details, _ = self._concurrent_details(
+                    resource_ids, lambda name: lambda_client.get_function(FunctionName=name)['Configuration']
+                )
+                records = [self._lambda_inventory_record(function, region, fields) for function in details.values()]
+            elif collection_type == 'S3':
+                # The tagging API already says everything the bucket inventory would
+                records = [project({
+                    'resource_id': bucket,
+                    'resource_type': 'S3',
+                    'name': bucket,
+                    'status': 'active',
+                    'created_date': None,
+                    'region': region,
+                    'metadata': {'bucket_type': 'standard'}
+                }, fields) for bucket in resource_ids]
+            else:
+                # Other collectors list the region once and keep the matches
+                collect = self.collectors.get(collection_type)['collect']
+                records = [record for record in collect(region, request_id, None, fields)
+                           if record['resource_id'] in matched]
+            
+            for record in records:
+                record['tags'] = matched[record['resource_id']]['tags']
+                record['arn'] = matched[record['resource_id']]['arn']
+                if matches_filters(record, filters):
+                    resources.append(record)
+        
+        return {'resources': resources, 'failed_regions': found['failed_regions']}
+    
+    def _inventory_collectors(self, resource_type: str, regions: List[str], request_id: str,
+                              filters: Optional[Dict[str, Any]] = None,
+                              fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """
+        Map each requested collection to its collector.
+        
+        Returns:
+            Collection key -> (collector, resource type, scope, collect callable).
+            Keys are resource types, or 'TYPE:region' for regional types when
+            several regions are requested.
+        """
+        collections = {}
+        for collector in self.collectors.select(resource_type):
+            collection_type = collector['resource_type']
+            scopes = ['global'] if collector['scope'] == 'global' else regions
+            for scope in scopes:
+                key = collection_type if len(scopes) == 1 else f"{collection_type}:{scope}"
+                collections[key] = (
+                    collector, collection_type, scope, partial(collector['collect'], scope, request_id, filters, fields)
+                )
+        return collections
+    
+    def _load_collections(self, collections: Dict[str, Any], force_refresh: bool, request_id: str,
+                          filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Load collections concurrently through the collector scheduler.
+        
+        Returns:
+            Dictionary with 'results' (key -> _load_collection result) and 'errors' (key -> exception)
+        """
+        tasks = {
+            key: (collector, partial(self._load_collection, collection_type, scope, collect, force_refresh,
+                                     request_id, filters))
+            for key, (collector, collection_type, scope, collect) in collections.items()
+        }
+        return self.scheduler.run(tasks, request_id)
+    
+    def _load_collection(self, collection_type: str, scope: str, collect, force_refresh: bool, request_id: str,
+                         filters: Optional[Dict[str, Any]] = None):
+        """
+        Serve one collection from the index, refreshing it when stale.
+        
+        Filtered live collections only return matching records, so they are
+        not written to the index.
+        
+        Returns:
+            Tuple of (source, resources, refresh counts or None); source is
+            'index', 'live' or 'stale'. Raises if the collection could not be
+            refreshed and was never indexed.
+        """
+        filters = filters or {}
+        
+        def indexed():
+            stored = self.inventory_index.query(resource_type=collection_type, scope=scope, tags=filters.get('tags'))
+            return [resource for resource in stored if matches_filters(resource, filters)]
+        
+        if not force_refresh and self.inventory_index.is_fresh(collection_type, scope):
+            return 'index', indexed(), None
+        
+        try:
+            collected = collect()
+        except Exception as e:
+            logger.warning(f"[{request_id}] Could not refresh {collection_type} resources in {scope}: {str(e)}")
+            if self.inventory_index.refreshed_at(collection_type, scope) is None:
+                raise
+            return 'stale', indexed(), None
+        
+        if filters:
+            return 'live', [resource for resource in collected if matches_filters(resource, filters)], None
+        return 'live', collected, self.inventory_index.sync(collection_type, scope, collected)
+    
     def get_resource_details(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
         """
         Get detailed information about a specific resource.
         
         Args:
-            params: Parameters including resource_id, resource_type, region
+            params: Parameters including resource_id (or resource_ids for a
+                batch of one type), resource_type, region
             request_id: Request ID for tracking
             
         Returns:
@@ -93,6 +772,9 @@ class ResourceDiscoveryHandler:
         """
         logger.info(f"[{request_id}] Getting resource details with params: {params}")
         
+        if params.get('resource_ids'):
+            return self._get_resource_details_batch(params, request_id)
+        
         try:
             resource_id = params.get('resource_id')
             resource_type = params.get('resource_type')
@@ -102,19 +784,13 @@ class ResourceDiscoveryHandler:
             if not resource_id or not resource_type:
                 raise ValueError("resource_id and resource_type are required")
             
-            if resource_type == 'EC2':
-                details = self._get_ec2_instance_details(resource_id, region, request_id)
-            elif resource_type == 'S3':
-                details = self._get_s3_bucket_details(resource_id, request_id)
-            elif resource_type == 'RDS':
-                details = self._get_rds_instance_details(resource_id, region, request_id)
-            elif resource_type == 'LAMBDA':
-                details = self._get_lambda_function_details(resource_id, region, request_id)
-            else:
+            collector = self.collectors.get(resource_type)
+            if collector is None or collector['details'] is None:
                 raise ValueError(f"Unsupported resource type: {resource_type}")
+            details = collector['details'](resource_id, region, request_id)
             
             # Add health metrics if requested
-            if include_health and resource_type in ['EC2', 'RDS', 'LAMBDA']:
+            if include_health and collector['health']:
                 health_metrics = self._get_resource_health_metrics(
                     resource_id, resource_type, region, request_id
                 )
@@ -138,6 +814,154 @@ class ResourceDiscoveryHandler:
             logger.error(f"[{request_id}] Error getting resource details: {str(e)}")
             raise
     
+    def _get_resource_details_batch(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+        """
+        Get details for many resources of one type with as few API calls as possible.
+        
+        EC2 instances are described up to 1000 IDs per call and RDS instances
+        through db-instance-id filters; other types are fetched concurrently. A missing or inaccessible ID is reported in
+        'errors' without failing the others.
+        
+        Args:
+            params: Parameters including resource_ids (list or comma-separated),
+                resource_type, region, include_health
+            request_id: Request ID for tracking
+            
+        Returns:
+            Map of resource ID to details, plus per-ID errors
+        """
+        try:
+            resource_ids = params['resource_ids']
+            if not isinstance(resource_ids, list):
+                resource_ids = str(resource_ids).split(',')
+            # De-duplicate, keeping the requested order
+            resource_ids = list(dict.fromkeys(str(r).strip() for r in resource_ids if str(r).strip()))
+            resource_type = params.get('resource_type')
+            region = params.get('region', 'us-east-1')
+            include_health = str(params.get('include_health', True)).lower() == 'true'
+            
+            if not resource_ids or not resource_type:
+                raise ValueError("resource_ids and resource_type are required")
+            
+            collector = self.collectors.get(resource_type)
+            if collector is None or collector['details'] is None:
+                raise ValueError(f"Unsupported resource type: {resource_type}")
+            if collector['batch_details'] is not None:
+                details, errors = collector['batch_details'](resource_ids, region, request_id)
+            else:
+                details, errors = self._concurrent_details(
+                    resource_ids, lambda resource_id: collector['details'](resource_id, region, request_id)
+                )
+            
+            if include_health and collector['health'] and details:
+                health, _ = self._concurrent_details(
+                    list(details),
+                    lambda resource_id: self._get_resource_health_metrics(resource_id, resource_type, region, request_id)
+                )
+                for resource_id, health_metrics in health.items():
+                    details[resource_id]['health_metrics'] = health_metrics
+            
+            result = {
+                'resource_type': resource_type,
+                'region': region,
+                'resource_ids': resource_ids,
+                'details': {resource_id: details[resource_id] for resource_id in resource_ids if resource_id in details},
+                'errors': {resource_id: errors[resource_id] for resource_id in resource_ids if resource_id in errors},
+                'found_count': len(details),
+                'error_count': len(errors),
+                'retrieved_at': datetime.utcnow().isoformat()
+            }
+            
+            logger.info(f"[{request_id}] Retrieved details for {len(details)} of {len(resource_ids)} {resource_type} resources")
+            return result
+            
+        except ClientError as e:
+            logger.error(f"[{request_id}] AWS error getting resource details: {str(e)}")
+            raise
+        except Exception as e:
+            logger.error(f"[{request_id}] Error getting resource details: {str(e)}")
+            raise
+    
+    def _batch_ec2_instance_details(self, instance_ids: List[str], region: str, request_id: str):
+        """
+        Describe EC2 instances in batches, retrying a batch without IDs EC2 reports as invalid.
+        
+        Malformed IDs are reported without being sent, so they cannot fail a batch.
+        """
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        details, errors = {}, {}
+        for instance_id in instance_ids:
+            if not _EC2_INSTANCE_ID_FORMAT.fullmatch(instance_id):
+                errors[instance_id] = {'error_code': 'InvalidInstanceID.Malformed',
+                                       'message': f"Invalid instance ID: {instance_id}"}
+        well_formed = [instance_id for instance_id in instance_ids if instance_id not in errors]
+        
+        for start in range(0, len(well_formed), EC2_DESCRIBE_BATCH_SIZE):
+            batch = well_formed[start:start + EC2_DESCRIBE_BATCH_SIZE]
+            while batch:
+                try:
+                    response = ec2_client.describe_instances(InstanceIds=batch)
+                except ClientError as e:
+                    code = e.response['Error']['Code']
+                    invalid = [i for i in _EC2_INSTANCE_ID.findall(e.response['Error'].get('Message', '')) if i in batch]
+                    if not code.startswith('InvalidInstanceID') or not invalid:
+                        raise
+                    for instance_id in invalid:
+                        errors[instance_id] = {'error_code': code, 'message': f"Instance {instance_id} not found"}
+                    batch = [i for i in batch if i not in invalid]
+                    continue
+                
+                for reservation in response['Reservations']:
+                    for instance in reservation['Instances']:
+                        details[instance['InstanceId']] = self._ec2_instance_detail(instance)
+                break
+        
+        for instance_id in instance_ids:
+            if instance_id not in details and instance_id not in errors:
+                errors[instance_id] = {'error_code': 'NotFound', 'message': f"Instance {instance_id} not found"}
+        return details, errors
+    
+    def _batch_rds_instance_details(self, db_identifiers: List[str], region: str, request_id: str):
+        """Describe RDS instances through db-instance-id filters, which skip missing IDs instead of failing."""
+        rds_client = self.aws_clients.get_rds_client(region)
+        details = {}
+        
+        for start in range(0, len(db_identifiers), RDS_FILTER_BATCH_SIZE):
+            kwargs = {'Filters': [{'Name': 'db-instance-id', 'Values': db_identifiers[start:start + RDS_FILTER_BATCH_SIZE]}]}
+            while True:
+                response = rds_client.describe_db_instances(**kwargs)
+                for db_instance in response.get('DBInstances', []):
+                    details[db_instance['DBInstanceIdentifier']] = db_instance
+                if not response.get('Marker'):
+                    break
+                kwargs['Marker'] = response['Marker']
+        
+        errors = {
+            db_identifier: {'error_code': 'DBInstanceNotFound', 'message': f"RDS instance {db_identifier} not found"}
+            for db_identifier in db_identifiers if db_identifier not in details
+        }
+        return details, errors
+    
+    def _concurrent_details(self, resource_ids: List[str], fetch):
+        """Run a per-resource fetch concurrently, collecting results and per-ID errors."""
+        details, errors = {}, {}
+        
+        def attempt(resource_id):
+            try:
+                return resource_id, fetch(resource_id), None
+            except ClientError as e:
+                return resource_id, None, {'error_code': e.response['Error']['Code'], 'message': str(e)}
+            except Exception as e:
+                return resource_id, None, {'error_code': type(e).__name__, 'message': str(e)}
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(DETAIL_MAX_WORKERS, len(resource_ids)))) as executor:
+            for resource_id, detail, error in executor.map(attempt, resource_ids):
+                if error is None:
+                    details[resource_id] = detail
+                else:
+                    errors[resource_id] = error
+        return details, errors
+    
     def get_resource_health_status(self, params: Dict[str, Any], request_id: str) -> Dict[str, Any]:
         """
         Get health status and metrics for a specific resource.
@@ -190,146 +1014,176 @@ class ResourceDiscoveryHandler:
             logger.error(f"[{request_id}] Error getting resource health: {str(e)}")
             raise
     
-    def _get_ec2_resources(self, region: str, request_id: str) -> List[Dict[str, Any]]:
-        """Get EC2 instances in the specified region."""
-        try:
-            ec2_client = self.aws_clients.get_ec2_client(region)
-            response = ec2_client.describe_instances()
-            
-            resources = []
-            for reservation in response['Reservations']:
-                for instance in reservation['Instances']:
-                    resource = {
-                        'resource_id': instance['InstanceId'],
-                        'resource_type': 'EC2',
-                        'name': self._get_resource_name(instance.get('Tags', [])),
-                        'status': instance['State']['Name'],
-                        'instance_type': instance['InstanceType'],
-                        'launch_time': instance.get('LaunchTime', '').isoformat() if instance.get('LaunchTime') else None,
-                        'region': region,
-                        'availability_zone': instance.get('Placement', {}).get('AvailabilityZone'),
-                        'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
-                        'metadata': {
-                            'vpc_id': instance.get('VpcId'),
-                            'subnet_id': instance.get('SubnetId'),
-                            'security_groups': [sg['GroupName'] for sg in instance.get('SecurityGroups', [])],
-                            'public_ip': instance.get('PublicIpAddress'),
-                            'private_ip': instance.get('PrivateIpAddress')
-                        }
-                    }
-                    resources.append(resource)
-            
-            return resources
-            
-        except Exception as e:
-            logger.warning(f"[{request_id}] Could not get EC2 resources in {region}: {str(e)}")
-            return []
-    
-    def _get_s3_resources(self, request_id: str) -> List[Dict[str, Any]]:
+    def _get_ec2_resources(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                           fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get EC2 instances in the specified region, filtered server-side."""
+        filters = filters or {}
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        api_filters = ec2_api_filters(filters)
+        reservations = EC2_INSTANCES.paginate(ec2_client, **({'Filters': api_filters} if api_filters else {}))
+        
+        return [
+            self._ec2_inventory_record(instance, region, fields)
+            for reservation in reservations for instance in reservation['Instances']
+        ]
+
+    def _count_ec2_resources(self, region: str, request_id: str,
+                             filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, str]]:
+        """EC2 instance states and types, filtered server-side."""
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        api_filters = ec2_api_filters(filters or {})
+        for reservation in EC2_INSTANCES.pages(ec2_client, MaxResults=1000,
+                                               **({'Filters': api_filters} if api_filters else {})):
+            for instance in reservation['Instances']:
+                yield instance['State']['Name'], instance['InstanceType']
+
+    def _ec2_inventory_record(self, instance: Dict[str, Any], region: str,
+                              fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Inventory record for one describe_instances instance."""
+        resource = {
+            'resource_id': instance['InstanceId'],
+            'resource_type': 'EC2',
+            'name': self._get_resource_name(instance.get('Tags', [])),
+            'status': instance['State']['Name'],
+            'instance_type': instance['InstanceType'],
+            'launch_time': instance.get('LaunchTime', '').isoformat() if instance.get('LaunchTime') else None,
+            'availability_zone': instance.get('Placement', {}).get('AvailabilityZone'),
+            'region': region
+        }
+        if wants(fields, 'tags'):
+            resource['tags'] = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'vpc_id': instance.get('VpcId'),
+                'subnet_id': instance.get('SubnetId'),
+                'security_groups': [sg['GroupName'] for sg in instance.get('SecurityGroups', [])],
+                'public_ip': instance.get('PublicIpAddress'),
+                'private_ip': instance.get('PrivateIpAddress')
+            }
+        return project(resource, fields)
+
+    def _get_s3_resources(self, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                          fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
         """Get S3 buckets (global service)."""
-        try:
-            s3_client = self.aws_clients.get_s3_client()
-            response = s3_client.list_buckets()
+        filters = filters or {}
+        s3_client = self.aws_clients.get_s3_client()
+        resources = []
+        for bucket in S3_BUCKETS.pages(s3_client):
+            # Skip the per-bucket location call for buckets the filters already exclude
+            if not bucket['Name'].startswith(filters.get('name_prefix', '')):
+                continue
             
-            resources = []
-            for bucket in response.get('Buckets', []):
-                # Get bucket location
+            region = None
+            if wants(fields, 'region'):
                 try:
                     location_response = s3_client.get_bucket_location(Bucket=bucket['Name'])
                     region = location_response.get('LocationConstraint') or 'us-east-1'
                 except:
                     region = 'unknown'
-                
-                resource = {
-                    'resource_id': bucket['Name'],
-                    'resource_type': 'S3',
-                    'name': bucket['Name'],
-                    'status': 'active',
-                    'created_date': bucket.get('CreationDate', '').isoformat() if bucket.get('CreationDate') else None,
-                    'region': region,
-                    'tags': {},  # Would need separate API call to get tags
-                    'metadata': {
-                        'bucket_type': 'standard'
-                    }
-                }
-                resources.append(resource)
-            
-            return resources
             
-        except Exception as e:
-            logger.warning(f"[{request_id}] Could not get S3 resources: {str(e)}")
-            return []
-    
-    def _get_rds_resources(self, region: str, request_id: str) -> List[Dict[str, Any]]:
-        """Get RDS instances in the specified region."""
-        try:
-            rds_client = self.aws_clients.get_rds_client(region)
-            response = rds_client.describe_db_instances()
-            
-            resources = []
-            for db_instance in response.get('DBInstances', []):
-                resource = {
-                    'resource_id': db_instance['DBInstanceIdentifier'],
-                    'resource_type': 'RDS',
-                    'name': db_instance['DBInstanceIdentifier'],
-                    'status': db_instance['DBInstanceStatus'],
-                    'engine': db_instance['Engine'],
-                    'engine_version': db_instance['EngineVersion'],
-                    'instance_class': db_instance['DBInstanceClass'],
-                    'created_date': db_instance.get('InstanceCreateTime', '').isoformat() if db_instance.get('InstanceCreateTime') else None,
-                    'region': region,
-                    'availability_zone': db_instance.get('AvailabilityZone'),
-                    'tags': {},  # Would need separate API call to get tags
-                    'metadata': {
-                        'allocated_storage': db_instance.get('AllocatedStorage'),
-                        'storage_type': db_instance.get('StorageType'),
-                        'multi_az': db_instance.get('MultiAZ'),
-                        'publicly_accessible': db_instance.get('PubliclyAccessible'),
-                        'vpc_id': db_instance.get('DBSubnetGroup', {}).get('VpcId')
-                    }
+            resource = {
+                'resource_id': bucket['Name'],
+                'resource_type': 'S3',
+                'name': bucket['Name'],
+                'status': 'active',
+                'created_date': bucket.get('CreationDate', '').isoformat() if bucket.get('CreationDate') else None,
+                'region': region,
+                'tags': None,
+                'metadata': {
+                    'bucket_type': 'standard'
                 }
-                resources.append(resource)
-            
-            return resources
-            
-        except Exception as e:
-            logger.warning(f"[{request_id}] Could not get RDS resources in {region}: {str(e)}")
-            return []
-    
-    def _get_lambda_resources(self, region: str, request_id: str) -> List[Dict[str, Any]]:
+            }
+            resources.append(project(resource, fields))
+        
+        return resources
+
+    def _count_s3_resources(self, request_id: str) -> Iterator[Tuple[str, None]]:
+        """S3 buckets, without the per-bucket location calls."""
+        for _ in S3_BUCKETS.pages(self.aws_clients.get_s3_client()):
+            yield 'active', None
+
+    def _get_rds_resources(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                           fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Get RDS instances in the specified region."""
+        rds_client = self.aws_clients.get_rds_client(region)
+        # describe_db_instances has no filters for state, class, VPC or name prefix; they are applied by the caller
+        db_instances = RDS_INSTANCES.paginate(rds_client)
+        
+        return [self._rds_inventory_record(db_instance, region, fields) for db_instance in db_instances]
+
+    def _count_rds_resources(self, region: str, request_id: str,
+                             filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, str]]:
+        """RDS instance statuses and classes."""
+        rds_client = self.aws_clients.get_rds_client(region)
+        for db_instance in RDS_INSTANCES.pages(rds_client, MaxRecords=100):
+            yield db_instance['DBInstanceStatus'], db_instance['DBInstanceClass']
+
+    def _rds_inventory_record(self, db_instance: Dict[str, Any], region: str,
+                              fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Inventory record for one describe_db_instances instance."""
+        resource = {
+            'resource_id': db_instance['DBInstanceIdentifier'],
+            'resource_type': 'RDS',
+            'name': db_instance['DBInstanceIdentifier'],
+            'status': db_instance['DBInstanceStatus'],
+            'engine': db_instance['Engine'],
+            'engine_version': db_instance['EngineVersion'],
+            'instance_class': db_instance['DBInstanceClass'],
+            'created_date': db_instance.get('InstanceCreateTime', '').isoformat() if db_instance.get('InstanceCreateTime') else None,
+            'availability_zone': db_instance.get('AvailabilityZone'),
+            'region': region,
+            'tags': None
+        }
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'allocated_storage': db_instance.get('AllocatedStorage'),
+                'storage_type': db_instance.get('StorageType'),
+                'multi_az': db_instance.get('MultiAZ'),
+                'publicly_accessible': db_instance.get('PubliclyAccessible'),
+                'vpc_id': db_instance.get('DBSubnetGroup', {}).get('VpcId')
+            }
+        return project(resource, fields)
+
+    def _get_lambda_resources(self, region: str, request_id: str, filters: Optional[Dict[str, Any]] = None,
+                              fields: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
         """Get Lambda functions in the specified region."""
-        try:
-            lambda_client = self.aws_clients.get_lambda_client(region)
-            response = lambda_client.list_functions()
-            
-            resources = []
-            for function in response.get('Functions', []):
-                resource = {
-                    'resource_id': function['FunctionName'],
-                    'resource_type': 'LAMBDA',
-                    'name': function['FunctionName'],
-                    'status': function.get('State', 'Active'),
-                    'runtime': function['Runtime'],
-                    'handler': function['Handler'],
-                    'last_modified': function.get('LastModified'),
-                    'region': region,
-                    'tags': {},  # Would need separate API call to get tags
-                    'metadata': {
-                        'memory_size': function.get('MemorySize'),
-                        'timeout': function.get('Timeout'),
-                        'code_size': function.get('CodeSize'),
-                        'role': function.get('Role'),
-                        'vpc_config': function.get('VpcConfig')
-                    }
-                }
-                resources.append(resource)
-            
-            return resources
-            
-        except Exception as e:
-            logger.warning(f"[{request_id}] Could not get Lambda resources in {region}: {str(e)}")
-            return []
-    
+        lambda_client = self.aws_clients.get_lambda_client(region)
+        # list_functions has no server-side filters; they are applied by the caller
+        functions = LAMBDA_FUNCTIONS.paginate(lambda_client)
+        
+        return [self._lambda_inventory_record(function, region, fields) for function in functions]
+
+    def _count_lambda_resources(self, region: str, request_id: str,
+                                filters: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, None]]:
+        """Lambda function states."""
+        lambda_client = self.aws_clients.get_lambda_client(region)
+        for function in LAMBDA_FUNCTIONS.pages(lambda_client, MaxItems=50):
+            yield function.get('State', 'Active'), None
+
+    def _lambda_inventory_record(self, function: Dict[str, Any], region: str,
+                                 fields: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Inventory record for one Lambda function configuration."""
+        resource = {
+            'resource_id': function['FunctionName'],
+            'resource_type': 'LAMBDA',
+            'name': function['FunctionName'],
+            'status': function.get('State', 'Active'),
+            'runtime': function['Runtime'],
+            'handler': function['Handler'],
+            'last_modified': function.get('LastModified'),
+            'region': region,
+            'tags': None
+        }
+        if wants(fields, 'metadata'):
+            resource['metadata'] = {
+                'memory_size': function.get('MemorySize'),
+                'timeout': function.get('Timeout'),
+                'code_size': function.get('CodeSize'),
+                'role': function.get('Role'),
+                'vpc_config': function.get('VpcConfig')
+            }
+        return project(resource, fields)
+
     def _get_ec2_instance_details(self, instance_id: str, region: str, request_id: str) -> Dict[str, Any]:
         """Get detailed information about an EC2 instance."""
         ec2_client = self.aws_clients.get_ec2_client(region)
@@ -338,8 +1192,10 @@ class ResourceDiscoveryHandler:
         if not response['Reservations']:
             raise ValueError(f"Instance {instance_id} not found")
         
-        instance = response['Reservations'][0]['Instances'][0]
-        
+        return self._ec2_instance_detail(response['Reservations'][0]['Instances'][0])
+    
+    def _ec2_instance_detail(self, instance: Dict[str, Any]) -> Dict[str, Any]:
+        """Detail record for one describe_instances instance."""
         return {
             'instance_id': instance['InstanceId'],
             'instance_type': instance['InstanceType'],
@@ -419,120 +1275,32 @@ class ResourceDiscoveryHandler:
             start_time = end_time - timedelta(hours=24)  # Last 24 hours
             
             metrics = {}
+            health_config = self.collectors.health_metrics(resource_type)
             
-            if resource_type == 'EC2':
-                # Get EC2 metrics
-                ec2_metrics = {
-                    'CPUUtilization': {'namespace': 'AWS/EC2', 'stat': 'Average'},
-                    'NetworkIn': {'namespace': 'AWS/EC2', 'stat': 'Sum'},
-                    'NetworkOut': {'namespace': 'AWS/EC2', 'stat': 'Sum'},
-                    'DiskReadOps': {'namespace': 'AWS/EC2', 'stat': 'Sum'},
-                    'DiskWriteOps': {'namespace': 'AWS/EC2', 'stat': 'Sum'}
-                }
+            if health_config:
+                dimensions = [{'Name': health_config['dimension'], 'Value': resource_id}]
                 
-                for metric_name, config in ec2_metrics.items():
+                for metric_name, config in health_config['metrics'].items():
                     try:
-                        response = cw_client.get_metric_statistics(
-                            Namespace=config['namespace'],
-                            MetricName=metric_name,
-                            Dimensions=[{'Name': 'InstanceId', 'Value': resource_id}],
-                            StartTime=start_time,
-                            EndTime=end_time,
-                            Period=3600,  # 1 hour periods
-                            Statistics=[config['stat']]
+                        # Hourly datapoints are served from the metric cache; only the tail is re-fetched
+                        series = self.metric_cache.get_values(
+                            cw_client, config['namespace'], metric_name, dimensions, 3600,
+                            [config['stat']], start_time, end_time, request_id
                         )
                         
-                        datapoints = response.get('Datapoints', [])
-                        if datapoints:
-                            latest_value = datapoints[-1][config['stat']]
-                            avg_value = sum(dp[config['stat']] for dp in datapoints) / len(datapoints)
-                            metrics[metric_name] = {
-                                'latest': round(latest_value, 2),
-                                'average_24h': round(avg_value, 2),
-                                'unit': datapoints[0].get('Unit', 'None'),
-                                'datapoints_count': len(datapoints)
+                        values = series['values'][config['stat']]
+                        if values:
+                            summary = summarize(values)
+                            metric = {
+                                'latest': round(summary['latest'], 2),
+                                'unit': series['unit'],
+                                'datapoints_count': len(values)
                             }
-                    except Exception as e:
-                        logger.warning(f"[{request_id}] Could not get {metric_name} for {resource_id}: {str(e)}")
-            
-            elif resource_type == 'RDS':
-                # Get RDS metrics
-                rds_metrics = {
-                    'CPUUtilization': {'namespace': 'AWS/RDS', 'stat': 'Average'},
-                    'DatabaseConnections': {'namespace': 'AWS/RDS', 'stat': 'Average'},
-                    'FreeableMemory': {'namespace': 'AWS/RDS', 'stat': 'Average'},
-                    'FreeStorageSpace': {'namespace': 'AWS/RDS', 'stat': 'Average'},
-                    'ReadLatency': {'namespace': 'AWS/RDS', 'stat': 'Average'},
-                    'WriteLatency': {'namespace': 'AWS/RDS', 'stat': 'Average'}
-                }
-                
-                for metric_name, config in rds_metrics.items():
-                    try:
-                        response = cw_client.get_metric_statistics(
-                            Namespace=config['namespace'],
-                            MetricName=metric_name,
-                            Dimensions=[{'Name': 'DBInstanceIdentifier', 'Value': resource_id}],
-                            StartTime=start_time,
-                            EndTime=end_time,
-                            Period=3600,
-                            Statistics=[config['stat']]
-                        )
-                        
-                        datapoints = response.get('Datapoints', [])
-                        if datapoints:
-                            latest_value = datapoints[-1][config['stat']]
-                            avg_value = sum(dp[config['stat']] for dp in datapoints) / len(datapoints)
-                            metrics[metric_name] = {
-                                'latest': round(latest_value, 2),
-                                'average_24h': round(avg_value, 2),
-                                'unit': datapoints[0].get('Unit', 'None'),
-                                'datapoints_count': len(datapoints)
-                            }
-                    except Exception as e:
-                        logger.warning(f"[{request_id}] Could not get {metric_name} for {resource_id}: {str(e)}")
-            
-            elif resource_type == 'LAMBDA':
-                # Get Lambda metrics
-                lambda_metrics = {
-                    'Invocations': {'namespace': 'AWS/Lambda', 'stat': 'Sum'},
-                    'Errors': {'namespace': 'AWS/Lambda', 'stat': 'Sum'},
-                    'Duration': {'namespace': 'AWS/Lambda', 'stat': 'Average'},
-                    'Throttles': {'namespace': 'AWS/Lambda', 'stat': 'Sum'},
-                    'ConcurrentExecutions': {'namespace': 'AWS/Lambda', 'stat': 'Maximum'}
-                }
-                
-                for metric_name, config in lambda_metrics.items():
-                    try:
-                        response = cw_client.get_metric_statistics(
-                            Namespace=config['namespace'],
-                            MetricName=metric_name,
-                            Dimensions=[{'Name': 'FunctionName', 'Value': resource_id}],
-                            StartTime=start_time,
-                            EndTime=end_time,
-                            Period=3600,
-                            Statistics=[config['stat']]
-                        )
-                        
-                        datapoints = response.get('Datapoints', [])
-                        if datapoints:
-                            if config['stat'] == 'Sum':
-                                total_value = sum(dp[config['stat']] for dp in datapoints)
-                                latest_value = datapoints[-1][config['stat']]
-                                metrics[metric_name] = {
-                                    'latest': round(latest_value, 2),
-                                    'total_24h': round(total_value, 2),
-                                    'unit': datapoints[0].get('Unit', 'None'),
-                                    'datapoints_count': len(datapoints)
-                                }
+                            if resource_type == 'LAMBDA' and config['stat'] == 'Sum':
+                                metric['total_24h'] = round(summary['total'], 2)
                             else:
-                                latest_value = datapoints[-1][config['stat']]
-                                avg_value = sum(dp[config['stat']] for dp in datapoints) / len(datapoints)
-                                metrics[metric_name] = {
-                                    'latest': round(latest_value, 2),
-                                    'average_24h': round(avg_value, 2),
-                                    'unit': datapoints[0].get('Unit', 'None'),
-                                    'datapoints_count': len(datapoints)
-                                }
+                                metric['average_24h'] = round(summary['average'], 2)
+                            metrics[metric_name] = metric
                     except Exception as e:
                         logger.warning(f"[{request_id}] Could not get {metric_name} for {resource_id}: {str(e)}")
             
@@ -551,20 +1319,16 @@ class ResourceDiscoveryHandler:
         try:
             cw_client = self.aws_clients.get_cloudwatch_client(region)
             
-            # Get alarms for the resource
-            if resource_type == 'EC2':
-                dimension_name = 'InstanceId'
-            elif resource_type == 'RDS':
-                dimension_name = 'DBInstanceIdentifier'
-            elif resource_type == 'LAMBDA':
-                dimension_name = 'FunctionName'
-            else:
+            health_config = self.collectors.health_metrics(resource_type)
+            if not health_config:
                 return []
             
+            # Alarms on the type's primary health metric (CPU utilization where there is one)
+            metric_name, metric_config = next(iter(health_config['metrics'].items()))
             response = cw_client.describe_alarms_for_metric(
-                MetricName='CPUUtilization',  # Start with CPU utilization
-                Namespace=f'AWS/{resource_type}',
-                Dimensions=[{'Name': dimension_name, 'Value': resource_id}]
+                MetricName=metric_name,
+                Namespace=metric_config['namespace'],
+                Dimensions=[{'Name': health_config['dimension'], 'Value': resource_id}]
             )
             
             alarms = []
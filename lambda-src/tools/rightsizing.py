@@ -0,0 +1,308 @@
+"""
+Percentile-based EC2 rightsizing for AWS AI Concierge
+"""
+
+import logging
+import os
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timedelta
+from utils.instance_catalog import (
+    get_instance_spec, get_monthly_cost, get_family, is_burstable, list_instance_types
+)
+
+logger = logging.getLogger(__name__)
+
+# get_metric_data limits per call
+MAX_QUERIES_PER_CALL = 500
+MAX_DATAPOINTS_PER_CALL = 100800
+
+DEFAULT_PERIOD_SECONDS = 300
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIME_BUDGET_SECONDS = float(os.getenv('RIGHTSIZING_TIME_BUDGET_SECONDS', '60'))
+
+# Sizing targets: p95 CPU should land under 65% and p99 under 90% on the new type
+CPU_TARGET_P95 = 65.0
+CPU_TARGET_P99 = 90.0
+MEMORY_TARGET_P99 = 80.0
+HIGH_CPU_THRESHOLD = 80.0
+# Burstable targets are only suggested if the workload rarely exceeds the credit baseline
+BURST_TOLERANCE = 0.05
+# Treat candidates within 5% of the cheapest as equal and prefer the current family
+SAME_FAMILY_PREFERENCE = 1.05
+# Below this much traffic (bytes/second, in + out) an idle instance is a terminate candidate
+IDLE_NETWORK_BYTES_PER_SECOND = 5000.0
+
+# Metrics pulled per instance: key -> (namespace, metric name, statistic)
+RIGHTSIZING_METRICS = {
+    'cpu': ('AWS/EC2', 'CPUUtilization', 'Average'),
+    'network_in': ('AWS/EC2', 'NetworkIn', 'Sum'),
+    'network_out': ('AWS/EC2', 'NetworkOut', 'Sum'),
+    'memory': ('CWAgent', 'mem_used_percent', 'Average'),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def fraction_above(sorted_values: List[float], threshold: float) -> float:
+    """Fraction of values strictly above a threshold, using binary search."""
+    if not sorted_values:
+        return 0.0
+    return 1.0 - bisect_right(sorted_values, threshold) / len(sorted_values)
+
+
+class RightsizingEngine:
+    """Pulls 5-minute metric series in batches and maps instances to cheaper target types."""
+
+    def __init__(self, period: int = DEFAULT_PERIOD_SECONDS, max_workers: int = DEFAULT_MAX_WORKERS,
+                 time_budget_seconds: float = DEFAULT_TIME_BUDGET_SECONDS):
+        self.period = period
+        self.max_workers = max_workers
+        self.time_budget_seconds = time_budget_seconds
+
+    def analyze_instances(self, cw_client, instances: List[Dict[str, Any]], days: int,
+                          cpu_threshold: float, request_id: str) -> Dict[str, Any]:
+        """
+        Analyze utilization and rightsizing options for many instances.
+
+        Args:
+            cw_client: CloudWatch client for the instances' region
+            instances: Instances with 'instance_id' and 'instance_type'
+            days: Number of days to analyze
+            cpu_threshold: CPU percentage used for time-above-threshold
+            request_id: Request ID for tracking
+
+        Returns:
+            Dictionary with 'analyses' (instance_id -> analysis), 'skipped' (time budget)
+            and 'failed' (metric fetch errors) instance ID lists
+        """
+        deadline = time.time() + self.time_budget_seconds
+        end_time = datetime.utcnow()
+        start_time = end_time - timedelta(days=days)
+
+        batches = self._make_batches(instances, days)
+        analyses: Dict[str, Dict[str, Any]] = {}
+        skipped: List[str] = []
+        failed: List[str] = []
+
+        def run_batch(batch: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+            if time.time() >= deadline:
+                return 'skipped', batch, {}
+            try:
+                return 'ok', batch, self._fetch_batch(cw_client, batch, start_time, end_time)
+            except Exception as e:
+                logger.warning(f"[{request_id}] Rightsizing metric batch failed: {str(e)}")
+                return 'failed', batch, {}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(batches), 1))) as executor:
+            for status, batch, series_by_instance in executor.map(run_batch, batches):
+                batch_ids = [instance['instance_id'] for instance in batch]
+                if status == 'skipped':
+                    skipped.extend(batch_ids)
+                elif status == 'failed':
+                    failed.extend(batch_ids)
+                else:
+                    for instance in batch:
+                        series = series_by_instance.get(instance['instance_id'], {})
+                        analyses[instance['instance_id']] = self.analyze_series(
+                            instance['instance_type'], series, cpu_threshold
+                        )
+
+        logger.info(f"[{request_id}] Rightsizing analyzed {len(analyses)} instances in {len(batches)} batches "
+                    f"({len(skipped)} skipped, {len(failed)} failed)")
+        return {'analyses': analyses, 'skipped': skipped, 'failed': failed}
+
+    def analyze_series(self, instance_type: str, series: Dict[str, List[float]],
+                       cpu_threshold: float) -> Dict[str, Any]:
+        """Compute utilization statistics for one instance and recommend a target type."""
+        cpu = sorted(series.get('cpu', []))
+        memory = sorted(series.get('memory', []))
+        network_in = series.get('network_in', [])
+        network_out = series.get('network_out', [])
+
+        network_rate = sorted(
+            (i + o) / self.period for i, o in zip(network_in, network_out)
+        ) if network_in and network_out else []
+
+        metrics = {
+            'avg_cpu': sum(cpu) / len(cpu) if cpu else None,
+            'max_cpu': cpu[-1] if cpu else None,
+            'p50_cpu': percentile(cpu, 50),
+            'p95_cpu': percentile(cpu, 95),
+            'p99_cpu': percentile(cpu, 99),
+            'cpu_time_above_threshold_percent': round(fraction_above(cpu, cpu_threshold) * 100, 2) if cpu else None,
+            'cpu_time_above_high_percent': round(fraction_above(cpu, HIGH_CPU_THRESHOLD) * 100, 2) if cpu else None,
+            'avg_network_in': sum(network_in) / len(network_in) if network_in else None,
+            'avg_network_out': sum(network_out) / len(network_out) if network_out else None,
+            'p95_network_bytes_per_second': percentile(network_rate, 95),
+            'p95_memory': percentile(memory, 95),
+            'p99_memory': percentile(memory, 99),
+            'data_points': len(cpu),
+            'hours_covered': round(len(cpu) * self.period / 3600, 1)
+        }
+
+        return {
+            'metrics': metrics,
+            'recommendation': self.recommend(instance_type, metrics, cpu)
+        }
+
+    def recommend(self, instance_type: str, metrics: Dict[str, Any],
+                  sorted_cpu: List[float]) -> Dict[str, Any]:
+        """
+        Map an instance to the cheapest catalog type that fits its percentiles.
+
+        Returns:
+            Recommendation with target type, savings and confidence
+        """
+        current_cost = get_monthly_cost(instance_type)
+        hours = metrics.get('hours_covered', 0)
+        confidence = 'low' if hours < 24 else 'medium' if hours < 168 else 'high'
+
+        p95_cpu = metrics.get('p95_cpu')
+        p99_cpu = metrics.get('p99_cpu')
+        if p95_cpu is None:
+            return self._result('monitor', instance_type, current_cost, current_cost, 'low',
+                                'No CPU data available for the analysis period')
+
+        network = metrics.get('p95_network_bytes_per_second')
+        if p99_cpu < 5 and (network is None or network < IDLE_NETWORK_BYTES_PER_SECOND):
+            return self._result('terminate', None, current_cost, 0.0, confidence,
+                                f"p99 CPU is {p99_cpu:.1f}% with negligible network traffic")
+
+        spec = get_instance_spec(instance_type)
+        if not spec:
+            return self._result('monitor', instance_type, current_cost, current_cost, 'low',
+                                f"No catalog data for {instance_type}")
+
+        required_vcpu = spec['vcpu'] * max(p95_cpu / CPU_TARGET_P95, p99_cpu / CPU_TARGET_P99)
+        p99_memory = metrics.get('p99_memory')
+        if p99_memory is not None:
+            required_memory = spec['memory_gib'] * p99_memory / MEMORY_TARGET_P99
+        else:
+            # Without CloudWatch agent memory data, allow at most one size down
+            required_memory = spec['memory_gib'] / 2
+            if confidence == 'high':
+                confidence = 'medium'
+
+        target = self._pick_target(instance_type, spec, required_vcpu, required_memory, sorted_cpu)
+        if not target:
+            return self._result('monitor', instance_type, current_cost, current_cost, confidence,
+                                'Current instance type already fits the observed utilization')
+
+        target_cost = get_monthly_cost(target)
+        savings_ratio = (current_cost - target_cost) / current_cost if current_cost else 0
+
+        if is_burstable(target) and not is_burstable(instance_type):
+            recommendation = 'consider_burstable'
+        elif savings_ratio >= 0.5:
+            recommendation = 'downsize_significantly'
+        else:
+            recommendation = 'downsize'
+
+        return self._result(recommendation, target, current_cost, target_cost, confidence,
+                            f"p95 CPU {p95_cpu:.1f}%, p99 CPU {p99_cpu:.1f}% fit on {target}")
+
+    def _pick_target(self, instance_type: str, spec: Dict[str, Any], required_vcpu: float,
+                     required_memory: float, sorted_cpu: List[float]) -> Optional[str]:
+        """Choose the cheapest catalog type that satisfies the requirements and is cheaper than today."""
+        current_cost = spec['monthly_cost']
+        candidates = []
+
+        for candidate in list_instance_types():
+            candidate_spec = get_instance_spec(candidate)
+            if candidate_spec['monthly_cost'] >= current_cost:
+                break
+            if candidate_spec['vcpu'] < required_vcpu or candidate_spec['memory_gib'] < required_memory:
+                continue
+            if 'baseline_cpu' in candidate_spec:
+                # CPU% on the candidate scales by vCPU ratio; check how often it would exceed the baseline
+                threshold = candidate_spec['baseline_cpu'] * candidate_spec['vcpu'] / spec['vcpu']
+                if fraction_above(sorted_cpu, threshold) > BURST_TOLERANCE:
+                    continue
+            candidates.append(candidate)
+
+        if not candidates:
+            return None
+
+        cheapest_cost = get_monthly_cost(candidates[0])
+        family = get_family(instance_type)
+        for candidate in candidates:
+            if get_monthly_cost(candidate) > cheapest_cost * SAME_FAMILY_PREFERENCE:
+                break
+            if get_family(candidate) == family:
+                return candidate
+        return candidates[0]
+
+    def _result(self, recommendation: str, target: Optional[str], current_cost: float,
+                target_cost: float, confidence: str, reason: str) -> Dict[str, Any]:
+        return {
+            'recommendation': recommendation,
+            'target_instance_type': target,
+            'target_monthly_cost': round(target_cost, 2),
+            'potential_savings': round(max(current_cost - target_cost, 0.0), 2),
+            'confidence': confidence,
+            'reason': reason
+        }
+
+    def _make_batches(self, instances: List[Dict[str, Any]], days: int) -> List[List[Dict[str, Any]]]:
+        """Split instances so each get_metric_data call stays under the query and datapoint limits."""
+        points_per_series = max(1, days * 86400 // self.period)
+        queries_per_instance = len(RIGHTSIZING_METRICS)
+        per_call = max(1, min(MAX_QUERIES_PER_CALL // queries_per_instance,
+                              MAX_DATAPOINTS_PER_CALL // (queries_per_instance * points_per_series)))
+        return [instances[i:i + per_call] for i in range(0, len(instances), per_call)]
+
+    def _fetch_batch(self, cw_client, batch: List[Dict[str, Any]], start_time: datetime,
+                     end_time: datetime) -> Dict[str, Dict[str, List[float]]]:
+        """Fetch all metrics for a batch of instances with paginated get_metric_data."""
+        queries = []
+        query_map: Dict[str, Tuple[str, str]] = {}
+
+        for index, instance in enumerate(batch):
+            for key, (namespace, metric_name, stat) in RIGHTSIZING_METRICS.items():
+                query_id = f"q{index}_{key}"
+                query_map[query_id] = (instance['instance_id'], key)
+                queries.append({
+                    'Id': query_id,
+                    'MetricStat': {
+                        'Metric': {
+                            'Namespace': namespace,
+                            'MetricName': metric_name,
+                            'Dimensions': [{'Name': 'InstanceId', 'Value': instance['instance_id']}]
+                        },
+                        'Period': self.period,
+                        'Stat': stat
+                    },
+                    'ReturnData': True
+                })
+
+        series_by_instance: Dict[str, Dict[str, List[float]]] = {}
+        request = {
+            'MetricDataQueries': queries,
+            'StartTime': start_time,
+            'EndTime': end_time,
+            'ScanBy': 'TimestampAscending'
+        }
+
+        while True:
+            response = cw_client.get_metric_data(**request)
+            for result in response.get('MetricDataResults', []):
+                instance_id, key = query_map[result['Id']]
+                series_by_instance.setdefault(instance_id, {}).setdefault(key, []).extend(result.get('Values', []))
+
+            next_token = response.get('NextToken')
+            if not next_token:
+                break
+            request['NextToken'] = next_token
+
+        return series_by_instance
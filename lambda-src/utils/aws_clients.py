@@ -94,6 +94,10 @@ class AWSClientManager:
         """Get Lambda client for specified region."""
         return self.get_client('lambda', region)
     
+    def get_tagging_client(self, region: str) -> Any:
+        """Get Resource Groups Tagging API client for specified region."""
+        return self.get_client('resourcegroupstaggingapi', region)
+    
     def get_support_client(self) -> Any:
         """Get Support client (us-east-1 only)."""
         return self.get_client('support', 'us-east-1')
@@ -0,0 +1,208 @@
+"""
+Resource collector registry and scheduler for AWS AI Concierge
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Iterator, List, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+def pages(call, items_key: str, request_token: str = 'NextToken', response_token: str = 'NextToken',
+          **kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the items of a paginated AWS API, one page at a time.
+
+    Args:
+        call: Client method (e.g., ec2_client.describe_volumes)
+        items_key: Response key holding the page's items
+        request_token: Parameter that takes the continuation token
+        response_token: Response key holding the continuation token
+        **kwargs: Parameters for every call
+
+    Yields:
+        Items of each page, before the next page is requested
+    """
+    while True:
+        response = call(**kwargs)
+        yield from response.get(items_key, [])
+        token = response.get(response_token)
+        if not token:
+            return
+        kwargs[request_token] = token
+
+
+def paginate(call, items_key: str, request_token: str = 'NextToken', response_token: str = 'NextToken',
+             **kwargs) -> List[Dict[str, Any]]:
+    """Items from all pages of a paginated AWS API (see pages)."""
+    return list(pages(call, items_key, request_token, response_token, **kwargs))
+
+
+class Paginator:
+    """
+    The list API a collector pages through.
+
+    Declared once per collector, passed to CollectorRegistry.register, and used by
+    the collector itself so the token names are not repeated at each call site.
+    """
+
+    def __init__(self, operation: str, items_key: str, request_token: str = 'NextToken',
+                 response_token: str = 'NextToken'):
+        """
+        Args:
+            operation: Client method name (e.g., 'describe_volumes')
+            items_key: Response key holding the page's items
+            request_token: Parameter that takes the continuation token
+            response_token: Response key holding the continuation token
+        """
+        self.operation = operation
+        self.items_key = items_key
+        self.request_token = request_token
+        self.response_token = response_token
+
+    def pages(self, client, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Iterate over the items of the operation on a client, one page at a time (see pages)."""
+        return pages(getattr(client, self.operation), self.items_key, self.request_token, self.response_token,
+                     **kwargs)
+
+    def paginate(self, client, **kwargs) -> List[Dict[str, Any]]:
+        """Items from all pages of the operation on a client."""
+        return list(self.pages(client, **kwargs))
+
+
+class CollectorRegistry:
+    """
+    Resource collectors keyed by inventory resource type.
+
+    Each collector declares how it is scoped ('regional' or 'global'), the API it
+    pages through, a relative cost weight used for scheduling, how many copies
+    may run at once, and optionally its CloudWatch health metrics (in the
+    HEALTH_METRICS format), a details fetcher and a counter for count-only
+    summaries.
+    """
+
+    def __init__(self):
+        self._collectors: Dict[str, Dict[str, Any]] = {}
+
+    def register(self, resource_type: str, collect: Callable, scope: str = 'regional',
+                 paginator: Optional[Paginator] = None, cost_weight: float = 1.0,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY, health: Optional[Dict[str, Any]] = None,
+                 details: Optional[Callable] = None, batch_details: Optional[Callable] = None,
+                 count: Optional[Callable] = None):
+        """
+        Register a collector.
+
+        Args:
+            resource_type: Inventory resource type (e.g., 'EBS')
+            collect: Callable(scope, request_id, filters, fields) returning inventory records;
+                scope is the region, or 'global'
+            scope: 'regional' (collected per region) or 'global' (collected once)
+            paginator: List API the collector pages through
+            cost_weight: Relative cost of one collection; heavier collectors start first
+            max_concurrency: Most copies (one per region) allowed to run at once
+            health: CloudWatch health metrics as {'dimension': ..., 'metrics': {...}}
+            details: Callable(resource_id, region, request_id) returning resource details
+            batch_details: Callable(resource_ids, region, request_id) returning (details, errors)
+            count: Callable(scope, request_id, filters) yielding (state, instance_type)
+                for each resource without building records
+        """
+        if scope not in ('regional', 'global'):
+            raise ValueError(f"Invalid collector scope: {scope}")
+        if resource_type in self._collectors:
+            raise ValueError(f"Duplicate collector: {resource_type}")
+        self._collectors[resource_type] = {
+            'resource_type': resource_type,
+            'collect': collect,
+            'scope': scope,
+            'paginator': paginator,
+            'cost_weight': cost_weight,
+            'max_concurrency': max(1, max_concurrency),
+            'health': health,
+            'details': details,
+            'batch_details': batch_details,
+            'count': count
+        }
+
+    def get(self, resource_type: str) -> Optional[Dict[str, Any]]:
+        return self._collectors.get(resource_type)
+
+    def types(self) -> List[str]:
+        """Registered resource types, in registration order."""
+        return list(self._collectors)
+
+    def select(self, resource_type: str) -> List[Dict[str, Any]]:
+        """Collectors for a resource type, or all of them for 'ALL'."""
+        if resource_type == 'ALL':
+            return list(self._collectors.values())
+        if resource_type not in self._collectors:
+            raise ValueError(f"Unsupported resource type: {resource_type}")
+        return [self._collectors[resource_type]]
+
+    def health_metrics(self, resource_type: str) -> Optional[Dict[str, Any]]:
+        collector = self._collectors.get(resource_type)
+        return collector['health'] if collector else None
+
+
+class CollectorScheduler:
+    """
+    Runs collection tasks on a shared thread pool.
+
+    Tasks are started heaviest first (by cost weight) so the longest
+    collections do not finish last, and no more copies of a collector run at
+    once than its max_concurrency allows, which keeps one service's API rate
+    limits from being hit by a many-region fan-out.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+
+    def run(self, tasks: Dict[str, Tuple[Dict[str, Any], Callable[[], Any]]],
+            request_id: str) -> Dict[str, Any]:
+        """
+        Run collection tasks concurrently.
+
+        Args:
+            tasks: Task key -> (collector, zero-argument callable)
+            request_id: Request ID for tracking
+
+        Returns:
+            Dictionary with 'results' and 'errors' (task key -> exception)
+        """
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Exception] = {}
+        pending = sorted(tasks, key=lambda key: -tasks[key][0]['cost_weight'])
+        running: Dict[Any, str] = {}
+        active: Dict[str, int] = {}
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(tasks)))) as executor:
+            while pending or running:
+                for key in list(pending):
+                    if len(running) >= self.max_workers:
+                        break
+                    collector, func = tasks[key]
+                    resource_type = collector['resource_type']
+                    if active.get(resource_type, 0) >= collector['max_concurrency']:
+                        continue
+                    pending.remove(key)
+                    active[resource_type] = active.get(resource_type, 0) + 1
+                    running[executor.submit(func)] = key
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    active[tasks[key][0]['resource_type']] -= 1
+                    try:
+                        results[key] = future.result()
+                    except Exception as e:
+                        errors[key] = e
+                        logger.warning(f"[{request_id}] Collector {key} failed: {str(e)}")
+
+        logger.info(f"[{request_id}] Ran {len(tasks)} collectors in {time.time() - started:.2f}s "
+                    f"({len(errors)} failed)")
+        return {'results': results, 'errors': errors}
@@ -0,0 +1,271 @@
+"""
+Locally retained daily and hourly cost history for AWS AI Concierge
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = os.getenv('COST_HISTORY_PATH', '/tmp/aws-ai-concierge/daily_costs.json')
+DEFAULT_RETENTION_DAYS = 400
+
+
+class DailyCostHistory:
+    """Keeps a compact date -> total cost series in memory with a /tmp spill file."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_HISTORY_PATH, retention_days: int = DEFAULT_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self._series: Dict[str, float] = {}
+        self._loaded = False
+
+    def record(self, daily_costs: List[Dict[str, Any]]) -> int:
+        """
+        Merge daily totals into the retained series.
+
+        Args:
+            daily_costs: List of {'date': 'YYYY-MM-DD', 'cost': float} entries
+
+        Returns:
+            Number of days that were added or changed
+        """
+        self._ensure_loaded()
+
+        # Today's bucket is still accumulating charges, so never retain it
+        today = datetime.utcnow().date().isoformat()
+        changed = 0
+
+        for entry in daily_costs:
+            day = entry.get('date')
+            if not day or day >= today:
+                continue
+            cost = round(float(entry.get('cost', 0)), 4)
+            if self._series.get(day) != cost:
+                self._series[day] = cost
+                changed += 1
+
+        if changed:
+            self._prune()
+            self._save()
+
+        return changed
+
+    def get_series(self, days: Optional[int] = None) -> List[Tuple[date, float]]:
+        """
+        Get the retained series ordered by date.
+
+        Args:
+            days: Only return the most recent N days (optional)
+
+        Returns:
+            List of (date, cost) tuples
+        """
+        self._ensure_loaded()
+
+        items = sorted(self._series.items())
+        if days:
+            items = items[-days:]
+
+        return [(datetime.strptime(day, '%Y-%m-%d').date(), cost) for day, cost in items]
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._series)
+
+    def clear(self):
+        """Clear the retained series (useful for testing)."""
+        self._series.clear()
+        self._loaded = True
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                logger.debug(f"Could not remove cost history file {self.path}: {str(e)}")
+
+    def _ensure_loaded(self):
+        """Load the spill file once per container."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                stored = json.load(f)
+            for day, cost in stored.items():
+                self._series.setdefault(day, float(cost))
+            logger.debug(f"Loaded {len(stored)} days of cost history from {self.path}")
+        except Exception as e:
+            logger.warning(f"Could not load cost history from {self.path}: {str(e)}")
+
+    def _prune(self):
+        """Drop days older than the retention window."""
+        cutoff = (datetime.utcnow().date() - timedelta(days=self.retention_days)).isoformat()
+        for day in [d for d in self._series if d < cutoff]:
+            del self._series[day]
+
+    def _save(self):
+        """Write the series to the spill file, ignoring filesystem errors."""
+        if not self.path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._series, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist cost history to {self.path}: {str(e)}")
+
+
+DEFAULT_HOURLY_PATH = os.getenv('HOURLY_COST_HISTORY_PATH', '/tmp/aws-ai-concierge/hourly_costs.json')
+# Cost Explorer only serves hourly data for the last 14 days
+HOURLY_RETENTION_DAYS = 14
+
+
+class HourlyCostStore:
+    """
+    Keeps settled hourly cost rows per group_by dimension with a /tmp spill file.
+
+    Each dimension holds one contiguous range of hours [stored_from, settled_until),
+    so a repeated query only has to fetch the hours after settled_until. Rows are
+    added page by page with add_hours and only count once save_window settles them.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_HOURLY_PATH, retention_days: int = HOURLY_RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self._data: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+
+    def load_window(self, group_by: str, start: str, end: str) -> Tuple[Dict[str, Dict[str, list]], str]:
+        """
+        Get stored hours inside [start, end) and where fetching has to resume.
+
+        Args:
+            group_by: Cost Explorer group_by dimension
+            start: Window start hour ('YYYY-MM-DDTHH:00:00Z')
+            end: Window end hour (exclusive)
+
+        Returns:
+            Tuple of (hour -> {group: [cost, usage, unit]}, fetch start hour)
+        """
+        self._ensure_loaded()
+        entry = self._data.get(group_by)
+
+        if not entry or not (entry['stored_from'] <= start <= entry['settled_until']):
+            return {}, start
+
+        # Hours added by an interrupted fetch are past settled_until and will be fetched again
+        last = min(end, entry['settled_until'])
+        hours = {h: groups for h, groups in entry['hours'].items() if start <= h < last}
+        return hours, max(start, entry['settled_until'])
+
+    def add_hours(self, group_by: str, fetched_from: str, hours: Dict[str, Dict[str, list]]):
+        """
+        Add settled rows from one Cost Explorer page, without saving them yet.
+
+        Args:
+            group_by: Cost Explorer group_by dimension
+            fetched_from: First hour of the fetch the page belongs to
+            hours: hour -> {group: [cost, usage, unit]} for settled hours on the page
+        """
+        if not hours:
+            return
+        self._ensure_loaded()
+        entry = self._data.get(group_by)
+
+        if not entry or not (entry['stored_from'] <= fetched_from <= entry['settled_until']):
+            # Not contiguous with what we have: start a new range at the fetch
+            self._data[group_by] = entry = {
+                'stored_from': fetched_from,
+                'settled_until': fetched_from,
+                'hours': {}
+            }
+        for hour, groups in hours.items():
+            # A page may end part way through an hour's groups
+            entry['hours'].setdefault(hour, {}).update(groups)
+
+    def save_window(self, group_by: str, fetched_from: str, settled_until: str,
+                    hours: Optional[Dict[str, Dict[str, list]]] = None):
+        """
+        Mark the fetched hours as settled and persist them.
+
+        Args:
+            group_by: Cost Explorer group_by dimension
+            fetched_from: First hour that was fetched
+            settled_until: Hours before this will not change any more
+            hours: Settled rows not already passed to add_hours
+        """
+        self._ensure_loaded()
+        self.add_hours(group_by, fetched_from, hours)
+        entry = self._data.get(group_by)
+
+        if entry and entry['stored_from'] <= fetched_from <= entry['settled_until']:
+            # Contiguous with what we have: extend the range
+            entry['settled_until'] = max(entry['settled_until'], settled_until)
+        elif fetched_from < settled_until:
+            self._data[group_by] = entry = {
+                'stored_from': fetched_from,
+                'settled_until': settled_until,
+                'hours': {}
+            }
+        else:
+            return
+
+        self._prune(entry)
+        self._save()
+
+    def clear(self):
+        """Clear stored hours (useful for testing)."""
+        self._data.clear()
+        self._loaded = True
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                logger.debug(f"Could not remove hourly cost file {self.path}: {str(e)}")
+
+    def _ensure_loaded(self):
+        """Load the spill file once per container."""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r') as f:
+                self._data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not load hourly costs from {self.path}: {str(e)}")
+
+    def _prune(self, entry: Dict[str, Any]):
+        """Drop hours older than the retention window."""
+        cutoff = (datetime.utcnow() - timedelta(days=self.retention_days)).strftime('%Y-%m-%dT%H:00:00Z')
+        if entry['stored_from'] < cutoff:
+            entry['stored_from'] = min(cutoff, entry['settled_until'])
+            for hour in [h for h in entry['hours'] if h < cutoff]:
+                del entry['hours'][hour]
+
+    def _save(self):
+        """Write stored hours to the spill file, ignoring filesystem errors."""
+        if not self.path:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not persist hourly costs to {self.path}: {str(e)}")
@@ -0,0 +1,90 @@
+"""
+Streaming cost rollups for AWS AI Concierge
+"""
+
+import heapq
+from typing import Dict, Any, List, Tuple
+
+DEFAULT_TOP_K = 5
+
+
+class HourlyCostAggregator:
+    """
+    Folds hourly Cost Explorer rows into running totals one page at a time.
+
+    Keeps per-hour totals, per-group totals and the top-K most expensive hours of
+    each group in a bounded min-heap, so pages can be discarded as soon as they
+    are consumed.
+    """
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K):
+        self.top_k = top_k
+        self.total_cost = 0.0
+        self.hourly_totals: Dict[str, float] = {}
+        self.group_totals: Dict[str, Dict[str, Any]] = {}
+        self._top_hours: Dict[str, List[Tuple[float, str]]] = {}
+
+    def add(self, hour: str, group: str, cost: float, usage: float = 0.0, unit: str = ''):
+        """
+        Add one hour/group row.
+
+        Args:
+            hour: Hour start timestamp (e.g., '2025-01-15T13:00:00Z')
+            group: Group key (e.g., service name)
+            cost: Cost for the hour
+            usage: Usage quantity for the hour
+            unit: Usage unit
+        """
+        self.total_cost += cost
+        self.hourly_totals[hour] = self.hourly_totals.get(hour, 0.0) + cost
+
+        totals = self.group_totals.get(group)
+        if totals is None:
+            totals = self.group_totals[group] = {'cost': 0.0, 'usage': 0.0, 'unit': unit}
+        totals['cost'] += cost
+        totals['usage'] += usage
+
+        heap = self._top_hours.setdefault(group, [])
+        if len(heap) < self.top_k:
+            heapq.heappush(heap, (cost, hour))
+        elif cost > heap[0][0]:
+            heapq.heapreplace(heap, (cost, hour))
+
+    def add_results(self, results_by_time: List[Dict[str, Any]]) -> int:
+        """
+        Add the ResultsByTime entries of one get_cost_and_usage page.
+
+        Returns:
+            Number of hours in the page
+        """
+        for time_result in results_by_time:
+            hour = time_result.get('TimePeriod', {}).get('Start')
+            if not hour:
+                continue
+            # Hours without usage still count towards the hourly baseline
+            self.hourly_totals.setdefault(hour, 0.0)
+            for group in time_result.get('Groups', []):
+                metrics = group.get('Metrics', {})
+                self.add(
+                    hour,
+                    group.get('Keys', ['Unknown'])[0],
+                    float(metrics.get('BlendedCost', {}).get('Amount', 0)),
+                    float(metrics.get('UsageQuantity', {}).get('Amount', 0)),
+                    metrics.get('UsageQuantity', {}).get('Unit', '')
+                )
+        return len(results_by_time)
+
+    def peak_hours(self, limit: int = None) -> List[Dict[str, Any]]:
+        """Most expensive hours across all groups, highest first."""
+        top = heapq.nlargest(limit or self.top_k, self.hourly_totals.items(), key=lambda item: item[1])
+        return [{'hour': hour, 'cost': round(cost, 4)} for hour, cost in top]
+
+    def top_hours_by_group(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Top-K hours of each group, highest first."""
+        return {
+            group: [{'hour': hour, 'cost': round(cost, 4)} for cost, hour in sorted(heap, reverse=True)]
+            for group, heap in self._top_hours.items()
+        }
+
+    def average_hourly_cost(self) -> float:
+        return self.total_cost / len(self.hourly_totals) if self.hourly_totals else 0.0
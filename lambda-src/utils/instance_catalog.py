@@ -0,0 +1,79 @@
+"""
+EC2 instance type catalog for AWS AI Concierge
+"""
+
+from typing import Dict, Any, List, Optional
+
+# vCPU, memory and approximate on-demand Linux cost (USD per month, us-east-1).
+# Burstable types carry their baseline CPU utilization per vCPU.
+# This is a simplified catalog - in production, you'd use the AWS Pricing API.
+INSTANCE_TYPES: Dict[str, Dict[str, Any]] = {
+    't2.nano': {'vcpu': 1, 'memory_gib': 0.5, 'monthly_cost': 4.25, 'baseline_cpu': 5.0},
+    't2.micro': {'vcpu': 1, 'memory_gib': 1, 'monthly_cost': 8.50, 'baseline_cpu': 10.0},
+    't2.small': {'vcpu': 1, 'memory_gib': 2, 'monthly_cost': 17.00, 'baseline_cpu': 20.0},
+    't2.medium': {'vcpu': 2, 'memory_gib': 4, 'monthly_cost': 34.00, 'baseline_cpu': 20.0},
+    't2.large': {'vcpu': 2, 'memory_gib': 8, 'monthly_cost': 68.00, 'baseline_cpu': 30.0},
+    't2.xlarge': {'vcpu': 4, 'memory_gib': 16, 'monthly_cost': 136.00, 'baseline_cpu': 22.5},
+    't2.2xlarge': {'vcpu': 8, 'memory_gib': 32, 'monthly_cost': 272.00, 'baseline_cpu': 17.0},
+    't3.nano': {'vcpu': 2, 'memory_gib': 0.5, 'monthly_cost': 3.80, 'baseline_cpu': 5.0},
+    't3.micro': {'vcpu': 2, 'memory_gib': 1, 'monthly_cost': 7.60, 'baseline_cpu': 10.0},
+    't3.small': {'vcpu': 2, 'memory_gib': 2, 'monthly_cost': 15.20, 'baseline_cpu': 20.0},
+    't3.medium': {'vcpu': 2, 'memory_gib': 4, 'monthly_cost': 30.40, 'baseline_cpu': 20.0},
+    't3.large': {'vcpu': 2, 'memory_gib': 8, 'monthly_cost': 60.80, 'baseline_cpu': 30.0},
+    't3.xlarge': {'vcpu': 4, 'memory_gib': 16, 'monthly_cost': 121.60, 'baseline_cpu': 40.0},
+    't3.2xlarge': {'vcpu': 8, 'memory_gib': 32, 'monthly_cost': 243.20, 'baseline_cpu': 40.0},
+    'm5.large': {'vcpu': 2, 'memory_gib': 8, 'monthly_cost': 70.00},
+    'm5.xlarge': {'vcpu': 4, 'memory_gib': 16, 'monthly_cost': 140.00},
+    'm5.2xlarge': {'vcpu': 8, 'memory_gib': 32, 'monthly_cost': 280.00},
+    'm5.4xlarge': {'vcpu': 16, 'memory_gib': 64, 'monthly_cost': 560.00},
+    'm5.8xlarge': {'vcpu': 32, 'memory_gib': 128, 'monthly_cost': 1121.28},
+    'm6i.large': {'vcpu': 2, 'memory_gib': 8, 'monthly_cost': 70.08},
+    'm6i.xlarge': {'vcpu': 4, 'memory_gib': 16, 'monthly_cost': 140.16},
+    'm6i.2xlarge': {'vcpu': 8, 'memory_gib': 32, 'monthly_cost': 280.32},
+    'm6i.4xlarge': {'vcpu': 16, 'memory_gib': 64, 'monthly_cost': 560.64},
+    'c5.large': {'vcpu': 2, 'memory_gib': 4, 'monthly_cost': 62.00},
+    'c5.xlarge': {'vcpu': 4, 'memory_gib': 8, 'monthly_cost': 124.00},
+    'c5.2xlarge': {'vcpu': 8, 'memory_gib': 16, 'monthly_cost': 248.00},
+    'c5.4xlarge': {'vcpu': 16, 'memory_gib': 32, 'monthly_cost': 496.00},
+    'c6i.large': {'vcpu': 2, 'memory_gib': 4, 'monthly_cost': 62.05},
+    'c6i.xlarge': {'vcpu': 4, 'memory_gib': 8, 'monthly_cost': 124.10},
+    'c6i.2xlarge': {'vcpu': 8, 'memory_gib': 16, 'monthly_cost': 248.20},
+    'c6i.4xlarge': {'vcpu': 16, 'memory_gib': 32, 'monthly_cost': 496.40},
+    'r5.large': {'vcpu': 2, 'memory_gib': 16, 'monthly_cost': 91.00},
+    'r5.xlarge': {'vcpu': 4, 'memory_gib': 32, 'monthly_cost': 182.00},
+    'r5.2xlarge': {'vcpu': 8, 'memory_gib': 64, 'monthly_cost': 364.00},
+    'r5.4xlarge': {'vcpu': 16, 'memory_gib': 128, 'monthly_cost': 728.00},
+    'r6i.large': {'vcpu': 2, 'memory_gib': 16, 'monthly_cost': 91.98},
+    'r6i.xlarge': {'vcpu': 4, 'memory_gib': 32, 'monthly_cost': 183.96},
+    'r6i.2xlarge': {'vcpu': 8, 'memory_gib': 64, 'monthly_cost': 367.92},
+    'r6i.4xlarge': {'vcpu': 16, 'memory_gib': 128, 'monthly_cost': 735.84},
+}
+
+DEFAULT_MONTHLY_COST = 50.0
+
+
+def get_instance_spec(instance_type: str) -> Optional[Dict[str, Any]]:
+    """Get the catalog entry for an instance type, or None if unknown."""
+    return INSTANCE_TYPES.get(instance_type)
+
+
+def get_monthly_cost(instance_type: str) -> float:
+    """Get the estimated monthly cost for an instance type."""
+    spec = INSTANCE_TYPES.get(instance_type)
+    return spec['monthly_cost'] if spec else DEFAULT_MONTHLY_COST
+
+
+def get_family(instance_type: str) -> str:
+    """Get the family prefix of an instance type (e.g., 'm5' for 'm5.large')."""
+    return instance_type.split('.', 1)[0]
+
+
+def is_burstable(instance_type: str) -> bool:
+    """Check whether an instance type uses CPU credits."""
+    spec = INSTANCE_TYPES.get(instance_type)
+    return bool(spec and 'baseline_cpu' in spec)
+
+
+def list_instance_types() -> List[str]:
+    """List catalog instance types ordered by monthly cost."""
+    return sorted(INSTANCE_TYPES, key=lambda t: INSTANCE_TYPES[t]['monthly_cost'])
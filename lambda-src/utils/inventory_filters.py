@@ -0,0 +1,120 @@
+"""
+Inventory filters and field projection for AWS AI Concierge
+"""
+
+from typing import Dict, Any, List, Optional, Set
+
+# Always returned, whatever fields are requested
+KEY_FIELDS = ['resource_id', 'resource_type']
+
+
+def parse_inventory_filters(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read inventory filters from tool parameters.
+
+    Args:
+        params: Parameters including state, instance_type, tag ('Key=Value',
+            'Key', or a list of these), vpc_id, name_prefix
+
+    Returns:
+        Normalized filters; only the parameters that were given are present
+    """
+    filters = {}
+    for name in ('state', 'instance_type', 'vpc_id', 'name_prefix'):
+        value = params.get(name)
+        if value not in (None, ''):
+            filters[name] = str(value)
+
+    tag_param = params.get('tag')
+    if tag_param:
+        tags = {}
+        for tag in (tag_param if isinstance(tag_param, list) else str(tag_param).split(',')):
+            key, _, value = str(tag).partition('=')
+            if not key.strip():
+                raise ValueError(f"Invalid tag filter: '{tag}'. Use Key=Value or Key")
+            tags[key.strip()] = value.strip() if value.strip() else None
+        filters['tags'] = tags
+
+    return filters
+
+
+def parse_fields(params: Dict[str, Any]) -> Optional[Set[str]]:
+    """Requested record fields (comma-separated string or list), or None for full records."""
+    fields = params.get('fields')
+    if not fields:
+        return None
+    if not isinstance(fields, list):
+        fields = str(fields).split(',')
+    return {str(field).strip() for field in fields if str(field).strip()} | set(KEY_FIELDS)
+
+
+def fields_to_build(fields: Optional[Set[str]], filters: Dict[str, Any]) -> Optional[Set[str]]:
+    """Fields a collector must build: the projection plus whatever the filters inspect."""
+    if fields is None:
+        return None
+    needed = set(fields)
+    if 'state' in filters:
+        needed.add('status')
+    if 'instance_type' in filters:
+        needed.update(['instance_type', 'instance_class'])
+    if 'name_prefix' in filters:
+        needed.add('name')
+    if 'tags' in filters:
+        needed.add('tags')
+    if 'vpc_id' in filters:
+        needed.add('metadata')
+    return needed
+
+
+def wants(fields: Optional[Set[str]], field: str) -> bool:
+    """Whether a collector should build a field."""
+    return fields is None or field in fields
+
+
+def ec2_api_filters(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Translate inventory filters into describe_instances Filters."""
+    api_filters = []
+    if 'state' in filters:
+        api_filters.append({'Name': 'instance-state-name', 'Values': [filters['state']]})
+    if 'instance_type' in filters:
+        api_filters.append({'Name': 'instance-type', 'Values': [filters['instance_type']]})
+    if 'vpc_id' in filters:
+        api_filters.append({'Name': 'vpc-id', 'Values': [filters['vpc_id']]})
+    if 'name_prefix' in filters:
+        api_filters.append({'Name': 'tag:Name', 'Values': [filters['name_prefix'] + '*']})
+    for key, value in filters.get('tags', {}).items():
+        if value is None:
+            api_filters.append({'Name': 'tag-key', 'Values': [key]})
+        else:
+            api_filters.append({'Name': f"tag:{key}", 'Values': [value]})
+    return api_filters
+
+
+def _vpc_id(resource: Dict[str, Any]) -> Optional[str]:
+    metadata = resource.get('metadata') or {}
+    return metadata.get('vpc_id') or (metadata.get('vpc_config') or {}).get('VpcId')
+
+
+def matches_filters(resource: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    """Client-side check of a normalized record against inventory filters."""
+    if 'state' in filters and str(resource.get('status', '')).lower() != filters['state'].lower():
+        return False
+    if 'instance_type' in filters and filters['instance_type'] not in (
+            resource.get('instance_type'), resource.get('instance_class')):
+        return False
+    if 'vpc_id' in filters and _vpc_id(resource) != filters['vpc_id']:
+        return False
+    if 'name_prefix' in filters and not str(resource.get('name') or '').startswith(filters['name_prefix']):
+        return False
+    tags = resource.get('tags') or {}
+    for key, value in filters.get('tags', {}).items():
+        if key not in tags or (value is not None and tags[key] != value):
+            return False
+    return True
+
+
+def project(resource: Dict[str, Any], fields: Optional[Set[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields of a record."""
+    if fields is None:
+        return resource
+    return {field: value for field, value in resource.items() if field in fields}
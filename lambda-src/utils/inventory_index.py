@@ -0,0 +1,357 @@
+"""
+Persistent resource inventory index for AWS AI Concierge
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.getenv('INVENTORY_INDEX_PATH', '/tmp/aws-ai-concierge/inventory.db')
+# Collections older than this are refreshed from the live APIs
+DEFAULT_MAX_AGE_SECONDS = int(os.getenv('INVENTORY_MAX_AGE_SECONDS', '300'))
+# Snapshots older than this are pruned (the newest one before the cutoff is kept as a baseline)
+SNAPSHOT_RETENTION_SECONDS = int(os.getenv('INVENTORY_SNAPSHOT_RETENTION_DAYS', '14')) * 86400
+# Record fields kept in snapshots so modifications can be described without the old record
+SNAPSHOT_FIELDS = ['name', 'status', 'instance_type', 'instance_class', 'engine_version', 'runtime', 'region']
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS resources ('
+    '  resource_key TEXT PRIMARY KEY,'
+    '  resource_id TEXT NOT NULL,'
+    '  resource_type TEXT NOT NULL,'
+    '  scope TEXT NOT NULL,'
+    '  region TEXT,'
+    '  state TEXT,'
+    '  fingerprint TEXT NOT NULL,'
+    '  data TEXT NOT NULL,'
+    '  updated_at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_resources_collection ON resources (resource_type, scope)',
+    'CREATE INDEX IF NOT EXISTS idx_resources_region ON resources (region, resource_type)',
+    'CREATE INDEX IF NOT EXISTS idx_resources_state ON resources (state)',
+    'CREATE TABLE IF NOT EXISTS resource_tags ('
+    '  resource_key TEXT NOT NULL,'
+    '  tag_key TEXT NOT NULL,'
+    '  tag_value TEXT,'
+    '  PRIMARY KEY (resource_key, tag_key))',
+    'CREATE INDEX IF NOT EXISTS idx_tags_key_value ON resource_tags (tag_key, tag_value)',
+    'CREATE TABLE IF NOT EXISTS collections ('
+    '  resource_type TEXT NOT NULL,'
+    '  scope TEXT NOT NULL,'
+    '  refreshed_at REAL NOT NULL,'
+    '  PRIMARY KEY (resource_type, scope))',
+    'CREATE TABLE IF NOT EXISTS snapshots ('
+    '  snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,'
+    '  resource_type TEXT NOT NULL,'
+    '  scope TEXT NOT NULL,'
+    '  taken_at REAL NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS idx_snapshots_collection ON snapshots (resource_type, scope, taken_at)',
+    # Rows added, modified (fingerprint and summary set) or removed (both NULL) since the previous snapshot
+    'CREATE TABLE IF NOT EXISTS snapshot_changes ('
+    '  snapshot_id INTEGER NOT NULL,'
+    '  resource_id TEXT NOT NULL,'
+    '  fingerprint TEXT,'
+    '  summary TEXT,'
+    '  PRIMARY KEY (snapshot_id, resource_id))'
+]
+
+
+def resource_fingerprint(resource: Dict[str, Any]) -> str:
+    """Content hash of a normalized resource record."""
+    return hashlib.sha1(json.dumps(resource, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def snapshot_summary(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """The compact part of a record kept in snapshots."""
+    return {field: resource[field] for field in SNAPSHOT_FIELDS if resource.get(field) is not None}
+
+
+def snapshot_row(resource, fingerprint: str) -> tuple:
+    """(fingerprint, summary JSON) stored for a record in a snapshot."""
+    return fingerprint, json.dumps(snapshot_summary(resource), default=str)
+
+
+def diff_snapshots(baseline: Dict[str, str], current: Dict[str, str]) -> Dict[str, List[str]]:
+    """
+    Compare two resource ID -> fingerprint maps in a single pass over each.
+
+    Returns:
+        Sorted resource IDs that were added, removed and modified
+    """
+    added, modified = [], []
+    for resource_id, fingerprint in current.items():
+        previous = baseline.get(resource_id)
+        if previous is None:
+            added.append(resource_id)
+        elif previous != fingerprint:
+            modified.append(resource_id)
+    removed = [resource_id for resource_id in baseline if resource_id not in current]
+    return {'added': sorted(added), 'removed': sorted(removed), 'modified': sorted(modified)}
+
+
+class InventoryIndex:
+    """
+    SQLite-backed index of normalized inventory records.
+
+    Records are stored per collection (resource type + scope, where scope is the
+    region collected or 'global') with secondary indexes on region, state and
+    tag key/value. Refreshes only write records whose fingerprint changed, and
+    each refresh that changes a collection records a hash snapshot of it. A
+    snapshot stores only the rows that changed since the previous one; the
+    oldest retained snapshot of a collection holds every row.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH, max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._conn = self._connect(path)
+        with self._lock:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+
+    def sync(self, resource_type: str, scope: str, resources: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Replace one collection with freshly collected records, writing only the changes.
+
+        Args:
+            resource_type: Resource type (e.g., 'EC2')
+            scope: Region collected, or 'global'
+            resources: Normalized resource records with 'resource_id'
+
+        Returns:
+            Counts of added, modified, removed and unchanged records
+        """
+        now = time.time()
+        with self._lock:
+            stored = {key: (resource_id, fingerprint) for key, resource_id, fingerprint in self._conn.execute(
+                'SELECT resource_key, resource_id, fingerprint FROM resources WHERE resource_type = ? AND scope = ?',
+                (resource_type, scope)
+            )}
+
+            counts = {'added': 0, 'modified': 0, 'removed': 0, 'unchanged': 0}
+            seen = set()
+            changes = {}
+            for resource in resources:
+                key = self._key(resource_type, scope, resource['resource_id'])
+                seen.add(key)
+                fingerprint = resource_fingerprint(resource)
+                if key in stored and stored[key][1] == fingerprint:
+                    counts['unchanged'] += 1
+                    continue
+                counts['modified' if key in stored else 'added'] += 1
+                changes[resource['resource_id']] = snapshot_row(resource, fingerprint)
+                self._write(key, resource_type, scope, resource, fingerprint, now)
+
+            removed = [key for key in stored if key not in seen]
+            for key in removed:
+                self._conn.execute('DELETE FROM resources WHERE resource_key = ?', (key,))
+                self._conn.execute('DELETE FROM resource_tags WHERE resource_key = ?', (key,))
+                changes[stored[key][0]] = (None, None)
+            counts['removed'] = len(removed)
+
+            if not self._has_snapshot(resource_type, scope):
+                # The first snapshot is the full base the later deltas apply to
+                self._record_snapshot(resource_type, scope, {
+                    resource['resource_id']: snapshot_row(resource, resource_fingerprint(resource))
+                    for resource in resources
+                }, now)
+            elif changes:
+                self._record_snapshot(resource_type, scope, changes, now)
+
+            self._conn.execute(
+                'INSERT OR REPLACE INTO collections (resource_type, scope, refreshed_at) VALUES (?, ?, ?)',
+                (resource_type, scope, now)
+            )
+            self._conn.commit()
+        return counts
+
+    def is_fresh(self, resource_type: str, scope: str, max_age_seconds: Optional[int] = None) -> bool:
+        """Whether the collection was refreshed within the max age."""
+        refreshed_at = self.refreshed_at(resource_type, scope)
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        return refreshed_at is not None and time.time() - refreshed_at <= max_age
+
+    def refreshed_at(self, resource_type: str, scope: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT refreshed_at FROM collections WHERE resource_type = ? AND scope = ?',
+                (resource_type, scope)
+            ).fetchone()
+        return row[0] if row else None
+
+    def query(self, resource_type: Optional[str] = None, scope: Optional[str] = None,
+              region: Optional[str] = None, state: Optional[str] = None,
+              tags: Optional[Dict[str, Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Query stored records.
+
+        Args:
+            resource_type: Resource type filter
+            scope: Collection scope filter (region collected or 'global')
+            region: Resource region filter
+            state: Resource state filter
+            tags: Tag filters; a None value matches any value of the key
+
+        Returns:
+            Stored resource records ordered by resource type and ID
+        """
+        clauses, args = [], []
+        for column, value in (('resource_type', resource_type), ('scope', scope), ('region', region), ('state', state)):
+            if value is not None:
+                clauses.append(f"r.{column} = ?")
+                args.append(value)
+        for tag_key, tag_value in (tags or {}).items():
+            if tag_value is None:
+                clauses.append('EXISTS (SELECT 1 FROM resource_tags t WHERE t.resource_key = r.resource_key AND t.tag_key = ?)')
+                args.append(tag_key)
+            else:
+                clauses.append(
+                    'EXISTS (SELECT 1 FROM resource_tags t WHERE t.resource_key = r.resource_key '
+                    'AND t.tag_key = ? AND t.tag_value = ?)'
+                )
+                args.extend([tag_key, tag_value])
+
+        sql = 'SELECT data FROM resources r'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY r.resource_type, r.resource_id'
+
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, resource_type: str, scope: str, resource_id: str) -> Optional[Dict[str, Any]]:
+        """Get one stored record."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM resources WHERE resource_key = ?', (self._key(resource_type, scope, resource_id),)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def fingerprints(self, resource_type: str, scope: str) -> Dict[str, str]:
+        """Current resource ID -> fingerprint map of a collection."""
+        with self._lock:
+            return dict(self._conn.execute(
+                'SELECT resource_id, fingerprint FROM resources WHERE resource_type = ? AND scope = ?',
+                (resource_type, scope)
+            ).fetchall())
+
+    def snapshot_before(self, resource_type: str, scope: str, since: float) -> Optional[Dict[str, Any]]:
+        """
+        Get the collection snapshot that was current at a point in time.
+
+        Falls back to the oldest snapshot when the collection was first indexed
+        after that time.
+
+        Args:
+            resource_type: Resource type
+            scope: Region collected, or 'global'
+            since: Unix timestamp
+
+        Returns:
+            Dictionary with 'taken_at', 'fingerprints' (ID -> hash) and
+            'summaries' (ID -> compact record), or None if never snapshotted
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT snapshot_id, taken_at FROM snapshots WHERE resource_type = ? AND scope = ? AND taken_at <= ? '
+                'ORDER BY taken_at DESC LIMIT 1',
+                (resource_type, scope, since)
+            ).fetchone() or self._conn.execute(
+                'SELECT snapshot_id, taken_at FROM snapshots WHERE resource_type = ? AND scope = ? '
+                'ORDER BY taken_at ASC LIMIT 1',
+                (resource_type, scope)
+            ).fetchone()
+            if row is None:
+                return None
+            entries = self._snapshot_state(resource_type, scope, row[0])
+        return {
+            'taken_at': row[1],
+            'fingerprints': {resource_id: fingerprint for resource_id, (fingerprint, _) in entries.items()},
+            'summaries': {resource_id: json.loads(summary) for resource_id, (_, summary) in entries.items()}
+        }
+
+    def _has_snapshot(self, resource_type: str, scope: str) -> bool:
+        return self._conn.execute(
+            'SELECT 1 FROM snapshots WHERE resource_type = ? AND scope = ? LIMIT 1', (resource_type, scope)
+        ).fetchone() is not None
+
+    def _snapshot_state(self, resource_type: str, scope: str, snapshot_id: int) -> Dict[str, tuple]:
+        """Replay a collection's snapshot deltas up to snapshot_id into ID -> (fingerprint, summary JSON)."""
+        state = {}
+        for resource_id, fingerprint, summary in self._conn.execute(
+            'SELECT c.resource_id, c.fingerprint, c.summary FROM snapshot_changes c '
+            'JOIN snapshots s ON s.snapshot_id = c.snapshot_id '
+            'WHERE s.resource_type = ? AND s.scope = ? AND s.snapshot_id <= ? ORDER BY s.snapshot_id',
+            (resource_type, scope, snapshot_id)
+        ):
+            if fingerprint is None:
+                state.pop(resource_id, None)
+            else:
+                state[resource_id] = (fingerprint, summary)
+        return state
+
+    def _record_snapshot(self, resource_type: str, scope: str, changes: Dict[str, tuple], now: float):
+        snapshot_id = self._conn.execute(
+            'INSERT INTO snapshots (resource_type, scope, taken_at) VALUES (?, ?, ?)', (resource_type, scope, now)
+        ).lastrowid
+        self._conn.executemany(
+            'INSERT INTO snapshot_changes (snapshot_id, resource_id, fingerprint, summary) VALUES (?, ?, ?, ?)',
+            [(snapshot_id, resource_id, fingerprint, summary) for resource_id, (fingerprint, summary) in changes.items()]
+        )
+
+        # Prune expired snapshots, keeping the newest expired one as the baseline for the cutoff
+        expired = [row[0] for row in self._conn.execute(
+            'SELECT snapshot_id FROM snapshots WHERE resource_type = ? AND scope = ? AND taken_at < ? '
+            'ORDER BY snapshot_id DESC',
+            (resource_type, scope, now - SNAPSHOT_RETENTION_SECONDS)
+        ).fetchall()]
+        if len(expired) < 2:
+            return
+        # Fold the pruned deltas into the baseline so it becomes the full base of the collection
+        baseline_id = expired[0]
+        baseline = self._snapshot_state(resource_type, scope, baseline_id)
+        for expired_id in expired:
+            self._conn.execute('DELETE FROM snapshot_changes WHERE snapshot_id = ?', (expired_id,))
+        self._conn.executemany(
+            'INSERT INTO snapshot_changes (snapshot_id, resource_id, fingerprint, summary) VALUES (?, ?, ?, ?)',
+            [(baseline_id, resource_id, fingerprint, summary) for resource_id, (fingerprint, summary) in baseline.items()]
+        )
+        for expired_id in expired[1:]:
+            self._conn.execute('DELETE FROM snapshots WHERE snapshot_id = ?', (expired_id,))
+
+    def _write(self, key: str, resource_type: str, scope: str, resource, fingerprint: str, now: float):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO resources '
+            '(resource_key, resource_id, resource_type, scope, region, state, fingerprint, data, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (key, resource['resource_id'], resource_type, scope, resource.get('region'), resource.get('status'),
+             fingerprint, json.dumps(resource, default=str), now)
+        )
+        self._conn.execute('DELETE FROM resource_tags WHERE resource_key = ?', (key,))
+        self._conn.executemany(
+            'INSERT INTO resource_tags (resource_key, tag_key, tag_value) VALUES (?, ?, ?)',
+            [(key, tag_key, tag_value) for tag_key, tag_value in (resource.get('tags') or {}).items()]
+        )
+
+    @staticmethod
+    def _key(resource_type: str, scope: str, resource_id: str) -> str:
+        return f"{resource_type}:{scope}:{resource_id}"
+
+    @staticmethod
+    def _connect(path: Optional[str]) -> sqlite3.Connection:
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                return sqlite3.connect(path, check_same_thread=False)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Could not open inventory index {path}, using memory: {str(e)}")
+        return sqlite3.connect(':memory:', check_same_thread=False)
@@ -0,0 +1,82 @@
+"""
+Count-only inventory summaries for AWS AI Concierge
+"""
+
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# Filters a count-only summary can apply; the others need full records
+SUMMARY_FILTERS = ('state', 'instance_type')
+
+
+def count_resources(pairs: Iterable[Tuple[Optional[str], Optional[str]]],
+                    filters: Optional[Dict[str, Any]] = None) -> Counter:
+    """
+    Count (state, instance_type) pairs, as they are streamed, that match the filters.
+
+    Args:
+        pairs: (state, instance_type) for each resource
+        filters: Inventory filters; only state and instance_type are applied
+
+    Returns:
+        Counter keyed by (state, instance_type)
+    """
+    filters = filters or {}
+    state_filter = filters.get('state', '').lower()
+    type_filter = filters.get('instance_type')
+
+    counts = Counter()
+    for state, instance_type in pairs:
+        if state_filter and str(state or '').lower() != state_filter:
+            continue
+        if type_filter and instance_type != type_filter:
+            continue
+        counts[(state, instance_type)] += 1
+    return counts
+
+
+class InventorySummary:
+    """Resource counts by type, region, state and instance type."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+
+    @property
+    def total(self) -> int:
+        return sum(self._counts.values())
+
+    def add(self, resource_type: str, region: str, counts: Counter):
+        """Add one collection's (state, instance_type) counts."""
+        for (state, instance_type), count in counts.items():
+            self._counts[(resource_type, region, state or 'unknown', instance_type)] += count
+
+    def tables(self) -> Dict[str, Any]:
+        """
+        Aggregate tables, largest counts first.
+
+        Returns:
+            Dictionary with by_type, by_region, by_state and by_instance_type
+            counts, and 'groups' rows counting each (resource_type, region,
+            state, instance_type) combination
+        """
+        by_dimension = [Counter() for _ in range(4)]
+        for key, count in self._counts.items():
+            for position, value in enumerate(key):
+                if value is not None:
+                    by_dimension[position][value] += count
+
+        groups: List[Dict[str, Any]] = [
+            {'resource_type': resource_type, 'region': region, 'state': state,
+             'instance_type': instance_type, 'count': count}
+            for (resource_type, region, state, instance_type), count in self._counts.items()
+        ]
+        groups.sort(key=lambda row: (-row['count'], row['resource_type'], row['region'], row['state']))
+
+        by_type, by_region, by_state, by_instance_type = (dict(counter.most_common()) for counter in by_dimension)
+        return {
+            'by_type': by_type,
+            'by_region': by_region,
+            'by_state': by_state,
+            'by_instance_type': by_instance_type,
+            'groups': groups
+        }
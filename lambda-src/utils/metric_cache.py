@@ -0,0 +1,313 @@
+"""
+CloudWatch metric series cache for AWS AI Concierge
+"""
+
+import calendar
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# get_metric_statistics returns at most 1440 datapoints per call
+MAX_DATAPOINTS_PER_CALL = 1440
+# Datapoints newer than this may still change as late metrics arrive
+DEFAULT_SETTLE_SECONDS = 600
+DEFAULT_RETENTION_SECONDS = 35 * 24 * 3600
+DEFAULT_MAX_SERIES = 5000
+# Series locks are striped so the lock table stays bounded however many series are cached
+SERIES_LOCK_STRIPES = 64
+
+_MISSING = float('nan')
+
+
+def _to_epoch(value: datetime) -> int:
+    """Convert a naive-UTC or timezone-aware datetime to epoch seconds."""
+    return calendar.timegm(value.utctimetuple())
+
+
+class MetricSeries:
+    """One statistic of one metric, stored as a period-aligned array('d') with NaN gaps."""
+
+    __slots__ = ('start', 'period', 'values', 'settled_until', 'unit')
+
+    def __init__(self, start: int, period: int, unit: str = 'None'):
+        self.start = start
+        self.period = period
+        self.values = array('d')
+        self.settled_until = start
+        self.unit = unit
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.values) * self.period
+
+    def ensure_range(self, start: int, end: int):
+        """Grow the buffer with NaN slots so [start, end) is addressable."""
+        if start < self.start:
+            head = (self.start - start) // self.period
+            self.values = array('d', [_MISSING] * head) + self.values
+            self.start = start
+        if end > self.end:
+            self.values.extend([_MISSING] * ((end - self.end) // self.period))
+
+    def clear_range(self, start: int, end: int):
+        """Reset [start, end) to NaN before re-filling it from a fresh fetch."""
+        first = (start - self.start) // self.period
+        last = (end - self.start) // self.period
+        for index in range(max(first, 0), min(last, len(self.values))):
+            self.values[index] = _MISSING
+
+    def set(self, timestamp: int, value: float):
+        index = (timestamp - self.start) // self.period
+        if 0 <= index < len(self.values):
+            self.values[index] = value
+
+    def window(self, start: int, end: int) -> List[float]:
+        """Return the non-missing values in [start, end) in time order."""
+        first = max((start - self.start) // self.period, 0)
+        last = min((end - self.start) // self.period, len(self.values))
+        return [v for v in self.values[first:last] if v == v]
+
+    def trim(self, retention_seconds: int):
+        """Drop slots older than the retention window."""
+        excess = len(self.values) - retention_seconds // self.period
+        if excess > 0:
+            del self.values[:excess]
+            self.start += excess * self.period
+            self.settled_until = max(self.settled_until, self.start)
+
+
+class MetricSeriesCache:
+    """
+    Caches CloudWatch datapoints keyed by (region, namespace, metric, dimensions, period, stat).
+
+    Only the unsettled tail of a window is re-fetched on later calls, so repeated
+    queries over a sliding window cost one small API call instead of a full download.
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None, settle_seconds: int = DEFAULT_SETTLE_SECONDS,
+                 retention_seconds: int = DEFAULT_RETENTION_SECONDS, max_series: int = DEFAULT_MAX_SERIES):
+        self.spill_dir = spill_dir
+        self.settle_seconds = settle_seconds
+        self.retention_seconds = retention_seconds
+        self.max_series = max_series
+        self._series: 'OrderedDict[Tuple, MetricSeries]' = OrderedDict()
+        # Guards the LRU index; handlers may share one cache across worker threads
+        self._lock = threading.Lock()
+        # Held from loading a metric's series until its window is read, so concurrent
+        # requests for one metric never merge into (or trim) the same arrays at once
+        self._series_locks = [threading.Lock() for _ in range(SERIES_LOCK_STRIPES)]
+        self.api_calls = 0
+
+    def get_values(self, cw_client, namespace: str, metric_name: str, dimensions: List[Dict[str, str]],
+                   period: int, stats: List[str], start_time: datetime, end_time: datetime,
+                   request_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get datapoints for a metric window, fetching only what is not cached yet.
+
+        Args:
+            cw_client: CloudWatch client for the metric's region
+            namespace: CloudWatch namespace (e.g., 'AWS/EC2')
+            metric_name: Metric name (e.g., 'CPUUtilization')
+            dimensions: CloudWatch dimensions list
+            period: Period in seconds
+            stats: Statistics to return (e.g., ['Average', 'Maximum'])
+            start_time: Window start (naive UTC or timezone-aware)
+            end_time: Window end (naive UTC or timezone-aware)
+            request_id: Request ID for tracking
+
+        Returns:
+            Dictionary with 'values' (stat -> time-ordered list of floats) and 'unit'
+        """
+        start = _to_epoch(start_time) // period * period
+        end = -(-_to_epoch(end_time) // period) * period
+        settle_boundary = (int(time.time()) - self.settle_seconds) // period * period
+
+        base_key = self._base_key(cw_client, namespace, metric_name, dimensions, period)
+        with self._series_lock(base_key):
+            return self._get_locked(cw_client, namespace, metric_name, dimensions, period, stats,
+                                    base_key, start, end, settle_boundary, request_id)
+
+    def _get_locked(self, cw_client, namespace: str, metric_name: str, dimensions: List[Dict[str, str]],
+                    period: int, stats: List[str], base_key: Tuple, start: int, end: int,
+                    settle_boundary: int, request_id: Optional[str]) -> Dict[str, Any]:
+        """Fetch, merge and read a metric's series; the caller holds the metric's series lock."""
+        # Group statistics by the ranges they are missing so each range is fetched once
+        pending: Dict[Tuple[Tuple[int, int], ...], List[str]] = {}
+        series_by_stat: Dict[str, MetricSeries] = {}
+        for stat in stats:
+            series = self._load(base_key + (stat,))
+            # A series that ends before the window starts cannot be extended append-only
+            if series is None or series.settled_until < start:
+                series = MetricSeries(start, period)
+                self._store(base_key + (stat,), series)
+            series_by_stat[stat] = series
+            ranges = self._missing_ranges(series, start, end)
+            if ranges:
+                pending.setdefault(tuple(ranges), []).append(stat)
+
+        for ranges, group_stats in pending.items():
+            for range_start, range_end in ranges:
+                datapoints = self._fetch(cw_client, namespace, metric_name, dimensions, period,
+                                         group_stats, range_start, range_end, request_id)
+                for stat in group_stats:
+                    series = series_by_stat[stat]
+                    series.ensure_range(range_start, range_end)
+                    series.clear_range(range_start, range_end)
+                    for datapoint in datapoints:
+                        if stat in datapoint and datapoint.get('Timestamp'):
+                            series.set(_to_epoch(datapoint['Timestamp']) // period * period, float(datapoint[stat]))
+                            series.unit = datapoint.get('Unit', series.unit)
+                    if range_start <= series.settled_until:
+                        series.settled_until = max(series.settled_until, min(range_end, settle_boundary))
+
+            for stat in group_stats:
+                series = series_by_stat[stat]
+                series.trim(self.retention_seconds)
+                self._spill(base_key + (stat,), series)
+
+        unit = next((s.unit for s in series_by_stat.values() if s.unit != 'None'), 'None')
+        return {
+            'values': {stat: series.window(start, end) for stat, series in series_by_stat.items()},
+            'unit': unit
+        }
+
+    def clear(self):
+        """Clear in-memory series (useful for testing)."""
+        with self._lock:
+            self._series.clear()
+        self.api_calls = 0
+
+    def _series_lock(self, base_key: Tuple) -> threading.Lock:
+        """The lock covering every statistic of one metric's series."""
+        return self._series_locks[hash(base_key) % SERIES_LOCK_STRIPES]
+
+    def _missing_ranges(self, series: MetricSeries, start: int, end: int) -> List[Tuple[int, int]]:
+        """Work out which parts of [start, end) still need to be fetched."""
+        if series.settled_until <= series.start and series.end <= series.start:
+            return [(start, end)]
+
+        ranges = []
+        if start < series.start:
+            ranges.append((start, min(series.start, end)))
+        tail_start = max(series.settled_until, start)
+        if tail_start < end:
+            ranges.append((tail_start, end))
+        return ranges
+
+    def _fetch(self, cw_client, namespace: str, metric_name: str, dimensions: List[Dict[str, str]],
+               period: int, stats: List[str], start: int, end: int,
+               request_id: Optional[str]) -> List[Dict[str, Any]]:
+        """Fetch a range from CloudWatch in chunks that respect the datapoint limit."""
+        datapoints = []
+        chunk_seconds = MAX_DATAPOINTS_PER_CALL * period
+        chunk_start = start
+
+        while chunk_start < end:
+            chunk_end = min(chunk_start + chunk_seconds, end)
+            response = cw_client.get_metric_statistics(
+                Namespace=namespace,
+                MetricName=metric_name,
+                Dimensions=dimensions,
+                StartTime=datetime.utcfromtimestamp(chunk_start),
+                EndTime=datetime.utcfromtimestamp(chunk_end),
+                Period=period,
+                Statistics=stats
+            )
+            with self._lock:
+                self.api_calls += 1
+            datapoints.extend(response.get('Datapoints', []))
+            chunk_start = chunk_end
+
+        logger.debug(f"[{request_id}] Fetched {len(datapoints)} {namespace}/{metric_name} datapoints "
+                     f"for {(end - start) // period} periods")
+        return datapoints
+
+    def _base_key(self, cw_client, namespace: str, metric_name: str,
+                  dimensions: List[Dict[str, str]], period: int) -> Tuple:
+        region = getattr(getattr(cw_client, 'meta', None), 'region_name', None)
+        if not isinstance(region, str):
+            region = 'default'
+        dimension_key = tuple(sorted((d['Name'], d['Value']) for d in dimensions))
+        return (region, namespace, metric_name, dimension_key, period)
+
+    def _store(self, key: Tuple, series: MetricSeries):
+        with self._lock:
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+
+    def _load(self, key: Tuple) -> Optional[MetricSeries]:
+        """Look a series up in memory, then in the spill directory."""
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+                return series
+
+        path = self._spill_path(key)
+        if not path or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline().decode('utf-8'))
+                series = MetricSeries(header['start'], header['period'], header.get('unit', 'None'))
+                series.values.frombytes(f.read())
+                series.settled_until = header['settled_until']
+            self._store(key, series)
+            return series
+        except Exception as e:
+            logger.warning(f"Could not load spilled metric series {path}: {str(e)}")
+            return None
+
+    def _spill(self, key: Tuple, series: MetricSeries):
+        """Write a series to the spill directory, ignoring filesystem errors."""
+        path = self._spill_path(key)
+        if not path:
+            return
+
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            header = {
+                'start': series.start,
+                'period': series.period,
+                'settled_until': series.settled_until,
+                'unit': series.unit
+            }
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(json.dumps(header).encode('utf-8') + b'\n')
+                f.write(series.values.tobytes())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not spill metric series to {path}: {str(e)}")
+
+    def _spill_path(self, key: Tuple) -> Optional[str]:
+        if not self.spill_dir:
+            return None
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.series")
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Average, maximum and latest value of a time-ordered list."""
+    if not values:
+        return {'average': None, 'maximum': None, 'latest': None, 'total': None}
+    total = math.fsum(values)
+    return {
+        'average': total / len(values),
+        'maximum': max(values),
+        'latest': values[-1],
+        'total': total
+    }
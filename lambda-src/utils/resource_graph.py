@@ -0,0 +1,266 @@
+"""
+Resource relationship graph for AWS AI Concierge
+"""
+
+import logging
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.collector_registry import paginate
+
+logger = logging.getLogger(__name__)
+
+# Edge labels, always pointing from the dependent resource to what it depends on
+RELATIONS = ('in_vpc', 'in_subnet', 'uses_security_group', 'attached_to', 'allows_traffic_from')
+_RELATION_CODES = {relation: code for code, relation in enumerate(RELATIONS)}
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def _name_tag(tags: Optional[List[Dict[str, str]]]) -> Optional[str]:
+    for tag in tags or []:
+        if tag['Key'] == 'Name':
+            return tag['Value']
+    return None
+
+
+class ResourceGraph:
+    """
+    Adjacency-list graph of resources in one region.
+
+    Nodes are numbered and held in parallel lists (ID, type, name, state).
+    Each edge is stored once per direction as a single int,
+    neighbor * len(RELATIONS) + relation code, so a region with tens of
+    thousands of resources stays small and traversals never touch AWS.
+    """
+
+    def __init__(self, region: str):
+        self.region = region
+        self.built_at = time.time()
+        self.failed_collectors: Dict[str, str] = {}
+        self._ids: List[str] = []
+        self._types: List[str] = []
+        self._names: List[Optional[str]] = []
+        self._states: List[Optional[str]] = []
+        self._outgoing: List[List[int]] = []
+        self._incoming: List[List[int]] = []
+        self._nodes: Dict[Tuple[str, str], int] = {}
+        self._by_id: Dict[str, List[int]] = {}
+        self.edge_count = 0
+
+    def add_node(self, resource_type: str, resource_id: str, name: Optional[str] = None,
+                 state: Optional[str] = None) -> int:
+        """Add a resource, or fill in the name and state of one already referenced by an edge."""
+        key = (resource_type, resource_id)
+        node = self._nodes.get(key)
+        if node is not None:
+            self._names[node] = name if name is not None else self._names[node]
+            self._states[node] = state if state is not None else self._states[node]
+            return node
+
+        node = len(self._ids)
+        self._nodes[key] = node
+        self._by_id.setdefault(resource_id, []).append(node)
+        self._ids.append(resource_id)
+        self._types.append(sys.intern(resource_type))
+        self._names.append(name)
+        self._states.append(sys.intern(state) if state else state)
+        self._outgoing.append([])
+        self._incoming.append([])
+        return node
+
+    def add_edge(self, source: int, relation: str, target_type: str, target_id: Optional[str]):
+        """Link a node to the resource it depends on; the target is added if not seen yet."""
+        if not target_id:
+            return
+        target = self.add_node(target_type, target_id)
+        code = _RELATION_CODES[relation]
+        outgoing = target * len(RELATIONS) + code
+        if outgoing in self._outgoing[source]:
+            return
+        self._outgoing[source].append(outgoing)
+        self._incoming[target].append(source * len(RELATIONS) + code)
+        self.edge_count += 1
+
+    @property
+    def node_count(self) -> int:
+        return len(self._ids)
+
+    def find(self, resource_id: str, resource_type: Optional[str] = None) -> List[int]:
+        """Nodes with an ID, optionally narrowed to one type."""
+        return [node for node in self._by_id.get(resource_id, [])
+                if resource_type is None or self._types[node] == resource_type]
+
+    def describe(self, node: int) -> Dict[str, Any]:
+        """Response dict for a node."""
+        return {
+            'resource_id': self._ids[node],
+            'resource_type': self._types[node],
+            'name': self._names[node],
+            'state': self._states[node]
+        }
+
+    def neighborhood(self, node: int, depth: int = 1) -> Dict[str, Any]:
+        """
+        Resources within a number of hops, following edges in both directions.
+
+        Returns:
+            Dictionary with 'resources' (each with distance) and the 'edges' traversed
+        """
+        return self._traverse(node, depth, (self._outgoing, self._incoming))
+
+    def blast_radius(self, node: int, max_depth: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Resources that depend on a node directly or transitively.
+
+        Returns:
+            Dictionary with 'resources' (each with distance) and the 'edges' traversed
+        """
+        return self._traverse(node, max_depth, (self._incoming,))
+
+    def _traverse(self, start: int, max_depth: Optional[int], adjacency: Tuple[List[List[int]], ...]) -> Dict[str, Any]:
+        distances = {start: 0}
+        resources, edges = [], []
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if max_depth is not None and distances[node] >= max_depth:
+                continue
+            for lists in adjacency:
+                for encoded in lists[node]:
+                    neighbor, code = divmod(encoded, len(RELATIONS))
+                    # Edges are reported in their stored direction: dependent -> dependency
+                    source, target = (node, neighbor) if lists is self._outgoing else (neighbor, node)
+                    edges.append({'source': self._ids[source], 'relation': RELATIONS[code], 'target': self._ids[target]})
+                    if neighbor in distances:
+                        continue
+                    distances[neighbor] = distances[node] + 1
+                    resources.append({**self.describe(neighbor), 'distance': distances[neighbor],
+                                      'via': self._ids[node], 'relation': RELATIONS[code]})
+                    queue.append(neighbor)
+
+        unique_edges = list({(e['source'], e['relation'], e['target']): e for e in edges}.values())
+        return {'resources': resources, 'edges': unique_edges}
+
+
+class RelationshipGraphBuilder:
+    """Builds a region's ResourceGraph from one batched pass of describe calls."""
+
+    def __init__(self, aws_clients, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.aws_clients = aws_clients
+        self.max_workers = max_workers
+
+    def build(self, region: str, request_id: str) -> ResourceGraph:
+        """
+        Describe the region's network-related resources concurrently and link them.
+
+        Args:
+            region: AWS region to describe
+            request_id: Request ID for tracking
+
+        Returns:
+            ResourceGraph; collectors that failed are listed in failed_collectors.
+            Raises if every collector fails.
+        """
+        ec2_client = self.aws_clients.get_ec2_client(region)
+        rds_client = self.aws_clients.get_rds_client(region)
+        lambda_client = self.aws_clients.get_lambda_client(region)
+        collectors = {
+            'vpcs': lambda: paginate(ec2_client.describe_vpcs, 'Vpcs', MaxResults=1000),
+            'subnets': lambda: paginate(ec2_client.describe_subnets, 'Subnets', MaxResults=1000),
+            'security_groups': lambda: paginate(ec2_client.describe_security_groups, 'SecurityGroups',
+                                                MaxResults=1000),
+            'instances': lambda: [
+                instance
+                for reservation in paginate(ec2_client.describe_instances, 'Reservations', MaxResults=1000)
+                for instance in reservation['Instances']
+            ],
+            'network_interfaces': lambda: paginate(ec2_client.describe_network_interfaces, 'NetworkInterfaces',
+                                                   MaxResults=1000),
+            'volumes': lambda: paginate(ec2_client.describe_volumes, 'Volumes', MaxResults=500),
+            'db_instances': lambda: paginate(rds_client.describe_db_instances, 'DBInstances', 'Marker', 'Marker',
+                                             MaxRecords=100),
+            'functions': lambda: paginate(lambda_client.list_functions, 'Functions', 'Marker', 'NextMarker',
+                                          MaxItems=50)
+        }
+
+        def collect(item):
+            name, call = item
+            try:
+                return name, call(), None
+            except Exception as e:
+                logger.warning(f"[{request_id}] Relationship collector {name} failed in {region}: {str(e)}")
+                return name, [], e
+
+        collected, failures = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(collectors)))) as executor:
+            for name, items, error in executor.map(collect, collectors.items()):
+                collected[name] = items
+                if error is not None:
+                    failures[name] = error
+
+        if len(failures) == len(collectors):
+            raise next(iter(failures.values()))
+
+        graph = ResourceGraph(region)
+        graph.failed_collectors = {name: str(e) for name, e in failures.items()}
+        self._link(graph, collected)
+        logger.info(f"[{request_id}] Built relationship graph for {region}: "
+                    f"{graph.node_count} resources, {graph.edge_count} relationships")
+        return graph
+
+    def _link(self, graph: ResourceGraph, collected: Dict[str, List[Dict[str, Any]]]):
+        for vpc in collected['vpcs']:
+            graph.add_node('VPC', vpc['VpcId'], _name_tag(vpc.get('Tags')), vpc.get('State'))
+
+        for subnet in collected['subnets']:
+            node = graph.add_node('SUBNET', subnet['SubnetId'], _name_tag(subnet.get('Tags')), subnet.get('State'))
+            graph.add_edge(node, 'in_vpc', 'VPC', subnet.get('VpcId'))
+
+        for group in collected['security_groups']:
+            node = graph.add_node('SECURITY_GROUP', group['GroupId'], group.get('GroupName'))
+            graph.add_edge(node, 'in_vpc', 'VPC', group.get('VpcId'))
+            for permission in group.get('IpPermissions', []):
+                for pair in permission.get('UserIdGroupPairs', []):
+                    if pair.get('GroupId') != group['GroupId']:
+                        graph.add_edge(node, 'allows_traffic_from', 'SECURITY_GROUP', pair.get('GroupId'))
+
+        for instance in collected['instances']:
+            node = graph.add_node('EC2', instance['InstanceId'], _name_tag(instance.get('Tags')),
+                                  instance.get('State', {}).get('Name'))
+            graph.add_edge(node, 'in_subnet', 'SUBNET', instance.get('SubnetId'))
+            for group in instance.get('SecurityGroups', []):
+                graph.add_edge(node, 'uses_security_group', 'SECURITY_GROUP', group.get('GroupId'))
+
+        for interface in collected['network_interfaces']:
+            node = graph.add_node('ENI', interface['NetworkInterfaceId'], interface.get('Description') or None,
+                                  interface.get('Status'))
+            graph.add_edge(node, 'in_subnet', 'SUBNET', interface.get('SubnetId'))
+            for group in interface.get('Groups', []):
+                graph.add_edge(node, 'uses_security_group', 'SECURITY_GROUP', group.get('GroupId'))
+            graph.add_edge(node, 'attached_to', 'EC2', interface.get('Attachment', {}).get('InstanceId'))
+
+        for volume in collected['volumes']:
+            node = graph.add_node('EBS_VOLUME', volume['VolumeId'], _name_tag(volume.get('Tags')), volume.get('State'))
+            for attachment in volume.get('Attachments', []):
+                graph.add_edge(node, 'attached_to', 'EC2', attachment.get('InstanceId'))
+
+        for db_instance in collected['db_instances']:
+            node = graph.add_node('RDS', db_instance['DBInstanceIdentifier'], db_instance['DBInstanceIdentifier'],
+                                  db_instance.get('DBInstanceStatus'))
+            for subnet in db_instance.get('DBSubnetGroup', {}).get('Subnets', []):
+                graph.add_edge(node, 'in_subnet', 'SUBNET', subnet.get('SubnetIdentifier'))
+            for group in db_instance.get('VpcSecurityGroups', []):
+                graph.add_edge(node, 'uses_security_group', 'SECURITY_GROUP', group.get('VpcSecurityGroupId'))
+
+        for function in collected['functions']:
+            node = graph.add_node('LAMBDA', function['FunctionName'], function['FunctionName'],
+                                  function.get('State', 'Active'))
+            vpc_config = function.get('VpcConfig') or {}
+            for subnet_id in vpc_config.get('SubnetIds', []):
+                graph.add_edge(node, 'in_subnet', 'SUBNET', subnet_id)
+            for group_id in vpc_config.get('SecurityGroupIds', []):
+                graph.add_edge(node, 'uses_security_group', 'SECURITY_GROUP', group_id)
@@ -0,0 +1,232 @@
+"""
+Resource search index for AWS AI Concierge
+"""
+
+import bisect
+import heapq
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# Score of a term match by the field it came from
+FIELD_WEIGHTS = {'id': 5.0, 'name': 4.0, 'tag': 2.0, 'type': 1.0}
+# Prefix completions score less than exact terms
+PREFIX_FACTOR = 0.5
+# Most completions expanded for one query term
+MAX_PREFIX_TERMS = 64
+STOPWORDS = {'a', 'an', 'and', 'for', 'in', 'my', 'of', 'on', 'our', 'the', 'with'}
+# Words people use for each resource type ("the payments db")
+TYPE_TERMS = {
+    'EC2': ('ec2', 'instance', 'server', 'vm'),
+    'S3': ('s3', 'bucket'),
+    'RDS': ('rds', 'db', 'database'),
+    'LAMBDA': ('lambda', 'function'),
+    'ECS': ('ecs', 'cluster', 'container'),
+    'EKS': ('eks', 'kubernetes', 'cluster'),
+    'DYNAMODB': ('dynamodb', 'table', 'db', 'database'),
+    'ELASTICACHE': ('elasticache', 'cache', 'redis', 'memcached'),
+    'EBS': ('ebs', 'volume', 'disk'),
+    'ELB': ('elb', 'load', 'balancer', 'alb', 'nlb'),
+    'NAT_GATEWAY': ('nat', 'gateway')
+}
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case alphanumeric tokens of a string."""
+    return _TOKEN.findall(str(text).lower()) if text else []
+
+
+class ResourceSearchIndex:
+    """
+    In-memory search over inventory records.
+
+    An inverted index maps terms from IDs, names, tag keys and values and
+    resource type words to the records containing them. Prefix lookups (ID
+    completion, partially typed words) binary-search a sorted array of all
+    terms, which answers the same queries as a character trie in a fraction
+    of the memory. Records are indexed per inventory collection and replaced
+    whenever that collection is refreshed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs: Dict[int, Tuple[str, str, Optional[str], Optional[str], Optional[str]]] = {}
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._collections: Dict[Tuple[str, str], Tuple[Any, List[int]]] = {}
+        self._postings: Dict[str, Dict[int, Tuple[float, str]]] = {}
+        self._terms: List[str] = []
+        self._terms_dirty = False
+        self._next_doc = 0
+
+    @property
+    def document_count(self) -> int:
+        return len(self._docs)
+
+    def version(self, resource_type: str, scope: str) -> Any:
+        """Version the collection was indexed at (its inventory refresh time), or None."""
+        indexed = self._collections.get((resource_type, scope))
+        return indexed[0] if indexed else None
+
+    def replace_collection(self, resource_type: str, scope: str, resources: List[Any], version: Any):
+        """
+        Index one inventory collection, replacing what was indexed for it before.
+
+        Args:
+            resource_type: Resource type (e.g., 'EC2')
+            scope: Region collected, or 'global'
+            resources: Inventory records
+            version: Inventory refresh time the records correspond to
+        """
+        with self._lock:
+            _, previous = self._collections.get((resource_type, scope), (None, []))
+            for doc in previous:
+                self._remove(doc)
+
+            docs = []
+            for resource in resources:
+                doc = self._next_doc
+                self._next_doc += 1
+                self._add(doc, resource)
+                docs.append(doc)
+            self._collections[(resource_type, scope)] = (version, docs)
+            self._terms_dirty = True
+
+    def search(self, query: str, limit: int = 10, resource_type: Optional[str] = None,
+               region: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Rank records against a free-text query.
+
+        Records matching every query word are found by intersecting postings,
+        rarest word first; records matching only some words are considered
+        only when fewer than limit match them all. Matches rank by words
+        matched, then score. The last query word and ID-like queries ('i-0ab')
+        also match as prefixes.
+
+        Args:
+            query: Free text, names, tag values or partial IDs
+            limit: Most matches returned
+            resource_type: Only match this type (optional)
+            region: Only match this region (optional)
+
+        Returns:
+            Dictionary with 'matches' (best first) and 'total_matches'
+        """
+        terms = [term for term in tokenize(query) if term not in STOPWORDS]
+        raw = query.strip().lower()
+        if raw and ' ' not in raw and not raw.isalnum():
+            # Whole ID or ARN fragment, matched as one term
+            terms.append(raw)
+        terms = list(dict.fromkeys(terms))
+
+        with self._lock:
+            if self._terms_dirty:
+                self._terms = sorted(self._postings)
+                self._terms_dirty = False
+
+            # Words are usually still being typed at the end of a query, and IDs are typed partially
+            postings = [
+                self._term_postings(term, position == len(terms) - 1 or not term.isalnum() or len(term) >= 3)
+                for position, term in enumerate(terms)
+            ]
+
+            def wanted(doc: int) -> bool:
+                return ((resource_type is None or self._docs[doc][0] == resource_type)
+                        and (region is None or self._docs[doc][3] in (region, None)))
+
+            candidates = set()
+            if postings:
+                by_size = sorted(postings, key=len)
+                candidates = {doc for doc in by_size[0] if all(doc in other for other in by_size[1:]) and wanted(doc)}
+                if len(candidates) < limit:
+                    candidates = {doc for posting in postings for doc in posting if wanted(doc)}
+
+            def rank(doc: int):
+                hits = [posting[doc] for posting in postings if doc in posting]
+                return len(hits), sum(weight for weight, _ in hits), hits
+
+            ranked = heapq.nsmallest(
+                limit, ((rank(doc), doc) for doc in candidates),
+                key=lambda item: (-item[0][0], -item[0][1], self._docs[item[1]][2] or self._docs[item[1]][1])
+            )
+
+            matches = []
+            for (coverage, score, hits), doc in ranked:
+                doc_type, resource_id, name, doc_region, status = self._docs[doc]
+                matches.append({
+                    'resource_id': resource_id,
+                    'resource_type': doc_type,
+                    'name': name,
+                    'region': doc_region,
+                    'status': status,
+                    'score': round(score, 2),
+                    'matched_terms': coverage,
+                    'matched_fields': sorted({field for _, field in hits})
+                })
+        return {'matches': matches, 'total_matches': len(candidates)}
+
+    def _term_postings(self, term: str, expand: bool) -> Dict[int, Tuple[float, str]]:
+        """Records matching a term, plus its prefix completions when expand is set."""
+        exact = self._postings.get(term, {})
+        completions = self._complete(term) if expand else []
+        if not completions:
+            return exact
+
+        merged = dict(exact)
+        for completion in completions:
+            for doc, (weight, field) in self._postings[completion].items():
+                if weight * PREFIX_FACTOR > merged.get(doc, (0.0, ''))[0]:
+                    merged[doc] = (weight * PREFIX_FACTOR, field)
+        return merged
+
+    def _complete(self, prefix: str) -> List[str]:
+        """Indexed terms that extend a prefix, shortest first."""
+        start = bisect.bisect_right(self._terms, prefix)
+        completions = []
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            completions.append(term)
+        completions.sort(key=len)
+        return completions[:MAX_PREFIX_TERMS]
+
+    def _add(self, doc: int, resource: Any):
+        resource_type = resource['resource_type']
+        resource_id = str(resource['resource_id'])
+        name = resource.get('name')
+        self._docs[doc] = (resource_type, resource_id, name, resource.get('region'), resource.get('status'))
+
+        weighted: Dict[str, Tuple[float, str]] = {}
+
+        def add(term: str, field: str, weight: float):
+            if weight > weighted.get(term, (0.0, ''))[0]:
+                weighted[term] = (weight, field)
+
+        add(resource_id.lower(), 'id', FIELD_WEIGHTS['id'])
+        for token in tokenize(resource_id):
+            # Single characters ('i' of i-0abc) would match nearly everything
+            if len(token) > 1:
+                add(token, 'id', FIELD_WEIGHTS['id'] * PREFIX_FACTOR)
+        for token in tokenize(name):
+            add(token, 'name', FIELD_WEIGHTS['name'])
+        for key, value in (resource.get('tags') or {}).items():
+            for token in tokenize(value):
+                add(token, f"tag:{key}", FIELD_WEIGHTS['tag'])
+            for token in tokenize(key):
+                add(token, f"tag:{key}", FIELD_WEIGHTS['tag'] * PREFIX_FACTOR)
+        for token in TYPE_TERMS.get(resource_type, (resource_type.lower(),)):
+            add(token, 'type', FIELD_WEIGHTS['type'])
+
+        for term, posting in weighted.items():
+            self._postings.setdefault(term, {})[doc] = posting
+        self._doc_terms[doc] = list(weighted)
+
+    def _remove(self, doc: int):
+        for term in self._doc_terms.pop(doc, []):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc, None)
+                if not postings:
+                    del self._postings[term]
+        self._docs.pop(doc, None)
@@ -0,0 +1,115 @@
+"""
+Invocation-scoped AWS response cache for AWS AI Concierge
+"""
+
+import json
+import logging
+import threading
+from typing import Dict, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Only read-only operations are cached
+CACHEABLE_PREFIXES = ('describe_', 'get_', 'list_')
+# Client helpers that are not API operations
+UNCACHED_METHODS = ('get_paginator', 'get_waiter')
+
+
+class ResponseCache:
+    """
+    Memoizes read-only AWS API responses for the lifetime of one invocation.
+
+    Concurrent identical calls wait for the first one instead of issuing their own
+    request. Errors are not cached.
+    """
+
+    def __init__(self):
+        self._responses: Dict[Tuple, Any] = {}
+        self._inflight: Dict[Tuple, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, client: Any, operation: str, **kwargs) -> Any:
+        """
+        Call a client operation, reusing an earlier response for identical arguments.
+
+        Args:
+            client: Boto3 client
+            operation: API operation name
+            **kwargs: API call parameters
+
+        Returns:
+            API response
+        """
+        key = (id(client), operation, json.dumps(kwargs, sort_keys=True, default=str))
+
+        while True:
+            with self._lock:
+                if key in self._responses:
+                    self.hits += 1
+                    return self._responses[key]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._inflight[key] = event
+                    self.misses += 1
+                    break
+            # Another thread is fetching this response; re-check once it finishes
+            event.wait()
+
+        try:
+            response = getattr(client, operation)(**kwargs)
+            with self._lock:
+                self._responses[key] = response
+            return response
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache hit and miss counts."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._responses)}
+
+
+class CachingClient:
+    """Client proxy that routes read-only operations through a ResponseCache."""
+
+    def __init__(self, client: Any, cache: ResponseCache):
+        self._client = client
+        self._cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if callable(attr) and name.startswith(CACHEABLE_PREFIXES) and name not in UNCACHED_METHODS:
+            return lambda **kwargs: self._cache.call(self._client, name, **kwargs)
+        return attr
+
+
+class CachingClientManager:
+    """
+    Wraps an AWSClientManager so every client it hands out shares one ResponseCache.
+
+    Used to give concurrent sub-analyses of a single request a common view of AWS data.
+    """
+
+    def __init__(self, aws_clients: Any, cache: ResponseCache = None):
+        self._aws_clients = aws_clients
+        self.cache = cache if cache is not None else ResponseCache()
+        self._wrapped: Dict[int, CachingClient] = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._aws_clients, name)
+        if callable(attr) and name.startswith('get_') and name.endswith('client'):
+            return lambda *args, **kwargs: self._wrap(attr(*args, **kwargs))
+        return attr
+
+    def _wrap(self, client: Any) -> CachingClient:
+        with self._lock:
+            wrapped = self._wrapped.get(id(client))
+            if wrapped is None:
+                wrapped = CachingClient(client, self.cache)
+                self._wrapped[id(client)] = wrapped
+            return wrapped
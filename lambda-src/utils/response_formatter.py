@@ -138,8 +138,12 @@ class ResponseFormatter:
         path_mapping = {
             'getCostAnalysis': '/getCostAnalysis',
             'getIdleResources': '/getIdleResources',
+            'getCostForecast': '/getCostForecast',
             'getResourceInventory': '/getResourceInventory',
             'getResourceDetails': '/getResourceDetails',
+            'getInventoryChanges': '/getInventoryChanges',
+            'getResourceRelationships': '/getResourceRelationships',
+            'searchResources': '/searchResources',
             'getResourceHealth': '/getResourceHealth',
             'getSecurityAssessment': '/getSecurityAssessment',
             'checkEncryptionStatus': '/checkEncryptionStatus',
@@ -0,0 +1,139 @@
+"""
+Tag-driven resource discovery through the Resource Groups Tagging API
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Inventory resource types and their tagging API resource type filters
+RESOURCE_TYPE_FILTERS = {
+    'EC2': 'ec2:instance',
+    'S3': 's3',
+    'RDS': 'rds:db',
+    'LAMBDA': 'lambda:function',
+    'ECS': 'ecs:cluster',
+    'EKS': 'eks:cluster',
+    'DYNAMODB': 'dynamodb:table',
+    'ELASTICACHE': 'elasticache:cluster',
+    'EBS': 'ec2:volume',
+    'ELB': 'elasticloadbalancing:loadbalancer',
+    'NAT_GATEWAY': 'ec2:natgateway'
+}
+RESOURCES_PER_PAGE = 100
+DEFAULT_MAX_WORKERS = 8
+
+
+def parse_arn(arn: str) -> Optional[Tuple[str, str]]:
+    """
+    Map an ARN to an inventory resource type and ID.
+
+    Returns:
+        Tuple of (resource type, resource ID), or None for unsupported ARNs
+    """
+    parts = arn.split(':', 5)
+    if len(parts) < 6:
+        return None
+    service, resource = parts[2], parts[5]
+    if service == 'ec2' and resource.startswith('instance/'):
+        return 'EC2', resource.split('/', 1)[1]
+    if service == 'ec2' and resource.startswith('volume/'):
+        return 'EBS', resource.split('/', 1)[1]
+    if service == 'ec2' and resource.startswith('natgateway/'):
+        return 'NAT_GATEWAY', resource.split('/', 1)[1]
+    if service == 's3' and '/' not in resource:
+        return 'S3', resource
+    if service == 'rds' and resource.startswith('db:'):
+        return 'RDS', resource.split(':', 1)[1]
+    if service == 'lambda' and resource.startswith('function:'):
+        # Drop a version or alias qualifier
+        return 'LAMBDA', resource.split(':')[1]
+    if service in ('ecs', 'eks') and resource.startswith('cluster/'):
+        return service.upper(), resource.split('/', 1)[1]
+    if service == 'dynamodb' and resource.startswith('table/') and resource.count('/') == 1:
+        return 'DYNAMODB', resource.split('/', 1)[1]
+    if service == 'elasticache' and resource.startswith('cluster:'):
+        return 'ELASTICACHE', resource.split(':', 1)[1]
+    if service == 'elasticloadbalancing' and resource.startswith('loadbalancer/'):
+        # loadbalancer/app/<name>/<id> for ALB/NLB/GWLB, loadbalancer/<name> for Classic
+        parts = resource.split('/')
+        return 'ELB', parts[2] if len(parts) == 4 else parts[1]
+    return None
+
+
+def tag_filters_for(tags: Dict[str, Optional[str]]) -> List[Dict[str, Any]]:
+    """Tagging API TagFilters; a None value matches any value of the key."""
+    return [{'Key': key} if value is None else {'Key': key, 'Values': [value]} for key, value in tags.items()]
+
+
+class TagQueryEngine:
+    """Finds resources by tag across regions without describing untagged resources."""
+
+    def __init__(self, aws_clients, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.aws_clients = aws_clients
+        self.max_workers = max_workers
+
+    def find(self, tags: Dict[str, Optional[str]], resource_types: List[str], regions: List[str],
+             request_id: str) -> Dict[str, Any]:
+        """
+        Find resources matching all tag filters.
+
+        Args:
+            tags: Tag key -> value filters (None matches any value)
+            resource_types: Inventory resource types to search (e.g., ['EC2', 'S3'])
+            regions: Regions to query concurrently
+            request_id: Request ID for tracking
+
+        Returns:
+            Dictionary with 'matches' (resource_type, resource_id, arn, region,
+            tags) and 'failed_regions' (region -> error message)
+        """
+        type_filters = [RESOURCE_TYPE_FILTERS[t] for t in resource_types if t in RESOURCE_TYPE_FILTERS]
+        matches, failed_regions = [], {}
+
+        def query(region):
+            try:
+                return region, self._query_region(region, tags, type_filters), None
+            except Exception as e:
+                logger.warning(f"[{request_id}] Tag query failed in {region}: {str(e)}")
+                return region, [], e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(regions)))) as executor:
+            for region, region_matches, error in executor.map(query, regions):
+                if error is not None:
+                    failed_regions[region] = error
+                matches.extend(region_matches)
+
+        if regions and len(failed_regions) == len(regions):
+            raise next(iter(failed_regions.values()))
+
+        logger.info(f"[{request_id}] Tag query matched {len(matches)} resources in {len(regions)} regions")
+        return {'matches': matches, 'failed_regions': {region: str(e) for region, e in failed_regions.items()}}
+
+    def _query_region(self, region: str, tags: Dict[str, Optional[str]], type_filters: List[str]) -> List[Dict[str, Any]]:
+        client = self.aws_clients.get_tagging_client(region)
+        kwargs = {
+            'TagFilters': tag_filters_for(tags),
+            'ResourceTypeFilters': type_filters,
+            'ResourcesPerPage': RESOURCES_PER_PAGE
+        }
+
+        matches = []
+        while True:
+            response = client.get_resources(**kwargs)
+            for mapping in response.get('ResourceTagMappingList', []):
+                parsed = parse_arn(mapping['ResourceARN'])
+                if parsed is None:
+                    continue
+                matches.append({
+                    'resource_type': parsed[0],
+                    'resource_id': parsed[1],
+                    'arn': mapping['ResourceARN'],
+                    'region': region,
+                    'tags': {tag['Key']: tag['Value'] for tag in mapping.get('Tags', [])}
+                })
+            if not response.get('PaginationToken'):
+                return matches
+            kwargs['PaginationToken'] = response['PaginationToken']
@@ -0,0 +1,123 @@
+"""
+Concurrent task graph execution for AWS AI Concierge
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, List, Callable, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class TaskGraph:
+    """
+    Runs named tasks on a thread pool as soon as their dependencies finish.
+
+    Each task receives a dictionary of its dependencies' results. A failed task
+    does not stop independent branches; tasks that depend on it are skipped.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS):
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Iterable[str] = ()):
+        """
+        Add a task to the graph.
+
+        Args:
+            name: Unique task name
+            func: Callable taking a dict of dependency results
+            depends_on: Names of tasks that must succeed first
+        """
+        if name in self._tasks:
+            raise ValueError(f"Duplicate task name: {name}")
+        self._tasks[name] = {'func': func, 'depends_on': list(depends_on)}
+
+    def run(self, request_id: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute all tasks, running independent branches concurrently.
+
+        Args:
+            request_id: Request ID for tracking
+            timeout: Overall time limit in seconds (optional)
+
+        Returns:
+            Dictionary with 'results', 'errors' (task name -> message) and 'timings' (seconds)
+        """
+        for name, task in self._tasks.items():
+            unknown = [dep for dep in task['depends_on'] if dep not in self._tasks]
+            if unknown:
+                raise ValueError(f"Task {name} depends on unknown tasks: {unknown}")
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        timings: Dict[str, float] = {}
+        pending = dict(self._tasks)
+        running = {}
+        deadline = time.time() + timeout if timeout else None
+        started = time.time()
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self._tasks))))
+        try:
+            while pending or running:
+                self._skip_failed_dependents(pending, errors)
+                for name in self._ready(pending, results):
+                    task = pending.pop(name)
+                    deps = {dep: results[dep] for dep in task['depends_on']}
+                    running[executor.submit(self._timed, task['func'], deps)] = name
+
+                if not running:
+                    # Remaining tasks can never become ready
+                    for name in pending:
+                        errors[name] = 'Unresolvable dependencies'
+                    break
+
+                remaining = deadline - time.time() if deadline else None
+                if remaining is not None and remaining <= 0:
+                    break
+                done, _ = wait(list(running), timeout=remaining, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name], timings[name] = future.result()
+                    except Exception as e:
+                        errors[name] = str(e)
+                        logger.warning(f"[{request_id}] Task {name} failed: {str(e)}")
+        finally:
+            for name in list(running.values()) + list(pending):
+                errors.setdefault(name, 'Timed out')
+            executor.shutdown(wait=False)
+
+        logger.info(f"[{request_id}] Task graph finished {len(results)}/{len(self._tasks)} tasks "
+                    f"in {time.time() - started:.2f}s")
+        return {'results': results, 'errors': errors, 'timings': timings}
+
+    @staticmethod
+    def _timed(func: Callable[[Dict[str, Any]], Any], deps: Dict[str, Any]):
+        start = time.time()
+        result = func(deps)
+        return result, round(time.time() - start, 3)
+
+    @staticmethod
+    def _ready(pending: Dict[str, Dict[str, Any]], results: Dict[str, Any]) -> List[str]:
+        return [name for name, task in pending.items()
+                if all(dep in results for dep in task['depends_on'])]
+
+    @staticmethod
+    def _skip_failed_dependents(pending: Dict[str, Dict[str, Any]], errors: Dict[str, str]):
+        skipped = True
+        while skipped:
+            skipped = False
+            for name in list(pending):
+                failed = [dep for dep in pending[name]['depends_on'] if dep in errors]
+                if failed:
+                    errors[name] = f"Dependency failed: {failed[0]}"
+                    del pending[name]
+                    skipped = True